@@ -4,14 +4,18 @@ Responsável por inicialização, configuração e routing principal.
 Integra ETAPA 1 (Criação) + ETAPA 2 (Edição/Refinamento).
 """
 
+import uuid
 import streamlit as st
 import config
-from services.ai_service import AIService
+from services.async_ai_service import AsyncAIService
+from services.batch_service import BatchService
+from services.client_manager import get_client_manager
+from services.metrics import start_metrics_server
 from controllers.story_controller import StoryController
 from controllers.editor_controller import EditorController
 from views import story_form_view, story_display_view
 from views import editor_view, suggestions_view, version_view
-from views import story_list_view, export_view
+from views import story_list_view, export_view, bulk_import_view, batch_view, diagnostics_view
 from utils.formatters import format_error_message
 from models.story import Story
 from services.invest_service import InvestService
@@ -353,19 +357,29 @@ def initialize_services():
     Usa cache para evitar reinicialização desnecessária.
 
     Returns:
-        Tupla (AIService, StoryController, EditorController)
+        Tupla (AsyncAIService, StoryController, EditorController, BatchService)
     """
+    # Backend fake (testes e benchmarks offline) dispensa API key e conexões
+    use_api = config.LLM_BACKEND == "anthropic"
+
     # Obter API key
-    api_key = config.get_api_key()
+    api_key = config.get_api_key() if use_api else ""
+
+    # Conexões com a API abertas uma única vez por processo (clientes compartilhados)
+    if use_api and config.HTTP_WARM_UP:
+        get_client_manager().warm_up(api_key)
 
-    # Criar AI Service
-    ai_service = AIService(api_key=api_key)
+    # Criar AI Service (variante assíncrona permite análises em paralelo)
+    ai_service = AsyncAIService(api_key=api_key)
 
     # Criar Controllers
     story_controller = StoryController(ai_service=ai_service)
     editor_controller = EditorController(ai_service=ai_service)
 
-    return ai_service, story_controller, editor_controller
+    # Modo offline (Message Batches)
+    batch_service = BatchService(ai_service=ai_service, story_controller=story_controller)
+
+    return ai_service, story_controller, editor_controller, batch_service
 
 
 def main():
@@ -405,7 +419,7 @@ def main():
 
     # Inicializar services
     try:
-        ai_service, story_controller, editor_controller = initialize_services()
+        ai_service, story_controller, editor_controller, batch_service = initialize_services()
     except Exception as e:
         st.error(f"Erro ao inicializar aplicação: {str(e)}")
         st.stop()
@@ -414,6 +428,18 @@ def main():
     if 'current_story' not in st.session_state:
         st.session_state.current_story = None
 
+    # Identificador da sessão (pré-geração especulativa)
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+
+    # Endpoint local de métricas (Prometheus), iniciado uma vez por processo
+    metrics_url = None
+    if config.METRICS_SERVER_ENABLED:
+        metrics_url = start_metrics_server(config.METRICS_HOST, config.METRICS_PORT)
+
+    # Painel de diagnóstico (métricas de uso da IA)
+    diagnostics_view.render_diagnostics(ai_service, metrics_url)
+
     # Sistema de navegação por tabs (ETAPA 3: 5 tabs)
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "📝 Criar Historia",
@@ -425,7 +451,7 @@ def main():
 
     # TAB 1: Criar História (ETAPA 1)
     with tab1:
-        _render_create_story_tab(story_controller, editor_controller)
+        _render_create_story_tab(story_controller, editor_controller, batch_service)
 
     # TAB 2: Editar (ETAPA 2)
     with tab2:
@@ -439,56 +465,86 @@ def main():
     with tab4:
         story_list_view.render_story_list()
 
+        with st.expander("Processamento Offline (Message Batches)", expanded=False):
+            batch_view.render_batch_panel(batch_service)
+
     # TAB 5: Exportar (ETAPA 3)
     with tab5:
         export_view.render_export_options()
 
 
-def _render_create_story_tab(story_controller: StoryController, editor_controller: EditorController):
+def _render_create_story_tab(
+    story_controller: StoryController,
+    editor_controller: EditorController,
+    batch_service: BatchService
+):
     """
     Renderiza tab de criação de história (ETAPA 1).
 
     Args:
         story_controller: Controller de histórias
         editor_controller: Controller de edição
+        batch_service: Service de lotes offline
     """
     if st.session_state.current_story is None:
         # Mostrar formulário
         st.info("Preencha o formulario abaixo para gerar uma nova historia")
 
+        # Geração em lote a partir de backlog CSV/JSONL
+        with st.expander("Importar Backlog em Lote (CSV/JSONL)", expanded=False):
+            bulk_import_view.render_bulk_import(story_controller, batch_service)
+
         form_data = story_form_view.render_form()
 
+        # Estimativa de tokens/custo com os valores atuais do formulário
+        if form_data is None:
+            story_form_view.render_token_estimate(story_controller.estimate_generation)
+
+            # Formulário válido e parado: geração começa em background
+            story_controller.speculate(
+                story_form_view.build_draft_form_data(),
+                st.session_state.session_id
+            )
+
         # Se formulário foi submetido
         if form_data is not None:
             # Salvar form_data para regeneração posterior
             st.session_state.form_data = form_data
 
-            # Exibir loading
-            with st.spinner("Gerando historia..."):
-                st.info("Isso pode levar ate 30 segundos...")
+            # Renderização progressiva da história (streaming)
+            on_chunk = story_display_view.create_stream_renderer()
+
+            # Criar história via controller
+            story, error_type = story_controller.create_story(
+                form_data,
+                on_chunk=on_chunk,
+                speculation_owner=st.session_state.session_id
+            )
 
-                # Criar história via controller
-                story, error_type = story_controller.create_story(form_data)
+            if story is not None:
+                # Sucesso - converter Story para dict e armazenar
+                story_dict = story.to_dict()
+                st.session_state.current_story = story_dict
 
-                if story is not None:
-                    # Sucesso - converter Story para dict e armazenar
-                    story_dict = story.to_dict()
-                    st.session_state.current_story = story_dict
+                # IMPORTANTE: Inicializar primeira versão (ETAPA 2)
+                editor_controller.initialize_first_version(story_dict)
 
-                    # IMPORTANTE: Inicializar primeira versão (ETAPA 2)
-                    editor_controller.initialize_first_version(story_dict)
+                # Marcar que história foi gerada com sucesso
+                st.session_state.story_generated_success = True
 
-                    # Marcar que história foi gerada com sucesso
-                    st.session_state.story_generated_success = True
+                # Uso de tokens da geração (inclui leitura/escrita do prompt cache)
+                st.session_state.generation_usage = story_controller.ai_service.get_last_usage(
+                    "generate_story"
+                )
 
-                    st.rerun()
-                else:
-                    # Erro - exibir mensagem apropriada
-                    error_info = format_error_message(error_type)
-                    story_display_view.show_error(
-                        error_message=error_info["message"],
-                        error_type=error_type
-                    )
+                st.rerun()
+            else:
+                # Erro - exibir mensagem apropriada
+                error_info = format_error_message(error_type)
+                story_display_view.show_error(
+                    error_message=error_info["message"],
+                    error_type=error_type
+                )
     else:
         # Verificar se história foi gerada com sucesso (mostrar mensagem)
         if st.session_state.get('story_generated_success', False):
@@ -532,10 +588,14 @@ def _render_create_story_tab(story_controller: StoryController, editor_controlle
             complexidade=story_dict.get('complexidade'),
             criterios_aceitacao=story_dict.get('criterios_aceitacao'),
             historia_gerada=story_dict.get('historia_gerada', ''),
-            created_at=created_at
+            created_at=created_at,
+            value_area=story_dict.get('value_area', 'Business'),
+            modelo_ia=story_dict.get('modelo_ia', ''),
+            form_data=story_dict.get('form_data') or {}
         )
 
         story_display_view.render_story(story)
+        story_display_view.render_usage(st.session_state.get('generation_usage', {}))
 
         st.markdown("---")
 
@@ -605,6 +665,11 @@ def _render_edit_tab(editor_controller: EditorController):
     with st.expander("Ver Sugestoes de Melhoria", expanded=False):
         suggestions_view.render_suggestions(editor_controller)
 
+    # Análise completa (INVEST + sugestões + regenerações em paralelo)
+    st.markdown("---")
+    with st.expander("Analise Completa (paralela)", expanded=False):
+        suggestions_view.render_full_analysis(editor_controller)
+
 
 def _render_versions_tab(editor_controller: EditorController):
     """
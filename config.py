@@ -62,6 +62,115 @@ CLAUDE_MAX_TOKENS = 4000
 CLAUDE_TIMEOUT = 30
 CLAUDE_MAX_RETRIES = 2
 
+# Circuit breaker por modelo (latência/erros acima do SLO desviam para o modelo de contingência)
+CIRCUIT_BREAKER_ENABLED = True
+CLAUDE_FALLBACK_MODEL = os.getenv("CLAUDE_FALLBACK_MODEL", "claude-3-5-haiku-20241022")
+CIRCUIT_WINDOW_SIZE = 20
+CIRCUIT_MIN_SAMPLES = 5
+CIRCUIT_ERROR_RATE_THRESHOLD = 0.5
+CIRCUIT_SLOW_RATE_THRESHOLD = 0.5
+CIRCUIT_FIRST_TOKEN_SLO_SECONDS = 10.0
+CIRCUIT_LATENCY_SLO_SECONDS = 60.0
+CIRCUIT_OPEN_SECONDS = 60.0
+CIRCUIT_HALF_OPEN_PROBES = 2
+
+# Orçamento de tokens (max_tokens e timeout dinâmicos por tipo de requisição)
+TOKEN_BUDGET_ENABLED = True
+TOKEN_BUDGET_HISTORY_SIZE = 200
+TOKEN_BUDGET_PERCENTILE = 0.95
+TOKEN_BUDGET_SAFETY_MARGIN = 1.3
+TOKEN_BUDGET_DEFAULT_TOKENS_PER_SECOND = 60.0
+TOKEN_BUDGET_BASE_LATENCY_SECONDS = 3.0
+TOKEN_BUDGET_MIN_TIMEOUT = 15.0
+TOKEN_BUDGET_MAX_TIMEOUT = 90.0
+
+# Preços do modelo (USD por milhão de tokens) para estimativa de custo
+PRICE_INPUT_PER_MTOK = 3.0
+PRICE_OUTPUT_PER_MTOK = 15.0
+
+# Pool de conexões HTTP compartilhado (keep-alive entre sessões e reruns)
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 10
+HTTP_KEEPALIVE_EXPIRY = 120.0
+HTTP_WARM_UP = True
+
+# Agendador de requisições (limites da conta compartilhados por todas as sessões)
+RATE_LIMIT_ENABLED = True
+RATE_LIMIT_REQUESTS_PER_MINUTE = int(os.getenv("ANTHROPIC_RPM", "50"))
+RATE_LIMIT_TOKENS_PER_MINUTE = int(os.getenv("ANTHROPIC_TPM", "40000"))
+RATE_LIMIT_MAX_WAIT_SECONDS = 120
+RATE_LIMIT_MAX_RETRIES = 3
+RATE_LIMIT_DEFAULT_RETRY_AFTER = 10
+
+# Hedged requests em generate_story (segunda tentativa se a primeira demorar além do percentil)
+HEDGE_ENABLED = False
+HEDGE_OPERATIONS = ("generate_story",)
+HEDGE_PERCENTILE = 0.9
+HEDGE_MIN_SAMPLES = 10
+HEDGE_DEFAULT_DELAY_SECONDS = 8.0
+HEDGE_MIN_DELAY_SECONDS = 1.0
+
+# Single-flight: requisições idênticas em andamento compartilham a mesma chamada à API
+SINGLE_FLIGHT_ENABLED = True
+
+# Continuação de respostas cortadas por max_tokens (o texto parcial é mantido e completado)
+CONTINUATION_OPERATIONS = ("generate_story", "generate_section", "regenerate_section")
+CONTINUATION_MAX_ROUNDS = 3
+
+# Regeneração de seções com contexto mínimo (seções relevantes + resumo das demais)
+REGENERATION_MINIMAL_CONTEXT = True
+REGENERATION_SUMMARY_CHARS = 160
+
+# Cache de respostas da IA (LRU em memória + SQLite local)
+CACHE_ENABLED = True
+CACHE_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "ai_responses.sqlite3")
+CACHE_TTL_SECONDS = 24 * 60 * 60
+CACHE_MEMORY_MAX_ENTRIES = 256
+CACHE_DISK_MAX_ENTRIES = 5000
+
+# Geração em lote (importação de backlog CSV/JSONL)
+BULK_MAX_WORKERS = 4
+BULK_MAX_RETRIES = 2
+BULK_RETRY_BACKOFF_SECONDS = 2.0
+
+# Pré-processamento das imagens de evidência (Fix/Bug/Incidente)
+IMAGE_MAX_DIMENSION = 1568  # maior lado útil para o modelo (px); acima disso a API redimensiona
+IMAGE_MAX_PIXELS = 1_150_000  # área útil (~1,15 MP ≈ 1600 tokens por imagem)
+IMAGE_QUALITY = 85
+IMAGE_PREPROCESS_WORKERS = 2
+
+# Armazenamento das imagens por hash (a história guarda só referências image://<hash>)
+IMAGE_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "images")
+IMAGE_STORE_MEMORY_MAX_ENTRIES = 64
+IMAGE_STORE_MAX_BYTES = 500 * 1024 * 1024  # acima disso remove as imagens acessadas há mais tempo
+IMAGE_STORE_MAX_AGE_SECONDS = 30 * 24 * 60 * 60  # imagens não acessadas nesse período são removidas
+
+# Motor de geração ("monolithic" = uma chamada, "sections" = seções em paralelo; apenas Business)
+GENERATION_ENGINE = os.getenv("GENERATION_ENGINE", "monolithic")
+SECTION_ENGINE_MAX_WORKERS = 6
+
+# Pré-geração especulativa (inicia a geração quando o formulário válido fica parado)
+SPECULATIVE_GENERATION_ENABLED = False
+SPECULATIVE_DEBOUNCE_SECONDS = 2.0
+
+# Métricas de uso da IA (exportadas em formato Prometheus em http://METRICS_HOST:METRICS_PORT/metrics)
+METRICS_ENABLED = True
+METRICS_SERVER_ENABLED = True
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+
+# Backend de LLM ("anthropic" = API real, "fake" = backend local determinístico)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "anthropic")
+
+# Simulação do backend fake (latência até o primeiro token e velocidade; 0 = instantâneo)
+FAKE_BACKEND_LATENCY_SECONDS = float(os.getenv("FAKE_BACKEND_LATENCY_SECONDS", "0.5"))
+FAKE_BACKEND_TOKENS_PER_SECOND = float(os.getenv("FAKE_BACKEND_TOKENS_PER_SECOND", "80"))
+FAKE_BACKEND_SEED = int(os.getenv("FAKE_BACKEND_SEED", "0"))
+
+# Modo offline via Message Batches ("anthropic" = API real, "local" = servidor local)
+BATCH_BACKEND = os.getenv("BATCH_BACKEND", "anthropic")
+BATCH_POLL_INTERVAL_SECONDS = 30
+
 # Configurações da aplicação
 APP_TITLE = "Gerador de Histórias"
 APP_ICON = "📝"
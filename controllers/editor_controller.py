@@ -4,7 +4,7 @@ Coordena Services e gerencia fluxo de dados entre Models e Views.
 Segue padrão MVC e Single Responsibility Principle.
 """
 
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Dict, Any, Iterator, Optional, Tuple, List
 import streamlit as st
 from models.story import Story
 from models.version import StoryVersion
@@ -12,8 +12,10 @@ from models.invest_validator import InvestScore, Suggestion
 from models.session_storage import SessionStorage
 from services.editor_service import EditorService
 from services.version_service import VersionService
-from services.invest_service import InvestService
+from services.invest_service import InvestService, INVEST_CRITERIA
 from services.ai_service import AIService
+from services.async_ai_service import AsyncAIService
+import asyncio
 import json
 
 
@@ -120,6 +122,47 @@ class EditorController:
         except Exception as e:
             return None, str(e)
 
+    def handle_batch_regeneration(
+        self,
+        section_names: List[str],
+        original_story: Dict[str, Any],
+        form_data: Dict[str, Any]
+    ) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+        """
+        Regenera várias seções em uma única chamada à IA.
+
+        Args:
+            section_names: Seções a regenerar ("criterios", "testes", etc)
+            original_story: História original completa
+            form_data: Dados do formulário original
+
+        Returns:
+            Tupla (seção -> conteúdo regenerado, error_message)
+        """
+        try:
+            regenerated = self.ai_service.regenerate_sections(
+                section_names=section_names,
+                original_story=original_story,
+                form_data=form_data
+            )
+
+            return {
+                section: self.editor_service.sanitize_markdown(content)
+                for section, content in regenerated.items()
+            }, None
+
+        except Exception as e:
+            return None, str(e)
+
+    def get_last_regeneration(self) -> Dict[str, Any]:
+        """
+        Retorna tokens enviados, economia de contexto e latência da última regeneração.
+
+        Returns:
+            Dict do AIService.get_last_regeneration (vazio se indisponível)
+        """
+        return self.ai_service.get_last_regeneration()
+
     def apply_regenerated_section(
         self,
         section_name: str,
@@ -137,38 +180,60 @@ class EditorController:
         Returns:
             Tupla (success, new_version)
         """
-        if 'current_story' not in st.session_state:
-            return False, None
+        return self.apply_regenerated_sections(
+            {section_name: regenerated_content},
+            user_note=user_note
+        )
+
+    def apply_regenerated_sections(
+        self,
+        regenerated_sections: Dict[str, str],
+        user_note: str = ""
+    ) -> Tuple[bool, Optional[StoryVersion]]:
+        """
+        Aplica várias seções regeneradas à história atual como uma única versão.
+
+        Args:
+            regenerated_sections: Dict seção -> conteúdo regenerado
+            user_note: Nota sobre a regeneração
 
-        # Atualizar seção na história
-        # Aqui você pode implementar lógica para substituir seção específica
-        # no Markdown completo da história
+        Returns:
+            Tupla (success, new_version)
+        """
+        if 'current_story' not in st.session_state or not regenerated_sections:
+            return False, None
 
         current_story = st.session_state.current_story
         historia_atual = current_story.get('historia_gerada', '')
 
-        # Substituir seção no Markdown
+        # Substituir cada seção no Markdown
         # Esta é uma implementação simplificada
         # Em produção, você faria parsing mais robusto
-        updated_historia = self._replace_section_in_markdown(
-            historia_atual,
-            section_name,
-            regenerated_content
-        )
+        for section_name, regenerated_content in regenerated_sections.items():
+            historia_atual = self._replace_section_in_markdown(
+                historia_atual,
+                section_name,
+                regenerated_content
+            )
 
-        current_story['historia_gerada'] = updated_historia
+        current_story['historia_gerada'] = historia_atual
 
         # Atualizar história no SessionStorage (ETAPA 3)
         story_id = current_story.get('id')
         if story_id:
             SessionStorage.update_story(story_id, current_story)
 
-        # Criar nova versão
-        changes_summary = f"Regenerada seção: {section_name}"
+        # Criar nova versão (uma só para todas as seções)
+        section_list = ", ".join(regenerated_sections)
+        if len(regenerated_sections) == 1:
+            changes_summary = f"Regenerada seção: {section_list}"
+        else:
+            changes_summary = f"Regeneradas seções: {section_list}"
+
         new_version = self.version_service.create_version(
             story_content=current_story,
             changes_summary=changes_summary,
-            user_note=user_note or f"Regeneração de {section_name}"
+            user_note=user_note or f"Regeneração de {section_list}"
         )
 
         return True, new_version
@@ -204,12 +269,13 @@ class EditorController:
         # Padrão para encontrar a seção
         pattern = rf"(###\s+{section_label}.*?)(?=###|\Z)"
 
-        # Substituir seção
+        # Substituir seção (linha em branco antes da próxima seção)
         replacement = new_content if new_content.startswith('###') else f"### {section_label}\n\n{new_content}"
+        replacement = replacement.rstrip() + "\n\n"
 
         updated_text = re.sub(
             pattern,
-            replacement,
+            lambda _: replacement,
             markdown_text,
             flags=re.DOTALL
         )
@@ -258,6 +324,37 @@ class EditorController:
             local_score = self.invest_service.validate_invest_local(story)
             return local_score, f"Erro na validação com IA: {str(e)}"
 
+    def validate_invest_with_ai_stream(
+        self,
+        story: Dict[str, Any]
+    ) -> Iterator[Tuple[str, InvestScore, Optional[str]]]:
+        """
+        Valida história com IA em streaming: cada critério é entregue
+        assim que chega, sem esperar a resposta completa.
+
+        Args:
+            story: História completa
+
+        Yields:
+            Tupla (campo, invest_score parcial, error_message).
+            O último item tem campo "overall" (score final) ou, em caso de erro,
+            "error" com a validação local.
+        """
+        fields = set()
+
+        try:
+            chunks = self.ai_service.validate_invest_with_ai_stream(story)
+            for field, invest_score in self.invest_service.parse_ai_validation_stream(chunks):
+                fields.add(field)
+                if field == "overall" and not fields & set(INVEST_CRITERIA):
+                    raise ValueError("Erro ao processar resposta da IA")
+                yield field, invest_score, None
+
+        except Exception as e:
+            # Em caso de erro, retornar validação local
+            local_score = self.invest_service.validate_invest_local(story)
+            yield "error", local_score, f"Erro na validação com IA: {str(e)}"
+
     def analyze_and_suggest(
         self,
         story: Dict[str, Any]
@@ -275,28 +372,164 @@ class EditorController:
             # Chamar AI Service
             ai_response = self.ai_service.analyze_and_suggest(story)
 
-            # Parsear resposta JSON
-            suggestions_data = json.loads(ai_response)
-
-            # Converter para objetos Suggestion
-            suggestions = [
-                Suggestion(
-                    type=s['type'],
-                    severity=s['severity'],
-                    problem=s['problem'],
-                    suggestion=s['suggestion'],
-                    applicable=s.get('applicable', False)
-                )
-                for s in suggestions_data
-            ]
-
-            return suggestions, None
+            return self._parse_suggestions(ai_response), None
 
         except json.JSONDecodeError:
             return None, "Erro ao processar resposta da IA"
         except Exception as e:
             return None, str(e)
 
+    def _parse_suggestions(self, ai_response: str) -> List[Suggestion]:
+        """
+        Converte resposta JSON da IA em objetos Suggestion.
+
+        Args:
+            ai_response: Resposta JSON (array) da IA
+
+        Returns:
+            Lista de Suggestion
+
+        Raises:
+            json.JSONDecodeError: Se a resposta não for JSON válido
+        """
+        # Parsear resposta JSON
+        suggestions_data = json.loads(ai_response)
+
+        # Converter para objetos Suggestion
+        return [
+            Suggestion(
+                type=s['type'],
+                severity=s['severity'],
+                problem=s['problem'],
+                suggestion=s['suggestion'],
+                applicable=s.get('applicable', False)
+            )
+            for s in suggestions_data
+        ]
+
+    def review_story(
+        self,
+        story: Dict[str, Any]
+    ) -> Tuple[Optional[InvestScore], Optional[List[Suggestion]], Optional[str]]:
+        """
+        Revisão completa (INVEST + sugestões) em uma única chamada à IA.
+
+        Args:
+            story: História completa
+
+        Returns:
+            Tupla (invest_score, suggestions, error_message).
+            Em caso de erro, invest_score vem da validação local e suggestions é None.
+        """
+        try:
+            review = self.ai_service.review_story(story)
+            invest_score, suggestions = self.invest_service.parse_review_result(review)
+            return invest_score, suggestions, None
+
+        except Exception as e:
+            local_score = self.invest_service.validate_invest_local(story)
+            return local_score, None, f"Erro na revisão com IA: {str(e)}"
+
+    def analyze_everything(
+        self,
+        story: Dict[str, Any],
+        form_data: Optional[Dict[str, Any]] = None,
+        sections: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Executa a revisão (validação INVEST e sugestões em uma única chamada)
+        e as regenerações pendentes (todas as seções em uma única chamada) em
+        paralelo. O tempo total é o da chamada mais lenta. Sem AsyncAIService,
+        as chamadas são executadas em sequência.
+
+        Args:
+            story: História completa
+            form_data: Dados do formulário original (para regenerações)
+            sections: Seções a regenerar ("criterios", "testes", etc)
+
+        Returns:
+            Dict com chaves:
+            - invest: Tupla (invest_score, error_message)
+            - suggestions: Tupla (suggestions, error_message)
+            - regenerations: Dict seção -> Tupla (conteúdo, error_message)
+        """
+        sections = sections or []
+        form_data = form_data or {}
+
+        if not isinstance(self.ai_service, AsyncAIService):
+            invest_score, suggestions, error = self.review_story(story)
+            regenerations = {}
+            if sections:
+                regenerated, regeneration_error = self.handle_batch_regeneration(sections, story, form_data)
+                regenerations = {
+                    section: ((regenerated or {}).get(section), regeneration_error)
+                    for section in sections
+                }
+            return {
+                "invest": (invest_score, error),
+                "suggestions": (suggestions, error),
+                "regenerations": regenerations
+            }
+
+        return self.ai_service.run(
+            self._gather_analysis(story, form_data, sections)
+        )
+
+    async def _gather_analysis(
+        self,
+        story: Dict[str, Any],
+        form_data: Dict[str, Any],
+        sections: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Dispara as chamadas assíncronas e agrega os resultados.
+
+        Args:
+            story: História completa
+            form_data: Dados do formulário original
+            sections: Seções a regenerar
+
+        Returns:
+            Dict no mesmo formato de analyze_everything
+        """
+        calls = [self.ai_service.review_story_async(story)]
+        if sections:
+            calls.append(self.ai_service.regenerate_sections_async(sections, story, form_data))
+
+        responses = await asyncio.gather(*calls, return_exceptions=True)
+
+        review_response = responses[0]
+        regeneration_response = responses[1] if sections else {}
+
+        # Revisão: em caso de erro, retornar validação local e nenhuma sugestão
+        try:
+            if isinstance(review_response, Exception):
+                raise review_response
+            invest_score, suggestions = self.invest_service.parse_review_result(review_response)
+            invest_result = (invest_score, None)
+            suggestions_result = (suggestions, None)
+        except Exception as e:
+            error = f"Erro na revisão com IA: {str(e)}"
+            invest_result = (self.invest_service.validate_invest_local(story), error)
+            suggestions_result = (None, error)
+
+        # Regenerações
+        regenerations = {}
+        for section in sections:
+            if isinstance(regeneration_response, Exception):
+                regenerations[section] = (None, str(regeneration_response))
+            else:
+                regenerations[section] = (
+                    self.editor_service.sanitize_markdown(regeneration_response[section]),
+                    None
+                )
+
+        return {
+            "invest": invest_result,
+            "suggestions": suggestions_result,
+            "regenerations": regenerations
+        }
+
     def restore_version(
         self,
         version_number: int,
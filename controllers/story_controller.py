@@ -4,10 +4,12 @@ Segue padrão MVC e Single Responsibility Principle.
 """
 
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable, Iterator, Optional, Tuple
 from models.story import Story
 from models.session_storage import SessionStorage
 from services.ai_service import AIService
+from services.image_store import get_image_store, image_reference
+from services.speculative_generator import Speculation, get_speculative_generator
 from anthropic import APITimeoutError, APIConnectionError, RateLimitError
 
 
@@ -25,8 +27,20 @@ class StoryController:
             ai_service: Instância do AIService configurado
         """
         self.ai_service = ai_service
-
-    def create_story(self, form_data: Dict[str, Any]) -> tuple[Story | None, str | None]:
+        self.speculator = get_speculative_generator()
+
+        if ai_service.metrics is not None:
+            ai_service.metrics.register_collector("image_store", get_image_store().get_stats)
+            if self.speculator is not None:
+                ai_service.metrics.register_collector("speculation", self.speculator.get_stats)
+
+    def create_story(
+        self,
+        form_data: Dict[str, Any],
+        on_chunk: Optional[Callable[[str], None]] = None,
+        persist: bool = True,
+        speculation_owner: Optional[str] = None
+    ) -> tuple[Story | None, str | None]:
         """
         Cria uma história a partir dos dados do formulário.
 
@@ -38,6 +52,13 @@ class StoryController:
                 - objetivos: List[str]
                 - complexidade: int
                 - criterios_aceitacao: List[str]
+            on_chunk: Callback opcional que recebe cada trecho de texto.
+                Quando informado, a geração usa o modo streaming e a
+                história é persistida somente após o stream terminar.
+            persist: Se False, não salva no SessionStorage (usado por workers
+                da geração em lote, que não têm acesso ao session_state)
+            speculation_owner: Sessão cuja pré-geração especulativa pode ser
+                reaproveitada (mesmos dados do formulário)
 
         Returns:
             Tupla (Story, error_type) onde:
@@ -46,49 +67,28 @@ class StoryController:
                          (timeout, rate_limit, connection, api_key, generic)
         """
         try:
-            # Extrair dados do formulário
-            value_area = form_data.get("value_area", "Business")
-            titulo = form_data.get("titulo", "")
-            complexidade = form_data.get("complexidade", 5)
-
-            # Dados específicos para Business
-            regras_negocio = form_data.get("regras_negocio", [])
-            apis_servicos = form_data.get("apis_servicos", [])
-            objetivos = form_data.get("objetivos", {})
-            criterios_aceitacao = form_data.get("criterios_aceitacao", [])
-            api_specs = form_data.get("api_specs", None)
+            generation_args = self._generation_args(form_data)
+
+            # Pré-geração especulativa com os mesmos dados (em andamento ou concluída)
+            speculation = self._take_speculation(form_data, speculation_owner)
 
             # Chamar AI Service para gerar história (passa form_data completo)
-            historia_gerada = self.ai_service.generate_story(
-                titulo=titulo,
-                regras_negocio=regras_negocio,
-                apis_servicos=apis_servicos,
-                objetivos=objetivos,
-                complexidade=complexidade,
-                criterios_aceitacao=criterios_aceitacao,
-                api_specs=api_specs,
-                form_data=form_data
-            )
+            if speculation is not None:
+                historia_gerada, modelo_ia = self._consume_stream(speculation.follow(), on_chunk)
+                self.ai_service.last_usage["generate_story"] = speculation.usage
+            elif on_chunk is not None:
+                # Modo streaming: repassa cada trecho para a view
+                historia_gerada, modelo_ia = self._consume_stream(
+                    self.ai_service.generate_story_stream(**generation_args), on_chunk
+                )
+            else:
+                historia_gerada, modelo_ia = self.ai_service.generate_story(**generation_args)
 
-            # Se for Fix/Bug e tiver imagens, inserir as imagens reais na seção de evidências
-            fix_images = form_data.get('fix_images', [])
-            if value_area == 'Fix/Bug/Incidente' and fix_images:
-                historia_gerada = self._insert_images_in_story(historia_gerada, fix_images)
-
-            # Criar objeto Story
-            story = Story(
-                titulo=titulo,
-                regras_negocio=regras_negocio if regras_negocio else [],
-                apis_servicos=apis_servicos if apis_servicos else [],
-                objetivos=objetivos if objetivos else {},
-                complexidade=complexidade,
-                criterios_aceitacao=criterios_aceitacao if criterios_aceitacao else [],
-                historia_gerada=historia_gerada,
-                value_area=value_area
-            )
+            story = self.build_story(form_data, historia_gerada, modelo_ia=modelo_ia)
 
             # Salvar história no SessionStorage (ETAPA 3)
-            SessionStorage.add_story(story.to_dict())
+            if persist:
+                SessionStorage.add_story(story.to_dict())
 
             return story, None
 
@@ -114,6 +114,221 @@ class StoryController:
             error_details = f"{type(e).__name__}: {str(e)}\n\nStack Trace:\n{traceback.format_exc()}"
             return None, f"generic:{error_details}"
 
+    @staticmethod
+    def _consume_stream(
+        stream: Iterator[str],
+        on_chunk: Optional[Callable[[str], None]] = None
+    ) -> Tuple[str, str]:
+        """
+        Consome um stream de geração repassando cada trecho ao callback.
+
+        Returns:
+            Tupla (texto completo, modelo retornado pelo gerador)
+        """
+        chunks = []
+        while True:
+            try:
+                chunk = next(stream)
+            except StopIteration as stop:
+                return "".join(chunks), stop.value or ""
+            chunks.append(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk)
+
+    @staticmethod
+    def _generation_args(form_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Argumentos de AIService.generate_story a partir do formulário."""
+        return dict(
+            titulo=form_data.get("titulo", ""),
+            regras_negocio=form_data.get("regras_negocio", []),
+            apis_servicos=form_data.get("apis_servicos", []),
+            objetivos=form_data.get("objetivos", {}),
+            complexidade=form_data.get("complexidade", 5),
+            criterios_aceitacao=form_data.get("criterios_aceitacao", []),
+            api_specs=form_data.get("api_specs", None),
+            form_data=form_data
+        )
+
+    def speculate(self, form_data: Dict[str, Any], owner: str) -> None:
+        """
+        Registra o rascunho do formulário para pré-geração especulativa.
+        Só especula histórias Business que passam em validate_form; rascunhos
+        inválidos cancelam a especulação da sessão.
+
+        Args:
+            form_data: Rascunho do formulário (mesmo formato do envio)
+            owner: Identificador da sessão
+        """
+        if self.speculator is None:
+            return
+
+        is_valid = False
+        if form_data.get("value_area", "Business") == "Business":
+            is_valid, _ = self.validate_story_data(form_data)
+
+        if not is_valid:
+            self.speculator.discard(owner)
+            return
+
+        try:
+            key = self.ai_service.generation_key(form_data)
+        except Exception:
+            return
+
+        generation_args = self._generation_args(form_data)
+        self.speculator.observe(
+            owner,
+            key,
+            generate=lambda: self.ai_service.generate_story_stream(**generation_args),
+            usage=lambda: dict(self.ai_service.get_last_usage("generate_story"))
+        )
+
+    def _take_speculation(self, form_data: Dict[str, Any], owner: Optional[str]) -> Optional[Speculation]:
+        """Especulação reaproveitável para o envio (None se não houver)."""
+        if self.speculator is None or not owner:
+            return None
+
+        try:
+            key = self.ai_service.generation_key(form_data)
+        except Exception:
+            self.speculator.discard(owner)
+            return None
+
+        return self.speculator.take(owner, key)
+
+    def estimate_generation(self, form_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Estima tokens, limite de saída, timeout e custo da geração
+        antes do envio do formulário.
+
+        Args:
+            form_data: Dados (possivelmente parciais) do formulário
+
+        Returns:
+            Dict com input_tokens, expected_output_tokens, max_tokens,
+            timeout e estimated_cost_usd, ou None se não for possível estimar
+        """
+        try:
+            return self.ai_service.estimate_generation(form_data)
+        except Exception:
+            return None
+
+    def build_story(
+        self,
+        form_data: Dict[str, Any],
+        historia_gerada: str,
+        story_id: Optional[str] = None,
+        modelo_ia: str = ""
+    ) -> Story:
+        """
+        Monta o objeto Story a partir do formulário e do texto gerado.
+        Para Fix/Bug com imagens, insere as evidências na história.
+
+        Args:
+            form_data: Dados do formulário
+            historia_gerada: História gerada pela IA em Markdown
+            story_id: ID pré-definido (ex: geração em lote offline)
+            modelo_ia: Modelo que gerou a história
+
+        Returns:
+            Story criada
+        """
+        value_area = form_data.get("value_area", "Business")
+
+        # Se for Fix/Bug e tiver imagens, inserir as imagens reais na seção de evidências
+        fix_images = form_data.get('fix_images', [])
+        if value_area == 'Fix/Bug/Incidente' and fix_images:
+            historia_gerada = self._insert_images_in_story(historia_gerada, fix_images)
+
+        story_fields = dict(
+            titulo=form_data.get("titulo", ""),
+            regras_negocio=form_data.get("regras_negocio") or [],
+            apis_servicos=form_data.get("apis_servicos") or [],
+            objetivos=form_data.get("objetivos") or {},
+            complexidade=form_data.get("complexidade", 5),
+            criterios_aceitacao=form_data.get("criterios_aceitacao") or [],
+            historia_gerada=historia_gerada,
+            value_area=value_area,
+            modelo_ia=modelo_ia,
+            form_data=self.stored_form_data(form_data)
+        )
+        if story_id:
+            story_fields["id"] = story_id
+
+        return Story(**story_fields)
+
+    @staticmethod
+    def stored_form_data(form_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Cópia do formulário guardada com a história, para que ela possa ser
+        gerada novamente com os campos específicos do tipo (Spike, Kaizen,
+        Fix, api_specs). As imagens de evidência ficam no ImageStore e a
+        cópia guarda apenas o hash.
+
+        Args:
+            form_data: Dados do formulário
+
+        Returns:
+            Cópia do formulário sem o conteúdo das imagens
+        """
+        stored = dict(form_data)
+
+        images = stored.get('fix_images')
+        if images:
+            store = get_image_store()
+            stored['fix_images'] = [
+                {
+                    "name": img.get('name', f'Evidência {i+1}'),
+                    "type": img.get('type', 'image/png'),
+                    "digest": (
+                        store.put_base64(img['data'], img.get('type', 'image/png'))
+                        if img.get('data') else img.get('digest', '')
+                    )
+                }
+                for i, img in enumerate(images)
+            ]
+
+        return stored
+
+    @staticmethod
+    def restore_form_data(story: Dict[str, Any]) -> tuple[Dict[str, Any] | None, str | None]:
+        """
+        Formulário original de uma história salva, pronto para nova geração
+        (imagens de evidência recuperadas do ImageStore).
+
+        Args:
+            story: História do SessionStorage
+
+        Returns:
+            Tupla (form_data, motivo) onde:
+            - form_data: Formulário original, None se não puder ser recuperado
+            - motivo: None se recuperado, descrição do problema caso contrário
+        """
+        stored = story.get('form_data')
+        if not stored:
+            return None, "historia sem os dados originais do formulario"
+
+        form_data = dict(stored)
+
+        images = form_data.get('fix_images')
+        if images:
+            store = get_image_store()
+            restored = []
+            for img in images:
+                if img.get('data'):
+                    restored.append(img)
+                    continue
+
+                image = store.get_base64(img.get('digest', ''))
+                if image is None:
+                    return None, f"imagem de evidencia indisponivel: {img.get('name', '')}"
+
+                media_type, data = image
+                restored.append({"name": img.get('name', ''), "type": media_type, "data": data})
+            form_data['fix_images'] = restored
+
+        return form_data, None
+
     def validate_story_data(self, form_data: Dict[str, Any]) -> tuple[bool, list[str]]:
         """
         Valida os dados do formulário antes de criar a história.
@@ -146,12 +361,13 @@ class StoryController:
             images: Lista de imagens em formato {name, type, data}
 
         Returns:
-            História com imagens inseridas
+            História com referências às imagens inseridas
         """
         if not images:
             return historia
 
-        # Criar bloco de imagens em Markdown (base64 inline)
+        # Criar bloco de imagens em Markdown (referências ao armazenamento por hash)
+        store = get_image_store()
         images_markdown = "\n\n**Imagens Anexadas:**\n\n"
         for i, img in enumerate(images):
             img_name = img.get('name', f'Evidência {i+1}')
@@ -159,9 +375,10 @@ class StoryController:
             img_data = img.get('data', '')
 
             if img_data:
-                # Sintaxe Markdown para imagem base64 inline
+                # Imagem guardada uma única vez; a história leva só a referência
+                digest = store.put_base64(img_data, img_type)
                 images_markdown += f"**{img_name}:**\n\n"
-                images_markdown += f"![{img_name}](data:{img_type};base64,{img_data})\n\n"
+                images_markdown += f"{image_reference(img_name, digest)}\n\n"
 
         # Encontrar a seção de Evidências e inserir as imagens
         # Padrão: ### Evidências seguido de conteúdo até a próxima seção ###
@@ -4,6 +4,7 @@ Exportador para formato JSON.
 
 import json
 from typing import List, Dict
+from services.image_store import resolve_images
 from .base_exporter import BaseExporter
 
 
@@ -11,6 +12,12 @@ class JSONExporter(BaseExporter):
     """Exporta histórias em JSON"""
 
     def export(self, stories: List[Dict]) -> bytes:
+        # Referências de imagem viram data URIs (arquivo autocontido)
+        stories = [
+            {**story, "historia_gerada": resolve_images(story.get("historia_gerada", ""))}
+            for story in stories
+        ]
+
         # Se for apenas 1 história, exportar objeto
         if len(stories) == 1:
             data = stories[0]
@@ -3,12 +3,21 @@ Exportador para formato Markdown com metadados.
 """
 
 from typing import List, Dict
+from services.image_store import resolve_images
 from .base_exporter import BaseExporter
 
 
 class MarkdownExporter(BaseExporter):
     """Exporta histórias em Markdown com metadados"""
 
+    def __init__(self, embed_images: bool = True):
+        """
+        Args:
+            embed_images: Resolve referências de imagem em data URIs
+                (False mantém image://<hash>, ex: ZIP com arquivos de imagem)
+        """
+        self.embed_images = embed_images
+
     def export(self, stories: List[Dict]) -> bytes:
         content = []
 
@@ -23,7 +32,8 @@ complexidade: {story['complexidade']}
 
 """
             content.append(metadata)
-            content.append(story['historia_gerada'])
+            historia = story['historia_gerada']
+            content.append(resolve_images(historia) if self.embed_images else historia)
             content.append("\n\n---\n\n")
 
         return "".join(content).encode('utf-8')
@@ -4,6 +4,7 @@ Exportador para formato TXT (texto simples).
 
 import re
 from typing import List, Dict
+from services.image_store import strip_images
 from .base_exporter import BaseExporter
 
 
@@ -15,7 +16,7 @@ class TextExporter(BaseExporter):
 
         for story in stories:
             # Remover markdown e formatar
-            text = self._clean_markdown(story['historia_gerada'])
+            text = self._clean_markdown(strip_images(story['historia_gerada']))
             content.append(text)
             content.append("\n\n" + "="*80 + "\n\n")
 
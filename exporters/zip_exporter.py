@@ -5,18 +5,34 @@ Exportador para formato ZIP (múltiplos arquivos).
 import zipfile
 from io import BytesIO
 from typing import List, Dict
+from services.image_store import MEDIA_TYPE_EXTENSIONS, get_image_store, replace_image_refs
 from .base_exporter import BaseExporter
 from .markdown_exporter import MarkdownExporter
 
 
 class ZipExporter(BaseExporter):
-    """Exporta múltiplas histórias em ZIP"""
+    """
+    Exporta múltiplas histórias em ZIP.
+    Imagens vão uma única vez para historias/imagens/ e o Markdown aponta para elas.
+    """
 
     def export(self, stories: List[Dict]) -> bytes:
         buffer = BytesIO()
 
         with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            md_exporter = MarkdownExporter()
+            md_exporter = MarkdownExporter(embed_images=False)
+            image_paths: Dict[str, str] = {}
+
+            def link_image(alt: str, digest: str) -> str:
+                if digest not in image_paths:
+                    image = get_image_store().get(digest)
+                    if image is None:
+                        return f"[Imagem indisponível: {alt}]"
+                    media_type, image_bytes = image
+                    image_paths[digest] = f"imagens/{digest}.{MEDIA_TYPE_EXTENSIONS.get(media_type, 'bin')}"
+                    # Imagens já comprimidas: armazenadas sem recompressão
+                    zip_file.writestr(f"historias/{image_paths[digest]}", image_bytes, zipfile.ZIP_STORED)
+                return f"![{alt}]({image_paths[digest]})"
 
             for i, story in enumerate(stories, 1):
                 # Nome do arquivo individual
@@ -25,7 +41,8 @@ class ZipExporter(BaseExporter):
                 filename = f"historia-{i}-{safe_title}.md"
 
                 # Conteúdo em markdown
-                content = md_exporter.export([story])
+                content = md_exporter.export([story]).decode('utf-8')
+                content = replace_image_refs(content, link_image)
 
                 # Adicionar ao ZIP
                 zip_file.writestr(f"historias/{filename}", content)
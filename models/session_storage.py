@@ -2,27 +2,46 @@
 Modelo de armazenamento em sessão.
 Encapsula acesso ao session_state do Streamlit.
 Implementa padrão Repository para histórias em memória.
+As histórias ficam em um StoryIndex (mapa ordenado por ID com índices
+secundários), então buscas, atualizações e remoções por ID são O(1).
 """
 
 import streamlit as st
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import date, datetime
+from models.story_index import StoryIndex
 
 
 class SessionStorage:
     """Encapsula acesso ao session_state para histórias"""
 
+    @staticmethod
+    def _index() -> StoryIndex:
+        """
+        Retorna o índice de histórias da sessão (criado sob demanda).
+        Sessões com a lista antiga em session_state.stories são migradas.
+
+        Returns:
+            StoryIndex da sessão
+        """
+        if 'story_index' not in st.session_state:
+            legacy = st.session_state.get('stories', [])
+            st.session_state.story_index = StoryIndex(legacy)
+            if 'stories' in st.session_state:
+                del st.session_state['stories']
+        return st.session_state.story_index
+
     @staticmethod
     def get_all_stories() -> List[Dict]:
         """
-        Retorna todas as histórias da sessão.
+        Retorna todas as histórias da sessão (ordem de criação).
+        A lista é reaproveitada entre leituras enquanto não houver alteração;
+        use os métodos de escrita em vez de alterá-la diretamente.
 
         Returns:
             Lista de dicionários com histórias
         """
-        if 'stories' not in st.session_state:
-            st.session_state.stories = []
-        return st.session_state.stories
+        return SessionStorage._index().as_list()
 
     @staticmethod
     def add_story(story: Dict) -> None:
@@ -32,8 +51,7 @@ class SessionStorage:
         Args:
             story: Dicionário com dados da história
         """
-        stories = SessionStorage.get_all_stories()
-        stories.append(story)
+        SessionStorage._index().add(story)
 
     @staticmethod
     def get_story_by_id(story_id: str) -> Optional[Dict]:
@@ -46,11 +64,7 @@ class SessionStorage:
         Returns:
             Dicionário da história ou None se não encontrada
         """
-        stories = SessionStorage.get_all_stories()
-        for story in stories:
-            if story['id'] == story_id:
-                return story
-        return None
+        return SessionStorage._index().get(story_id)
 
     @staticmethod
     def update_story(story_id: str, updated_story: Dict) -> bool:
@@ -64,13 +78,12 @@ class SessionStorage:
         Returns:
             True se atualizou, False se não encontrou
         """
-        stories = SessionStorage.get_all_stories()
-        for i, story in enumerate(stories):
-            if story['id'] == story_id:
-                updated_story['updated_at'] = datetime.now().isoformat()
-                stories[i] = updated_story
-                return True
-        return False
+        index = SessionStorage._index()
+        if story_id not in index:
+            return False
+
+        updated_story['updated_at'] = datetime.now().isoformat()
+        return index.replace(story_id, updated_story)
 
     @staticmethod
     def delete_story(story_id: str) -> bool:
@@ -83,10 +96,7 @@ class SessionStorage:
         Returns:
             True se removeu, False se não encontrou
         """
-        stories = SessionStorage.get_all_stories()
-        initial_len = len(stories)
-        st.session_state.stories = [s for s in stories if s['id'] != story_id]
-        return len(st.session_state.stories) < initial_len
+        return SessionStorage._index().remove(story_id)
 
     @staticmethod
     def clear_all() -> int:
@@ -96,9 +106,7 @@ class SessionStorage:
         Returns:
             Quantidade de histórias removidas
         """
-        count = len(st.session_state.get('stories', []))
-        st.session_state.stories = []
-        return count
+        return SessionStorage._index().clear()
 
     @staticmethod
     def count_stories() -> int:
@@ -108,32 +116,66 @@ class SessionStorage:
         Returns:
             Número total de histórias
         """
-        return len(SessionStorage.get_all_stories())
+        return len(SessionStorage._index())
 
     @staticmethod
-    def get_stories_created_today() -> int:
+    def get_stories_by_value_area(value_area: str) -> List[Dict]:
         """
-        Conta histórias criadas hoje.
+        Histórias de um Value Area.
+
+        Args:
+            value_area: Business, Spike, Kaizen ou Fix/Bug/Incidente
 
         Returns:
-            Número de histórias criadas hoje
+            Lista de histórias (ordem de criação)
         """
-        stories = SessionStorage.get_all_stories()
-        today = datetime.now().date()
+        return SessionStorage._index().by_value_area(value_area)
 
-        count = 0
-        for story in stories:
-            created_at = story.get('created_at')
-            if created_at:
-                if isinstance(created_at, str):
-                    created_date = datetime.fromisoformat(created_at).date()
-                else:
-                    created_date = created_at.date()
+    @staticmethod
+    def get_stories_by_complexity(complexidade: int) -> List[Dict]:
+        """
+        Histórias com determinada complexidade.
 
-                if created_date == today:
-                    count += 1
+        Args:
+            complexidade: Pontos de complexidade
 
-        return count
+        Returns:
+            Lista de histórias (ordem de criação)
+        """
+        return SessionStorage._index().by_complexity(complexidade)
+
+    @staticmethod
+    def get_stories_created_on(day: date) -> List[Dict]:
+        """
+        Histórias criadas em um dia.
+
+        Args:
+            day: Data de criação
+
+        Returns:
+            Lista de histórias (ordem de criação)
+        """
+        return SessionStorage._index().created_on(day)
+
+    @staticmethod
+    def count_by_value_area() -> Dict[str, int]:
+        """
+        Quantidade de histórias por Value Area.
+
+        Returns:
+            Dict Value Area -> quantidade
+        """
+        return SessionStorage._index().value_areas()
+
+    @staticmethod
+    def get_stories_created_today() -> int:
+        """
+        Conta histórias criadas hoje.
+
+        Returns:
+            Número de histórias criadas hoje
+        """
+        return SessionStorage._index().count_created_on(datetime.now().date())
 
     @staticmethod
     def get_average_complexity() -> float:
@@ -143,12 +185,7 @@ class SessionStorage:
         Returns:
             Complexidade média ou 0 se não houver histórias
         """
-        stories = SessionStorage.get_all_stories()
-        if not stories:
-            return 0.0
-
-        total = sum(s.get('complexidade', 0) for s in stories)
-        return total / len(stories)
+        return SessionStorage._index().average_complexity()
 
     @staticmethod
     def count_stories_with_versions() -> int:
@@ -158,5 +195,4 @@ class SessionStorage:
         Returns:
             Número de histórias com versões
         """
-        stories = SessionStorage.get_all_stories()
-        return sum(1 for s in stories if s.get('versions'))
+        return SessionStorage._index().count_with_versions()
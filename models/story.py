@@ -24,6 +24,10 @@ class Story(BaseModel):
         criterios_aceitacao: Lista de critérios de aceitação
         historia_gerada: História completa gerada pela IA em Markdown
         created_at: Data/hora de criação
+        value_area: Tipo da história (Business, Spike, Kaizen, Fix/Bug)
+        modelo_ia: Modelo que gerou a história (principal ou contingência)
+        form_data: Dados originais do formulário, incluindo os campos específicos
+            do tipo (imagens de evidência guardadas apenas pelo hash)
     """
 
     id: str = Field(default_factory=lambda: str(uuid4()))
@@ -36,6 +40,8 @@ class Story(BaseModel):
     historia_gerada: str = Field(default="")
     created_at: datetime = Field(default_factory=datetime.now)
     value_area: str = Field(default="Business")
+    modelo_ia: str = Field(default="")
+    form_data: Dict[str, Any] = Field(default_factory=dict)
 
     @field_validator("regras_negocio", "apis_servicos", "criterios_aceitacao")
     @classmethod
@@ -68,7 +74,9 @@ class Story(BaseModel):
             "criterios_aceitacao": self.criterios_aceitacao,
             "historia_gerada": self.historia_gerada,
             "created_at": self.created_at.isoformat(),
-            "value_area": self.value_area
+            "value_area": self.value_area,
+            "modelo_ia": self.modelo_ia,
+            "form_data": self.form_data
         }
 
     def to_json_export(self) -> Dict:
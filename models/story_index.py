@@ -0,0 +1,221 @@
+"""
+Índice em memória das histórias da sessão.
+Mapa ordenado por ID (ordem de inserção) com índices secundários por
+Value Area, data de criação e complexidade, e agregados mantidos a cada
+alteração; buscas, atualizações e remoções por ID são O(1).
+Segue Single Responsibility Principle.
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# Chaves de índice de uma história: (value_area, data de criação, complexidade, tem versões)
+IndexKeys = Tuple[str, Optional[date], int, bool]
+
+
+class StoryIndex:
+    """
+    Histórias indexadas por ID, com índices secundários.
+
+    As chaves de índice de cada história são guardadas no momento da
+    indexação, então alterações feitas diretamente no dicionário só são
+    refletidas nos índices após replace().
+    """
+
+    def __init__(self, stories: Iterable[Dict[str, Any]] = ()):
+        """
+        Inicializa o índice.
+
+        Args:
+            stories: Histórias iniciais (ex: lista legada da sessão)
+        """
+        self._reset()
+
+        for story in stories:
+            self.add(story)
+
+    def _reset(self) -> None:
+        """Esvazia o mapa, os índices e os agregados."""
+        self._stories: Dict[str, Dict[str, Any]] = {}
+        self._keys: Dict[str, IndexKeys] = {}
+        self._by_value_area: Dict[str, Dict[str, None]] = {}
+        self._by_created_date: Dict[date, Dict[str, None]] = {}
+        self._by_complexity: Dict[int, Dict[str, None]] = {}
+        self._complexity_total = 0
+        self._with_versions = 0
+        self._list: Optional[List[Dict[str, Any]]] = None
+
+    def __len__(self) -> int:
+        return len(self._stories)
+
+    def __contains__(self, story_id: str) -> bool:
+        return story_id in self._stories
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._stories.values())
+
+    def add(self, story: Dict[str, Any]) -> None:
+        """
+        Adiciona história ao final (substitui, na mesma posição, se o ID já existir).
+
+        Args:
+            story: Dicionário com dados da história (com "id")
+        """
+        story_id = story['id']
+        if story_id in self._stories:
+            self._unindex(story_id)
+        self._stories[story_id] = story
+        self._index(story_id, story)
+        self._list = None
+
+    def get(self, story_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca história por ID.
+
+        Args:
+            story_id: ID da história
+
+        Returns:
+            Dicionário da história ou None
+        """
+        return self._stories.get(story_id)
+
+    def replace(self, story_id: str, story: Dict[str, Any]) -> bool:
+        """
+        Substitui história existente mantendo sua posição e reindexando.
+
+        Args:
+            story_id: ID da história
+            story: Novos dados
+
+        Returns:
+            True se substituiu, False se o ID não existe
+        """
+        if story_id not in self._stories:
+            return False
+
+        self._unindex(story_id)
+        self._stories[story_id] = story
+        self._index(story_id, story)
+        self._list = None
+        return True
+
+    def remove(self, story_id: str) -> bool:
+        """
+        Remove história.
+
+        Args:
+            story_id: ID da história
+
+        Returns:
+            True se removeu, False se o ID não existe
+        """
+        if story_id not in self._stories:
+            return False
+
+        self._unindex(story_id)
+        del self._stories[story_id]
+        self._list = None
+        return True
+
+    def clear(self) -> int:
+        """
+        Remove todas as histórias.
+
+        Returns:
+            Quantidade removida
+        """
+        count = len(self._stories)
+        self._reset()
+        return count
+
+    def as_list(self) -> List[Dict[str, Any]]:
+        """
+        Histórias em ordem de inserção. A lista é reconstruída apenas após
+        alterações; leituras seguidas (reruns) reaproveitam a mesma lista.
+
+        Returns:
+            Lista das histórias (não deve ser alterada pelo chamador)
+        """
+        if self._list is None:
+            self._list = list(self._stories.values())
+        return self._list
+
+    def by_value_area(self, value_area: str) -> List[Dict[str, Any]]:
+        """Histórias de um Value Area (ordem de inserção)."""
+        return [self._stories[story_id] for story_id in self._by_value_area.get(value_area, ())]
+
+    def by_complexity(self, complexidade: int) -> List[Dict[str, Any]]:
+        """Histórias com uma complexidade (ordem de inserção)."""
+        return [self._stories[story_id] for story_id in self._by_complexity.get(complexidade, ())]
+
+    def created_on(self, day: date) -> List[Dict[str, Any]]:
+        """Histórias criadas em um dia (ordem de inserção)."""
+        return [self._stories[story_id] for story_id in self._by_created_date.get(day, ())]
+
+    def count_created_on(self, day: date) -> int:
+        """Quantidade de histórias criadas em um dia."""
+        return len(self._by_created_date.get(day, ()))
+
+    def value_areas(self) -> Dict[str, int]:
+        """Value Areas presentes e quantidade de histórias em cada um."""
+        return {value_area: len(ids) for value_area, ids in self._by_value_area.items()}
+
+    def average_complexity(self) -> float:
+        """Complexidade média (0 se não houver histórias)."""
+        return self._complexity_total / len(self._stories) if self._stories else 0.0
+
+    def count_with_versions(self) -> int:
+        """Quantidade de histórias que possuem versões."""
+        return self._with_versions
+
+    def _index(self, story_id: str, story: Dict[str, Any]) -> None:
+        """Registra a história nos índices secundários e agregados."""
+        keys = (
+            story.get('value_area') or "Business",
+            self._created_date(story.get('created_at')),
+            story.get('complexidade', 0) or 0,
+            bool(story.get('versions'))
+        )
+        value_area, created, complexidade, has_versions = keys
+
+        self._keys[story_id] = keys
+        self._by_value_area.setdefault(value_area, {})[story_id] = None
+        if created is not None:
+            self._by_created_date.setdefault(created, {})[story_id] = None
+        self._by_complexity.setdefault(complexidade, {})[story_id] = None
+        self._complexity_total += complexidade
+        self._with_versions += has_versions
+
+    def _unindex(self, story_id: str) -> None:
+        """Remove a história dos índices usando as chaves registradas na indexação."""
+        value_area, created, complexidade, has_versions = self._keys.pop(story_id)
+
+        self._discard(self._by_value_area, value_area, story_id)
+        if created is not None:
+            self._discard(self._by_created_date, created, story_id)
+        self._discard(self._by_complexity, complexidade, story_id)
+        self._complexity_total -= complexidade
+        self._with_versions -= has_versions
+
+    @staticmethod
+    def _discard(index: Dict[Any, Dict[str, None]], key: Any, story_id: str) -> None:
+        """Remove o ID do grupo e descarta grupos vazios."""
+        group = index.get(key)
+        if group is not None:
+            group.pop(story_id, None)
+            if not group:
+                del index[key]
+
+    @staticmethod
+    def _created_date(created_at: Any) -> Optional[date]:
+        """Data de criação a partir de datetime ou string ISO (None se inválida)."""
+        if isinstance(created_at, datetime):
+            return created_at.date()
+        if isinstance(created_at, str) and created_at:
+            try:
+                return datetime.fromisoformat(created_at).date()
+            except ValueError:
+                return None
+        return None
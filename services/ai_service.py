@@ -4,28 +4,103 @@ Responsável por comunicação com IA e geração de histórias.
 Segue Single Responsibility Principle e Dependency Inversion Principle.
 """
 
-from typing import List, Dict, Any
-from anthropic import Anthropic, APITimeoutError, APIConnectionError, RateLimitError
+import json
+import os
+import time
+from types import SimpleNamespace
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from anthropic import APITimeoutError, APIConnectionError, APIStatusError, RateLimitError
+from services.circuit_breaker import Route, get_circuit_breaker
+from services.llm_backend import LLMBackend, create_backend
+from services.metrics import get_metrics_registry
+from services.response_cache import ResponseCache, get_response_cache
+from services.rate_limiter import RateLimiter, Reservation, get_rate_limiter, retry_after_seconds
+from services.request_hedger import COMPLETE, FIRST_TOKEN, CancelToken, get_request_hedger
+from services.section_engine import SectionStoryEngine
+from services.prompt_templates import VALUE_AREA_TEMPLATES, get_prompt_templates
+from services.regeneration_context import get_regeneration_context
+from services.single_flight import get_single_flight
+from services.token_budget import TokenBudget, TokenBudgetPlan, get_token_budget
 import config
 
 
+# Operação registrada nas requisições que continuam respostas cortadas por max_tokens
+CONTINUATION_OPERATION = "continue_story"
+
+# Seções regeneráveis (chave -> título da seção na história)
+REGENERATION_SECTIONS = {
+    'criterios': 'Criterios de Aceitacao',
+    'testes': 'Cenarios de Teste Sugeridos',
+    'arquitetura': 'Estrutura Tecnica/Arquitetura',
+    'beneficios': 'Beneficios'
+}
+
+# Regras comuns aos prompts de regeneração
+REGENERATION_RULES = """<critical_rules>
+1. NUNCA ADICIONAR EMOJIS
+2. USAR APENAS INFORMAÇÕES FORNECIDAS
+3. SER OBJETIVA E DIRETA
+4. NÃO INVENTAR NADA
+</critical_rules>"""
+
+# Ferramenta da regeneração em lote: uma entrada por seção pedida (schema garantido)
+REGENERATION_TOOL = {
+    "name": "submit_sections",
+    "description": "Registra as seções regeneradas da história, uma entrada por seção.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "sections": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "section": {"type": "string", "description": "Chave da seção (ex: criterios)"},
+                        "content": {"type": "string", "description": "Seção em Markdown, começando com ###"}
+                    },
+                    "required": ["section", "content"]
+                }
+            }
+        },
+        "required": ["sections"]
+    }
+}
+
+
 class AIService:
     """
     Service responsável pela comunicação com Claude API.
     Gera histórias de usuário técnicas usando IA.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str = "", backend: Optional[LLMBackend] = None):
         """
         Inicializa o service com configurações da API.
+        Com o backend da Anthropic, o cliente é compartilhado pelo processo
+        (pool de conexões persistente).
 
         Args:
             api_key: Chave de API da Anthropic
+            backend: Backend de LLM (padrão: config.LLM_BACKEND)
         """
-        self.client = Anthropic(api_key=api_key)
+        self.backend = backend or create_backend(api_key)
         self.model = config.CLAUDE_MODEL
         self.max_tokens = config.CLAUDE_MAX_TOKENS
         self.timeout = config.CLAUDE_TIMEOUT
+        self.cache = get_response_cache()
+        self.rate_limiter = get_rate_limiter()
+        self.token_budget = get_token_budget() if config.TOKEN_BUDGET_ENABLED else None
+        self.hedger = get_request_hedger()
+        self.single_flight = get_single_flight()
+        self.circuit_breaker = get_circuit_breaker()
+        self.prompt_templates = get_prompt_templates()
+        self.regeneration_context = get_regeneration_context()
+        self.metrics = get_metrics_registry()
+        self._register_metrics_collectors()
+        self.section_engine = SectionStoryEngine(self, max_workers=config.SECTION_ENGINE_MAX_WORKERS)
+        self.last_usage: Dict[str, Dict[str, int]] = {}
+        self.last_model: Dict[str, str] = {}
+        self.last_regeneration: Dict[str, Any] = {}
 
     def generate_story(
         self,
@@ -37,7 +112,7 @@ class AIService:
         criterios_aceitacao: List[str] = None,
         api_specs: Dict[str, str] = None,
         form_data: Dict[str, Any] = None
-    ) -> str:
+    ) -> Tuple[str, str]:
         """
         Gera história técnica usando Claude API.
 
@@ -52,7 +127,7 @@ class AIService:
             form_data: Dados completos do formulário (para novos tipos de história)
 
         Returns:
-            História gerada em formato Markdown
+            Tupla (história gerada em formato Markdown, modelo que a gerou)
 
         Raises:
             APITimeoutError: Se a API demorar mais que o timeout
@@ -60,98 +135,1323 @@ class AIService:
             APIConnectionError: Se houver erro de conexão
             Exception: Para outros erros da API
         """
-        # Verificar se é um novo tipo de história (Spike, Kaizen, Fix)
-        value_area = form_data.get('value_area', 'Business') if form_data else 'Business'
-
-        if value_area == 'Spike':
-            prompt = self._build_spike_prompt(form_data)
-        elif value_area == 'Kaizen':
-            prompt = self._build_kaizen_prompt(form_data)
-        elif value_area == 'Fix/Bug/Incidente':
-            prompt = self._build_fix_prompt(form_data)
-        else:
-            prompt = self._build_prompt(
-                titulo=titulo,
-                regras_negocio=regras_negocio or [],
-                apis_servicos=apis_servicos or [],
-                objetivos=objetivos or {},
-                complexidade=complexidade,
-                criterios_aceitacao=criterios_aceitacao or [],
-                api_specs=api_specs,
-                form_data=form_data
-            )
+        system_prompt, prompt = self._build_story_prompt(
+            titulo=titulo,
+            regras_negocio=regras_negocio,
+            apis_servicos=apis_servicos,
+            objetivos=objetivos,
+            complexidade=complexidade,
+            criterios_aceitacao=criterios_aceitacao,
+            api_specs=api_specs,
+            form_data=form_data
+        )
 
         try:
-            # Verificar se há imagens para enviar (Fix/Bug/Incidente)
-            fix_images = form_data.get('fix_images', []) if form_data else []
-
-            if fix_images and value_area == 'Fix/Bug/Incidente':
-                # Usar API multimodal com imagens
-                content = []
-
-                # Adicionar cada imagem como content block
-                for img in fix_images:
-                    content.append({
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": img.get("type", "image/png"),
-                            "data": img.get("data", "")
-                        }
-                    })
-
-                # Adicionar o prompt de texto
-                content.append({
-                    "type": "text",
-                    "text": prompt
-                })
-
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=self.max_tokens,
-                    timeout=self.timeout,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": content
-                        }
-                    ]
-                )
-            else:
-                # Requisição normal sem imagens
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=self.max_tokens,
-                    timeout=self.timeout,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ]
+            if self._uses_section_engine(form_data):
+                return self.section_engine.generate(
+                    prompt, titulo, regras_negocio or [], complexidade, form_data
                 )
 
-            # Extrai texto da resposta
-            if response.content and len(response.content) > 0:
-                return response.content[0].text
+            return self._request_text_with_model(
+                messages=self._build_story_messages(prompt, form_data),
+                system=self._build_system_blocks(system_prompt),
+                operation="generate_story",
+                category=(form_data or {}).get("value_area", "Business")
+            )
 
-            raise Exception("Resposta vazia da API")
+        except APITimeoutError:
+            raise APITimeoutError(
+                "Tempo esgotado ao aguardar resposta da IA. Tente novamente."
+            )
+        except RateLimitError as e:
+            raise RateLimitError(
+                "Limite de requisições atingido. Aguarde alguns minutos.",
+                response=e.response,
+                body=e.body
+            )
+        except APIConnectionError as e:
+            raise APIConnectionError(
+                message="Erro de conexão com a API. Verifique sua internet.",
+                request=e.request
+            )
+        except Exception as e:
+            raise Exception(f"Erro ao gerar história: {str(e)}")
+
+    def generate_story_stream(
+        self,
+        titulo: str,
+        regras_negocio: List[str] = None,
+        apis_servicos: List[str] = None,
+        objetivos: Dict[str, Any] = None,
+        complexidade: int = 5,
+        criterios_aceitacao: List[str] = None,
+        api_specs: Dict[str, str] = None,
+        form_data: Dict[str, Any] = None
+    ) -> Iterator[str]:
+        """
+        Gera história técnica em modo streaming (Messages streaming API).
+        Produz os trechos de texto à medida que chegam, permitindo
+        renderização progressiva do Markdown.
+
+        Args:
+            Mesmos argumentos de generate_story
+
+        Yields:
+            Trechos (deltas) de texto da história em Markdown
+
+        Returns:
+            Modelo que gerou a história (valor de retorno do gerador)
+
+        Raises:
+            APITimeoutError: Se a API demorar mais que o timeout
+            RateLimitError: Se atingir limite de requisições
+            APIConnectionError: Se houver erro de conexão
+            Exception: Para outros erros da API
+        """
+        system_prompt, prompt = self._build_story_prompt(
+            titulo=titulo,
+            regras_negocio=regras_negocio,
+            apis_servicos=apis_servicos,
+            objetivos=objetivos,
+            complexidade=complexidade,
+            criterios_aceitacao=criterios_aceitacao,
+            api_specs=api_specs,
+            form_data=form_data
+        )
+
+        try:
+            if self._uses_section_engine(form_data):
+                return (yield from self.section_engine.generate_stream(
+                    prompt, titulo, regras_negocio or [], complexidade, form_data
+                ))
+
+            return (yield from self._stream_text(
+                messages=self._build_story_messages(prompt, form_data),
+                system=self._build_system_blocks(system_prompt),
+                operation="generate_story",
+                category=(form_data or {}).get("value_area", "Business")
+            ))
 
         except APITimeoutError:
             raise APITimeoutError(
                 "Tempo esgotado ao aguardar resposta da IA. Tente novamente."
             )
-        except RateLimitError:
+        except RateLimitError as e:
             raise RateLimitError(
-                "Limite de requisições atingido. Aguarde alguns minutos."
+                "Limite de requisições atingido. Aguarde alguns minutos.",
+                response=e.response,
+                body=e.body
             )
-        except APIConnectionError:
+        except APIConnectionError as e:
             raise APIConnectionError(
-                "Erro de conexão com a API. Verifique sua internet."
+                message="Erro de conexão com a API. Verifique sua internet.",
+                request=e.request
             )
         except Exception as e:
             raise Exception(f"Erro ao gerar história: {str(e)}")
 
+    @staticmethod
+    def _uses_section_engine(form_data: Optional[Dict[str, Any]]) -> bool:
+        """Indica se a história é gerada seção a seção (apenas Business)."""
+        value_area = (form_data or {}).get("value_area", "Business")
+        return config.GENERATION_ENGINE == "sections" and value_area == "Business"
+
+    def _stream_text(
+        self,
+        messages: List[Dict[str, Any]],
+        system: Optional[List[Dict[str, Any]]] = None,
+        operation: str = "",
+        category: str = ""
+    ) -> Iterator[str]:
+        """
+        Versão streaming de _request_text: produz os trechos à medida que chegam.
+        Respostas em cache são entregues de uma vez; requisições idênticas
+        em andamento são compartilhadas (single-flight).
+
+        Args:
+            messages: Mensagens no formato da Messages API
+            system: Blocos do prompt de sistema (opcional)
+            operation: Nome da operação (uso de tokens e orçamento)
+            category: Value Area ou seção (orçamento de tokens)
+
+        Yields:
+            Trechos (deltas) de texto da resposta
+
+        Returns:
+            Modelo que atendeu a requisição (valor de retorno do gerador)
+
+        Raises:
+            Exception: Se a resposta vier vazia (demais erros da API são propagados)
+        """
+        cache_key = self._cache_key(messages, system)
+
+        # Resposta idêntica já em cache: entregar de uma vez
+        cached = self.cache.get(cache_key) if self.cache else None
+        if cached is not None:
+            self._record_usage(operation, None)
+            self._record_model(operation, self.model)
+            self._record_cache_metric(operation, "hit")
+            yield cached
+            return self.model
+        self._record_cache_metric(operation, "miss")
+
+        if self.single_flight is None:
+            return (yield from self._stream_uncached(messages, system, operation, category, cache_key))
+
+        stream, coalesced = self.single_flight.stream(
+            cache_key,
+            lambda: self._stream_uncached(messages, system, operation, category, cache_key)
+        )
+        if coalesced:
+            self._record_cache_metric(operation, "coalesced")
+        model = yield from stream
+        if coalesced:
+            self._record_coalesced(operation, model)
+        return model
+
+    def _stream_uncached(
+        self,
+        messages: List[Dict[str, Any]],
+        system: Optional[List[Dict[str, Any]]],
+        operation: str,
+        category: str,
+        cache_key: str
+    ) -> Iterator[str]:
+        """
+        Requisição em streaming à API (sem consultar o cache).
+        Respostas cortadas por max_tokens são continuadas a partir do texto
+        já entregue (ver _continuation_request).
+
+        Yields:
+            Trechos (deltas) de texto da resposta
+
+        Returns:
+            Modelo que atendeu a requisição (principal ou contingência)
+        """
+        chunks = []
+        route = self._route()
+        budget = self._plan_budget(operation, category, messages, system)
+        request = dict(
+            model=route.model,
+            max_tokens=budget.max_tokens,
+            timeout=budget.timeout,
+            messages=messages
+        )
+        if system:
+            request["system"] = system
+
+        try:
+            final_message = yield from self._stream_attempts(request, chunks, operation, category, route)
+            usage = final_message.usage
+
+            # Cortada por max_tokens: continua do ponto em que parou (só paga o trecho faltante)
+            rounds = 0
+            while self._should_continue(operation, final_message, rounds):
+                rounds += 1
+                partial = "".join(chunks)
+                final_message = yield from self._append_continuation(
+                    self._stream_attempts(
+                        self._continuation_request(request, partial),
+                        [], CONTINUATION_OPERATION, category, route
+                    ),
+                    chunks,
+                    partial[len(partial.rstrip()):]
+                )
+                usage = self._merge_usage(usage, final_message.usage)
+
+            self._record_usage(operation, usage)
+            self._record_model(operation, route.model)
+        except Exception as e:
+            self._record_error_metric(operation, route.model, e)
+            raise
+        finally:
+            self._release_route(route)
+
+        if not chunks:
+            raise Exception("Resposta vazia da API")
+
+        # Respostas ainda cortadas por max_tokens (ou do modelo de contingência) não são reaproveitadas
+        if self.cache and final_message.stop_reason != "max_tokens" and route.model == self.model:
+            self.cache.set(cache_key, "".join(chunks))
+
+        return route.model
+
+    def _stream_attempts(
+        self,
+        request: Dict[str, Any],
+        chunks: List[str],
+        operation: str,
+        category: str,
+        route: Route
+    ) -> Iterator[str]:
+        """
+        Uma requisição em streaming, repetida após 429 enquanto ela
+        ainda não tiver entregue nenhum trecho.
+        Gerador: produz os trechos e retorna a mensagem final.
+
+        Returns:
+            Mensagem final do stream
+        """
+        delivered = len(chunks)
+
+        for attempt in range(self._rate_limit_retries() + 1):
+            started = time.monotonic()
+            timing: Dict[str, float] = {}
+            try:
+                final_message = yield from self._timed(
+                    self._stream_message(request, chunks, operation, category, route), started, timing
+                )
+            except RateLimitError as e:
+                self._on_rate_limited(e)
+                # Só tenta novamente se nada foi entregue à view
+                if len(chunks) > delivered or attempt >= self._rate_limit_retries():
+                    raise
+                continue
+
+            elapsed = time.monotonic() - started
+            self._observe_metrics(operation, route.model, final_message, elapsed, timing.get("first_token"))
+            self._observe_budget(operation, category, final_message, elapsed, timing.get("first_token"))
+            return final_message
+
+    @staticmethod
+    def _should_continue(operation: str, response: Any, rounds: int) -> bool:
+        """Indica se a resposta foi cortada por max_tokens e pode ser continuada."""
+        return (
+            getattr(response, "stop_reason", None) == "max_tokens"
+            and operation in config.CONTINUATION_OPERATIONS
+            and rounds < config.CONTINUATION_MAX_ROUNDS
+        )
+
+    @staticmethod
+    def _continuation_request(request: Dict[str, Any], partial: str) -> Dict[str, Any]:
+        """
+        Requisição que continua uma resposta cortada por max_tokens.
+        O texto parcial vai como início da resposta do assistente (prefill):
+        o modelo segue exatamente de onde parou, sem regenerar o que já existe.
+
+        Args:
+            request: Requisição original
+            partial: Texto gerado até o corte
+
+        Returns:
+            Parâmetros da Messages API para a continuação
+        """
+        continuation = dict(request)
+        # A API não aceita prefill terminado em espaço em branco
+        continuation["messages"] = list(request["messages"]) + [
+            {"role": "assistant", "content": partial.rstrip()}
+        ]
+        return continuation
+
+    @staticmethod
+    def _append_continuation(stream: Iterator[str], chunks: List[str], overlap: str) -> Iterator[str]:
+        """
+        Repassa os trechos da continuação acumulando-os em chunks.
+        O espaço em branco final do texto parcial (removido do prefill e já
+        entregue) não é repetido quando a continuação começa por ele.
+        Retorna a mensagem final da continuação.
+        """
+        try:
+            while True:
+                try:
+                    text = next(stream)
+                except StopIteration as stop:
+                    return stop.value
+
+                if overlap:
+                    common = len(os.path.commonprefix([overlap, text]))
+                    text = text[common:]
+                    overlap = overlap[common:] if not text else ""
+
+                if text:
+                    chunks.append(text)
+                    yield text
+        finally:
+            stream.close()
+
+    @staticmethod
+    def _join_continuation(partial: str, continuation: str) -> str:
+        """Junta texto parcial e continuação sem duplicar o espaço em branco do corte."""
+        overlap = partial[len(partial.rstrip()):]
+        return partial + continuation[len(os.path.commonprefix([overlap, continuation])):]
+
+    @staticmethod
+    def _merge_usage(first: Any, second: Any) -> SimpleNamespace:
+        """Soma o uso de tokens de duas respostas (original + continuação)."""
+        return SimpleNamespace(**{
+            name: (getattr(first, name, 0) or 0) + (getattr(second, name, 0) or 0)
+            for name in (
+                "input_tokens",
+                "output_tokens",
+                "cache_creation_input_tokens",
+                "cache_read_input_tokens"
+            )
+        })
+
+    def _request_text(
+        self,
+        messages: List[Dict[str, Any]],
+        system: Optional[List[Dict[str, Any]]] = None,
+        operation: str = "",
+        category: str = "",
+        tools: Optional[List[Dict[str, Any]]] = None,
+        usage_key: Optional[str] = None,
+        use_cache: bool = True
+    ) -> str:
+        """
+        Envia requisição à Messages API e retorna o texto da resposta.
+
+        Args:
+            Mesmos argumentos de _request_text_with_model
+
+        Returns:
+            Texto da resposta
+
+        Raises:
+            Exception: Se a resposta vier vazia (demais erros da API são propagados)
+        """
+        text, _ = self._request_text_with_model(
+            messages, system, operation, category, tools, usage_key, use_cache
+        )
+        return text
+
+    def _request_text_with_model(
+        self,
+        messages: List[Dict[str, Any]],
+        system: Optional[List[Dict[str, Any]]] = None,
+        operation: str = "",
+        category: str = "",
+        tools: Optional[List[Dict[str, Any]]] = None,
+        usage_key: Optional[str] = None,
+        use_cache: bool = True
+    ) -> Tuple[str, str]:
+        """
+        Envia requisição à Messages API e retorna o texto da resposta
+        junto com o modelo que a atendeu.
+        Consulta o cache de respostas antes de chamar a API.
+        max_tokens e timeout vêm do orçamento de tokens da operação.
+
+        Args:
+            messages: Mensagens no formato da Messages API
+            system: Blocos do prompt de sistema (opcional)
+            operation: Nome da operação (uso de tokens e orçamento)
+            category: Value Area ou seção (orçamento de tokens)
+            tools: Ferramentas; a primeira é de uso obrigatório e seu input
+                (JSON) é devolvido como texto
+            usage_key: Chave do registro de uso (padrão: operation); permite
+                distinguir chamadas simultâneas da mesma operação
+            use_cache: Consultar e gravar o cache de respostas (False quando o
+                usuário pede explicitamente uma nova resposta)
+
+        Returns:
+            Tupla (texto da resposta, modelo que a atendeu)
+
+        Raises:
+            Exception: Se a resposta vier vazia (demais erros da API são propagados)
+        """
+        cache_key = self._cache_key(messages, system, tools)
+        usage_key = usage_key or operation
+
+        if self.cache and use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._record_usage(usage_key, None)
+                self._record_model(usage_key, self.model)
+                self._record_cache_metric(operation, "hit")
+                return cached, self.model
+            self._record_cache_metric(operation, "miss")
+
+        if self.single_flight is None:
+            return self._request_uncached(messages, system, operation, category, tools, usage_key, cache_key, use_cache)
+
+        # Requisição idêntica em andamento: aguarda a mesma resposta
+        (text, model), coalesced = self.single_flight.call(
+            cache_key,
+            lambda: self._request_uncached(
+                messages, system, operation, category, tools, usage_key, cache_key, use_cache
+            )
+        )
+        if coalesced:
+            self._record_coalesced(usage_key, model)
+            self._record_cache_metric(operation, "coalesced")
+        return text, model
+
+    def _request_uncached(
+        self,
+        messages: List[Dict[str, Any]],
+        system: Optional[List[Dict[str, Any]]],
+        operation: str,
+        category: str,
+        tools: Optional[List[Dict[str, Any]]],
+        usage_key: str,
+        cache_key: str,
+        store: bool = True
+    ) -> Tuple[str, str]:
+        """
+        Requisição à API (sem consultar o cache); grava a resposta completa
+        no cache (se store).
+
+        Returns:
+            Tupla (texto da resposta, modelo que a atendeu)
+
+        Raises:
+            Exception: Se a resposta vier vazia
+        """
+        route = self._route()
+        budget = self._plan_budget(operation, category, messages, system)
+        request = dict(
+            model=route.model,
+            max_tokens=budget.max_tokens,
+            timeout=budget.timeout,
+            messages=messages
+        )
+        if system:
+            request["system"] = system
+        if tools:
+            request.update(self._tool_params(tools))
+
+        hedge_key = None
+        if operation in config.HEDGE_OPERATIONS:
+            hedge_key = f"{operation}:{category}:{COMPLETE}"
+
+        current_operation = operation
+        try:
+            started = time.monotonic()
+            response = self._create_message(request, hedge_key=hedge_key, route=route)
+            self._observe_metrics(operation, route.model, response, time.monotonic() - started)
+            self._observe_budget(operation, category, response, time.monotonic() - started)
+
+            # Extrai texto da resposta
+            text = self._response_text(response)
+            usage = response.usage
+
+            # Cortada por max_tokens: continua do ponto em que parou (só paga o trecho faltante)
+            rounds = 0
+            current_operation = CONTINUATION_OPERATION
+            while text is not None and self._should_continue(operation, response, rounds):
+                rounds += 1
+                started = time.monotonic()
+                response = self._create_message(self._continuation_request(request, text), route=route)
+                self._observe_metrics(CONTINUATION_OPERATION, route.model, response, time.monotonic() - started)
+                self._observe_budget(CONTINUATION_OPERATION, category, response, time.monotonic() - started)
+                text = self._join_continuation(text, self._response_text(response) or "")
+                usage = self._merge_usage(usage, response.usage)
+        except Exception as e:
+            self._record_error_metric(current_operation, route.model, e)
+            raise
+        finally:
+            self._release_route(route)
+
+        self._record_usage(usage_key, usage)
+        self._record_model(usage_key, route.model)
+
+        if text is not None:
+            # Respostas ainda cortadas por max_tokens (ou do modelo de contingência) não são reaproveitadas
+            if store and self.cache and response.stop_reason != "max_tokens" and route.model == self.model:
+                self.cache.set(cache_key, text)
+            return text, route.model
+
+        raise Exception("Resposta vazia da API")
+
+    @staticmethod
+    def _tool_params(tools: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Parâmetros de tool use: a primeira ferramenta é de uso obrigatório."""
+        return {
+            "tools": tools,
+            "tool_choice": {"type": "tool", "name": tools[0]["name"]}
+        }
+
+    @staticmethod
+    def _response_text(response: Any) -> Optional[str]:
+        """
+        Extrai o texto de uma resposta da Messages API.
+        Respostas de tool use devolvem o input da ferramenta serializado em JSON.
+
+        Args:
+            response: Message da API
+
+        Returns:
+            Texto da resposta ou None se vazia
+        """
+        content = getattr(response, "content", None) or []
+
+        for block in content:
+            if getattr(block, "type", None) == "tool_use":
+                return json.dumps(block.input, ensure_ascii=False)
+
+        for block in content:
+            if getattr(block, "type", "text") == "text":
+                return block.text
+
+        return None
+
+    def _create_message(
+        self,
+        request: Dict[str, Any],
+        hedge_key: Optional[str] = None,
+        route: Optional[Route] = None
+    ) -> Any:
+        """
+        Envia requisição à Messages API passando pelo agendador RPM/TPM.
+        Em caso de 429, suspende o agendador pelo retry-after e reenfileira.
+
+        Args:
+            request: Parâmetros da Messages API
+            hedge_key: Chave de latência para hedge (None = sem hedge)
+            route: Rota do circuit breaker (recebe latência e falhas)
+
+        Returns:
+            Resposta da API
+
+        Raises:
+            RateLimitError: Se o limite persistir após as retentativas
+        """
+        for attempt in range(self._rate_limit_retries() + 1):
+            try:
+                if hedge_key and self.hedger is not None:
+                    response = self._run_hedged(request, hedge_key, COMPLETE, None, route)
+                else:
+                    response = self._send_message(request, route)
+            except RateLimitError as e:
+                self._on_rate_limited(e)
+                if attempt >= self._rate_limit_retries():
+                    raise
+                continue
+
+            return response
+
+    def _send_message(self, request: Dict[str, Any], route: Optional[Route] = None) -> Any:
+        """
+        Uma requisição (sem streaming) admitida pelo agendador.
+        A reserva é sempre ajustada: para o uso real, ou liberada se a
+        requisição falhar (429, timeout, erro de conexão).
+
+        Args:
+            request: Parâmetros da Messages API
+            route: Rota do circuit breaker (recebe latência e falhas)
+
+        Returns:
+            Resposta da API
+        """
+        reservation = self._admit(request)
+        usage = None
+        started = time.monotonic()
+        try:
+            response = self.backend.create_message(**request)
+            usage = response.usage
+        except Exception as e:
+            self._report_failure(route, e, started)
+            raise
+        finally:
+            self._settle(reservation, usage)
+
+        self._report_latency(route, started)
+        return response
+
+    def _stream_message(
+        self,
+        request: Dict[str, Any],
+        chunks: List[str],
+        operation: str,
+        category: str,
+        route: Optional[Route] = None
+    ) -> Iterator[str]:
+        """
+        Executa uma requisição em streaming (com hedge, se habilitado).
+        Gerador: produz os trechos de texto, acumula-os em chunks e
+        retorna a mensagem final.
+
+        Args:
+            request: Parâmetros da Messages API
+            chunks: Lista que recebe os trechos entregues
+            operation: Nome da operação (hedge apenas nas operações configuradas)
+            category: Value Area ou seção (chave de latência do hedge)
+            route: Rota do circuit breaker (recebe latência até o primeiro trecho)
+
+        Returns:
+            Mensagem final do stream
+        """
+        if self.hedger is not None and operation in config.HEDGE_OPERATIONS:
+            hedge_key = f"{operation}:{category}:{FIRST_TOKEN}"
+            return (yield from self._run_hedged(request, hedge_key, FIRST_TOKEN, chunks, route))
+
+        reservation = self._admit(request)
+        started = time.monotonic()
+        try:
+            with self.backend.stream_message(**request) as stream:
+                for text in stream.text_stream:
+                    if text:
+                        self._report_latency(route, started, first_token=True)
+                        chunks.append(text)
+                        yield text
+
+                final_message = stream.get_final_message()
+        except Exception as e:
+            self._report_failure(route, e, started)
+            raise
+
+        self._settle(reservation, final_message.usage)
+        return final_message
+
+    def _run_hedged(
+        self,
+        request: Dict[str, Any],
+        hedge_key: str,
+        wins_on: str,
+        chunks: Optional[List[str]],
+        route: Optional[Route] = None
+    ) -> Any:
+        """
+        Executa a requisição pelo hedger.
+        Com chunks (FIRST_TOKEN), é um gerador que repassa os trechos da
+        tentativa vencedora; sem chunks (COMPLETE), retorna a resposta.
+
+        Args:
+            request: Parâmetros da Messages API
+            hedge_key: Chave do histórico de latência
+            wins_on: Critério de vitória (FIRST_TOKEN ou COMPLETE)
+            chunks: Lista que recebe os trechos (None = resposta completa)
+            route: Rota do circuit breaker
+
+        Returns:
+            Mensagem final da tentativa vencedora (ou gerador, com chunks)
+        """
+        events = self.hedger.run(
+            self._hedge_attempt(request, route),
+            hedge_key,
+            wins_on=wins_on,
+            request_tokens=RateLimiter.estimate_tokens(request["messages"], 0, request.get("system"))
+        )
+
+        if chunks is None:
+            return self._drain(events)
+        return self._forward(events, chunks)
+
+    @staticmethod
+    def _drain(events: Iterator[str]) -> Any:
+        """Consome o gerador do hedger e retorna a mensagem final."""
+        try:
+            while True:
+                next(events)
+        except StopIteration as stop:
+            return stop.value
+
+    @staticmethod
+    def _timed(stream: Iterator[str], started: float, timing: Dict[str, float]) -> Iterator[str]:
+        """Repassa os trechos registrando o tempo até o primeiro e retorna a mensagem final."""
+        try:
+            while True:
+                try:
+                    text = next(stream)
+                except StopIteration as stop:
+                    return stop.value
+                timing.setdefault("first_token", time.monotonic() - started)
+                yield text
+        finally:
+            stream.close()
+
+    @staticmethod
+    def _forward(events: Iterator[str], chunks: List[str]) -> Iterator[str]:
+        """Repassa os trechos do hedger e retorna a mensagem final."""
+        try:
+            while True:
+                try:
+                    text = next(events)
+                except StopIteration as stop:
+                    return stop.value
+                chunks.append(text)
+                yield text
+        finally:
+            # View interrompeu a leitura: cancela as tentativas em andamento
+            events.close()
+
+    def _hedge_attempt(self, request: Dict[str, Any], route: Optional[Route] = None):
+        """
+        Cria a função de uma tentativa do hedge.
+        Cada tentativa passa pelo agendador e usa streaming, para que o
+        cancelamento feche a resposta HTTP da tentativa perdedora.
+        A reserva de cada tentativa é sempre ajustada (liberada se cancelada ou com falha).
+        A primeira tentativa a entregar (ou falhar) alimenta o circuit breaker.
+
+        Args:
+            request: Parâmetros da Messages API
+            route: Rota do circuit breaker
+
+        Returns:
+            Função (CancelToken, emit) -> mensagem final (None se cancelada)
+        """
+        def attempt(cancel: CancelToken, emit) -> Any:
+            reservation = self._admit(request)
+            usage = None
+            try:
+                if cancel.is_set():
+                    return None
+
+                started = time.monotonic()
+                try:
+                    with self.backend.stream_message(**request) as stream:
+                        if hasattr(stream, "close"):
+                            cancel.add_callback(stream.close)
+
+                        for text in stream.text_stream:
+                            if cancel.is_set():
+                                return None
+                            if text:
+                                self._report_latency(route, started, first_token=True)
+                                emit(text)
+
+                        final_message = stream.get_final_message()
+                except Exception as e:
+                    if not cancel.is_set():
+                        self._report_failure(route, e, started)
+                    raise
+
+                usage = final_message.usage
+            finally:
+                # Tentativa cancelada ou com falha: libera a reserva no agendador
+                self._settle(reservation, usage)
+
+            self._report_latency(route, started)
+            return final_message
+
+        return attempt
+
+    def _rate_limit_retries(self) -> int:
+        """Retentativas após 429 (somente com agendador ativo)."""
+        return config.RATE_LIMIT_MAX_RETRIES if self.rate_limiter else 0
+
+    def _admit(self, request: Dict[str, Any]) -> Optional[Reservation]:
+        """
+        Aguarda orçamento no agendador para a requisição.
+
+        Args:
+            request: Parâmetros da requisição
+
+        Returns:
+            Reserva do agendador (None se desabilitado)
+        """
+        if self.rate_limiter is None:
+            return None
+
+        estimated = RateLimiter.estimate_tokens(
+            request["messages"], request["max_tokens"], request.get("system")
+        )
+        return self.rate_limiter.acquire(estimated)
+
+    def _settle(self, reservation: Optional[Reservation], usage: Any) -> None:
+        """
+        Ajusta a reserva do agendador para os tokens efetivamente usados.
+        Sem usage (requisição falhou) os tokens reservados são liberados;
+        a requisição continua contando no limite de RPM.
+        """
+        if self.rate_limiter is None or reservation is None:
+            return
+
+        actual = sum(
+            getattr(usage, name, 0) or 0
+            for name in ("input_tokens", "output_tokens", "cache_creation_input_tokens")
+        )
+        self.rate_limiter.release(reservation, actual)
+
+    def _on_rate_limited(self, error: RateLimitError) -> None:
+        """Repassa o retry-after de um 429 ao agendador compartilhado."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.penalize(
+                retry_after_seconds(error, config.RATE_LIMIT_DEFAULT_RETRY_AFTER)
+            )
+
+    def _route(self) -> Route:
+        """Modelo da próxima requisição (principal ou contingência)."""
+        if self.circuit_breaker is None:
+            return Route(self.model)
+        return self.circuit_breaker.route()
+
+    def _report_latency(self, route: Optional[Route], started: float, first_token: bool = False) -> None:
+        """Informa ao circuit breaker a latência de uma requisição bem-sucedida."""
+        if self.circuit_breaker is not None and route is not None:
+            self.circuit_breaker.record(route, time.monotonic() - started, first_token=first_token)
+
+    def _report_failure(self, route: Optional[Route], error: Exception, started: float) -> None:
+        """Informa ao circuit breaker falhas do modelo (timeout, conexão ou 5xx)."""
+        if self.circuit_breaker is None or route is None:
+            return
+
+        if isinstance(error, APIConnectionError) or (
+            isinstance(error, APIStatusError) and error.status_code >= 500
+        ):
+            self.circuit_breaker.record(route, time.monotonic() - started, failed=True)
+
+    def _release_route(self, route: Route) -> None:
+        """Libera a rota que terminou sem resultado (cancelada, 429 ou erro do cliente)."""
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.release(route)
+
+    def _cache_key(
+        self,
+        messages: List[Dict[str, Any]],
+        system: Optional[List[Dict[str, Any]]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None
+    ) -> str:
+        """
+        Calcula chave de cache da requisição (backend, modelo, prompt e ferramentas).
+        max_tokens não entra na chave: só respostas completas são armazenadas,
+        então o orçamento dinâmico não invalida o cache. Prompts de sistema
+        que são templates entram pelo fingerprint, não pelo texto.
+
+        Args:
+            messages: Mensagens da requisição
+            system: Blocos do prompt de sistema (opcional)
+            tools: Ferramentas da requisição (opcional)
+
+        Returns:
+            Hash SHA-256 da requisição
+        """
+        return ResponseCache.make_key(
+            self.model,
+            messages,
+            self.prompt_templates.compact_system(system),
+            tools,
+            backend=self.backend.name
+        )
+
+    def _plan_budget(
+        self,
+        operation: str,
+        category: str,
+        messages: List[Dict[str, Any]],
+        system: Optional[List[Dict[str, Any]]] = None
+    ) -> TokenBudgetPlan:
+        """
+        Calcula max_tokens e timeout da requisição.
+        Com o orçamento desabilitado, usa os limites fixos de config.
+
+        Args:
+            operation: Nome da operação
+            category: Value Area ou seção
+            messages: Mensagens da requisição
+            system: Blocos do prompt de sistema (opcional)
+
+        Returns:
+            TokenBudgetPlan da requisição
+        """
+        if self.token_budget is not None:
+            return self.token_budget.plan(operation, category, messages, system)
+
+        input_tokens = TokenBudget.count_input_tokens(messages, system)
+        max_tokens = 2000 if operation in ("validate_invest_with_ai", "analyze_and_suggest", "review_story") else self.max_tokens
+        return TokenBudgetPlan(
+            input_tokens=input_tokens,
+            expected_output_tokens=max_tokens,
+            max_tokens=max_tokens,
+            timeout=self.timeout,
+            estimated_cost_usd=TokenBudget.estimate_cost(input_tokens, max_tokens)
+        )
+
+    def _register_metrics_collectors(self) -> None:
+        """Exporta as estatísticas dos subsistemas compartilhados como gauges."""
+        if self.metrics is None:
+            return
+
+        for name, component in (
+            ("response_cache", self.cache),
+            ("rate_limiter", self.rate_limiter),
+            ("hedge", self.hedger),
+            ("single_flight", self.single_flight),
+            ("circuit_breaker", self.circuit_breaker),
+            ("regeneration", self.regeneration_context)
+        ):
+            if component is not None:
+                self.metrics.register_collector(name, component.get_stats)
+
+    def _observe_metrics(
+        self,
+        operation: str,
+        model: str,
+        response: Any,
+        elapsed: float,
+        first_token: Optional[float] = None
+    ) -> None:
+        """Registra latência, tokens e stop_reason de uma resposta da API."""
+        if self.metrics is not None:
+            self.metrics.observe_response(
+                operation,
+                model,
+                elapsed,
+                getattr(response, "usage", None),
+                getattr(response, "stop_reason", None),
+                first_token=first_token
+            )
+
+    def _record_error_metric(self, operation: str, model: str, error: Exception) -> None:
+        """Registra a classe do erro de uma requisição."""
+        if self.metrics is not None:
+            self.metrics.record_error(operation, model, error)
+
+    def _record_cache_metric(self, operation: str, result: str) -> None:
+        """Registra acerto, erro ou coalescência na consulta ao cache de respostas."""
+        if self.metrics is not None:
+            self.metrics.record_cache(operation, result)
+
+    def get_metrics_summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna o resumo das métricas por operação (painel de diagnóstico).
+
+        Returns:
+            Dict operação -> requisições, latências, tokens, cache e stop reasons
+            (vazio se as métricas estiverem desabilitadas)
+        """
+        return self.metrics.summary() if self.metrics else {}
+
+    def _observe_budget(
+        self,
+        operation: str,
+        category: str,
+        response: Any,
+        elapsed: float,
+        first_token: Optional[float] = None
+    ) -> None:
+        """
+        Alimenta o histórico do orçamento com tokens de saída e duração
+        (velocidade de geração apenas quando o tempo até o primeiro trecho é conhecido).
+        """
+        if self.token_budget is None:
+            return
+
+        self.token_budget.observe(
+            operation,
+            category,
+            getattr(response.usage, "output_tokens", 0) or 0,
+            elapsed_seconds=elapsed,
+            stop_reason=getattr(response, "stop_reason", None),
+            first_token_seconds=first_token
+        )
+
+    def estimate_generation(self, form_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Estima tokens, max_tokens, timeout e custo da geração de uma história
+        antes do envio (exibido no formulário).
+
+        Args:
+            form_data: Dados do formulário (podem estar incompletos)
+
+        Returns:
+            Dict de TokenBudgetPlan.to_dict()
+        """
+        params = self.build_request_params("generate_story", form_data=form_data)
+        budget = self._plan_budget(
+            "generate_story",
+            form_data.get("value_area", "Business"),
+            params["messages"],
+            params.get("system")
+        )
+        return budget.to_dict()
+
+    def _build_system_blocks(self, system_prompt: str) -> List[Dict[str, Any]]:
+        """
+        Monta o prompt de sistema marcado para prompt caching do provedor.
+        As instruções fixas passam a ser cobradas como leitura de cache
+        a partir da segunda chamada dentro da janela de cache.
+
+        Args:
+            system_prompt: Instruções estáticas do tipo de história
+
+        Returns:
+            Lista de blocos de sistema com cache_control
+        """
+        return [{
+            "type": "text",
+            "text": system_prompt,
+            "cache_control": {"type": "ephemeral"}
+        }]
+
+    def _record_usage(self, operation: str, usage: Any) -> None:
+        """
+        Registra tokens consumidos pela última chamada de uma operação,
+        incluindo leitura e escrita do prompt cache.
+
+        Args:
+            operation: Nome da operação (ex: "generate_story")
+            usage: Objeto usage retornado pela API (None para resposta do cache local)
+        """
+        if not operation:
+            return
+
+        if usage is None:
+            # Resposta servida pelo cache local: nenhum token cobrado
+            self.last_usage[operation] = {"response_cache_hit": 1}
+            return
+
+        self.last_usage[operation] = {
+            "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+            "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+            "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+            "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0
+        }
+
+    def _record_coalesced(self, operation: str, model: str) -> None:
+        """Registra resposta obtida de requisição idêntica em andamento (sem custo)."""
+        if operation:
+            self.last_usage[operation] = {"coalesced_request": 1}
+            self._record_model(operation, model)
+
+    def _record_model(self, operation: str, model: str) -> None:
+        """Registra o modelo que atendeu a última chamada de uma operação."""
+        if operation:
+            self.last_model[operation] = model
+
+    def get_last_usage(self, operation: str) -> Dict[str, int]:
+        """
+        Retorna uso de tokens da última chamada de uma operação.
+
+        Args:
+            operation: Nome da operação (ex: "generate_story")
+
+        Returns:
+            Dict com input/output tokens e tokens de cache (lidos/gravados)
+        """
+        return self.last_usage.get(operation, {})
+
+    def get_last_model(self, operation: str) -> str:
+        """
+        Retorna o modelo que atendeu a última chamada de uma operação.
+
+        Args:
+            operation: Nome da operação (ex: "generate_story")
+
+        Returns:
+            Nome do modelo (principal ou contingência) ou "" se não houver chamada
+        """
+        return self.last_model.get(operation, "")
+
+    def get_circuit_breaker_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estado do circuit breaker e saúde de cada modelo.
+
+        Returns:
+            Dict de estatísticas (vazio se o circuit breaker estiver desabilitado)
+        """
+        return self.circuit_breaker.get_stats() if self.circuit_breaker else {}
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores de acerto/erro do cache de respostas.
+
+        Returns:
+            Dict de estatísticas (vazio se o cache estiver desabilitado)
+        """
+        return self.cache.get_stats() if self.cache else {}
+
+    def get_single_flight_stats(self) -> Dict[str, Any]:
+        """
+        Retorna quantas requisições foram coalescidas com outra idêntica.
+
+        Returns:
+            Dict de estatísticas (vazio se a coalescência estiver desabilitada)
+        """
+        return self.single_flight.get_stats() if self.single_flight else {}
+
+    def get_hedge_stats(self) -> Dict[str, Any]:
+        """
+        Retorna taxa de hedge, vitórias e custo extra estimado.
+
+        Returns:
+            Dict de estatísticas (vazio se o hedge estiver desabilitado)
+        """
+        return self.hedger.get_stats() if self.hedger else {}
+
+    def build_request_params(
+        self,
+        operation: str,
+        story: Optional[Dict] = None,
+        form_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Monta os parâmetros da Messages API de uma operação sem enviá-la.
+        Usado pelo modo offline (Message Batches), que envia as requisições
+        em lote e recebe as respostas de forma assíncrona.
+
+        Args:
+            operation: "generate_story", "validate_invest_with_ai",
+                "analyze_and_suggest" ou "review_story"
+            story: História completa (validação, sugestões e revisão)
+            form_data: Dados do formulário (geração)
+
+        Returns:
+            Dict com model, max_tokens, messages e system (quando houver)
+
+        Raises:
+            ValueError: Se a operação não for suportada
+        """
+        system = None
+        tools = None
+
+        if operation == "generate_story":
+            form_data = form_data or {}
+            system_prompt, prompt = self._build_story_prompt(
+                titulo=form_data.get("titulo", ""),
+                regras_negocio=form_data.get("regras_negocio", []),
+                apis_servicos=form_data.get("apis_servicos", []),
+                objetivos=form_data.get("objetivos", {}),
+                complexidade=form_data.get("complexidade", 5),
+                criterios_aceitacao=form_data.get("criterios_aceitacao", []),
+                api_specs=form_data.get("api_specs", None),
+                form_data=form_data
+            )
+            messages = self._build_story_messages(prompt, form_data)
+            system = self._build_system_blocks(system_prompt)
+            category = form_data.get("value_area", "Business")
+
+        elif operation == "validate_invest_with_ai":
+            from services.invest_service import InvestService
+
+            prompt = InvestService().prepare_for_ai_validation(story)
+            messages = [{"role": "user", "content": prompt}]
+            category = ""
+
+        elif operation == "analyze_and_suggest":
+            messages = [{"role": "user", "content": self._build_suggestion_prompt(story)}]
+            category = ""
+
+        elif operation == "review_story":
+            from services.invest_service import InvestService, REVIEW_TOOL
+
+            messages = [{"role": "user", "content": InvestService().prepare_for_review(story)}]
+            tools = [REVIEW_TOOL]
+            category = ""
+
+        else:
+            raise ValueError(f"Operação não suportada: {operation}")
+
+        max_tokens = self._plan_budget(operation, category, messages, system).max_tokens
+        params = dict(model=self.model, max_tokens=max_tokens, messages=messages)
+        if system:
+            params["system"] = system
+        if tools:
+            params.update(self._tool_params(tools))
+
+        return params
+
+    def generation_key(self, form_data: Dict[str, Any]) -> str:
+        """
+        Chave da geração de uma história: hash do prompt enviado ao modelo
+        e do motor de geração. Formulários que produzem o mesmo prompt
+        têm a mesma chave.
+
+        Args:
+            form_data: Dados do formulário
+
+        Returns:
+            Chave da geração
+        """
+        params = self.build_request_params("generate_story", form_data=form_data)
+        prompt_key = self._cache_key(params["messages"], params.get("system"))
+        return f"{config.GENERATION_ENGINE}:{prompt_key}"
+
+    def cache_response(self, params: Dict[str, Any], text: str) -> None:
+        """
+        Grava no cache de respostas o texto obtido fora do fluxo síncrono
+        (ex: resultado de Message Batches), para reaproveitar em chamadas futuras.
+
+        Args:
+            params: Parâmetros gerados por build_request_params
+            text: Texto da resposta
+        """
+        if self.cache:
+            key = self._cache_key(params["messages"], params.get("system"), params.get("tools"))
+            self.cache.set(key, text)
+
+    def _build_story_prompt(
+        self,
+        titulo: str,
+        regras_negocio: List[str] = None,
+        apis_servicos: List[str] = None,
+        objetivos: Dict[str, Any] = None,
+        complexidade: int = 5,
+        criterios_aceitacao: List[str] = None,
+        api_specs: Dict[str, str] = None,
+        form_data: Dict[str, Any] = None
+    ) -> Tuple[str, str]:
+        """
+        Seleciona e constrói o prompt adequado ao Value Area da história.
+
+        Args:
+            Mesmos argumentos de generate_story
+
+        Returns:
+            Tupla (system_prompt, prompt) onde:
+            - system_prompt: Instruções estáticas (cacheáveis) do tipo de história
+            - prompt: Dados dinâmicos em <input_data>
+        """
+        # Verificar se é um novo tipo de história (Spike, Kaizen, Fix)
+        value_area = form_data.get('value_area', 'Business') if form_data else 'Business'
+        system_name, _ = VALUE_AREA_TEMPLATES.get(value_area, VALUE_AREA_TEMPLATES['Business'])
+        system_prompt = self.prompt_templates.get(system_name).text
+
+        if value_area == 'Spike':
+            return system_prompt, self._build_spike_prompt(form_data)
+        elif value_area == 'Kaizen':
+            return system_prompt, self._build_kaizen_prompt(form_data)
+        elif value_area == 'Fix/Bug/Incidente':
+            return system_prompt, self._build_fix_prompt(form_data)
+
+        return system_prompt, self._build_prompt(
+            titulo=titulo,
+            regras_negocio=regras_negocio or [],
+            apis_servicos=apis_servicos or [],
+            objetivos=objetivos or {},
+            complexidade=complexidade,
+            criterios_aceitacao=criterios_aceitacao or [],
+            api_specs=api_specs,
+            form_data=form_data
+        )
+
+    def _build_story_messages(
+        self,
+        prompt: str,
+        form_data: Dict[str, Any] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Monta a lista de mensagens da requisição de geração.
+        Histórias Fix/Bug/Incidente com imagens usam conteúdo multimodal.
+
+        Args:
+            prompt: Prompt de texto já construído
+            form_data: Dados completos do formulário
+
+        Returns:
+            Lista de mensagens no formato da Messages API
+        """
+        value_area = form_data.get('value_area', 'Business') if form_data else 'Business'
+
+        # Verificar se há imagens para enviar (Fix/Bug/Incidente)
+        fix_images = form_data.get('fix_images', []) if form_data else []
+
+        if not (fix_images and value_area == 'Fix/Bug/Incidente'):
+            # Requisição normal sem imagens
+            return [{"role": "user", "content": prompt}]
+
+        # Usar API multimodal com imagens
+        content = []
+
+        # Adicionar cada imagem como content block
+        for img in fix_images:
+            content.append({
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": img.get("type", "image/png"),
+                    "data": img.get("data", "")
+                }
+            })
+
+        # Adicionar o prompt de texto
+        content.append({
+            "type": "text",
+            "text": prompt
+        })
+
+        return [{"role": "user", "content": content}]
+
     def _build_prompt(
         self,
         titulo: str,
@@ -178,7 +1478,8 @@ class AIService:
             form_data: Dados completos do formulário
 
         Returns:
-            Prompt formatado em XML
+            Dados dinâmicos da história em <input_data>
+            (template "business_input"; instruções fixas em BUSINESS_SYSTEM_PROMPT)
         """
         # Extrair dependências se existirem
         has_dependencies = form_data.get('has_dependencies', False) if form_data else False
@@ -231,467 +1532,31 @@ class AIService:
             elif metodo in ['PUT', 'PATCH']:
                 if api_specs.get('path_param'):
                     specs_parts.append(f"Parâmetro de Rota (Path Param): {api_specs['path_param']}")
-                if api_specs.get('body'):
-                    specs_parts.append(f"Corpo da Requisição (Body): {api_specs['body']}")
-            elif metodo == 'DELETE' and api_specs.get('path_param'):
-                specs_parts.append(f"Parâmetro de Rota (Path Param): {api_specs['path_param']}")
-
-            # Formato de resposta (sempre presente)
-            if api_specs.get('formato_resposta'):
-                specs_parts.append(f"Formato de Resposta: {api_specs['formato_resposta']}")
-
-            if specs_parts:
-                api_specs_formatado = "\n".join(f"- {spec}" for spec in specs_parts)
-
-        prompt = f"""
-<task>
-Você é um Product Owner sênior especializado em metodologias ágeis e documentação técnica de alta qualidade.
-Sua missão é gerar uma história de usuário COMPLETA, TÉCNICA e PROFISSIONAL seguindo rigorosamente
-os padrões estabelecidos.
-</task>
-
-<critical_rules>
-REGRAS ABSOLUTAS (NUNCA VIOLAR):
-
-1. NUNCA ADICIONAR EMOJIS NO CONTEÚDO DA HISTÓRIA
-   - Títulos e seções devem ser puramente textuais
-   - Sem emojis decorativos em nenhuma parte
-   - Formato corporativo/técnico profissional
-
-2. NUNCA INVENTAR INFORMAÇÕES
-   - Use APENAS dados fornecidos pelo usuário
-   - Não criar APIs, endpoints ou tecnologias não mencionadas
-   - Não adicionar regras de negócio não fornecidas
-   - Se algo não foi informado, não especular
-   - Mantenha-se fiel aos inputs fornecidos
-   - SEMPRE incluir especificações de API quando fornecidas (endpoint, parâmetros, formato, erros, documentação)
-
-3. SER OBJETIVA E DIRETA
-   - Evitar floreios ou descrições elaboradas
-   - Foco em clareza e precisão técnica
-   - Tom profissional e direto ao ponto
-   - Sem criatividade excessiva
-
-4. FORMATO TÉCNICO
-   - Esta é uma especificação para desenvolvedores
-   - Linguagem técnica precisa
-   - Sem formato "Como usuário, eu quero..."
-   - Formato direto: "Implementar X", "Integrar Y"
-</critical_rules>
-
-<input_data>
-<titulo>{titulo}</titulo>
-
-<regras_negocio>
-{regras_formatadas}
-</regras_negocio>
-
-<apis_servicos>
-{apis_formatadas}
-</apis_servicos>
-
-<objetivos>
-{objetivos_formatados}
-</objetivos>
-
-<complexidade>{complexidade}</complexidade>
-
-<criterios_aceitacao>
-{criterios_formatados}
-</criterios_aceitacao>
-{f'''
-<especificacoes_api>
-{api_specs_formatado}
-</especificacoes_api>''' if api_specs_formatado else ''}
-{f'''
-<dependencias>
-{dependencies}
-</dependencias>''' if has_dependencies and dependencies else ''}
-</input_data>
-
-<mandatory_structure>
-SUA HISTÓRIA DEVE CONTER EXATAMENTE ESTAS SEÇÕES (SEM EMOJIS):
-
-1. TÍTULO (nível ##)
-   Formato: ## [Título da Tarefa]
-
-2. DECLARAÇÃO DE OBJETIVO (formato Como/Quero/Para que) - OBRIGATÓRIO NO INÍCIO
-   Formato em texto normal (mesma formatação do resto da história):
-
-   **Como** [persona/papel do usuário], **quero** [ação/funcionalidade desejada], **para que** [benefício/valor de negócio].
-
-   CRÍTICO: Esta seção DEVE aparecer IMEDIATAMENTE após o título, em um único parágrafo
-   Use os valores fornecidos em <objetivos> para preencher cada campo
-   Se algum campo não foi fornecido, use contexto para inferir de forma coerente
-   IMPORTANTE: Manter a mesma formatação visual do resto da história (sem quote, sem cor diferente)
-
-3. CONTEXTO/PROBLEMA (nível ###)
-   Formato: ### Contexto
-   Conteúdo: Situação atual baseada APENAS nos dados fornecidos
-
-4. OBJETIVO (nível ###)
-   Formato: ### Objetivo
-   Conteúdo: O que se pretende alcançar (baseado nos objetivos fornecidos)
-
-5. REGRAS DE NEGÓCIO (nível ###)
-   Formato: ### Regras de Negocio
-   Conteúdo: TODAS as regras fornecidas (bullet points)
-   IMPORTANTE: Incluir TODAS sem omitir nenhuma
-
-6. SEPARADOR TÉCNICO (linha divisória)
-   Formato: ---
-   Seguido de: ### Sessão Técnica
-   Propósito: Indicar visualmente onde começa a parte técnica da história
-   IMPORTANTE: Usar título de nível ### para destaque visual adequado
-
-7. APIS/SERVIÇOS (nível ###)
-   Formato: ### APIs e Servicos Necessarios
-   Conteúdo: Listar TODAS as APIs fornecidas
-   Descrição: Uso técnico baseado no contexto
-
-7.1. ESPECIFICAÇÕES DE API (nível #### - SUBSEÇÃO OBRIGATÓRIA SE especificacoes_api FORNECIDAS)
-   Formato: #### Especificacoes da API
-   CRÍTICO: Se a tag <especificacoes_api> estiver presente nos dados de entrada, VOCÊ DEVE:
-   - Criar esta subseção dentro de "APIs e Servicos Necessarios"
-   - Incluir TODOS os detalhes fornecidos em especificacoes_api:
-     * Endpoint (se fornecido)
-     * Parâmetros (se fornecido)
-     * Formato de Resposta (se fornecido) - usar bloco de código markdown para JSON
-     * Tratamento de Erros (se fornecido)
-     * Documentação (se fornecido)
-   - NÃO omitir nenhum detalhe fornecido
-   - Usar formatação markdown apropriada (código em blocos ```)
-
-8. OBJETIVOS TÉCNICOS (nível ###)
-   Formato: ### Objetivos Tecnicos
-   Conteúdo: TODOS os objetivos fornecidos (bullet points)
-
-9. CRITÉRIOS DE ACEITAÇÃO (nível ###)
-   Formato: ### Criterios de Aceitacao
-   Conteúdo: Mínimo 3 critérios
-
-   Use formato Gherkin quando apropriado:
-   ```
-   CA1 - [Nome do critério]
-   Dado que [condição]
-   Quando [ação]
-   Então [resultado esperado]
-   ```
-
-   OU bullet points técnicos:
-   ```
-   - Sistema deve validar X
-   - Formato de saída deve ser Y
-   - Performance deve ser < Z
-   ```
-
-   SEMPRE incluir:
-   - Caso de sucesso
-   - Caso de erro
-   - Validação técnica
-
-10. CENÁRIOS DE TESTE (nível ###)
-   Formato: ### Cenarios de Teste Sugeridos
-   Conteúdo: OBRIGATÓRIO mínimo 5 cenários
-
-   1. Cenario de sucesso principal: [descrição objetiva do fluxo feliz]
-   2. Cenario de sucesso alternativo: [descrição de outro caminho válido]
-   3. Cenario de erro/excecao: [descrição de falha esperada]
-   4. Cenario de validacao: [descrição de validação de dados/regras]
-   5. Cenario edge case: [descrição de caso limite/borda]
-
-11. DEPENDÊNCIAS (nível ### - APENAS SE <dependencias> FORNECIDAS)
-   Formato: ### Dependencias
-   Conteúdo: Se a tag <dependencias> estiver presente nos dados de entrada:
-   - Listar todas as dependências de outras equipes/sistemas
-   - Indicar impacto no cronograma se aplicável
-   - Sugerir pontos de comunicação necessários
-
-12. COMPLEXIDADE (nível ###)
-   Formato: ### Complexidade
-   Conteúdo:
-   Pontos: {complexidade}
-</mandatory_structure>
-
-<formatting_rules>
-FORMATAÇÃO:
-
-1. Use Markdown estruturado
-   - ## para título principal
-   - ### para seções
-   - Listas com - ou números
-   - Blocos de código com ```
-
-2. NUNCA use emojis em:
-   - Títulos (## ou ###)
-   - Conteúdo das seções
-   - Listas
-   - Critérios
-   - Nenhuma parte da história
-
-3. Linguagem:
-   - Técnica e profissional
-   - Objetiva e direta
-   - Sem adjetivos desnecessários
-   - Foco em precisão
-
-4. Estrutura:
-   - Linha em branco entre seções
-   - Bullet points alinhados
-   - Numeração sequencial para cenários
-</formatting_rules>
-
-<quality_checklist>
-ANTES DE ENTREGAR, VERIFICAR:
-
-[ ] Nenhum emoji presente na história
-[ ] Declaração Como/Quero/Para que presente IMEDIATAMENTE após o título
-[ ] Todas as seções obrigatórias presentes (incluindo separador "Sessão Técnica")
-[ ] Separador técnico ("---" seguido de "### Sessão Técnica") presente antes das APIs
-[ ] TODAS as regras de negócio incluídas
-[ ] TODAS as APIs mencionadas detalhadas
-[ ] SE <especificacoes_api> presente: subseção "Especificacoes da API" incluída com TODOS os detalhes
-[ ] TODOS os objetivos incluídos
-[ ] TODOS os critérios fornecidos incluídos
-[ ] Mínimo 5 cenários de teste
-[ ] Nenhuma informação inventada
-[ ] Linguagem objetiva e técnica
-[ ] Formato Markdown correto
-[ ] Blocos de código JSON formatados com ```json
-</quality_checklist>
-
-<generation_instructions>
-INSTRUÇÕES DE GERAÇÃO:
-
-PRINCÍPIO FUNDAMENTAL - ELABORAÇÃO INTELIGENTE:
-Você NÃO deve simplesmente copiar e colar o input do usuário. Você DEVE:
-- MANTER o significado e intenção original de tudo que foi fornecido
-- ELABORAR cada ponto com linguagem técnica profissional
-- ENRIQUECER com contexto relevante (sem inventar funcionalidades)
-- EXPANDIR descrições curtas em explicações claras e completas
-- CONECTAR os elementos entre si de forma coesa
-
-EXEMPLO DE ELABORAÇÃO:
-- Input do usuário: "API de busca de médicos"
-- RUIM (determinístico): "API de busca de médicos"
-- BOM (elaborado): "Endpoint de consulta que permite localizar profissionais de saúde cadastrados na plataforma, aplicando filtros por especialidade, localização geográfica e disponibilidade, retornando resultados paginados e ordenáveis"
-
-- Input do usuário: "Validar CPF"
-- RUIM (determinístico): "Validar CPF"
-- BOM (elaborado): "Implementar validação de CPF utilizando algoritmo oficial da Receita Federal, verificando dígitos verificadores e formato, com tratamento para CPFs inválidos ou já cadastrados no sistema"
-
-REGRA DE OURO: Cada frase da história gerada deve agregar valor técnico ou de contexto, nunca ser uma simples repetição do input.
-
-1. ANÁLISE:
-   - Leia TODOS os inputs fornecidos
-   - Identifique o tipo de implementação
-   - Compreenda o CONTEXTO DE NEGÓCIO por trás da tarefa
-   - Identifique IMPLICAÇÕES TÉCNICAS não explícitas mas óbvias
-
-2. CONTEXTO (ENRIQUECER COM ANÁLISE):
-   - Descreva a situação atual de forma CONTEXTUALIZADA
-   - Explique POR QUE essa funcionalidade é necessária
-   - Conecte com o valor de negócio que será entregue
-   - Mantenha-se fiel aos dados mas ELABORE o contexto de forma profissional
-   - EXEMPLO: Se o input é "API de bairros", contextualize: "O sistema atual não possui capacidade de consulta geográfica granular, limitando a personalização de ofertas por região..."
-
-3. DESCRIÇÃO (PROFISSIONAL E ELABORADA):
-   - Use linguagem técnica profissional
-   - EXPANDA os pontos fornecidos com detalhamento técnico relevante
-   - Não adicione tecnologias não mencionadas, mas DETALHE as mencionadas
-   - Para cada regra de negócio, explique seu impacto técnico
-   - Para cada API, descreva sua integração e uso no fluxo
-   - NUNCA usar frases genéricas - seja ESPECÍFICO ao contexto
-
-4. CRITÉRIOS DE ACEITAÇÃO (COMPLETOS E TESTÁVEIS):
-   - TRANSFORME critérios simples em critérios GHERKIN completos e detalhados
-   - Adicione cenários de ERRO e EDGE CASES baseados nas regras
-   - Cada critério deve ser VERIFICÁVEL e MENSURÁVEL
-   - Inclua validações de dados, performance esperada, e tratamento de exceções
-   - Os critérios devem refletir a complexidade REAL da funcionalidade
-
-5. ESPECIFICAÇÕES DE API (SE FORNECIDAS):
-   - Verifique se há tag <especificacoes_api> nos inputs
-   - Se presente, OBRIGATORIAMENTE criar subseção "#### Especificacoes da API"
-   - Incluir TODOS os campos fornecidos
-   - Usar blocos de código ```json para JSONs
-   - Detalhar códigos de erro HTTP esperados (400, 401, 404, 500)
-
-6. CENÁRIOS DE TESTE (ABRANGENTES E ESPECÍFICOS):
-   - Crie cenários que REALMENTE testem a funcionalidade descrita
-   - Inclua dados de exemplo CONCRETOS quando relevante
-   - Cubra fluxos principais, alternativos e de exceção
-   - Cada cenário deve ser ÚNICO e testar um aspecto diferente
-   - Não use descrições genéricas - seja específico ao contexto da história
-
-3.2. INTERPRETAÇÃO DE MÉTODOS HTTP:
-   Ao gerar especificações de API, você DEVE interpretar os campos de acordo com o método HTTP:
-
-   **GET (Consulta de dados)**
-   - Endpoint: Rota da API
-   - Parâmetros de Consulta (Query Params): Filtros, paginação e ordenação passados na URL
-   - Exemplo: GET /api/v1/usuarios?status=ativo&limit=10&page=1
-   - NÃO possui corpo de requisição
-
-   **POST (Criação de recurso)**
-   - Endpoint: Rota da API
-   - Corpo da Requisição (Body): Objeto JSON com os dados que serão enviados para criação
-   - Exemplo: POST /api/v1/usuarios com body {{"nome": "João", "email": "joao@email.com"}}
-   - NÃO utiliza parâmetros de consulta para envio de dados
-
-   **PUT (Substituição completa de recurso)**
-   - Endpoint: Rota da API contendo o identificador do recurso
-   - Parâmetro de Rota (Path Param): Identificador do recurso a ser substituído
-   - Corpo da Requisição (Body): Objeto JSON completo que substituirá o recurso existente
-   - Exemplo: PUT /api/v1/usuarios/123 com body contendo todos os campos do recurso
-
-   **PATCH (Alteração parcial de recurso)**
-   - Endpoint: Rota da API contendo o identificador do recurso
-   - Parâmetro de Rota (Path Param): Identificador do recurso a ser alterado
-   - Corpo da Requisição (Body): Objeto JSON contendo apenas os campos que serão modificados
-   - Exemplo: PATCH /api/v1/usuarios/123 com body {{"status": "inativo"}}
-
-   **DELETE (Exclusão de recurso)**
-   - Endpoint: Rota da API contendo o identificador do recurso
-   - Parâmetro de Rota (Path Param): Identificador do recurso a ser excluído
-   - Exemplo: DELETE /api/v1/usuarios/123
-   - NÃO possui corpo de requisição
-
-   IMPORTANTE: Se o usuário fornecer informações incompatíveis (ex: body em requisição GET),
-   ignore ou adapte conforme o padrão REST apropriado para o método.
-
-4. CRITÉRIOS:
-   - Derive dos critérios fornecidos
-   - Adicione casos de erro/sucesso relacionados
-   - Mantenha testável e verificável
-
-5. FORMATAÇÃO:
-   - Aplique Markdown estruturado
-   - SEM emojis em nenhuma parte
-   - Seções claramente separadas
-
-6. VALIDAÇÃO FINAL:
-   - Execute checklist de qualidade
-   - Confirme ausência de emojis
-   - Verifique que nada foi inventado
-</generation_instructions>
-
-<output_example>
-EXEMPLO DE FORMATO ESPERADO (SEM EMOJIS):
-
-## Implementar autenticacao OAuth com Google
-
-**Como** desenvolvedor backend, **quero** implementar autenticacao OAuth 2.0 com Google, **para que** usuarios possam fazer login de forma segura e rapida usando suas contas Google.
-
-### Contexto
-
-Atualmente o sistema utiliza autenticacao basica com usuario e senha.
-Necessidade de adicionar opcao de login social conforme especificado.
-
-### Objetivo
-
-Implementar fluxo de autenticacao OAuth 2.0 utilizando Google Identity Platform.
-
-### Regras de Negocio
-
-- Usuario deve poder iniciar login com botao dedicado
-- Sistema deve redirecionar para tela de consentimento do Google
-- Email do Google deve ser usado como identificador unico
-- Sessao deve expirar apos periodo definido
-
----
-
-### Sessão Técnica
-
-### APIs e Servicos Necessarios
-
-- Google OAuth 2.0 API: Autenticacao e autorizacao de usuarios
-- Google Identity Platform: Gerenciamento de identidades
-
-#### Especificacoes da API
-
-**Método HTTP:** POST
-
-**Endpoint:** `/api/v1/auth/google`
-
-**Corpo da Requisição (Body):**
-```json
-{{
-  "redirect_uri": "https://app.example.com/callback",
-  "state": "random_csrf_token"
-}}
-```
-
-**Formato de Resposta:**
-```json
-{{
-  "success": true,
-  "token": "jwt_token_aqui",
-  "user": {{
-    "id": "123",
-    "email": "user@example.com"
-  }}
-}}
-```
-
-### Objetivos Tecnicos
-
-- Permitir autenticacao via conta Google
-- Reduzir tempo de cadastro
-- Melhorar experiencia do usuario
-
-### Criterios de Aceitacao
-
-CA1 - Iniciar fluxo OAuth
-Dado que usuario acessa tela de login
-Quando clica em botao de login com Google
-Então deve ser redirecionado para tela de consentimento
-
-CA2 - Processar autorizacao
-Dado que usuario autoriza acesso
-Quando Google redireciona de volta
-Então sistema deve processar tokens
-E criar ou atualizar cadastro do usuario
-
-CA3 - Tratar erro
-Dado que usuario nega permissao
-Quando retorna para aplicacao
-Então sistema deve exibir mensagem de erro apropriada
-
-### Cenarios de Teste Sugeridos
-
-1. Cenario de sucesso principal: Usuario completa fluxo OAuth e e autenticado com sucesso
-2. Cenario de sucesso alternativo: Usuario ja autenticado anteriormente e reconhecido automaticamente
-3. Cenario de erro: Usuario nega permissao e recebe mensagem apropriada
-4. Cenario de validacao: Email do Google ja cadastrado com outro metodo de login
-5. Cenario edge case: Token expira durante sessao e sistema renova automaticamente
-
-### Complexidade
-
-Pontos: 5
-</output_example>
+                if api_specs.get('body'):
+                    specs_parts.append(f"Corpo da Requisição (Body): {api_specs['body']}")
+            elif metodo == 'DELETE' and api_specs.get('path_param'):
+                specs_parts.append(f"Parâmetro de Rota (Path Param): {api_specs['path_param']}")
 
-<final_reminder>
-CRÍTICO - LEMBRE-SE:
+            # Formato de resposta (sempre presente)
+            if api_specs.get('formato_resposta'):
+                specs_parts.append(f"Formato de Resposta: {api_specs['formato_resposta']}")
 
-1. SEM EMOJIS EM NENHUMA PARTE DA HISTÓRIA
-2. **COMO/QUERO/PARA QUE**: OBRIGATÓRIO incluir declaração de objetivo no formato:
-   **Como** [persona], **quero** [ação], **para que** [benefício].
-   Esta seção DEVE aparecer IMEDIATAMENTE após o título ## em um parágrafo normal (SEM quote >)
-3. USAR APENAS INFORMAÇÕES FORNECIDAS
-4. NÃO INVENTAR NADA
-5. SER OBJETIVA E DIRETA
-6. INCLUIR TODAS AS SEÇÕES OBRIGATÓRIAS
-7. INCLUIR TODAS AS REGRAS/APIs/OBJETIVOS/CRITÉRIOS FORNECIDOS
-8. **SEPARADOR TÉCNICO**: OBRIGATÓRIO incluir "---" seguido de "### Sessão Técnica" antes da seção de APIs
-9. **ESPECIFICAÇÕES DE API**: Se a tag <especificacoes_api> estiver presente, OBRIGATORIAMENTE incluir subseção "#### Especificacoes da API" com TODOS os detalhes fornecidos
-10. **CENÁRIOS DE TESTE**: OBRIGATÓRIO incluir mínimo 5 cenários de teste variados
-
-Retorne APENAS o Markdown da história, sem texto adicional antes ou depois.
-</final_reminder>
-"""
+            if specs_parts:
+                api_specs_formatado = "\n".join(f"- {spec}" for spec in specs_parts)
 
-        return prompt.strip()
+        return self.prompt_templates.render(
+            "business_input",
+            titulo=titulo,
+            regras_negocio=regras_formatadas,
+            apis_servicos=apis_formatadas,
+            objetivos=objetivos_formatados,
+            complexidade=complexidade,
+            criterios_aceitacao=criterios_formatados,
+            especificacoes_api=self._optional_block("especificacoes_api", api_specs_formatado),
+            dependencias=self._optional_block(
+                "dependencias", dependencies if has_dependencies else ""
+            )
+        )
 
     # ============================================================
     # NOVOS MÉTODOS DA ETAPA 2
@@ -701,7 +1566,8 @@ Retorne APENAS o Markdown da história, sem texto adicional antes ou depois.
         self,
         section_name: str,
         original_story: Dict,
-        form_data: Dict
+        form_data: Dict,
+        use_cache: bool = False
     ) -> str:
         """
         Regenera apenas uma seção específica da história.
@@ -711,6 +1577,8 @@ Retorne APENAS o Markdown da história, sem texto adicional antes ou depois.
             section_name: Nome da seção ("criterios", "testes", "arquitetura", "beneficios")
             original_story: História completa original
             form_data: Dados do formulário original
+            use_cache: Reaproveitar resposta em cache (padrão: não; regenerar
+                pede uma nova versão da seção)
 
         Returns:
             Seção regenerada em Markdown
@@ -719,26 +1587,31 @@ Retorne APENAS o Markdown da história, sem texto adicional antes ou depois.
             Exception: Em caso de erro na API
         """
         prompt = self._build_regeneration_prompt(section_name, original_story, form_data)
+        started = time.monotonic()
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                timeout=self.timeout,
-                messages=[{"role": "user", "content": prompt}]
+            text = self._request_text(
+                messages=[{"role": "user", "content": prompt}],
+                operation="regenerate_section",
+                category=section_name,
+                use_cache=use_cache
             )
-
-            if response.content and len(response.content) > 0:
-                return response.content[0].text
-
-            raise Exception("Resposta vazia da API")
+            self._record_regeneration([section_name], original_story, form_data, prompt, started)
+            return text
 
         except APITimeoutError:
             raise APITimeoutError("Tempo esgotado ao regenerar seção. Tente novamente.")
-        except RateLimitError:
-            raise RateLimitError("Limite de requisições atingido. Aguarde alguns minutos.")
-        except APIConnectionError:
-            raise APIConnectionError("Erro de conexão com a API. Verifique sua internet.")
+        except RateLimitError as e:
+            raise RateLimitError(
+                "Limite de requisições atingido. Aguarde alguns minutos.",
+                response=e.response,
+                body=e.body
+            )
+        except APIConnectionError as e:
+            raise APIConnectionError(
+                message="Erro de conexão com a API. Verifique sua internet.",
+                request=e.request
+            )
         except Exception as e:
             raise Exception(f"Erro ao regenerar seção: {str(e)}")
 
@@ -746,7 +1619,8 @@ Retorne APENAS o Markdown da história, sem texto adicional antes ou depois.
         self,
         section_name: str,
         original_story: Dict,
-        form_data: Dict
+        form_data: Dict,
+        minimal: bool = True
     ) -> str:
         """
         Constrói prompt para regeneração parcial.
@@ -755,20 +1629,12 @@ Retorne APENAS o Markdown da história, sem texto adicional antes ou depois.
             section_name: Seção a regenerar
             original_story: História original
             form_data: Dados do formulário
+            minimal: Enviar só as seções relevantes e o resumo das demais
 
         Returns:
             Prompt formatado
         """
-        historia_completa = original_story.get('historia_gerada', '')
-
-        section_mapping = {
-            'criterios': 'Criterios de Aceitacao',
-            'testes': 'Cenarios de Teste Sugeridos',
-            'arquitetura': 'Estrutura Tecnica/Arquitetura',
-            'beneficios': 'Beneficios'
-        }
-
-        section_label = section_mapping.get(section_name, section_name)
+        section_label = REGENERATION_SECTIONS.get(section_name, section_name)
 
         prompt = f"""
 <task>
@@ -776,40 +1642,16 @@ Regenere APENAS a seção "{section_label}" desta história.
 Mantenha todo o contexto e informações da história original.
 </task>
 
-<critical_rules>
-1. NUNCA ADICIONAR EMOJIS
-2. USAR APENAS INFORMAÇÕES FORNECIDAS
-3. SER OBJETIVA E DIRETA
-4. NÃO INVENTAR NADA
-</critical_rules>
-
-<original_story>
-{historia_completa}
-</original_story>
-
-<form_data>
-Título: {form_data.get('titulo', '')}
-Regras de Negócio:
-{chr(10).join(f"- {r}" for r in form_data.get('regras_negocio', []))}
-
-APIs/Serviços:
-{chr(10).join(f"- {a}" for a in form_data.get('apis_servicos', []))}
-
-Objetivos:
-{chr(10).join(f"- {o}" for o in form_data.get('objetivos', []))}
+{REGENERATION_RULES}
 
-Complexidade: {form_data.get('complexidade', 5)}
-
-Critérios de Aceitação:
-{chr(10).join(f"- {c}" for c in form_data.get('criterios_aceitacao', []))}
-</form_data>
+{self._regeneration_context(original_story, form_data, [section_name] if minimal else None)}
 
 <section_to_regenerate>
 {section_label}
 </section_to_regenerate>
 
 <instructions>
-1. Analise o contexto da história completa
+1. Analise o contexto fornecido da história
 2. Regenere APENAS a seção "{section_label}"
 3. Mantenha consistência com o resto da história
 4. Use mesmo nível de detalhe técnico
@@ -827,6 +1669,282 @@ Retorne APENAS a seção solicitada em Markdown, sem texto adicional.
 
         return prompt.strip()
 
+    def regenerate_sections(
+        self,
+        section_names: List[str],
+        original_story: Dict,
+        form_data: Dict,
+        use_cache: bool = False
+    ) -> Dict[str, str]:
+        """
+        Regenera várias seções em uma única chamada: a história e os dados do
+        formulário são enviados uma vez e cada seção volta como uma entrada
+        da ferramenta submit_sections.
+
+        Args:
+            section_names: Seções a regenerar ("criterios", "testes", ...)
+            original_story: História completa original
+            form_data: Dados do formulário original
+            use_cache: Reaproveitar resposta em cache (padrão: não)
+
+        Returns:
+            Dict seção -> seção regenerada em Markdown (na ordem pedida)
+
+        Raises:
+            Exception: Em caso de erro na API ou seção ausente na resposta
+        """
+        section_names = list(dict.fromkeys(section_names))
+        if len(section_names) == 1:
+            section_name = section_names[0]
+            return {section_name: self.regenerate_section(section_name, original_story, form_data, use_cache)}
+
+        prompt = self._build_multi_regeneration_prompt(section_names, original_story, form_data)
+        started = time.monotonic()
+
+        try:
+            response = self._request_text(
+                messages=[{"role": "user", "content": prompt}],
+                operation="regenerate_sections",
+                category="+".join(sorted(section_names)),
+                tools=[REGENERATION_TOOL],
+                use_cache=use_cache
+            )
+            regenerated = self._parse_regenerated_sections(response, section_names)
+            self._record_regeneration(section_names, original_story, form_data, prompt, started)
+            return regenerated
+
+        except APITimeoutError:
+            raise APITimeoutError("Tempo esgotado ao regenerar seções. Tente novamente.")
+        except RateLimitError as e:
+            raise RateLimitError(
+                "Limite de requisições atingido. Aguarde alguns minutos.",
+                response=e.response,
+                body=e.body
+            )
+        except APIConnectionError as e:
+            raise APIConnectionError(
+                message="Erro de conexão com a API. Verifique sua internet.",
+                request=e.request
+            )
+        except Exception as e:
+            raise Exception(f"Erro ao regenerar seções: {str(e)}")
+
+    def _build_multi_regeneration_prompt(
+        self,
+        section_names: List[str],
+        original_story: Dict,
+        form_data: Dict,
+        minimal: bool = True
+    ) -> str:
+        """
+        Constrói prompt para regeneração de várias seções em uma chamada.
+
+        Args:
+            section_names: Seções a regenerar
+            original_story: História original
+            form_data: Dados do formulário
+            minimal: Enviar só as seções relevantes e o resumo das demais
+
+        Returns:
+            Prompt formatado
+        """
+        secoes = "\n".join(
+            f"- {name}: {REGENERATION_SECTIONS.get(name, name)}" for name in section_names
+        )
+
+        prompt = f"""
+<task>
+Regenere APENAS as seções listadas em <sections_to_regenerate> desta história.
+Mantenha todo o contexto e informações da história original.
+</task>
+
+{REGENERATION_RULES}
+
+{self._regeneration_context(original_story, form_data, section_names if minimal else None)}
+
+<sections_to_regenerate>
+{secoes}
+</sections_to_regenerate>
+
+<instructions>
+1. Analise o contexto fornecido da história
+2. Regenere APENAS as seções listadas (formato "- chave: título")
+3. Mantenha consistência com o resto da história e entre as seções regeneradas
+4. Use mesmo nível de detalhe técnico
+5. Registre o resultado com a ferramenta submit_sections: uma entrada por seção,
+   com a chave em "section" e o Markdown em "content", começando com ### [título da seção]
+</instructions>
+"""
+
+        return prompt.strip()
+
+    def _regeneration_context(
+        self,
+        original_story: Dict,
+        form_data: Dict,
+        section_names: Optional[List[str]] = None
+    ) -> str:
+        """
+        Contexto enviado nos prompts de regeneração: história e dados do formulário.
+        Com section_names (e seleção de contexto habilitada), a história é reduzida
+        às seções relevantes para as seções pedidas e a um resumo das demais.
+
+        Args:
+            original_story: História original
+            form_data: Dados do formulário
+            section_names: Seções a regenerar (None = história inteira)
+
+        Returns:
+            Blocos da história e <form_data>
+        """
+        historia_completa = original_story.get('historia_gerada', '')
+
+        selection = None
+        if section_names and self.regeneration_context is not None:
+            selection = self.regeneration_context.select(historia_completa, section_names)
+
+        if selection is None:
+            story_blocks = f"""<original_story>
+{historia_completa}
+</original_story>"""
+        else:
+            story_blocks = f"""<story_title>{selection['title']}</story_title>
+
+<relevant_sections>
+{selection['relevant'] or '(nenhuma)'}
+</relevant_sections>
+
+<other_sections_summary>
+{selection['summary'] or '(nenhuma)'}
+</other_sections_summary>"""
+
+        return f"""{story_blocks}
+
+<form_data>
+{self._regeneration_form_data(form_data)}
+</form_data>"""
+
+    @staticmethod
+    def _regeneration_form_data(form_data: Dict) -> str:
+        """
+        Dados do formulário no prompt de regeneração (campos vazios omitidos).
+
+        Args:
+            form_data: Dados do formulário
+
+        Returns:
+            Texto do bloco <form_data>
+        """
+        lines = [f"Título: {form_data.get('titulo', '')}"]
+
+        objetivos = form_data.get('objetivos', {})
+        if isinstance(objetivos, dict):
+            labels = {"como": "Como", "quero": "Quero", "para_que": "Para que"}
+            objetivos = [
+                f"{labels.get(key, key)}: {value}"
+                for key, value in objetivos.items()
+                if isinstance(value, str) and value.strip()
+            ]
+
+        for label, items in (
+            ("Regras de Negócio", form_data.get('regras_negocio', [])),
+            ("APIs/Serviços", form_data.get('apis_servicos', [])),
+            ("Objetivos", objetivos),
+            ("Critérios de Aceitação", form_data.get('criterios_aceitacao', []))
+        ):
+            items = [item for item in items or [] if item]
+            if items:
+                lines.append(f"{label}:\n" + "\n".join(f"- {item}" for item in items))
+
+        lines.append(f"Complexidade: {form_data.get('complexidade', 5)}")
+        return "\n\n".join(lines)
+
+    def _record_regeneration(
+        self,
+        section_names: List[str],
+        original_story: Dict,
+        form_data: Dict,
+        prompt: str,
+        started: float
+    ) -> None:
+        """
+        Registra tokens enviados, tokens economizados em relação à história
+        inteira e latência de uma regeneração concluída.
+
+        Args:
+            section_names: Seções regeneradas
+            original_story: História original
+            form_data: Dados do formulário
+            prompt: Prompt enviado
+            started: Início da regeneração (time.monotonic)
+        """
+        if self.regeneration_context is None:
+            return
+
+        if len(section_names) == 1:
+            full_prompt = self._build_regeneration_prompt(section_names[0], original_story, form_data, minimal=False)
+        else:
+            full_prompt = self._build_multi_regeneration_prompt(section_names, original_story, form_data, minimal=False)
+
+        report = self.regeneration_context.record(
+            full_input_tokens=TokenBudget.count_input_tokens([{"role": "user", "content": full_prompt}]),
+            input_tokens=TokenBudget.count_input_tokens([{"role": "user", "content": prompt}]),
+            seconds=time.monotonic() - started
+        )
+        report["sections"] = list(section_names)
+        self.last_regeneration = report
+
+    def get_last_regeneration(self) -> Dict[str, Any]:
+        """
+        Retorna tokens, economia e latência da última regeneração.
+
+        Returns:
+            Dict com sections, full_input_tokens, input_tokens, saved_tokens,
+            saved_ratio e seconds (vazio se não houver regeneração registrada)
+        """
+        return self.last_regeneration
+
+    def get_regeneration_stats(self) -> Dict[str, Any]:
+        """
+        Retorna a economia acumulada das regenerações com contexto mínimo.
+
+        Returns:
+            Dict de estatísticas (vazio se a seleção de contexto estiver desabilitada)
+        """
+        return self.regeneration_context.get_stats() if self.regeneration_context else {}
+
+    @staticmethod
+    def _parse_regenerated_sections(response: str, section_names: List[str]) -> Dict[str, str]:
+        """
+        Extrai as seções do input da ferramenta submit_sections.
+        Aceita a chave ou o título da seção no campo "section".
+
+        Args:
+            response: Input da ferramenta em JSON
+            section_names: Seções pedidas
+
+        Returns:
+            Dict seção -> Markdown (na ordem pedida)
+
+        Raises:
+            Exception: Se alguma seção pedida não vier na resposta
+        """
+        by_label = {REGENERATION_SECTIONS.get(name, name).lower(): name for name in section_names}
+
+        received = {}
+        for item in json.loads(response).get("sections", []):
+            key = str(item.get("section", "")).strip()
+            key = key if key in section_names else by_label.get(key.lower())
+            content = str(item.get("content", "")).strip()
+            if key and content:
+                received[key] = content
+
+        missing = [name for name in section_names if name not in received]
+        if missing:
+            raise Exception(f"Resposta sem as seções: {', '.join(missing)}")
+
+        return {name: received[name] for name in section_names}
+
     def validate_invest_with_ai(self, story: Dict) -> str:
         """
         Valida história com IA segundo critérios INVEST.
@@ -847,24 +1965,64 @@ Retorne APENAS a seção solicitada em Markdown, sem texto adicional.
         prompt = invest_service.prepare_for_ai_validation(story)
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=2000,
-                timeout=self.timeout,
-                messages=[{"role": "user", "content": prompt}]
+            return self._request_text(
+                messages=[{"role": "user", "content": prompt}],
+                operation="validate_invest_with_ai"
             )
 
-            if response.content and len(response.content) > 0:
-                return response.content[0].text
+        except APITimeoutError:
+            raise APITimeoutError("Tempo esgotado ao validar. Tente novamente.")
+        except RateLimitError as e:
+            raise RateLimitError(
+                "Limite de requisições atingido. Aguarde alguns minutos.",
+                response=e.response,
+                body=e.body
+            )
+        except APIConnectionError as e:
+            raise APIConnectionError(
+                message="Erro de conexão com a API. Verifique sua internet.",
+                request=e.request
+            )
+        except Exception as e:
+            raise Exception(f"Erro ao validar história: {str(e)}")
+
+    def validate_invest_with_ai_stream(self, story: Dict) -> Iterator[str]:
+        """
+        Versão streaming de validate_invest_with_ai: produz o JSON da
+        avaliação em trechos, permitindo exibir cada critério assim que chega.
 
-            raise Exception("Resposta vazia da API")
+        Args:
+            story: História completa
+
+        Yields:
+            Trechos da resposta JSON
+
+        Raises:
+            Exception: Em caso de erro na API
+        """
+        from services.invest_service import InvestService
+
+        prompt = InvestService().prepare_for_ai_validation(story)
+
+        try:
+            yield from self._stream_text(
+                messages=[{"role": "user", "content": prompt}],
+                operation="validate_invest_with_ai"
+            )
 
         except APITimeoutError:
             raise APITimeoutError("Tempo esgotado ao validar. Tente novamente.")
-        except RateLimitError:
-            raise RateLimitError("Limite de requisições atingido. Aguarde alguns minutos.")
-        except APIConnectionError:
-            raise APIConnectionError("Erro de conexão com a API. Verifique sua internet.")
+        except RateLimitError as e:
+            raise RateLimitError(
+                "Limite de requisições atingido. Aguarde alguns minutos.",
+                response=e.response,
+                body=e.body
+            )
+        except APIConnectionError as e:
+            raise APIConnectionError(
+                message="Erro de conexão com a API. Verifique sua internet.",
+                request=e.request
+            )
         except Exception as e:
             raise Exception(f"Erro ao validar história: {str(e)}")
 
@@ -885,27 +2043,68 @@ Retorne APENAS a seção solicitada em Markdown, sem texto adicional.
         prompt = self._build_suggestion_prompt(story)
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=2000,
-                timeout=self.timeout,
-                messages=[{"role": "user", "content": prompt}]
+            return self._request_text(
+                messages=[{"role": "user", "content": prompt}],
+                operation="analyze_and_suggest"
             )
 
-            if response.content and len(response.content) > 0:
-                return response.content[0].text
-
-            raise Exception("Resposta vazia da API")
-
         except APITimeoutError:
             raise APITimeoutError("Tempo esgotado ao analisar. Tente novamente.")
-        except RateLimitError:
-            raise RateLimitError("Limite de requisições atingido. Aguarde alguns minutos.")
-        except APIConnectionError:
-            raise APIConnectionError("Erro de conexão com a API. Verifique sua internet.")
+        except RateLimitError as e:
+            raise RateLimitError(
+                "Limite de requisições atingido. Aguarde alguns minutos.",
+                response=e.response,
+                body=e.body
+            )
+        except APIConnectionError as e:
+            raise APIConnectionError(
+                message="Erro de conexão com a API. Verifique sua internet.",
+                request=e.request
+            )
         except Exception as e:
             raise Exception(f"Erro ao analisar história: {str(e)}")
 
+    def review_story(self, story: Dict) -> Dict[str, Any]:
+        """
+        Revisão completa em uma única chamada: scores INVEST e sugestões
+        de melhoria via tool use (schema garantido, sem parsing de texto livre).
+
+        Args:
+            story: História completa
+
+        Returns:
+            input da ferramenta submit_review (ver REVIEW_TOOL)
+
+        Raises:
+            Exception: Em caso de erro na API
+        """
+        from services.invest_service import InvestService, REVIEW_TOOL
+
+        prompt = InvestService().prepare_for_review(story)
+
+        try:
+            return json.loads(self._request_text(
+                messages=[{"role": "user", "content": prompt}],
+                operation="review_story",
+                tools=[REVIEW_TOOL]
+            ))
+
+        except APITimeoutError:
+            raise APITimeoutError("Tempo esgotado ao revisar. Tente novamente.")
+        except RateLimitError as e:
+            raise RateLimitError(
+                "Limite de requisições atingido. Aguarde alguns minutos.",
+                response=e.response,
+                body=e.body
+            )
+        except APIConnectionError as e:
+            raise APIConnectionError(
+                message="Erro de conexão com a API. Verifique sua internet.",
+                request=e.request
+            )
+        except Exception as e:
+            raise Exception(f"Erro ao revisar história: {str(e)}")
+
     def _build_suggestion_prompt(self, story: Dict) -> str:
         """
         Constrói prompt para análise e sugestões.
@@ -985,109 +2184,22 @@ Retorne APENAS JSON array neste formato:
             form_data: Dados do formulário Spike
 
         Returns:
-            Prompt formatado
+            Dados dinâmicos da história em <input_data>
+            (template "spike_input"; instruções fixas em SPIKE_SYSTEM_PROMPT)
         """
-        titulo = form_data.get('titulo', '')
-        pergunta = form_data.get('spike_pergunta', '')
         alternativas = form_data.get('spike_alternativas', [])
-        timebox = form_data.get('spike_timebox', 8)
-        output = form_data.get('spike_output', '')
         criterios_sucesso = form_data.get('spike_criterios_sucesso', [])
 
-        # Objetivos Como/Quero/Para que
-        objetivos = form_data.get('objetivos', {})
-        como = objetivos.get('como', '') if isinstance(objetivos, dict) else ''
-        quero = objetivos.get('quero', '') if isinstance(objetivos, dict) else ''
-        para_que = objetivos.get('para_que', '') if isinstance(objetivos, dict) else ''
-
-        alternativas_formatadas = "\n".join(f"- {alt}" for alt in alternativas if alt)
-        criterios_formatados = "\n".join(f"- {crit}" for crit in criterios_sucesso if crit)
-
-        prompt = f"""
-<task>
-Você é um Product Owner sênior especializado em metodologias ágeis.
-Gere uma história de usuário do tipo SPIKE (exploratória/investigação) completa e profissional.
-</task>
-
-<critical_rules>
-1. NUNCA ADICIONAR EMOJIS
-2. SER OBJETIVO E TÉCNICO
-3. FOCAR NA INVESTIGAÇÃO, NÃO NA IMPLEMENTAÇÃO
-4. DEFINIR CLARAMENTE O QUE SERÁ ENTREGUE AO FINAL
-</critical_rules>
-
-<input_data>
-<titulo>{titulo}</titulo>
-<pergunta_hipotese>{pergunta}</pergunta_hipotese>
-<alternativas_investigar>
-{alternativas_formatadas}
-</alternativas_investigar>
-<timebox_horas>{timebox}</timebox_horas>
-<output_esperado>{output}</output_esperado>
-<criterios_sucesso>
-{criterios_formatados}
-</criterios_sucesso>
-<objetivos>
-Como: {como}
-Quero: {quero}
-Para que: {para_que}
-</objetivos>
-</input_data>
-
-<mandatory_structure>
-## [Título]
-
-**Como** [persona - use o valor de objetivos.como ou infira do contexto], **quero** [ação - use o valor de objetivos.quero ou infira do contexto], **para que** [benefício - use o valor de objetivos.para_que ou infira do contexto].
-
-### Contexto
-Descreva o cenário que motivou esta investigação. Por que precisamos investigar isso?
-Qual incerteza técnica ou de negócio estamos tentando resolver?
-
-### Pergunta/Hipótese
-Formule claramente a pergunta principal que esta spike deve responder.
-Se aplicável, liste hipóteses secundárias a serem validadas.
-
-### Escopo da Investigação
-Liste especificamente o que SERÁ e o que NÃO SERÁ investigado.
-Defina limites claros para manter o foco.
-
----
-
-### Sessão Técnica
-
-### Alternativas a Avaliar
-Para cada alternativa fornecida, descreva:
-- O que é a tecnologia/abordagem
-- Prós esperados
-- Contras potenciais
-- Critérios de avaliação
-
-### Timebox
-Tempo máximo: {timebox} horas
-- Defina checkpoints intermediários
-- Estabeleça momento de decisão go/no-go
-
-### Entregáveis
-Output esperado: {output}
-Liste especificamente o que será produzido:
-- Documentação
-- POC (se aplicável)
-- Recomendação final
-
-### Critérios de Sucesso
-Defina quando a spike será considerada bem-sucedida.
-Liste critérios mensuráveis e verificáveis.
-
-### Próximos Passos Potenciais
-Descreva os possíveis caminhos após a conclusão:
-- Se a hipótese for validada
-- Se a hipótese for invalidada
-- Se precisar de mais investigação
-</mandatory_structure>
-
-Retorne APENAS o Markdown da história, sem texto adicional.
-"""
-        return prompt.strip()
+        return self.prompt_templates.render(
+            "spike_input",
+            titulo=form_data.get('titulo', ''),
+            pergunta=form_data.get('spike_pergunta', ''),
+            alternativas="\n".join(f"- {alt}" for alt in alternativas if alt),
+            timebox=form_data.get('spike_timebox', 8),
+            output=form_data.get('spike_output', ''),
+            criterios_sucesso="\n".join(f"- {crit}" for crit in criterios_sucesso if crit),
+            **self._objetivos_fields(form_data)
+        )
 
     def _build_kaizen_prompt(self, form_data: Dict[str, Any]) -> str:
         """
@@ -1097,113 +2209,22 @@ Retorne APENAS o Markdown da história, sem texto adicional.
             form_data: Dados do formulário Kaizen
 
         Returns:
-            Prompt formatado
+            Dados dinâmicos da história em <input_data>
+            (template "kaizen_input"; instruções fixas em KAIZEN_SYSTEM_PROMPT)
         """
-        titulo = form_data.get('titulo', '')
-        processo = form_data.get('kaizen_processo', '')
-        situacao_atual = form_data.get('kaizen_situacao_atual', '')
-        meta = form_data.get('kaizen_meta', '')
         metricas = form_data.get('kaizen_metricas', [])
-        impacto = form_data.get('kaizen_impacto', '')
-        complexidade = form_data.get('complexidade', 5)
-
-        # Objetivos Como/Quero/Para que
-        objetivos = form_data.get('objetivos', {})
-        como = objetivos.get('como', '') if isinstance(objetivos, dict) else ''
-        quero = objetivos.get('quero', '') if isinstance(objetivos, dict) else ''
-        para_que = objetivos.get('para_que', '') if isinstance(objetivos, dict) else ''
-
-        metricas_formatadas = "\n".join(f"- {m}" for m in metricas if m)
-
-        prompt = f"""
-<task>
-Você é um Product Owner sênior especializado em metodologias ágeis e melhoria contínua.
-Gere uma história de usuário do tipo KAIZEN (melhoria contínua) completa e profissional.
-</task>
 
-<critical_rules>
-1. NUNCA ADICIONAR EMOJIS
-2. FOCAR EM MÉTRICAS E RESULTADOS MENSURÁVEIS
-3. COMPARAR ESTADO ATUAL vs ESTADO DESEJADO
-4. SER ESPECÍFICO SOBRE O IMPACTO ESPERADO
-</critical_rules>
-
-<input_data>
-<titulo>{titulo}</titulo>
-<processo_area>{processo}</processo_area>
-<situacao_atual>{situacao_atual}</situacao_atual>
-<meta_desejada>{meta}</meta_desejada>
-<metricas_sucesso>
-{metricas_formatadas}
-</metricas_sucesso>
-<impacto_esperado>{impacto}</impacto_esperado>
-<complexidade>{complexidade}</complexidade>
-<objetivos>
-Como: {como}
-Quero: {quero}
-Para que: {para_que}
-</objetivos>
-</input_data>
-
-<mandatory_structure>
-## [Título]
-
-**Como** [persona - use o valor de objetivos.como ou infira do contexto], **quero** [ação - use o valor de objetivos.quero ou infira do contexto], **para que** [benefício - use o valor de objetivos.para_que ou infira do contexto].
-
-### Contexto
-Descreva o processo/área atual e por que precisa ser melhorado.
-Conecte com o impacto no time e na entrega de valor.
-
-### Situação Atual (Baseline)
-Detalhe o estado atual com dados concretos:
-- Métricas atuais (tempo, taxa de erro, etc.)
-- Problemas identificados
-- Impacto negativo no time/processo
-
-### Meta Desejada
-Descreva claramente o estado futuro esperado:
-- Métricas alvo
-- Melhorias específicas
-- Benefícios esperados
-
----
-
-### Sessão Técnica
-
-### Plano de Melhoria
-Liste as ações necessárias para atingir a meta:
-1. Ação 1 - Descrição e impacto esperado
-2. Ação 2 - Descrição e impacto esperado
-(baseado no processo descrito)
-
-### Métricas de Sucesso
-Defina como medir o sucesso da melhoria:
-- Métrica principal
-- Métricas secundárias
-- Frequência de medição
-
-### Impacto Esperado
-Descreva o impacto positivo após a implementação:
-- No time
-- No processo
-- Na entrega de valor
-
-### Critérios de Aceitação
-CA1 - [Critério mensurável]
-Dado que [situação atual]
-Quando [melhoria implementada]
-Então [resultado esperado com métrica]
-
-### Riscos e Mitigações
-Liste possíveis riscos na implementação e como mitigá-los.
-
-### Complexidade
-Pontos: {complexidade}
-</mandatory_structure>
-
-Retorne APENAS o Markdown da história, sem texto adicional.
-"""
-        return prompt.strip()
+        return self.prompt_templates.render(
+            "kaizen_input",
+            titulo=form_data.get('titulo', ''),
+            processo=form_data.get('kaizen_processo', ''),
+            situacao_atual=form_data.get('kaizen_situacao_atual', ''),
+            meta=form_data.get('kaizen_meta', ''),
+            metricas="\n".join(f"- {m}" for m in metricas if m),
+            impacto=form_data.get('kaizen_impacto', ''),
+            complexidade=form_data.get('complexidade', 5),
+            **self._objetivos_fields(form_data)
+        )
 
     def _build_fix_prompt(self, form_data: Dict[str, Any]) -> str:
         """
@@ -1213,143 +2234,69 @@ Retorne APENAS o Markdown da história, sem texto adicional.
             form_data: Dados do formulário Fix
 
         Returns:
-            Prompt formatado
+            Dados dinâmicos da história em <input_data>
+            (template "fix_input"; instruções fixas em FIX_SYSTEM_PROMPT)
         """
-        titulo = form_data.get('titulo', '')
-        descricao = form_data.get('fix_descricao', '')
         passos = form_data.get('fix_passos_reproduzir', [])
-        esperado = form_data.get('fix_comportamento_esperado', '')
-        atual = form_data.get('fix_comportamento_atual', '')
-        ambiente = form_data.get('fix_ambiente', '')
-        severidade = form_data.get('fix_severidade', '')
-        logs = form_data.get('fix_logs', '')
-        complexidade = form_data.get('complexidade', 5)
         fix_images = form_data.get('fix_images', [])
 
-        # Objetivos Como/Quero/Para que
-        objetivos = form_data.get('objetivos', {})
-        como = objetivos.get('como', '') if isinstance(objetivos, dict) else ''
-        quero = objetivos.get('quero', '') if isinstance(objetivos, dict) else ''
-        para_que = objetivos.get('para_que', '') if isinstance(objetivos, dict) else ''
-
-        passos_formatados = "\n".join(f"{i+1}. {p}" for i, p in enumerate(passos) if p)
-
         # Texto sobre imagens anexadas
         imagens_info = ""
         if fix_images:
             nomes_imagens = [img.get('name', 'imagem') for img in fix_images]
-            imagens_info = f"""
-<imagens_anexadas>
-Foram anexadas {len(fix_images)} imagem(ns) como evidência do bug:
-{chr(10).join(f"- {nome}" for nome in nomes_imagens)}
-
-IMPORTANTE: As imagens serão inseridas automaticamente na história depois.
-NÃO descreva o conteúdo das imagens na seção de Evidências.
-Apenas mencione que há evidências visuais anexadas e foque nos logs/erros textuais se houver.
-</imagens_anexadas>
-"""
+            imagens_info = "\n" + self.prompt_templates.render(
+                "fix_images",
+                quantidade=len(fix_images),
+                nomes="\n".join(f"- {nome}" for nome in nomes_imagens)
+            ) + "\n"
+
+        return self.prompt_templates.render(
+            "fix_input",
+            titulo=form_data.get('titulo', ''),
+            descricao=form_data.get('fix_descricao', ''),
+            passos="\n".join(f"{i+1}. {p}" for i, p in enumerate(passos) if p),
+            esperado=form_data.get('fix_comportamento_esperado', ''),
+            atual=form_data.get('fix_comportamento_atual', ''),
+            ambiente=form_data.get('fix_ambiente', ''),
+            severidade=form_data.get('fix_severidade', ''),
+            logs=form_data.get('fix_logs', ''),
+            complexidade=form_data.get('complexidade', 5),
+            imagens=imagens_info,
+            **self._objetivos_fields(form_data)
+        )
+
+    @staticmethod
+    def _objetivos_fields(form_data: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Campos Como/Quero/Para que do bloco <objetivos> (Spike, Kaizen e Fix).
 
-        prompt = f"""
-<task>
-Você é um Product Owner sênior especializado em metodologias ágeis.
-Gere uma história de usuário do tipo FIX/BUG/INCIDENTE completa e profissional.
-</task>
+        Args:
+            form_data: Dados do formulário
 
-<critical_rules>
-1. NUNCA ADICIONAR EMOJIS
-2. SER PRECISO NA DESCRIÇÃO DO PROBLEMA
-3. FOCAR NA CORREÇÃO, NÃO EM NOVAS FUNCIONALIDADES
-4. INCLUIR CRITÉRIOS DE VERIFICAÇÃO DA CORREÇÃO
-5. NÃO DESCREVER O CONTEÚDO DAS IMAGENS - elas serão inseridas automaticamente depois
-</critical_rules>
-
-<input_data>
-<titulo>{titulo}</titulo>
-<descricao_bug>{descricao}</descricao_bug>
-<passos_reproduzir>
-{passos_formatados}
-</passos_reproduzir>
-<comportamento_esperado>{esperado}</comportamento_esperado>
-<comportamento_atual>{atual}</comportamento_atual>
-<ambiente_afetado>{ambiente}</ambiente_afetado>
-<severidade>{severidade}</severidade>
-<logs_evidencias>{logs}</logs_evidencias>
-<complexidade>{complexidade}</complexidade>
-<objetivos>
-Como: {como}
-Quero: {quero}
-Para que: {para_que}
-</objetivos>
-{imagens_info}
-</input_data>
-
-<mandatory_structure>
-## [Título]
-
-**Como** [persona - use o valor de objetivos.como ou infira do contexto], **quero** [ação - use o valor de objetivos.quero ou infira do contexto], **para que** [benefício - use o valor de objetivos.para_que ou infira do contexto].
-
-### Descrição do Problema
-Descreva o bug/incidente de forma clara e técnica.
-Inclua contexto sobre quando foi identificado e impacto.
-
-### Severidade e Impacto
-**Severidade:** {severidade}
-**Ambiente:** {ambiente}
-
-Descreva o impacto:
-- Usuários afetados
-- Funcionalidades comprometidas
-- Impacto no negócio
-
-### Passos para Reproduzir
-{passos_formatados if passos_formatados else "1. [Passo 1]\n2. [Passo 2]\n3. [Passo 3]"}
-
----
-
-### Sessão Técnica
-
-### Comportamento Esperado
-{esperado}
-
-### Comportamento Atual
-{atual}
-
-### Evidências
-{"(As imagens de evidência serão inseridas automaticamente aqui)" + chr(10) + chr(10) if fix_images else ""}{"**Logs/Mensagens de Erro:**" + chr(10) + f"```{chr(10)}{logs}{chr(10)}```" if logs else ""}{"Nenhuma evidência adicional fornecida." if not logs and not fix_images else ""}
-
-### Análise Técnica Sugerida
-Baseado na descrição{" e nas imagens anexadas" if fix_images else ""}, sugira possíveis causas raiz:
-- Causa potencial 1
-- Causa potencial 2
-- Área do código a investigar
-
-### Critérios de Aceitação
-CA1 - Bug Corrigido
-Dado que o bug foi identificado
-Quando a correção for aplicada
-Então o comportamento esperado deve ocorrer
-
-CA2 - Sem Regressão
-Dado que a correção foi aplicada
-Quando funcionalidades relacionadas forem testadas
-Então não deve haver regressão
-
-CA3 - Verificação em {ambiente}
-Dado que a correção foi deployada em {ambiente}
-Quando o cenário do bug for reproduzido
-Então o sistema deve funcionar corretamente
-
-### Cenarios de Teste Sugeridos
-1. Cenario de verificacao: Reproduzir bug e confirmar correcao
-2. Cenario de regressao: Testar funcionalidades adjacentes
-3. Cenario de validacao: Verificar dados/estados apos correcao
-4. Cenario de carga (se aplicavel): Verificar sob condicoes similares
-5. Cenario edge case: Testar cenarios de borda relacionados ao bug
-
-### Complexidade
-Pontos: {complexidade}
-</mandatory_structure>
-
-Retorne APENAS o Markdown da história, sem texto adicional.
-"""
-        return prompt.strip()
+        Returns:
+            Dict com como, quero e para_que
+        """
+        objetivos = form_data.get('objetivos', {})
+        if not isinstance(objetivos, dict):
+            objetivos = {}
+        return {
+            "como": objetivos.get('como', ''),
+            "quero": objetivos.get('quero', ''),
+            "para_que": objetivos.get('para_que', '')
+        }
+
+    @staticmethod
+    def _optional_block(tag: str, content: str) -> str:
+        """
+        Bloco XML opcional do <input_data> (vazio quando não há conteúdo).
+
+        Args:
+            tag: Nome da tag
+            content: Conteúdo do bloco
+
+        Returns:
+            Bloco precedido de quebra de linha ou string vazia
+        """
+        if not content:
+            return ""
+        return f"\n<{tag}>\n{content}\n</{tag}>"
@@ -0,0 +1,416 @@
+"""
+Service assíncrono de integração com Claude API (Anthropic).
+Permite disparar validação INVEST, sugestões e regenerações em paralelo.
+Segue Open/Closed Principle: estende AIService sem alterar seu comportamento.
+"""
+
+import asyncio
+import json
+import time
+from typing import List, Dict, Any, Awaitable, Optional, Tuple, TypeVar
+from anthropic import APITimeoutError, APIConnectionError, RateLimitError
+from services.ai_service import CONTINUATION_OPERATION, REGENERATION_TOOL, AIService
+from services.circuit_breaker import Route
+from services.client_manager import get_event_loop
+from services.llm_backend import LLMBackend
+
+T = TypeVar("T")
+
+
+class AsyncAIService(AIService):
+    """
+    Variante assíncrona do AIService (create_message_async do backend).
+    Reaproveita os construtores de prompt do AIService e mantém
+    os métodos síncronos disponíveis para o restante da aplicação.
+    """
+
+    def __init__(self, api_key: str = "", backend: Optional[LLMBackend] = None):
+        """
+        Inicializa o service (o backend atende chamadas síncronas e assíncronas).
+
+        Args:
+            api_key: Chave de API da Anthropic
+            backend: Backend de LLM (padrão: config.LLM_BACKEND)
+        """
+        super().__init__(api_key=api_key, backend=backend)
+
+    def run(self, coroutine: Awaitable[T]) -> T:
+        """
+        Executa corrotina no event loop do service e aguarda o resultado.
+
+        Args:
+            coroutine: Corrotina a executar
+
+        Returns:
+            Resultado da corrotina
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, get_event_loop())
+        return future.result()
+
+    async def generate_story_async(
+        self,
+        titulo: str,
+        regras_negocio: List[str] = None,
+        apis_servicos: List[str] = None,
+        objetivos: Dict[str, Any] = None,
+        complexidade: int = 5,
+        criterios_aceitacao: List[str] = None,
+        api_specs: Dict[str, str] = None,
+        form_data: Dict[str, Any] = None
+    ) -> str:
+        """
+        Versão assíncrona de generate_story.
+
+        Args:
+            Mesmos argumentos de AIService.generate_story
+
+        Returns:
+            História gerada em formato Markdown
+        """
+        system_prompt, prompt = self._build_story_prompt(
+            titulo=titulo,
+            regras_negocio=regras_negocio,
+            apis_servicos=apis_servicos,
+            objetivos=objetivos,
+            complexidade=complexidade,
+            criterios_aceitacao=criterios_aceitacao,
+            api_specs=api_specs,
+            form_data=form_data
+        )
+
+        return await self._create_text_async(
+            messages=self._build_story_messages(prompt, form_data),
+            timeout_message="Tempo esgotado ao aguardar resposta da IA. Tente novamente.",
+            error_prefix="Erro ao gerar história",
+            system=self._build_system_blocks(system_prompt),
+            operation="generate_story",
+            category=(form_data or {}).get("value_area", "Business")
+        )
+
+    async def regenerate_section_async(
+        self,
+        section_name: str,
+        original_story: Dict,
+        form_data: Dict,
+        use_cache: bool = False
+    ) -> str:
+        """
+        Versão assíncrona de regenerate_section.
+
+        Args:
+            section_name: Nome da seção a regenerar
+            original_story: História completa original
+            form_data: Dados do formulário original
+            use_cache: Reaproveitar resposta em cache (padrão: não)
+
+        Returns:
+            Seção regenerada em Markdown
+        """
+        prompt = self._build_regeneration_prompt(section_name, original_story, form_data)
+        started = time.monotonic()
+
+        text = await self._create_text_async(
+            messages=[{"role": "user", "content": prompt}],
+            timeout_message="Tempo esgotado ao regenerar seção. Tente novamente.",
+            error_prefix="Erro ao regenerar seção",
+            operation="regenerate_section",
+            category=section_name,
+            use_cache=use_cache
+        )
+        self._record_regeneration([section_name], original_story, form_data, prompt, started)
+        return text
+
+    async def regenerate_sections_async(
+        self,
+        section_names: List[str],
+        original_story: Dict,
+        form_data: Dict,
+        use_cache: bool = False
+    ) -> Dict[str, str]:
+        """
+        Versão assíncrona de regenerate_sections.
+
+        Args:
+            section_names: Seções a regenerar
+            original_story: História completa original
+            form_data: Dados do formulário original
+            use_cache: Reaproveitar resposta em cache (padrão: não)
+
+        Returns:
+            Dict seção -> seção regenerada em Markdown
+        """
+        section_names = list(dict.fromkeys(section_names))
+        if len(section_names) == 1:
+            section_name = section_names[0]
+            return {section_name: await self.regenerate_section_async(
+                section_name, original_story, form_data, use_cache
+            )}
+
+        prompt = self._build_multi_regeneration_prompt(section_names, original_story, form_data)
+        started = time.monotonic()
+
+        response = await self._create_text_async(
+            messages=[{"role": "user", "content": prompt}],
+            timeout_message="Tempo esgotado ao regenerar seções. Tente novamente.",
+            error_prefix="Erro ao regenerar seções",
+            operation="regenerate_sections",
+            category="+".join(sorted(section_names)),
+            tools=[REGENERATION_TOOL],
+            use_cache=use_cache
+        )
+        regenerated = self._parse_regenerated_sections(response, section_names)
+        self._record_regeneration(section_names, original_story, form_data, prompt, started)
+        return regenerated
+
+    async def validate_invest_with_ai_async(self, story: Dict) -> str:
+        """
+        Versão assíncrona de validate_invest_with_ai.
+
+        Args:
+            story: História completa
+
+        Returns:
+            Resposta JSON da IA com scores e justificativas
+        """
+        from services.invest_service import InvestService
+
+        prompt = InvestService().prepare_for_ai_validation(story)
+
+        return await self._create_text_async(
+            messages=[{"role": "user", "content": prompt}],
+            timeout_message="Tempo esgotado ao validar. Tente novamente.",
+            error_prefix="Erro ao validar história",
+            operation="validate_invest_with_ai"
+        )
+
+    async def analyze_and_suggest_async(self, story: Dict) -> str:
+        """
+        Versão assíncrona de analyze_and_suggest.
+
+        Args:
+            story: História completa
+
+        Returns:
+            Resposta JSON da IA com sugestões
+        """
+        prompt = self._build_suggestion_prompt(story)
+
+        return await self._create_text_async(
+            messages=[{"role": "user", "content": prompt}],
+            timeout_message="Tempo esgotado ao analisar. Tente novamente.",
+            error_prefix="Erro ao analisar história",
+            operation="analyze_and_suggest"
+        )
+
+    async def review_story_async(self, story: Dict) -> Dict[str, Any]:
+        """
+        Versão assíncrona de review_story.
+
+        Args:
+            story: História completa
+
+        Returns:
+            input da ferramenta submit_review (ver REVIEW_TOOL)
+        """
+        from services.invest_service import InvestService, REVIEW_TOOL
+
+        prompt = InvestService().prepare_for_review(story)
+
+        return json.loads(await self._create_text_async(
+            messages=[{"role": "user", "content": prompt}],
+            timeout_message="Tempo esgotado ao revisar. Tente novamente.",
+            error_prefix="Erro ao revisar história",
+            operation="review_story",
+            tools=[REVIEW_TOOL]
+        ))
+
+    async def _create_text_async(
+        self,
+        messages: List[Dict[str, Any]],
+        timeout_message: str,
+        error_prefix: str,
+        system: Optional[List[Dict[str, Any]]] = None,
+        operation: str = "",
+        category: str = "",
+        tools: Optional[List[Dict[str, Any]]] = None,
+        use_cache: bool = True
+    ) -> str:
+        """
+        Envia requisição assíncrona e extrai o texto da resposta.
+        Compartilha com a variante síncrona o cache de respostas, o single-flight,
+        o circuit breaker e o orçamento de tokens.
+
+        Args:
+            messages: Mensagens no formato da Messages API
+            timeout_message: Mensagem exibida em caso de timeout
+            error_prefix: Prefixo da mensagem de erro genérico
+            system: Blocos do prompt de sistema (opcional)
+            operation: Nome da operação (uso de tokens e orçamento)
+            category: Value Area ou seção (orçamento de tokens)
+            tools: Ferramentas (a primeira é de uso obrigatório)
+            use_cache: Consultar e gravar o cache de respostas
+
+        Returns:
+            Texto da resposta (input da ferramenta em JSON, com tools)
+
+        Raises:
+            APITimeoutError, RateLimitError, APIConnectionError, Exception
+        """
+        cache_key = self._cache_key(messages, system, tools)
+
+        try:
+            if self.cache and use_cache:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self._record_usage(operation, None)
+                    self._record_model(operation, self.model)
+                    self._record_cache_metric(operation, "hit")
+                    return cached
+                self._record_cache_metric(operation, "miss")
+
+            if self.single_flight is None:
+                text, _ = await self._request_uncached_async(
+                    messages, system, operation, category, tools, cache_key, use_cache
+                )
+                return text
+
+            # Requisição idêntica em andamento (síncrona ou assíncrona): aguarda a mesma resposta.
+            # O voo executa em thread própria e submete a requisição ao event loop do service.
+            loop = asyncio.get_running_loop()
+            (text, model), coalesced = await asyncio.to_thread(
+                self.single_flight.call,
+                cache_key,
+                lambda: asyncio.run_coroutine_threadsafe(
+                    self._request_uncached_async(messages, system, operation, category, tools, cache_key, use_cache),
+                    loop
+                ).result()
+            )
+            if coalesced:
+                self._record_coalesced(operation, model)
+                self._record_cache_metric(operation, "coalesced")
+            return text
+
+        except APITimeoutError:
+            raise APITimeoutError(timeout_message)
+        except RateLimitError as e:
+            raise RateLimitError(
+                "Limite de requisições atingido. Aguarde alguns minutos.",
+                response=e.response,
+                body=e.body
+            )
+        except APIConnectionError as e:
+            raise APIConnectionError(
+                message="Erro de conexão com a API. Verifique sua internet.",
+                request=e.request
+            )
+        except Exception as e:
+            raise Exception(f"{error_prefix}: {str(e)}")
+
+    async def _request_uncached_async(
+        self,
+        messages: List[Dict[str, Any]],
+        system: Optional[List[Dict[str, Any]]],
+        operation: str,
+        category: str,
+        tools: Optional[List[Dict[str, Any]]],
+        cache_key: str,
+        store: bool = True
+    ) -> Tuple[str, str]:
+        """
+        Versão assíncrona de _request_uncached: usa a rota do circuit breaker
+        (modelo principal ou contingência), registra o modelo usado e grava
+        no cache (se store) apenas respostas completas do modelo principal.
+
+        Returns:
+            Tupla (texto da resposta, modelo que a atendeu)
+
+        Raises:
+            Exception: Se a resposta vier vazia
+        """
+        route = self._route()
+        budget = self._plan_budget(operation, category, messages, system)
+        request = dict(
+            model=route.model,
+            max_tokens=budget.max_tokens,
+            timeout=budget.timeout,
+            messages=messages
+        )
+        if system:
+            request["system"] = system
+        if tools:
+            request.update(self._tool_params(tools))
+
+        current_operation = operation
+        try:
+            started = time.monotonic()
+            response = await self._create_message_async(request, route)
+            self._observe_metrics(operation, route.model, response, time.monotonic() - started)
+            self._observe_budget(operation, category, response, time.monotonic() - started)
+
+            text = self._response_text(response)
+            usage = response.usage
+
+            # Cortada por max_tokens: continua do ponto em que parou
+            rounds = 0
+            current_operation = CONTINUATION_OPERATION
+            while text is not None and self._should_continue(operation, response, rounds):
+                rounds += 1
+                started = time.monotonic()
+                response = await self._create_message_async(self._continuation_request(request, text), route)
+                self._observe_metrics(CONTINUATION_OPERATION, route.model, response, time.monotonic() - started)
+                self._observe_budget(CONTINUATION_OPERATION, category, response, time.monotonic() - started)
+                text = self._join_continuation(text, self._response_text(response) or "")
+                usage = self._merge_usage(usage, response.usage)
+        except Exception as e:
+            self._record_error_metric(current_operation, route.model, e)
+            raise
+        finally:
+            self._release_route(route)
+
+        self._record_usage(operation, usage)
+        self._record_model(operation, route.model)
+
+        if text is not None:
+            # Respostas ainda cortadas por max_tokens (ou do modelo de contingência) não são reaproveitadas
+            if store and self.cache and response.stop_reason != "max_tokens" and route.model == self.model:
+                self.cache.set(cache_key, text)
+            return text, route.model
+
+        raise Exception("Resposta vazia da API")
+
+    async def _create_message_async(self, request: Dict[str, Any], route: Optional[Route] = None) -> Any:
+        """
+        Versão assíncrona de _create_message: aguarda orçamento no agendador
+        compartilhado (sem bloquear o event loop) e reenfileira após 429.
+        A reserva é ajustada ao uso real ou liberada se a tentativa falhar.
+
+        Args:
+            request: Parâmetros da Messages API
+            route: Rota do circuit breaker (recebe latência e falhas)
+
+        Returns:
+            Resposta da API
+
+        Raises:
+            RateLimitError: Se o limite persistir após as retentativas
+        """
+        for attempt in range(self._rate_limit_retries() + 1):
+            reservation = await asyncio.to_thread(self._admit, request)
+            usage = None
+            started = time.monotonic()
+            try:
+                response = await self.backend.create_message_async(**request)
+                usage = response.usage
+            except RateLimitError as e:
+                self._on_rate_limited(e)
+                if attempt >= self._rate_limit_retries():
+                    raise
+                continue
+            except Exception as e:
+                self._report_failure(route, e, started)
+                raise
+            finally:
+                self._settle(reservation, usage)
+
+            self._report_latency(route, started)
+            return response
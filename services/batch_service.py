@@ -0,0 +1,434 @@
+"""
+Service responsável pelo modo offline via Message Batches API.
+Envia gerações, validações INVEST e sugestões como um único lote assíncrono,
+acompanha o processamento e aplica os resultados às histórias da sessão.
+Lotes são cobrados com desconto e não consomem o limite de requisições
+interativas, o que os torna adequados para regenerações noturnas de backlog.
+Segue Single Responsibility Principle.
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+from models.invest_validator import Suggestion
+from models.session_storage import SessionStorage
+from services.ai_service import AIService
+from services.invest_service import InvestService
+from services.local_batch_server import LocalBatchServer
+import config
+
+
+# Prefixo do custom_id por operação (custom_id = "<prefixo>_<story_id>")
+OPERATION_PREFIXES = {
+    "generate_story": "gen",
+    "validate_invest_with_ai": "invest",
+    "analyze_and_suggest": "suggest",
+    "review_story": "review"
+}
+
+
+@dataclass
+class BatchItem:
+    """
+    Requisição individual de um lote.
+
+    Attributes:
+        custom_id: Identificador da requisição no lote
+        operation: Operação do AIService
+        story_id: ID da história (existente ou pré-definido para novas)
+        form_data: Dados do formulário (apenas gerações)
+        params: Parâmetros da Messages API
+    """
+
+    custom_id: str
+    operation: str
+    story_id: str
+    params: Dict[str, Any]
+    form_data: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class BatchJob:
+    """
+    Lote submetido e seu estado de processamento.
+
+    Attributes:
+        batch_id: ID do lote no provedor
+        items: Requisições do lote indexadas por custom_id
+        submitted_at: Data/hora de envio (ISO)
+        status: processing_status do provedor (in_progress, canceling, ended)
+        request_counts: Contadores por estado (succeeded, errored, ...)
+        applied: Se os resultados já foram aplicados às histórias
+    """
+
+    batch_id: str
+    items: Dict[str, BatchItem]
+    submitted_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    status: str = "in_progress"
+    request_counts: Dict[str, int] = field(default_factory=dict)
+    applied: bool = False
+
+    @property
+    def ended(self) -> bool:
+        """Indica se o provedor terminou de processar o lote."""
+        return self.status == "ended"
+
+
+@dataclass
+class BatchItemResult:
+    """
+    Resultado de uma requisição do lote.
+
+    Attributes:
+        item: Requisição de origem
+        text: Texto da resposta (None em caso de falha)
+        error: Descrição do erro (None se sucesso)
+    """
+
+    item: BatchItem
+    text: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchService:
+    """
+    Orquestra lotes da Message Batches API.
+    Os prompts são montados pelo AIService (os mesmos do modo interativo),
+    então as respostas também alimentam o cache de respostas.
+    """
+
+    def __init__(self, ai_service: AIService, story_controller, batches_client: Any = None):
+        """
+        Inicializa o service.
+
+        Args:
+            ai_service: Service de IA (monta prompts e guarda respostas no cache)
+            story_controller: StoryController (monta Story das novas gerações)
+            batches_client: Cliente com interface de client.messages.batches.
+                Se None, usa config.BATCH_BACKEND ("anthropic" ou "local");
+                backends sem Batches API usam sempre o servidor local.
+        """
+        self.ai_service = ai_service
+        self.story_controller = story_controller
+        self.batches = batches_client or self._default_client()
+
+    def _default_client(self) -> Any:
+        """Seleciona cliente de lotes conforme configuração."""
+        batches = getattr(self.ai_service.backend, "batches", None)
+        if config.BATCH_BACKEND == "local" or batches is None:
+            return LocalBatchServer(responder=self._respond_synchronously)
+        return batches
+
+    def _respond_synchronously(self, params: Dict[str, Any]) -> str:
+        """Responder do servidor local: executa a requisição no backend de LLM."""
+        response = self.ai_service.backend.create_message(timeout=self.ai_service.timeout, **params)
+        return AIService._response_text(response) or ""
+
+    def build_generation_items(self, records: List[Dict[str, Any]]) -> List[BatchItem]:
+        """
+        Cria requisições de geração para novas histórias.
+
+        Args:
+            records: Lista de form_data
+
+        Returns:
+            Lista de BatchItem com IDs de história pré-definidos
+        """
+        items = []
+        for form_data in records:
+            story_id = str(uuid4())
+            items.append(self._make_item(
+                "generate_story",
+                story_id,
+                self.ai_service.build_request_params("generate_story", form_data=form_data),
+                form_data=form_data
+            ))
+        return items
+
+    def build_story_items(self, stories: List[Dict], operations: List[str]) -> List[BatchItem]:
+        """
+        Cria requisições para histórias já salvas no SessionStorage.
+        Para "generate_story", a história é regenerada a partir do formulário
+        original guardado com ela; histórias sem o formulário completo ficam
+        de fora da regeneração (ver skipped_regenerations).
+
+        Args:
+            stories: Histórias (dicts do SessionStorage)
+            operations: Operações a executar em cada história
+
+        Returns:
+            Lista de BatchItem
+        """
+        items = []
+        for story in stories:
+            for operation in operations:
+                if operation == "generate_story":
+                    form_data, _ = self.story_controller.restore_form_data(story)
+                    # Sem o formulário o prompt iria sem os dados da história
+                    if form_data is None:
+                        continue
+                    params = self.ai_service.build_request_params(operation, form_data=form_data)
+                    items.append(self._make_item(operation, story["id"], params, form_data=form_data))
+                else:
+                    params = self.ai_service.build_request_params(operation, story=story)
+                    items.append(self._make_item(operation, story["id"], params))
+        return items
+
+    def skipped_regenerations(self, stories: List[Dict]) -> List[Tuple[Dict, str]]:
+        """
+        Histórias que não podem ser regeneradas em lote e o motivo.
+
+        Args:
+            stories: Histórias (dicts do SessionStorage)
+
+        Returns:
+            Lista de tuplas (história, motivo)
+        """
+        skipped = []
+        for story in stories:
+            form_data, reason = self.story_controller.restore_form_data(story)
+            if form_data is None:
+                skipped.append((story, reason))
+        return skipped
+
+    def _make_item(
+        self,
+        operation: str,
+        story_id: str,
+        params: Dict[str, Any],
+        form_data: Optional[Dict[str, Any]] = None
+    ) -> BatchItem:
+        """Cria BatchItem com custom_id derivado da operação e da história."""
+        custom_id = f"{OPERATION_PREFIXES[operation]}_{story_id}"
+        return BatchItem(
+            custom_id=custom_id,
+            operation=operation,
+            story_id=story_id,
+            params=params,
+            form_data=form_data
+        )
+
+    def submit(self, items: List[BatchItem]) -> BatchJob:
+        """
+        Envia as requisições como um único lote.
+
+        Args:
+            items: Requisições do lote
+
+        Returns:
+            BatchJob para acompanhamento
+
+        Raises:
+            ValueError: Se a lista estiver vazia ou houver custom_id duplicado
+        """
+        if not items:
+            raise ValueError("Nenhuma requisição para enviar")
+
+        indexed = {item.custom_id: item for item in items}
+        if len(indexed) != len(items):
+            raise ValueError("Requisições duplicadas no lote")
+
+        batch = self.batches.create(requests=[
+            {"custom_id": item.custom_id, "params": item.params}
+            for item in items
+        ])
+
+        job = BatchJob(batch_id=batch.id, items=indexed)
+        self._update_job(job, batch)
+        return job
+
+    def refresh(self, job: BatchJob) -> BatchJob:
+        """
+        Atualiza o estado do lote consultando o provedor.
+
+        Args:
+            job: Lote submetido
+
+        Returns:
+            O próprio job atualizado
+        """
+        self._update_job(job, self.batches.retrieve(job.batch_id))
+        return job
+
+    def _update_job(self, job: BatchJob, batch: Any) -> None:
+        """Copia status e contadores do MessageBatch para o job."""
+        job.status = batch.processing_status
+        counts = batch.request_counts
+        job.request_counts = {
+            name: getattr(counts, name, 0) or 0
+            for name in ("processing", "succeeded", "errored", "canceled", "expired")
+        }
+
+    def wait(
+        self,
+        job: BatchJob,
+        poll_interval: float = config.BATCH_POLL_INTERVAL_SECONDS,
+        timeout: Optional[float] = None,
+        on_status: Optional[Callable[[BatchJob], None]] = None
+    ) -> BatchJob:
+        """
+        Aguarda o término do lote consultando o provedor periodicamente.
+
+        Args:
+            job: Lote submetido
+            poll_interval: Intervalo entre consultas (segundos)
+            timeout: Tempo máximo de espera (None = sem limite)
+            on_status: Callback chamado a cada consulta
+
+        Returns:
+            Job atualizado (pode não ter terminado se o timeout expirar)
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        while True:
+            self.refresh(job)
+            if on_status:
+                on_status(job)
+            if job.ended:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(poll_interval)
+
+    def collect(self, job: BatchJob) -> List[BatchItemResult]:
+        """
+        Coleta os resultados de um lote encerrado.
+        Respostas bem-sucedidas são gravadas no cache de respostas.
+
+        Args:
+            job: Lote encerrado
+
+        Returns:
+            Lista de BatchItemResult
+
+        Raises:
+            ValueError: Se o lote ainda não terminou
+        """
+        if not job.ended:
+            raise ValueError("Lote ainda em processamento")
+
+        results = []
+        for entry in self.batches.results(job.batch_id):
+            item = job.items.get(entry.custom_id)
+            if item is None:
+                continue
+
+            result = entry.result
+            if result.type == "succeeded":
+                text = AIService._response_text(result.message) or ""
+                if getattr(result.message, "stop_reason", None) != "max_tokens":
+                    self.ai_service.cache_response(item.params, text)
+                results.append(BatchItemResult(item=item, text=text))
+            elif result.type == "errored":
+                error = getattr(result.error, "error", result.error)
+                message = getattr(error, "message", None) or str(error)
+                results.append(BatchItemResult(item=item, error=message))
+            else:
+                results.append(BatchItemResult(item=item, error=result.type))
+
+        return results
+
+    def apply_results(self, job: BatchJob, results: List[BatchItemResult]) -> Dict[str, int]:
+        """
+        Aplica os resultados às histórias do SessionStorage.
+        Deve ser chamado na thread do script Streamlit.
+
+        - generate_story: cria a história nova ou substitui o texto da existente
+          (apenas requisições montadas a partir do formulário original)
+        - validate_invest_with_ai: salva invest_score (dict) na história
+        - analyze_and_suggest: salva suggestions (lista de dicts) na história
+        - review_story: salva invest_score e suggestions
+
+        Args:
+            job: Lote de origem
+            results: Resultados coletados
+
+        Returns:
+            Dict com contadores created, updated, failed, missing e skipped
+        """
+        summary = {"created": 0, "updated": 0, "failed": 0, "missing": 0, "skipped": 0}
+
+        # Gerações primeiro: validações do mesmo lote podem referenciar histórias novas
+        ordered = sorted(results, key=lambda r: r.item.operation != "generate_story")
+
+        for result in ordered:
+            item = result.item
+
+            if result.text is None:
+                summary["failed"] += 1
+                continue
+
+            story = SessionStorage.get_story_by_id(item.story_id)
+
+            if item.operation == "generate_story" and item.form_data is None:
+                # Prompt montado sem os dados do formulário: não substitui a história
+                summary["skipped"] += 1
+                continue
+
+            modelo_ia = item.params.get("model", self.ai_service.model)
+
+            if item.operation == "generate_story" and story is None:
+                new_story = self.story_controller.build_story(
+                    item.form_data, result.text, story_id=item.story_id,
+                    modelo_ia=modelo_ia
+                )
+                SessionStorage.add_story(new_story.to_dict())
+                summary["created"] += 1
+                continue
+
+            if story is None:
+                summary["missing"] += 1
+                continue
+
+            updated = dict(story)
+            try:
+                if item.operation == "generate_story":
+                    regenerated = self.story_controller.build_story(
+                        item.form_data, result.text, story_id=item.story_id, modelo_ia=modelo_ia
+                    )
+                    updated["historia_gerada"] = regenerated.historia_gerada
+                    updated["modelo_ia"] = regenerated.modelo_ia
+                    updated["form_data"] = regenerated.form_data
+                elif item.operation == "validate_invest_with_ai":
+                    score = InvestService().parse_ai_validation_response(result.text)
+                    updated["invest_score"] = score.to_dict()
+                elif item.operation == "analyze_and_suggest":
+                    updated["suggestions"] = [
+                        Suggestion(
+                            type=s['type'],
+                            severity=s['severity'],
+                            problem=s['problem'],
+                            suggestion=s['suggestion'],
+                            applicable=s.get('applicable', False)
+                        ).to_dict()
+                        for s in json.loads(result.text)
+                    ]
+                elif item.operation == "review_story":
+                    score, suggestions = InvestService().parse_review_result(json.loads(result.text))
+                    updated["invest_score"] = score.to_dict()
+                    updated["suggestions"] = [suggestion.to_dict() for suggestion in suggestions]
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                summary["failed"] += 1
+                continue
+
+            SessionStorage.update_story(item.story_id, updated)
+            summary["updated"] += 1
+
+        job.applied = True
+        return summary
+
+    def cancel(self, job: BatchJob) -> BatchJob:
+        """
+        Cancela as requisições ainda não processadas do lote.
+
+        Args:
+            job: Lote submetido
+
+        Returns:
+            Job atualizado
+        """
+        self._update_job(job, self.batches.cancel(job.batch_id))
+        return job
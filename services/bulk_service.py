@@ -0,0 +1,301 @@
+"""
+Service responsável pela geração de histórias em lote.
+Lê backlogs em CSV/JSONL e gera as histórias em um pool limitado de workers.
+Segue Single Responsibility Principle.
+"""
+
+import csv
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from models.story import Story
+from models.session_storage import SessionStorage
+import config
+
+
+# Value Areas aceitas no arquivo de backlog
+VALUE_AREAS = ["Business", "Spike", "Kaizen", "Fix/Bug/Incidente"]
+
+# Campos de lista do form_data (no CSV, itens separados por "|" ou quebra de linha)
+LIST_FIELDS = [
+    "regras_negocio",
+    "apis_servicos",
+    "criterios_aceitacao",
+    "spike_alternativas",
+    "spike_criterios_sucesso",
+    "kaizen_metricas",
+    "fix_passos_reproduzir"
+]
+
+# Colunas do CSV que compõem objetivos e api_specs
+OBJETIVO_FIELDS = ["como", "quero", "para_que"]
+API_SPEC_FIELDS = ["metodo", "endpoint", "query_params", "path_param", "body", "formato_resposta"]
+
+
+@dataclass
+class BulkRowResult:
+    """
+    Resultado da geração de uma linha do backlog.
+
+    Attributes:
+        row: Número da linha no arquivo (1 = primeiro registro)
+        titulo: Título da história
+        story: Story gerada (None em caso de falha)
+        error_type: Tipo do erro retornado pelo StoryController (None se sucesso)
+        attempts: Quantidade de tentativas realizadas
+    """
+
+    row: int
+    titulo: str
+    story: Optional[Story] = None
+    error_type: Optional[str] = None
+    attempts: int = 0
+
+    @property
+    def success(self) -> bool:
+        """Indica se a história foi gerada."""
+        return self.story is not None
+
+
+class BulkGenerationService:
+    """
+    Orquestra a geração em lote usando StoryController.create_story.
+    Cada linha é isolada: falhas não interrompem as demais e erros
+    transitórios (timeout, rate limit, conexão) são tentados novamente.
+    """
+
+    RETRYABLE_ERRORS = ("timeout", "rate_limit", "connection")
+
+    def __init__(
+        self,
+        story_controller,
+        max_workers: int = config.BULK_MAX_WORKERS,
+        max_retries: int = config.BULK_MAX_RETRIES,
+        retry_backoff: float = config.BULK_RETRY_BACKOFF_SECONDS
+    ):
+        """
+        Inicializa o service.
+
+        Args:
+            story_controller: StoryController usado para gerar cada história
+            max_workers: Máximo de gerações simultâneas
+            max_retries: Tentativas extras para erros transitórios
+            retry_backoff: Espera base (segundos) entre tentativas, dobrada a cada falha
+        """
+        self.story_controller = story_controller
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+    def parse_file(self, filename: str, content: bytes) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Lê arquivo CSV ou JSONL e converte cada registro em form_data.
+
+        Args:
+            filename: Nome do arquivo (extensão define o formato)
+            content: Conteúdo bruto do arquivo
+
+        Returns:
+            Tupla (records, errors) onde:
+            - records: Lista de form_data válidos
+            - errors: Mensagens de erro por linha inválida
+        """
+        try:
+            text = content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            return [], ["Arquivo deve estar codificado em UTF-8"]
+
+        if filename.lower().endswith(".jsonl"):
+            raw_records, errors = self._read_jsonl(text)
+        else:
+            raw_records, errors = self._read_csv(text)
+
+        records = []
+        for line_number, raw in raw_records:
+            form_data, error = self.normalize_record(raw)
+            if error:
+                errors.append(f"Linha {line_number}: {error}")
+            else:
+                records.append(form_data)
+
+        return records, errors
+
+    def _read_jsonl(self, text: str) -> Tuple[List[Tuple[int, Dict]], List[str]]:
+        """Lê registros JSONL (um objeto form_data por linha)."""
+        records, errors = [], []
+
+        for line_number, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                errors.append(f"Linha {line_number}: JSON inválido ({e.msg})")
+                continue
+            if not isinstance(data, dict):
+                errors.append(f"Linha {line_number}: registro deve ser um objeto JSON")
+                continue
+            records.append((line_number, data))
+
+        return records, errors
+
+    def _read_csv(self, text: str) -> Tuple[List[Tuple[int, Dict]], List[str]]:
+        """Lê registros CSV com cabeçalho (colunas = campos do form_data)."""
+        reader = csv.DictReader(io.StringIO(text))
+        # Linha 1 é o cabeçalho
+        return [(line_number, row) for line_number, row in enumerate(reader, 2)], []
+
+    def normalize_record(self, raw: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Converte registro bruto no formato de form_data dos formulários.
+
+        Args:
+            raw: Registro lido do arquivo
+
+        Returns:
+            Tupla (form_data, error) onde error é None se o registro for válido
+        """
+        record = {k.strip(): v for k, v in raw.items() if k and v not in (None, "")}
+
+        value_area = str(record.get("value_area", "Business")).strip()
+        if value_area not in VALUE_AREAS:
+            return None, f"value_area inválida: {value_area}"
+
+        titulo = str(record.get("titulo", "")).strip()
+        if not titulo:
+            return None, "titulo é obrigatório"
+
+        form_data = {k: v.strip() if isinstance(v, str) else v for k, v in record.items()}
+        form_data["value_area"] = value_area
+        form_data["titulo"] = titulo
+
+        for field in LIST_FIELDS:
+            if field in form_data:
+                form_data[field] = self._to_list(form_data[field])
+
+        # Objetivos: objeto JSON ou colunas como/quero/para_que
+        objetivos = form_data.get("objetivos")
+        if isinstance(objetivos, str):
+            try:
+                objetivos = json.loads(objetivos)
+            except json.JSONDecodeError:
+                objetivos = {}
+        if not isinstance(objetivos, dict):
+            objetivos = {}
+        for field in OBJETIVO_FIELDS:
+            value = form_data.pop(field, None)
+            if value:
+                objetivos[field] = value
+        form_data["objetivos"] = objetivos
+
+        # Especificações de API: objeto JSON ou colunas api_<campo>
+        api_specs = form_data.get("api_specs")
+        if isinstance(api_specs, str):
+            try:
+                api_specs = json.loads(api_specs)
+            except json.JSONDecodeError:
+                api_specs = None
+        api_specs = api_specs if isinstance(api_specs, dict) else {}
+        for field in API_SPEC_FIELDS:
+            value = form_data.pop(f"api_{field}", None)
+            if value:
+                api_specs[field] = value
+        if api_specs:
+            form_data["api_specs"] = api_specs
+            form_data["is_api"] = True
+        else:
+            form_data.pop("api_specs", None)
+
+        for field in ("complexidade", "spike_timebox"):
+            if field in form_data:
+                try:
+                    form_data[field] = int(form_data[field])
+                except (TypeError, ValueError):
+                    return None, f"{field} deve ser um número inteiro"
+
+        form_data.setdefault("complexidade", 5)
+
+        return form_data, None
+
+    def _to_list(self, value: Any) -> List[str]:
+        """Converte célula em lista de itens não vazios."""
+        if isinstance(value, list):
+            return [str(item).strip() for item in value if str(item).strip()]
+
+        text = str(value)
+        separator = "|" if "|" in text else "\n"
+        return [item.strip() for item in text.split(separator) if item.strip()]
+
+    def run(
+        self,
+        records: List[Dict[str, Any]],
+        on_progress: Optional[Callable[[BulkRowResult, int, int], None]] = None
+    ) -> List[BulkRowResult]:
+        """
+        Gera as histórias em paralelo e salva as bem-sucedidas no SessionStorage.
+        Deve ser chamado na thread do script Streamlit: workers apenas geram,
+        persistência e callbacks de progresso acontecem na thread chamadora.
+
+        Args:
+            records: Lista de form_data
+            on_progress: Callback (resultado, concluídas, total) chamado por linha
+
+        Returns:
+            Resultados na ordem original das linhas
+        """
+        total = len(records)
+        results: List[Optional[BulkRowResult]] = [None] * total
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bulk") as executor:
+            futures = {
+                executor.submit(self._generate_row, index + 1, form_data): index
+                for index, form_data in enumerate(records)
+            }
+
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                results[futures[future]] = result
+
+                if result.success:
+                    SessionStorage.add_story(result.story.to_dict())
+
+                if on_progress:
+                    on_progress(result, done, total)
+
+        return results
+
+    def _generate_row(self, row: int, form_data: Dict[str, Any]) -> BulkRowResult:
+        """
+        Gera uma história com retentativas para erros transitórios.
+
+        Args:
+            row: Número da linha
+            form_data: Dados do formulário
+
+        Returns:
+            BulkRowResult da linha
+        """
+        result = BulkRowResult(row=row, titulo=form_data.get("titulo", ""))
+
+        for attempt in range(self.max_retries + 1):
+            result.attempts = attempt + 1
+
+            try:
+                story, error_type = self.story_controller.create_story(form_data, persist=False)
+            except Exception as e:
+                story, error_type = None, f"generic:{type(e).__name__}: {str(e)}"
+
+            if story is not None:
+                result.story, result.error_type = story, None
+                return result
+
+            result.error_type = error_type
+            if error_type not in self.RETRYABLE_ERRORS or attempt == self.max_retries:
+                break
+
+            time.sleep(self.retry_backoff * (2 ** attempt))
+
+        return result
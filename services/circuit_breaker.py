@@ -0,0 +1,303 @@
+"""
+Circuit breaker por modelo com SLO de latência.
+Acompanha, em janela deslizante, latência e taxa de erros de cada modelo.
+Quando o modelo principal ultrapassa os limites, o circuito abre e as
+requisições passam para o modelo de contingência; após o tempo de espera,
+algumas requisições de teste (meio-aberto) decidem se o principal volta.
+Segue Single Responsibility Principle.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+import config
+
+
+# Estados do circuito
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class Route:
+    """
+    Modelo escolhido para uma requisição.
+
+    Attributes:
+        model: Modelo a usar
+        probe: Se é requisição de teste do circuito meio-aberto
+    """
+
+    def __init__(self, model: str, probe: bool = False):
+        """
+        Inicializa a rota.
+
+        Args:
+            model: Modelo a usar
+            probe: Se é requisição de teste do circuito meio-aberto
+        """
+        self.model = model
+        self.probe = probe
+        self.settled = False
+
+
+class ModelHealth:
+    """
+    Janela deslizante das últimas requisições de um modelo.
+    Cada amostra guarda latência, falha e se excedeu o SLO.
+    """
+
+    def __init__(self, window_size: int):
+        """
+        Inicializa a janela vazia.
+
+        Args:
+            window_size: Requisições mantidas na janela
+        """
+        self._samples: deque = deque(maxlen=window_size)
+
+    def add(self, latency: float, failed: bool, slow: bool) -> None:
+        """Registra uma requisição."""
+        self._samples.append((latency, failed, slow))
+
+    def clear(self) -> None:
+        """Descarta as amostras (circuito fechado novamente)."""
+        self._samples.clear()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    @property
+    def error_rate(self) -> float:
+        """Fração de requisições com falha."""
+        return sum(1 for _, failed, _ in self._samples if failed) / len(self._samples) if self._samples else 0.0
+
+    @property
+    def slow_rate(self) -> float:
+        """Fração de requisições acima do SLO de latência."""
+        return sum(1 for _, _, slow in self._samples if slow) / len(self._samples) if self._samples else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """Percentil da latência das requisições bem-sucedidas."""
+        latencies = sorted(latency for latency, failed, _ in self._samples if not failed)
+        if not latencies:
+            return 0.0
+        return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)]
+
+
+class CircuitBreaker:
+    """
+    Roteia requisições entre o modelo principal e o de contingência.
+
+    - Fechado: tudo vai para o principal
+    - Aberto: tudo vai para a contingência até expirar o tempo de espera
+    - Meio-aberto: até half_open_probes requisições de teste vão para o
+      principal; se todas ficarem dentro do SLO o circuito fecha, senão reabre
+    """
+
+    def __init__(
+        self,
+        primary_model: str,
+        fallback_model: str,
+        window_size: int = 20,
+        min_samples: int = 5,
+        error_rate_threshold: float = 0.5,
+        slow_rate_threshold: float = 0.5,
+        first_token_slo_seconds: float = 10.0,
+        latency_slo_seconds: float = 60.0,
+        open_seconds: float = 60.0,
+        half_open_probes: int = 2
+    ):
+        """
+        Inicializa o circuito fechado.
+
+        Args:
+            primary_model: Modelo principal
+            fallback_model: Modelo de contingência (mais rápido)
+            window_size: Requisições na janela de cada modelo
+            min_samples: Amostras mínimas antes de avaliar os limites
+            error_rate_threshold: Taxa de erros que abre o circuito
+            slow_rate_threshold: Taxa de requisições acima do SLO que abre o circuito
+            first_token_slo_seconds: SLO até o primeiro trecho (streaming)
+            latency_slo_seconds: SLO da resposta completa
+            open_seconds: Tempo aberto antes das requisições de teste
+            half_open_probes: Requisições de teste bem-sucedidas para fechar
+        """
+        self.primary_model = primary_model
+        self.fallback_model = fallback_model
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_rate_threshold = slow_rate_threshold
+        self.first_token_slo_seconds = first_token_slo_seconds
+        self.latency_slo_seconds = latency_slo_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._health: Dict[str, ModelHealth] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "opened": 0,
+            "closed": 0,
+            "fallback_requests": 0,
+            "probes": 0
+        }
+
+    def route(self) -> Route:
+        """
+        Escolhe o modelo da próxima requisição.
+
+        Returns:
+            Route com o modelo (e se é requisição de teste)
+        """
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._probes_in_flight = 0
+                self._probe_successes = 0
+
+            if self.state == CLOSED:
+                return Route(self.primary_model)
+
+            if self.state == HALF_OPEN and self._probes_in_flight + self._probe_successes < self.half_open_probes:
+                self._probes_in_flight += 1
+                self._stats["probes"] += 1
+                return Route(self.primary_model, probe=True)
+
+            self._stats["fallback_requests"] += 1
+            return Route(self.fallback_model)
+
+    def record(self, route: Route, latency: float, failed: bool = False, first_token: bool = False) -> None:
+        """
+        Registra o resultado de uma requisição (uma vez por rota).
+
+        Args:
+            route: Rota usada na requisição
+            latency: Segundos até o primeiro trecho ou até a resposta completa
+            failed: Se a requisição falhou por timeout, conexão ou erro 5xx
+            first_token: Se latency é até o primeiro trecho (streaming)
+        """
+        slo = self.first_token_slo_seconds if first_token else self.latency_slo_seconds
+        slow = not failed and latency > slo
+
+        with self._lock:
+            if route.settled:
+                return
+            route.settled = True
+
+            health = self._health.setdefault(route.model, ModelHealth(self.window_size))
+            health.add(latency, failed, slow)
+
+            if route.model != self.primary_model:
+                return
+
+            if route.probe:
+                self._probes_in_flight -= 1
+                if self.state != HALF_OPEN:
+                    return
+                if failed or slow:
+                    self._open()
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_probes:
+                        self._close()
+                return
+
+            if self.state == CLOSED and len(health) >= self.min_samples and (
+                health.error_rate >= self.error_rate_threshold
+                or health.slow_rate >= self.slow_rate_threshold
+            ):
+                self._open()
+
+    def release(self, route: Route) -> None:
+        """
+        Encerra uma rota sem resultado (cancelada, 429 ou erro do cliente).
+
+        Args:
+            route: Rota usada na requisição
+        """
+        with self._lock:
+            if route.settled:
+                return
+            route.settled = True
+            if route.probe:
+                self._probes_in_flight -= 1
+
+    def _open(self) -> None:
+        """Abre o circuito (chamado com o lock)."""
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._stats["opened"] += 1
+
+    def _close(self) -> None:
+        """Fecha o circuito e descarta o histórico ruim (chamado com o lock)."""
+        self.state = CLOSED
+        self._health.setdefault(self.primary_model, ModelHealth(self.window_size)).clear()
+        self._stats["closed"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estado do circuito e saúde de cada modelo.
+
+        Returns:
+            Dict com estado, aberturas, requisições desviadas e, por modelo,
+            amostras, taxas de erro/lentidão e latências p50/p95
+        """
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["state"] = self.state
+            stats["primary_model"] = self.primary_model
+            stats["fallback_model"] = self.fallback_model
+            stats["models"] = {
+                model: {
+                    "samples": len(health),
+                    "error_rate": round(health.error_rate, 3),
+                    "slow_rate": round(health.slow_rate, 3),
+                    "p50_seconds": round(health.percentile(0.5), 2),
+                    "p95_seconds": round(health.percentile(0.95), 2)
+                }
+                for model, health in self._health.items()
+            }
+
+        return stats
+
+
+_breaker_instance: Optional[CircuitBreaker] = None
+_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> Optional[CircuitBreaker]:
+    """
+    Retorna o circuit breaker compartilhado do processo (criado sob demanda).
+
+    Returns:
+        CircuitBreaker configurado ou None se desabilitado ou sem modelo de contingência
+    """
+    global _breaker_instance
+
+    if not config.CIRCUIT_BREAKER_ENABLED or not config.CLAUDE_FALLBACK_MODEL:
+        return None
+    if config.CLAUDE_FALLBACK_MODEL == config.CLAUDE_MODEL:
+        return None
+
+    with _breaker_lock:
+        if _breaker_instance is None:
+            _breaker_instance = CircuitBreaker(
+                primary_model=config.CLAUDE_MODEL,
+                fallback_model=config.CLAUDE_FALLBACK_MODEL,
+                window_size=config.CIRCUIT_WINDOW_SIZE,
+                min_samples=config.CIRCUIT_MIN_SAMPLES,
+                error_rate_threshold=config.CIRCUIT_ERROR_RATE_THRESHOLD,
+                slow_rate_threshold=config.CIRCUIT_SLOW_RATE_THRESHOLD,
+                first_token_slo_seconds=config.CIRCUIT_FIRST_TOKEN_SLO_SECONDS,
+                latency_slo_seconds=config.CIRCUIT_LATENCY_SLO_SECONDS,
+                open_seconds=config.CIRCUIT_OPEN_SECONDS,
+                half_open_probes=config.CIRCUIT_HALF_OPEN_PROBES
+            )
+
+    return _breaker_instance
@@ -0,0 +1,300 @@
+"""
+Gerenciador de clientes Anthropic compartilhados pelo processo.
+Mantém conexões HTTP persistentes (keep-alive) entre sessões e reruns
+do Streamlit, evitando novo handshake TLS a cada interação.
+Segue Single Responsibility Principle.
+"""
+
+import asyncio
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from anthropic import (
+    DEFAULT_CONNECTION_LIMITS,
+    Anthropic,
+    AsyncAnthropic,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient
+)
+import config
+
+
+# Limites de pool do cliente HTTP do próprio SDK (sem dependência direta do httpx)
+HttpLimits = type(DEFAULT_CONNECTION_LIMITS)
+
+
+# Event loop dedicado do processo (o Streamlit executa o script em threads síncronas)
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Retorna event loop persistente executando em thread daemon.
+    Um único loop por processo permite reaproveitar o cliente assíncrono
+    entre reruns sem vincular conexões a loops já encerrados.
+
+    Returns:
+        Event loop em execução
+    """
+    global _loop
+
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=_loop.run_forever,
+                name="ai-service-loop",
+                daemon=True
+            )
+            thread.start()
+
+    return _loop
+
+
+@dataclass(frozen=True)
+class ClientSettings:
+    """
+    Configurações que identificam um pool de conexões.
+
+    Attributes:
+        timeout: Timeout padrão das requisições (segundos)
+        max_retries: Retentativas automáticas do SDK
+        max_connections: Máximo de conexões abertas no pool
+        max_keepalive_connections: Máximo de conexões ociosas mantidas
+        keepalive_expiry: Tempo (segundos) que uma conexão ociosa é mantida
+    """
+
+    timeout: float = config.CLAUDE_TIMEOUT
+    max_retries: int = config.CLAUDE_MAX_RETRIES
+    max_connections: int = config.HTTP_MAX_CONNECTIONS
+    max_keepalive_connections: int = config.HTTP_MAX_KEEPALIVE_CONNECTIONS
+    keepalive_expiry: float = config.HTTP_KEEPALIVE_EXPIRY
+
+    def limits(self) -> Any:
+        """Converte as configurações em limites do pool HTTP do SDK."""
+        return HttpLimits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+
+class ClientManager:
+    """
+    Mantém um cliente síncrono e um assíncrono por (API key, configurações).
+    Clientes assíncronos ficam vinculados ao event loop do processo.
+    """
+
+    def __init__(self):
+        """Inicializa registros de clientes e contadores."""
+        self._clients: Dict[Tuple[str, ClientSettings], Anthropic] = {}
+        self._async_clients: Dict[Tuple[str, ClientSettings], AsyncAnthropic] = {}
+        self._http_clients: Dict[Tuple[str, str, ClientSettings], Any] = {}
+        self._warmed: set = set()
+        self._lock = threading.Lock()
+        self._stats = {
+            "clients_created": 0,
+            "clients_reused": 0,
+            "requests_sent": 0,
+            "warm_ups": 0,
+            "warm_up_failures": 0
+        }
+
+    @staticmethod
+    def _key(api_key: str, settings: ClientSettings) -> Tuple[str, ClientSettings]:
+        """Chave do registro (a API key nunca é guardada em texto puro)."""
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16], settings
+
+    def _count_request(self, request: Any) -> None:
+        """Event hook do httpx: conta requisições enviadas pelos pools."""
+        with self._lock:
+            self._stats["requests_sent"] += 1
+
+    async def _count_request_async(self, request: Any) -> None:
+        """Event hook assíncrono do httpx."""
+        self._count_request(request)
+
+    def get_client(self, api_key: str, settings: Optional[ClientSettings] = None) -> Anthropic:
+        """
+        Retorna cliente síncrono compartilhado (criado na primeira chamada).
+
+        Args:
+            api_key: Chave de API da Anthropic
+            settings: Configurações do pool (padrão: config)
+
+        Returns:
+            Cliente Anthropic com pool de conexões persistente
+        """
+        settings = settings or ClientSettings()
+        key = self._key(api_key, settings)
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._stats["clients_reused"] += 1
+                return client
+
+            http_client = DefaultHttpxClient(
+                limits=settings.limits(),
+                event_hooks={"request": [self._count_request]}
+            )
+            client = Anthropic(
+                api_key=api_key,
+                timeout=settings.timeout,
+                max_retries=settings.max_retries,
+                http_client=http_client
+            )
+            self._clients[key] = client
+            self._http_clients[("sync",) + key] = http_client
+            self._stats["clients_created"] += 1
+            return client
+
+    def get_async_client(self, api_key: str, settings: Optional[ClientSettings] = None) -> AsyncAnthropic:
+        """
+        Retorna cliente assíncrono compartilhado.
+        Deve ser usado apenas no event loop retornado por get_event_loop().
+
+        Args:
+            api_key: Chave de API da Anthropic
+            settings: Configurações do pool (padrão: config)
+
+        Returns:
+            Cliente AsyncAnthropic com pool de conexões persistente
+        """
+        settings = settings or ClientSettings()
+        key = self._key(api_key, settings)
+
+        with self._lock:
+            client = self._async_clients.get(key)
+            if client is not None:
+                self._stats["clients_reused"] += 1
+                return client
+
+            http_client = DefaultAsyncHttpxClient(
+                limits=settings.limits(),
+                event_hooks={"request": [self._count_request_async]}
+            )
+            client = AsyncAnthropic(
+                api_key=api_key,
+                timeout=settings.timeout,
+                max_retries=settings.max_retries,
+                http_client=http_client
+            )
+            self._async_clients[key] = client
+            self._http_clients[("async",) + key] = http_client
+            self._stats["clients_created"] += 1
+            return client
+
+    def warm_up(self, api_key: str, settings: Optional[ClientSettings] = None) -> None:
+        """
+        Abre conexões com a API em background (uma vez por chave/configuração),
+        para que a primeira requisição do usuário não pague o handshake TLS.
+
+        Args:
+            api_key: Chave de API da Anthropic
+            settings: Configurações do pool (padrão: config)
+        """
+        settings = settings or ClientSettings()
+        key = self._key(api_key, settings)
+
+        with self._lock:
+            if key in self._warmed:
+                return
+            self._warmed.add(key)
+
+        base_url = str(self.get_client(api_key, settings).base_url)
+        self.get_async_client(api_key, settings)
+
+        with self._lock:
+            http_client = self._http_clients[("sync",) + key]
+            async_http_client = self._http_clients[("async",) + key]
+
+        thread = threading.Thread(
+            target=self._warm_up_sync,
+            args=(http_client, base_url),
+            name="ai-client-warm-up",
+            daemon=True
+        )
+        thread.start()
+
+        asyncio.run_coroutine_threadsafe(
+            self._warm_up_async(async_http_client, base_url),
+            get_event_loop()
+        )
+
+    def _warm_up_sync(self, http_client: Any, base_url: str) -> None:
+        """Requisição leve (HEAD) que estabelece a conexão do pool síncrono."""
+        try:
+            http_client.head(base_url, timeout=5)
+            self._record_warm_up(True)
+        except Exception:
+            self._record_warm_up(False)
+
+    async def _warm_up_async(self, http_client: Any, base_url: str) -> None:
+        """Requisição leve (HEAD) que estabelece a conexão do pool assíncrono."""
+        try:
+            await http_client.head(base_url, timeout=5)
+            self._record_warm_up(True)
+        except Exception:
+            self._record_warm_up(False)
+
+    def _record_warm_up(self, success: bool) -> None:
+        """Atualiza contadores de warm-up."""
+        with self._lock:
+            self._stats["warm_ups" if success else "warm_up_failures"] += 1
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estatísticas dos clientes e das conexões dos pools.
+
+        Returns:
+            Dict com contadores e, por pool, conexões abertas/ociosas
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            pools = [
+                (kind, settings, http_client)
+                for (kind, _, settings), http_client in self._http_clients.items()
+            ]
+
+        stats["pools"] = []
+        for kind, settings, http_client in pools:
+            connections = self._pool_connections(http_client)
+            stats["pools"].append({
+                "type": kind,
+                "max_connections": settings.max_connections,
+                "keepalive_expiry": settings.keepalive_expiry,
+                "open_connections": len(connections),
+                "idle_connections": sum(1 for c in connections if c.is_idle())
+            })
+
+        return stats
+
+    @staticmethod
+    def _pool_connections(http_client: Any) -> list:
+        """Conexões do pool httpcore subjacente (lista vazia se indisponível)."""
+        transport = getattr(http_client, "_transport", None)
+        pool = getattr(transport, "_pool", None)
+        return list(getattr(pool, "connections", []) or [])
+
+
+_manager_instance: Optional[ClientManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_client_manager() -> ClientManager:
+    """
+    Retorna o gerenciador de clientes do processo (criado sob demanda).
+
+    Returns:
+        ClientManager compartilhado
+    """
+    global _manager_instance
+
+    with _manager_lock:
+        if _manager_instance is None:
+            _manager_instance = ClientManager()
+
+    return _manager_instance
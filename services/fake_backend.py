@@ -0,0 +1,514 @@
+"""
+Backend de LLM determinístico executado em processo.
+Responde cada tipo de prompt do AIService (geração de história por Value Area,
+regeneração de seções, validação INVEST, sugestões e revisão via tool use) com
+conteúdo no formato esperado, simulando latência e velocidade de geração de tokens.
+Permite exercitar e fazer testes de carga do pipeline sem rede nem API key.
+Segue Liskov Substitution Principle: substitui o AnthropicBackend no AIService.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from services.rate_limiter import CHARS_PER_TOKEN, RateLimiter
+from services.story_prompts import (
+    BUSINESS_SYSTEM_PROMPT,
+    SPIKE_SYSTEM_PROMPT,
+    KAIZEN_SYSTEM_PROMPT,
+    FIX_SYSTEM_PROMPT
+)
+
+
+# Seções geradas por Value Area (mesma ordem dos prompts de sistema)
+STORY_SECTIONS = {
+    "Business": [
+        "Contexto", "Objetivo", "Regras de Negocio", "Sessão Técnica",
+        "APIs e Servicos Necessarios", "Objetivos Tecnicos", "Criterios de Aceitacao",
+        "Cenarios de Teste Sugeridos", "Complexidade"
+    ],
+    "Spike": [
+        "Contexto", "Pergunta/Hipótese", "Escopo da Investigação", "Sessão Técnica",
+        "Alternativas a Avaliar", "Timebox", "Entregáveis", "Critérios de Sucesso",
+        "Próximos Passos Potenciais"
+    ],
+    "Kaizen": [
+        "Contexto", "Situação Atual (Baseline)", "Meta Desejada", "Sessão Técnica",
+        "Plano de Melhoria", "Métricas de Sucesso", "Impacto Esperado",
+        "Critérios de Aceitação", "Riscos e Mitigações", "Complexidade"
+    ],
+    "Fix/Bug/Incidente": [
+        "Descrição do Problema", "Severidade e Impacto", "Passos para Reproduzir",
+        "Sessão Técnica", "Comportamento Esperado", "Comportamento Atual", "Evidências",
+        "Análise Técnica Sugerida", "Critérios de Aceitação", "Cenarios de Teste Sugeridos",
+        "Complexidade"
+    ]
+}
+
+# Seção -> tag de <input_data> cujos itens são reaproveitados no conteúdo
+SECTION_SOURCES = {
+    "Regras de Negocio": "regras_negocio",
+    "APIs e Servicos Necessarios": "apis_servicos",
+    "Criterios de Aceitacao": "criterios_aceitacao",
+    "Alternativas a Avaliar": "alternativas_investigar",
+    "Critérios de Sucesso": "criterios_sucesso",
+    "Passos para Reproduzir": "passos_reproduzir",
+    "Pergunta/Hipótese": "pergunta_hipotese",
+    "Comportamento Esperado": "comportamento_esperado",
+    "Comportamento Atual": "comportamento_atual",
+    "Descrição do Problema": "descricao_bug"
+}
+
+GENERIC_LINES = [
+    "Garantir que \"{titulo}\" atenda aos requisitos descritos.",
+    "Documentar as decisões técnicas relacionadas a \"{titulo}\".",
+    "Validar o comportamento de \"{titulo}\" em ambiente de homologação.",
+    "Registrar métricas de uso e de erros de \"{titulo}\".",
+    "Revisar dependências e integrações afetadas por \"{titulo}\".",
+    "Cobrir cenários de erro e casos de borda de \"{titulo}\".",
+    "Alinhar com o time os pontos em aberto de \"{titulo}\"."
+]
+
+INVEST_CRITERIA = ["independent", "negotiable", "valuable", "estimable", "small", "testable"]
+
+SUGGESTION_TYPES = ["ambiguidade", "tamanho", "criterio", "clareza"]
+SUGGESTION_SEVERITIES = ["baixa", "media", "alta"]
+
+# Tokens por chunk entregue no streaming
+STREAM_CHUNK_TOKENS = 4
+
+
+class FakeBackend:
+    """
+    Backend local que implementa o protocolo LLMBackend.
+    A resposta é função apenas do prompt e da semente: a mesma
+    requisição sempre produz o mesmo texto.
+    """
+
+    name = "fake"
+    batches = None
+
+    def __init__(
+        self,
+        latency_seconds: float = 0.0,
+        tokens_per_second: float = 0.0,
+        seed: int = 0,
+        model: str = "fake-model"
+    ):
+        """
+        Inicializa o backend.
+
+        Args:
+            latency_seconds: Latência até o primeiro token (segundos)
+            tokens_per_second: Velocidade de geração simulada (0 = instantânea)
+            seed: Semente que, junto ao prompt, define a resposta
+            model: Nome de modelo informado nas respostas
+        """
+        self.latency_seconds = latency_seconds
+        self.tokens_per_second = tokens_per_second
+        self.seed = seed
+        self.model = model
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {}
+
+    # ------------------------------------------------------------
+    # Protocolo LLMBackend
+    # ------------------------------------------------------------
+
+    def create_message(self, **request: Any) -> SimpleNamespace:
+        """
+        Gera a resposta completa aguardando a latência simulada.
+
+        Args:
+            **request: Parâmetros no formato da Messages API
+
+        Returns:
+            Objeto equivalente a Message
+        """
+        message = self._build_message(request)
+        time.sleep(self._duration(message.usage.output_tokens))
+        return message
+
+    def stream_message(self, **request: Any) -> "FakeMessageStream":
+        """
+        Gera a resposta em chunks no ritmo de tokens_per_second.
+
+        Args:
+            **request: Parâmetros no formato da Messages API
+
+        Returns:
+            Context manager equivalente ao MessageStream do SDK
+        """
+        return FakeMessageStream(self, self._build_message(request))
+
+    async def create_message_async(self, **request: Any) -> SimpleNamespace:
+        """
+        Versão assíncrona de create_message (não bloqueia o event loop).
+
+        Args:
+            **request: Parâmetros no formato da Messages API
+
+        Returns:
+            Objeto equivalente a Message
+        """
+        message = self._build_message(request)
+        await asyncio.sleep(self._duration(message.usage.output_tokens))
+        return message
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Retorna requisições atendidas por tipo de prompt.
+
+        Returns:
+            Dict tipo de prompt -> quantidade
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    # ------------------------------------------------------------
+    # Simulação
+    # ------------------------------------------------------------
+
+    def _duration(self, output_tokens: int) -> float:
+        """Tempo total simulado: latência + geração dos tokens de saída."""
+        if self.tokens_per_second <= 0:
+            return self.latency_seconds
+        return self.latency_seconds + output_tokens / self.tokens_per_second
+
+    def _build_message(self, request: Dict[str, Any]) -> SimpleNamespace:
+        """Monta a Message simulada respeitando max_tokens e o prefill do assistente."""
+        messages = request.get("messages", [])
+        system = request.get("system")
+
+        # Última mensagem do assistente = início da resposta (continuação)
+        prefill = ""
+        prompt_messages = messages
+        if messages and messages[-1].get("role") == "assistant":
+            prefill = self._message_text(messages[-1])
+            prompt_messages = messages[:-1]
+
+        prompt = "\n".join(
+            block.get("text", "")
+            for block in RateLimiter._iter_blocks(prompt_messages)
+            if block.get("type") == "text"
+        )
+
+        tool = self._forced_tool(request)
+        if tool == "submit_review":
+            kind, text = "review", self._review_json(prompt, self._rng(prompt, ""))
+        elif tool == "submit_sections":
+            kind, text = "regenerate_sections", self._sections_json(prompt, self._rng(prompt, ""))
+        else:
+            kind, text = self._respond(prompt, self._system_text(system))
+
+        if prefill:
+            kind = f"{kind}_continuation"
+            text = text[len(prefill):] if text.startswith(prefill) else text
+
+        with self._lock:
+            self._stats[kind] = self._stats.get(kind, 0) + 1
+
+        stop_reason = "tool_use" if tool else "end_turn"
+        max_chars = int(request.get("max_tokens", 0) * CHARS_PER_TOKEN)
+        if max_chars and len(text) > max_chars:
+            text = text[:max_chars]
+            stop_reason = "max_tokens"
+
+        if tool and stop_reason == "tool_use":
+            content = [SimpleNamespace(
+                type="tool_use",
+                id=f"toolu_fake_{hashlib.sha256(text.encode('utf-8')).hexdigest()[:24]}",
+                name=tool,
+                input=json.loads(text)
+            )]
+        else:
+            content = [SimpleNamespace(type="text", text=text)]
+
+        return SimpleNamespace(
+            id=f"msg_fake_{hashlib.sha256(text.encode('utf-8')).hexdigest()[:24]}",
+            type="message",
+            role="assistant",
+            model=request.get("model", self.model),
+            content=content,
+            stop_reason=stop_reason,
+            usage=SimpleNamespace(
+                input_tokens=RateLimiter.estimate_tokens(messages, 0, system),
+                output_tokens=max(1, int(len(text) / CHARS_PER_TOKEN)),
+                cache_creation_input_tokens=0,
+                cache_read_input_tokens=0
+            )
+        )
+
+    @staticmethod
+    def _message_text(message: Dict[str, Any]) -> str:
+        """Texto de uma mensagem (string ou lista de blocos)."""
+        content = message.get("content", "")
+        if isinstance(content, str):
+            return content
+        return "".join(block.get("text", "") for block in content if block.get("type") == "text")
+
+    @staticmethod
+    def _system_text(system: Any) -> str:
+        """Texto do prompt de sistema (string ou lista de blocos)."""
+        if not system:
+            return ""
+        if isinstance(system, str):
+            return system
+        return "".join(block.get("text", "") for block in system)
+
+    @staticmethod
+    def _forced_tool(request: Dict[str, Any]) -> Optional[str]:
+        """Nome da ferramenta de uso obrigatório (tool_choice), se houver."""
+        tool_choice = request.get("tool_choice") or {}
+        if request.get("tools") and tool_choice.get("type") == "tool":
+            return tool_choice.get("name")
+        return None
+
+    def _rng(self, prompt: str, system: str) -> random.Random:
+        """Gerador pseudoaleatório derivado da semente e do prompt."""
+        digest = hashlib.sha256(f"{system}\n{prompt}".encode("utf-8")).hexdigest()
+        return random.Random(f"{self.seed}:{digest}")
+
+    def _respond(self, prompt: str, system: str) -> Tuple[str, str]:
+        """
+        Identifica o tipo de prompt e gera a resposta correspondente.
+
+        Returns:
+            Tupla (tipo de prompt, texto da resposta)
+        """
+        rng = self._rng(prompt, system)
+
+        if "segundo critérios INVEST" in prompt:
+            return "invest", self._invest_json(prompt, rng)
+
+        if "sugira melhorias" in prompt:
+            return "suggestions", self._suggestions_json(prompt, rng)
+
+        section = re.search(r'Regenere APENAS a seção "([^"]+)"', prompt)
+        if section:
+            titulo = self._extract_tag(prompt, "form_data").partition("\n")[0]
+            titulo = titulo.replace("Título:", "").strip() or "História"
+            return "regenerate_section", self._section(section.group(1), titulo, {}, rng)
+
+        task = re.search(r'Gere APENAS (?:a seção|as seções) (.+?) da história', prompt)
+        if task:
+            return "story_section", self._story_sections(prompt, task.group(1), rng)
+
+        return "story", self._story(prompt, system, rng)
+
+    @staticmethod
+    def _extract_tag(text: str, tag: str) -> str:
+        """Conteúdo de <tag>...</tag> (string vazia se ausente)."""
+        match = re.search(rf"<{tag}>(.*?)</{tag}>", text, re.DOTALL)
+        return match.group(1).strip() if match else ""
+
+    @staticmethod
+    def _items(content: str) -> List[str]:
+        """Itens de uma lista em Markdown (ou o próprio texto, se não for lista)."""
+        items = [
+            line.strip()[2:].strip()
+            for line in content.splitlines()
+            if line.strip().startswith("- ")
+        ]
+        if items:
+            return [item for item in items if item]
+        return [content.strip()] if content.strip() else []
+
+    @staticmethod
+    def _story_title(story_text: str) -> str:
+        """Título da história (primeira linha "## ...")."""
+        match = re.search(r"^##\s+(.+)$", story_text, re.MULTILINE)
+        return match.group(1).strip() if match else "História"
+
+    def _story(self, prompt: str, system: str, rng: random.Random) -> str:
+        """História completa com as seções do Value Area."""
+        value_area = {
+            SPIKE_SYSTEM_PROMPT.strip(): "Spike",
+            KAIZEN_SYSTEM_PROMPT.strip(): "Kaizen",
+            FIX_SYSTEM_PROMPT.strip(): "Fix/Bug/Incidente",
+            BUSINESS_SYSTEM_PROMPT.strip(): "Business"
+        }.get(system.strip(), "Business")
+
+        input_data = self._extract_tag(prompt, "input_data")
+        titulo = self._extract_tag(input_data, "titulo") or "História sem título"
+        tags = self._input_tags(input_data)
+
+        parts = [f"## {titulo}", "", self._declaration(input_data, titulo)]
+
+        for section in STORY_SECTIONS[value_area]:
+            parts.append("")
+            parts.append(self._section(section, titulo, tags, rng))
+
+        return "\n".join(parts)
+
+    def _story_sections(self, prompt: str, headings: str, rng: random.Random) -> str:
+        """Trecho da geração por seções: declaração (se pedida) e seções indicadas."""
+        input_data = self._extract_tag(prompt, "input_data")
+        titulo = self._extract_tag(input_data, "titulo") or "História sem título"
+        tags = self._input_tags(input_data)
+
+        parts = []
+        if "declaração de objetivo" in self._extract_tag(prompt, "section_task"):
+            parts.append(self._declaration(input_data, titulo))
+        for section in re.findall(r'"### ([^"]+)"', headings):
+            parts.append(self._section(section, titulo, tags, rng))
+
+        return "\n\n".join(parts)
+
+    def _input_tags(self, input_data: str) -> Dict[str, str]:
+        """Tags de <input_data> usadas no conteúdo das seções."""
+        return {
+            tag: self._extract_tag(input_data, tag)
+            for tag in set(SECTION_SOURCES.values()) | {"complexidade"}
+        }
+
+    @staticmethod
+    def _declaration(input_data: str, titulo: str) -> str:
+        """Declaração Como/Quero/Para que a partir de <objetivos>."""
+        def objetivo(label: str, default: str) -> str:
+            match = re.search(rf"^(?:- )?{label}:[ \t]*(.*)$", input_data, re.MULTILINE)
+            return (match.group(1).strip() if match else "") or default
+
+        return (
+            f"**Como** {objetivo('Como', 'usuário do sistema')}, "
+            f"**quero** {objetivo('Quero', titulo.lower())}, "
+            f"**para que** {objetivo('Para que', 'o processo seja mais eficiente')}."
+        )
+
+    def _section(self, section: str, titulo: str, tags: Dict[str, str], rng: random.Random) -> str:
+        """Seção em Markdown: itens do formulário ou linhas genéricas."""
+        if section == "Complexidade":
+            pontos = tags.get("complexidade") or str(rng.choice([3, 5, 8, 13]))
+            return f"### {section}\n\n{pontos} pontos"
+
+        items = self._items(tags.get(SECTION_SOURCES.get(section, ""), ""))
+        if not items:
+            items = [line.format(titulo=titulo) for line in rng.sample(GENERIC_LINES, 3)]
+
+        return f"### {section}\n\n" + "\n".join(f"- {item}" for item in items)
+
+    def _sections_json(self, prompt: str, rng: random.Random) -> str:
+        """Input da ferramenta submit_sections (uma entrada por seção pedida)."""
+        titulo = self._extract_tag(prompt, "form_data").partition("\n")[0]
+        titulo = titulo.replace("Título:", "").strip() or "História"
+
+        sections = []
+        for line in self._extract_tag(prompt, "sections_to_regenerate").splitlines():
+            key, _, label = line.strip().lstrip("- ").partition(":")
+            if key and label:
+                sections.append({
+                    "section": key.strip(),
+                    "content": self._section(label.strip(), titulo, {}, rng)
+                })
+
+        return json.dumps({"sections": sections}, ensure_ascii=False)
+
+    def _invest_json(self, prompt: str, rng: random.Random) -> str:
+        """Avaliação INVEST no formato de prepare_for_ai_validation."""
+        story = self._extract_tag(prompt, "story")
+        titulo = self._story_title(story)
+        sections = re.findall(r"^###\s+(.+)$", story, re.MULTILINE) or ["Contexto"]
+
+        data: Dict[str, Any] = {
+            criterion: {
+                "score": rng.randint(55, 95),
+                "justification": f"Avaliação de {criterion} para \"{titulo}\" com base nas seções da história."
+            }
+            for criterion in INVEST_CRITERIA
+        }
+        data["strengths"] = [
+            f"Seção \"{section}\" bem definida" for section in rng.sample(sections, min(2, len(sections)))
+        ]
+        data["weaknesses"] = [
+            f"Seção \"{rng.choice(sections)}\" poderia ser mais específica"
+        ]
+        data["suggestions"] = [
+            f"Detalhar a seção \"{section}\" de \"{titulo}\" com exemplos concretos"
+            for section in rng.sample(sections, min(3, len(sections)))
+        ]
+
+        return json.dumps(data, ensure_ascii=False, indent=2)
+
+    def _review_json(self, prompt: str, rng: random.Random) -> str:
+        """Input da ferramenta submit_review (INVEST + melhorias)."""
+        data = json.loads(self._invest_json(prompt, rng))
+        data["invest_suggestions"] = data.pop("suggestions")
+        data["improvements"] = self._improvements(prompt, rng)
+        return json.dumps(data, ensure_ascii=False)
+
+    def _suggestions_json(self, prompt: str, rng: random.Random) -> str:
+        """Array de sugestões no formato de _build_suggestion_prompt."""
+        return json.dumps(self._improvements(prompt, rng), ensure_ascii=False, indent=2)
+
+    def _improvements(self, prompt: str, rng: random.Random) -> List[Dict[str, Any]]:
+        """Sugestões de melhoria referenciando as seções da história."""
+        story = self._extract_tag(prompt, "story")
+        sections = re.findall(r"^###\s+(.+)$", story, re.MULTILINE) or ["Contexto"]
+
+        suggestions = []
+        for section in rng.sample(sections, min(rng.randint(2, 4), len(sections))):
+            suggestions.append({
+                "type": rng.choice(SUGGESTION_TYPES),
+                "severity": rng.choice(SUGGESTION_SEVERITIES),
+                "problem": f"A seção \"{section}\" está genérica.",
+                "suggestion": f"Adicione exemplos e valores concretos à seção \"{section}\".",
+                "applicable": rng.random() < 0.5
+            })
+
+        return suggestions
+
+
+class FakeMessageStream:
+    """
+    Stream simulado: entrega o texto em chunks de STREAM_CHUNK_TOKENS
+    tokens respeitando latência e velocidade do backend.
+    """
+
+    def __init__(self, backend: FakeBackend, message: SimpleNamespace):
+        """
+        Inicializa o stream.
+
+        Args:
+            backend: Backend de origem (latência e velocidade)
+            message: Mensagem completa já gerada
+        """
+        self.backend = backend
+        self.message = message
+        self._closed = threading.Event()
+
+    def close(self) -> None:
+        """Interrompe a entrega de chunks (equivalente a fechar a resposta HTTP)."""
+        self._closed.set()
+
+    def __enter__(self) -> "FakeMessageStream":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        return False
+
+    @property
+    def text_stream(self) -> Iterator[str]:
+        """Chunks de texto da resposta."""
+        text = getattr(self.message.content[0], "text", "")
+        chunk_chars = max(1, int(STREAM_CHUNK_TOKENS * CHARS_PER_TOKEN))
+        delay: Optional[float] = None
+        if self.backend.tokens_per_second > 0:
+            delay = STREAM_CHUNK_TOKENS / self.backend.tokens_per_second
+
+        if self._closed.wait(self.backend.latency_seconds):
+            return
+        for start in range(0, len(text), chunk_chars):
+            if delay and self._closed.wait(delay):
+                return
+            if self._closed.is_set():
+                return
+            yield text[start:start + chunk_chars]
+
+    def get_final_message(self) -> SimpleNamespace:
+        """Mensagem completa (content, stop_reason, usage)."""
+        return self.message
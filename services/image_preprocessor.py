@@ -0,0 +1,379 @@
+"""
+Pré-processamento das imagens de evidência (histórias Fix/Bug/Incidente).
+Reduz as imagens à resolução útil para o modelo, recodifica no formato mais
+compacto, remove metadados e elimina duplicatas pelo hash do conteúdo.
+O processamento roda em pool de threads enquanto o formulário é preenchido.
+Segue Single Responsibility Principle.
+"""
+
+import base64
+import hashlib
+import io
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from services.rate_limiter import TOKENS_PER_IMAGE
+import config
+
+try:
+    from PIL import Image, ImageOps, JpegImagePlugin
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+# Pixels por token de imagem (tokens ≈ largura * altura / 750)
+PIXELS_PER_TOKEN = 750
+
+# Formatos aceitos pela API (o arquivo original pode ser enviado como está)
+API_MEDIA_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
+
+# Tag EXIF de orientação (1 = sem rotação)
+EXIF_ORIENTATION = 0x0112
+
+
+@dataclass
+class ProcessedImage:
+    """
+    Imagem pronta para envio à API.
+
+    Attributes:
+        name: Nome do arquivo original
+        type: Media type após a recodificação
+        data: Conteúdo em base64
+        sha256: Hash do arquivo original (deduplicação)
+        original_bytes: Tamanho do arquivo original
+        processed_bytes: Tamanho após o processamento
+        original_tokens: Tokens estimados da imagem original
+        tokens: Tokens estimados após o redimensionamento
+    """
+
+    name: str
+    type: str
+    data: str
+    sha256: str
+    original_bytes: int
+    processed_bytes: int
+    original_tokens: int
+    tokens: int
+
+    def to_form_data(self) -> Dict[str, str]:
+        """Formato de form_data["fix_images"] (name, type, data)."""
+        return {"name": self.name, "type": self.type, "data": self.data}
+
+
+@dataclass
+class PreprocessReport:
+    """
+    Economia obtida no pré-processamento de um conjunto de imagens.
+
+    Attributes:
+        images: Imagens distintas enviadas
+        duplicates: Imagens descartadas por serem idênticas a outra
+        original_bytes: Bytes dos arquivos originais (incluindo duplicatas)
+        processed_bytes: Bytes após o processamento
+        original_tokens: Tokens estimados sem pré-processamento
+        tokens: Tokens estimados após o pré-processamento
+    """
+
+    images: int = 0
+    duplicates: int = 0
+    original_bytes: int = 0
+    processed_bytes: int = 0
+    original_tokens: int = 0
+    tokens: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes economizados no payload."""
+        return self.original_bytes - self.processed_bytes
+
+    @property
+    def tokens_saved(self) -> int:
+        """Tokens de imagem economizados (estimativa)."""
+        return self.original_tokens - self.tokens
+
+
+class ImagePreprocessor:
+    """
+    Processa imagens em background e guarda os resultados por hash,
+    de modo que o mesmo arquivo (reenviado ou em reruns) é processado uma vez.
+    Sem Pillow, as imagens são enviadas como estão (apenas deduplicadas).
+    """
+
+    def __init__(
+        self,
+        max_dimension: int = 1568,
+        max_pixels: int = 1_150_000,
+        quality: int = 85,
+        max_workers: int = 2,
+        max_entries: int = 64
+    ):
+        """
+        Inicializa o pré-processador.
+
+        Args:
+            max_dimension: Maior lado permitido (px)
+            max_pixels: Área máxima (px²)
+            quality: Qualidade da recodificação com perdas (WEBP/JPEG)
+            max_workers: Threads de processamento
+            max_entries: Resultados mantidos em memória
+        """
+        self.max_dimension = max_dimension
+        self.max_pixels = max_pixels
+        self.quality = quality
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-preprocess")
+        self._futures: "OrderedDict[str, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, content_type: Optional[str], content: bytes) -> str:
+        """
+        Agenda o processamento de uma imagem (ignorado se já agendada).
+
+        Args:
+            name: Nome do arquivo
+            content_type: Media type informado no upload
+            content: Bytes do arquivo
+
+        Returns:
+            Hash SHA-256 do conteúdo
+        """
+        digest = hashlib.sha256(content).hexdigest()
+
+        with self._lock:
+            if digest in self._futures:
+                self._futures.move_to_end(digest)
+                return digest
+
+            self._futures[digest] = self._executor.submit(
+                self.process, name, content_type, content, digest
+            )
+            while len(self._futures) > self.max_entries:
+                self._futures.popitem(last=False)
+
+        return digest
+
+    def prepare(self, files: List[Any]) -> Tuple[List[Dict[str, str]], PreprocessReport]:
+        """
+        Retorna as imagens prontas para o form_data, aguardando as pendentes.
+        Arquivos idênticos são enviados uma única vez.
+
+        Args:
+            files: Arquivos enviados (UploadedFile: name, type, getvalue())
+
+        Returns:
+            Tupla (lista para form_data["fix_images"], relatório de economia)
+        """
+        report = PreprocessReport()
+        images = []
+        seen: Dict[str, ProcessedImage] = {}
+
+        for file in files:
+            content = file.getvalue()
+            digest = self.submit(file.name, file.type, content)
+            report.original_bytes += len(content)
+
+            if digest in seen:
+                # Sem o pré-processamento a duplicata também seria enviada (e cobrada)
+                report.duplicates += 1
+                report.original_tokens += seen[digest].original_tokens
+                continue
+
+            processed = self._result(file.name, file.type, content, digest)
+            seen[digest] = processed
+            images.append(processed.to_form_data())
+            report.images += 1
+            report.processed_bytes += processed.processed_bytes
+            report.original_tokens += processed.original_tokens
+            report.tokens += processed.tokens
+
+        return images, report
+
+    def _result(self, name: str, content_type: Optional[str], content: bytes, digest: str) -> ProcessedImage:
+        """Resultado do processamento (reprocessa se a entrada saiu da memória)."""
+        with self._lock:
+            future = self._futures.get(digest)
+
+        if future is None:
+            return self.process(name, content_type, content, digest)
+        return future.result()
+
+    def process(
+        self,
+        name: str,
+        content_type: Optional[str],
+        content: bytes,
+        digest: Optional[str] = None
+    ) -> ProcessedImage:
+        """
+        Processa uma imagem: redimensiona, remove metadados e recodifica
+        no menor entre PNG otimizado e WEBP. O arquivo original é mantido
+        quando nenhuma recodificação fica menor que ele.
+
+        Args:
+            name: Nome do arquivo
+            content_type: Media type informado no upload
+            content: Bytes do arquivo
+            digest: Hash do conteúdo (calculado se ausente)
+
+        Returns:
+            ProcessedImage (original inalterada se Pillow não estiver disponível
+            ou se a imagem não puder ser lida)
+        """
+        digest = digest or hashlib.sha256(content).hexdigest()
+        media_type = content_type or "image/png"
+
+        if not PIL_AVAILABLE:
+            return self._unprocessed(name, media_type, content, digest, TOKENS_PER_IMAGE)
+
+        try:
+            with Image.open(io.BytesIO(content)) as image:
+                original_tokens = self.estimate_tokens(*image.size)
+                original = self._original_candidate(image, content)
+
+                # Primeiro quadro (GIF animado), orientação EXIF aplicada aos pixels
+                image.seek(0)
+                frame = ImageOps.exif_transpose(image)
+                has_alpha = frame.mode in ("RGBA", "LA") or "transparency" in frame.info
+                frame = frame.convert("RGBA" if has_alpha else "RGB")
+                scale = self._scale(*frame.size)
+                if scale < 1.0:
+                    size = (max(1, int(frame.width * scale)), max(1, int(frame.height * scale)))
+                    frame = frame.resize(size, Image.LANCZOS)
+
+                encoded, encoded_type = self._smallest_encoding(frame, original, self._jpeg_settings(image, frame))
+                tokens = self.estimate_tokens(*frame.size)
+
+        except Exception:
+            return self._unprocessed(name, media_type, content, digest, TOKENS_PER_IMAGE)
+
+        return ProcessedImage(
+            name=name,
+            type=encoded_type,
+            data=base64.standard_b64encode(encoded).decode("utf-8"),
+            sha256=digest,
+            original_bytes=len(content),
+            processed_bytes=len(encoded),
+            original_tokens=original_tokens,
+            tokens=tokens
+        )
+
+    @staticmethod
+    def _original_candidate(image: Any, content: bytes) -> Optional[Tuple[bytes, str]]:
+        """
+        Arquivo original como candidato ao envio, se a API o aceita como está.
+        Imagens com rotação EXIF precisam da recodificação (a rotação só é
+        aplicada aos pixels recodificados).
+        """
+        media_type = Image.MIME.get(image.format or "")
+        if media_type not in API_MEDIA_TYPES:
+            return None
+        if image.getexif().get(EXIF_ORIENTATION, 1) != 1:
+            return None
+        return content, media_type
+
+    @staticmethod
+    def _jpeg_settings(image: Any, frame: Any) -> Optional[Dict[str, Any]]:
+        """
+        Tabelas de quantização e subamostragem de um JPEG de origem (sem alfa).
+        Recodificar com elas mantém o tamanho próximo ao do original quando
+        o arquivo não pode ser enviado como está (ex: rotação EXIF).
+        """
+        if image.format != "JPEG" or frame.mode != "RGB" or not getattr(image, "quantization", None):
+            return None
+        return {"qtables": image.quantization, "subsampling": JpegImagePlugin.get_sampling(image)}
+
+    def _smallest_encoding(
+        self,
+        frame: Any,
+        original: Optional[Tuple[bytes, str]] = None,
+        jpeg_settings: Optional[Dict[str, Any]] = None
+    ) -> Tuple[bytes, str]:
+        """
+        Codifica em PNG otimizado e WEBP (e JPEG com as tabelas da origem, se
+        informadas) e retorna o menor (sem metadados). O original (se informado)
+        também concorre: o resultado nunca é maior que ele.
+        """
+        candidates = [original] if original is not None else []
+
+        if jpeg_settings is not None:
+            jpeg = io.BytesIO()
+            frame.save(jpeg, format="JPEG", optimize=True, **jpeg_settings)
+            candidates.append((jpeg.getvalue(), "image/jpeg"))
+
+        png = io.BytesIO()
+        frame.save(png, format="PNG", optimize=True)
+        candidates.append((png.getvalue(), "image/png"))
+
+        try:
+            webp = io.BytesIO()
+            frame.save(webp, format="WEBP", quality=self.quality, method=4)
+            candidates.append((webp.getvalue(), "image/webp"))
+        except (KeyError, OSError):
+            # Pillow compilado sem suporte a WEBP
+            pass
+
+        return min(candidates, key=lambda candidate: len(candidate[0]))
+
+    def estimate_tokens(self, width: int, height: int) -> int:
+        """
+        Estima tokens de uma imagem considerando o redimensionamento do provedor.
+
+        Args:
+            width: Largura (px)
+            height: Altura (px)
+
+        Returns:
+            Tokens estimados
+        """
+        scale = self._scale(width, height)
+        return math.ceil(width * scale * height * scale / PIXELS_PER_TOKEN)
+
+    def _scale(self, width: int, height: int) -> float:
+        """Fator de redução para respeitar o maior lado e a área máxima."""
+        by_edge = self.max_dimension / max(width, height, 1)
+        by_area = math.sqrt(self.max_pixels / max(width * height, 1))
+        return min(1.0, by_edge, by_area)
+
+    @staticmethod
+    def _unprocessed(name: str, media_type: str, content: bytes, digest: str, tokens: int) -> ProcessedImage:
+        """Imagem enviada sem alterações."""
+        return ProcessedImage(
+            name=name,
+            type=media_type,
+            data=base64.standard_b64encode(content).decode("utf-8"),
+            sha256=digest,
+            original_bytes=len(content),
+            processed_bytes=len(content),
+            original_tokens=tokens,
+            tokens=tokens
+        )
+
+
+_preprocessor_instance: Optional[ImagePreprocessor] = None
+_preprocessor_lock = threading.Lock()
+
+
+def get_image_preprocessor() -> ImagePreprocessor:
+    """
+    Retorna o pré-processador compartilhado do processo (criado sob demanda).
+
+    Returns:
+        ImagePreprocessor configurado
+    """
+    global _preprocessor_instance
+
+    with _preprocessor_lock:
+        if _preprocessor_instance is None:
+            _preprocessor_instance = ImagePreprocessor(
+                max_dimension=config.IMAGE_MAX_DIMENSION,
+                max_pixels=config.IMAGE_MAX_PIXELS,
+                quality=config.IMAGE_QUALITY,
+                max_workers=config.IMAGE_PREPROCESS_WORKERS
+            )
+
+    return _preprocessor_instance
@@ -0,0 +1,374 @@
+"""
+Armazenamento endereçado por conteúdo das imagens de evidência.
+Cada imagem é guardada uma única vez (chave = SHA-256 dos bytes) e a história
+carrega apenas referências leves (![nome](image://<hash>)), resolvidas
+somente na renderização e na exportação. O diretório tem limite de idade
+e de tamanho: cada acesso renova a imagem e as menos acessadas saem primeiro.
+Segue Single Responsibility Principle.
+"""
+
+import base64
+import glob
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import config
+
+
+# Referência de imagem no Markdown: ![alt](image://<sha256>)
+IMAGE_REF_SCHEME = "image://"
+IMAGE_REF_PATTERN = re.compile(r'!\[([^\]]*)\]\(image://([0-9a-f]{64})\)')
+
+# Extensões dos arquivos por media type
+MEDIA_TYPE_EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/gif": "gif",
+    "image/webp": "webp"
+}
+
+
+class ImageStore:
+    """
+    Guarda imagens em disco (um arquivo por hash) com cache LRU em memória.
+    Imagens idênticas, em qualquer história ou versão, ocupam um único arquivo.
+    A data de modificação do arquivo marca o último acesso: imagens não
+    acessadas há mais de max_age_seconds e, acima de max_bytes, as acessadas
+    há mais tempo são removidas a cada nova imagem gravada.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        memory_max_entries: int = 64,
+        max_bytes: int = 500 * 1024 * 1024,
+        max_age_seconds: float = 30 * 24 * 60 * 60
+    ):
+        """
+        Inicializa o armazenamento.
+
+        Args:
+            directory: Diretório dos arquivos de imagem
+            memory_max_entries: Imagens mantidas em memória
+            max_bytes: Tamanho máximo do diretório
+            max_age_seconds: Tempo sem acesso após o qual a imagem é removida
+        """
+        self.directory = directory
+        self.memory_max_entries = memory_max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._memory: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, digest: str, media_type: str) -> str:
+        """Caminho do arquivo da imagem."""
+        extension = MEDIA_TYPE_EXTENSIONS.get(media_type, "bin")
+        return os.path.join(self.directory, f"{digest}.{extension}")
+
+    def put(self, content: bytes, media_type: str = "image/png") -> str:
+        """
+        Armazena uma imagem (sem efeito se já existir).
+
+        Args:
+            content: Bytes da imagem
+            media_type: Media type (ex: "image/webp")
+
+        Returns:
+            Hash SHA-256 do conteúdo
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._path(digest, media_type)
+
+        if os.path.exists(path):
+            self._touch(path)
+        else:
+            # Escrita atômica: arquivo temporário + rename
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            self._evict(keep=path)
+
+        self._remember(digest, media_type, content)
+        return digest
+
+    def put_base64(self, data: str, media_type: str = "image/png") -> str:
+        """
+        Armazena uma imagem recebida em base64 (formato de form_data["fix_images"]).
+
+        Args:
+            data: Conteúdo em base64
+            media_type: Media type
+
+        Returns:
+            Hash SHA-256 do conteúdo
+        """
+        return self.put(base64.standard_b64decode(data), media_type)
+
+    def get_base64(self, digest: str) -> Optional[Tuple[str, str]]:
+        """
+        Recupera uma imagem em base64 (formato de form_data["fix_images"]).
+
+        Args:
+            digest: Hash SHA-256
+
+        Returns:
+            Tupla (media_type, conteúdo em base64) ou None se não existir
+        """
+        image = self.get(digest)
+        if image is None:
+            return None
+
+        media_type, content = image
+        return media_type, base64.standard_b64encode(content).decode("utf-8")
+
+    def get(self, digest: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Recupera uma imagem.
+
+        Args:
+            digest: Hash SHA-256
+
+        Returns:
+            Tupla (media_type, bytes) ou None se não existir
+        """
+        with self._lock:
+            image = self._memory.get(digest)
+            if image is not None:
+                self._memory.move_to_end(digest)
+
+        if image is not None:
+            self._touch(self._path(digest, image[0]))
+            return image
+
+        matches = glob.glob(os.path.join(self.directory, f"{digest}.*"))
+        matches = [path for path in matches if not path.endswith(".tmp")]
+        if not matches:
+            return None
+
+        extension = matches[0].rsplit(".", 1)[-1]
+        media_type = next(
+            (mt for mt, ext in MEDIA_TYPE_EXTENSIONS.items() if ext == extension),
+            "application/octet-stream"
+        )
+        try:
+            with open(matches[0], "rb") as f:
+                content = f.read()
+        except OSError:
+            # Removida pela limpeza entre a busca e a leitura
+            return None
+
+        self._touch(matches[0])
+        self._remember(digest, media_type, content)
+        return media_type, content
+
+    def data_uri(self, digest: str) -> Optional[str]:
+        """
+        Data URI da imagem (para embutir no Markdown).
+
+        Args:
+            digest: Hash SHA-256
+
+        Returns:
+            "data:<type>;base64,..." ou None se a imagem não existir
+        """
+        image = self.get(digest)
+        if image is None:
+            return None
+
+        media_type, content = image
+        return f"data:{media_type};base64,{base64.standard_b64encode(content).decode('utf-8')}"
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        """Marca o acesso à imagem (data de modificação do arquivo)."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _evict(self, keep: str) -> None:
+        """
+        Remove imagens não acessadas há mais de max_age_seconds e, acima de
+        max_bytes, as acessadas há mais tempo.
+
+        Args:
+            keep: Arquivo recém-gravado (nunca removido)
+        """
+        now = time.time()
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, "*.*")):
+            if path.endswith(".tmp") or path == keep:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        try:
+            total = os.path.getsize(keep) + sum(size for _, size, _ in entries)
+        except OSError:
+            total = sum(size for _, size, _ in entries)
+
+        entries.sort()
+        for accessed_at, size, path in entries:
+            if now - accessed_at <= self.max_age_seconds and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+            digest = os.path.basename(path).split(".", 1)[0]
+            with self._lock:
+                self._memory.pop(digest, None)
+                self._evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna ocupação do armazenamento.
+
+        Returns:
+            Dict com imagens e bytes em disco, imagens em memória e remoções
+        """
+        paths = [
+            path for path in glob.glob(os.path.join(self.directory, "*.*"))
+            if not path.endswith(".tmp")
+        ]
+        size = 0
+        for path in paths:
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+
+        with self._lock:
+            return {
+                "disk_images": len(paths),
+                "disk_bytes": size,
+                "memory_images": len(self._memory),
+                "evictions": self._evictions
+            }
+
+    def _remember(self, digest: str, media_type: str, content: bytes) -> None:
+        """Guarda a imagem no cache em memória (LRU)."""
+        with self._lock:
+            self._memory[digest] = (media_type, content)
+            self._memory.move_to_end(digest)
+            while len(self._memory) > self.memory_max_entries:
+                self._memory.popitem(last=False)
+
+
+def image_reference(name: str, digest: str) -> str:
+    """
+    Markdown de referência a uma imagem armazenada.
+
+    Args:
+        name: Texto alternativo (nome do arquivo)
+        digest: Hash SHA-256
+
+    Returns:
+        "![nome](image://<hash>)"
+    """
+    alt = name.replace("[", "(").replace("]", ")")
+    return f"![{alt}]({IMAGE_REF_SCHEME}{digest})"
+
+
+def referenced_images(markdown: str) -> List[str]:
+    """
+    Hashes das imagens referenciadas no Markdown (sem repetição, em ordem).
+
+    Args:
+        markdown: Texto da história
+
+    Returns:
+        Lista de hashes
+    """
+    return list(dict.fromkeys(match.group(2) for match in IMAGE_REF_PATTERN.finditer(markdown or "")))
+
+
+def replace_image_refs(markdown: str, replacer: Callable[[str, str], str]) -> str:
+    """
+    Substitui cada referência de imagem pelo retorno do replacer.
+
+    Args:
+        markdown: Texto da história
+        replacer: Função (alt, hash) -> texto substituto
+
+    Returns:
+        Markdown com as referências substituídas
+    """
+    if not markdown or IMAGE_REF_SCHEME not in markdown:
+        return markdown
+
+    return IMAGE_REF_PATTERN.sub(lambda match: replacer(match.group(1), match.group(2)), markdown)
+
+
+def resolve_images(markdown: str, store: Optional[ImageStore] = None) -> str:
+    """
+    Troca as referências por data URIs (renderização e exportação de arquivo único).
+    Imagens ausentes do armazenamento viram o texto "[Imagem indisponível: nome]".
+
+    Args:
+        markdown: Texto da história
+        store: Armazenamento (padrão: compartilhado do processo)
+
+    Returns:
+        Markdown autocontido
+    """
+    if not markdown or IMAGE_REF_SCHEME not in markdown:
+        return markdown
+
+    store = store or get_image_store()
+
+    def embed(alt: str, digest: str) -> str:
+        uri = store.data_uri(digest)
+        return f"![{alt}]({uri})" if uri else f"[Imagem indisponível: {alt}]"
+
+    return replace_image_refs(markdown, embed)
+
+
+def strip_images(markdown: str) -> str:
+    """
+    Troca as referências por "[Imagem: nome]" (exportação em texto simples).
+
+    Args:
+        markdown: Texto da história
+
+    Returns:
+        Texto sem imagens
+    """
+    return replace_image_refs(markdown, lambda alt, digest: f"[Imagem: {alt}]")
+
+
+_store_instance: Optional[ImageStore] = None
+_store_lock = threading.Lock()
+
+
+def get_image_store() -> ImageStore:
+    """
+    Retorna o armazenamento compartilhado do processo (criado sob demanda).
+
+    Returns:
+        ImageStore configurado
+    """
+    global _store_instance
+
+    with _store_lock:
+        if _store_instance is None:
+            _store_instance = ImageStore(
+                directory=config.IMAGE_STORE_DIR,
+                memory_max_entries=config.IMAGE_STORE_MEMORY_MAX_ENTRIES,
+                max_bytes=config.IMAGE_STORE_MAX_BYTES,
+                max_age_seconds=config.IMAGE_STORE_MAX_AGE_SECONDS
+            )
+
+    return _store_instance
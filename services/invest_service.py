@@ -5,12 +5,56 @@ Combina validação local (regras) + validação com IA (Claude).
 Segue Single Responsibility Principle.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, Iterator, List, Tuple
 from models.invest_validator import InvestScore, Suggestion
+from utils.json_stream import IncrementalJsonObjectParser
 import json
 import re
 
 
+INVEST_CRITERIA = ['independent', 'negotiable', 'valuable', 'estimable', 'small', 'testable']
+
+_CRITERION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "integer", "minimum": 0, "maximum": 100},
+        "justification": {"type": "string"}
+    },
+    "required": ["score", "justification"]
+}
+
+# Ferramenta da revisão estruturada: a resposta chega como tool_use com este schema
+REVIEW_TOOL = {
+    "name": "submit_review",
+    "description": "Registra a avaliação INVEST da história e as sugestões de melhoria.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            **{criterion: _CRITERION_SCHEMA for criterion in INVEST_CRITERIA},
+            "strengths": {"type": "array", "items": {"type": "string"}},
+            "weaknesses": {"type": "array", "items": {"type": "string"}},
+            "invest_suggestions": {"type": "array", "items": {"type": "string"}},
+            "improvements": {
+                "type": "array",
+                "maxItems": 5,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "type": {"type": "string", "enum": ["ambiguidade", "tamanho", "criterio", "clareza"]},
+                        "severity": {"type": "string", "enum": ["baixa", "media", "alta"]},
+                        "problem": {"type": "string"},
+                        "suggestion": {"type": "string"},
+                        "applicable": {"type": "boolean"}
+                    },
+                    "required": ["type", "severity", "problem", "suggestion", "applicable"]
+                }
+            }
+        },
+        "required": INVEST_CRITERIA + ["strengths", "weaknesses", "invest_suggestions", "improvements"]
+    }
+}
+
+
 class InvestService:
     """
     Service que valida histórias segundo critérios INVEST.
@@ -386,6 +430,125 @@ Retorne APENAS JSON válido neste formato exato:
 
         return prompt.strip()
 
+    def prepare_for_review(self, story: Dict[str, Any]) -> str:
+        """
+        Prepara prompt da revisão completa (INVEST + sugestões de melhoria).
+        A resposta é entregue pela ferramenta REVIEW_TOOL (schema garantido).
+
+        Args:
+            story: História completa
+
+        Returns:
+            Prompt formatado para Claude API
+        """
+        historia_texto = story.get('historia_gerada', '')
+
+        prompt = f"""
+<task>
+Revise esta história de usuário em uma única análise:
+1. Avalie segundo critérios INVEST (0 a 100 cada)
+2. Identifique problemas e sugira melhorias específicas
+Seja OBJETIVO e TÉCNICO. NÃO INVENTE INFORMAÇÕES - use apenas o que está na história.
+</task>
+
+<story>
+{historia_texto}
+</story>
+
+<criteria>
+- Independent: A história pode ser desenvolvida independentemente de outras?
+- Negotiable: Tem flexibilidade de implementação ou é muito rígida?
+- Valuable: Entrega valor claro ao negócio ou técnico?
+- Estimable: É possível estimar o esforço com precisão?
+- Small: Tamanho adequado para completar em uma sprint (1-2 semanas)?
+- Testable: Possui critérios de aceitação claros e testáveis?
+</criteria>
+
+<analysis_points>
+- AMBIGUIDADES: termos vagos, falta de especificidade técnica, requisitos não claros
+- TAMANHO: história muito grande (complexidade > 13) ou que pode ser dividida
+- CRITÉRIOS FALTANTES: cenários não cobertos, casos de erro, validações ausentes
+- CLAREZA: seções que precisam de detalhes, exemplos ou informações técnicas
+</analysis_points>
+
+<important>
+- Justificativas e sugestões devem citar elementos concretos da história (APIs, campos, regras)
+- invest_suggestions: 3 a 5 sugestões específicas para melhorar os scores INVEST
+- improvements: no máximo 5 melhorias mais importantes, acionáveis
+- Registre o resultado chamando a ferramenta {REVIEW_TOOL["name"]}
+</important>
+"""
+
+        return prompt.strip()
+
+    def parse_review_result(self, data: Dict[str, Any]) -> Tuple[InvestScore, List[Suggestion]]:
+        """
+        Converte o resultado da ferramenta de revisão em InvestScore e sugestões.
+
+        Args:
+            data: input do bloco tool_use (schema de REVIEW_TOOL)
+
+        Returns:
+            Tupla (invest_score, suggestions)
+
+        Raises:
+            KeyError: Se algum campo obrigatório estiver ausente
+        """
+        score = InvestScore(
+            strengths=list(data.get('strengths', [])),
+            weaknesses=list(data.get('weaknesses', [])),
+            suggestions=list(data.get('invest_suggestions', []))
+        )
+
+        for criterion in INVEST_CRITERIA:
+            setattr(score, criterion, int(data[criterion]['score']))
+            score.justifications[criterion] = data[criterion].get('justification', '')
+
+        score.calculate_overall()
+
+        suggestions = [
+            Suggestion(
+                type=item['type'],
+                severity=item['severity'],
+                problem=item['problem'],
+                suggestion=item['suggestion'],
+                applicable=item.get('applicable', False)
+            )
+            for item in data.get('improvements', [])
+        ]
+
+        return score, suggestions
+
+    def parse_ai_validation_stream(self, chunks: Iterable[str]) -> Iterator[Tuple[str, InvestScore]]:
+        """
+        Parseia a resposta da IA enquanto ela chega em streaming.
+        Cada critério é preenchido assim que o seu objeto JSON fecha;
+        strengths, weaknesses e suggestions em seguida.
+
+        Args:
+            chunks: Trechos da resposta JSON da IA
+
+        Yields:
+            Tupla (campo concluído, InvestScore parcial). O último item
+            tem campo "overall", com o score geral calculado.
+        """
+        score = InvestScore()
+        parser = IncrementalJsonObjectParser()
+
+        for chunk in chunks:
+            for key, value in parser.feed(chunk):
+                if key in INVEST_CRITERIA and isinstance(value, dict) and 'score' in value:
+                    setattr(score, key, int(value['score']))
+                    score.justifications[key] = value.get('justification', '')
+                elif key in ('strengths', 'weaknesses', 'suggestions') and isinstance(value, list):
+                    setattr(score, key, value)
+                else:
+                    continue
+                yield key, score
+
+        score.calculate_overall()
+        yield "overall", score
+
     def parse_ai_validation_response(self, ai_response: str) -> InvestScore:
         """
         Parseia resposta da IA para criar InvestScore.
@@ -412,7 +575,7 @@ Retorne APENAS JSON válido neste formato exato:
             )
 
             # Adicionar justificativas
-            for criterion in ['independent', 'negotiable', 'valuable', 'estimable', 'small', 'testable']:
+            for criterion in INVEST_CRITERIA:
                 if criterion in data:
                     score.justifications[criterion] = data[criterion].get('justification', '')
 
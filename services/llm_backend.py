@@ -0,0 +1,136 @@
+"""
+Interface de backend de LLM usada pelo AIService.
+Isola a comunicação com o provedor atrás de um protocolo mínimo, permitindo
+trocar a API real por um backend local (testes, benchmarks e uso offline).
+Segue Dependency Inversion Principle: o AIService depende da abstração.
+"""
+
+from typing import Any, ContextManager, Iterator, Optional, Protocol
+from services.client_manager import get_client_manager
+import config
+
+
+class MessageStream(Protocol):
+    """Stream de resposta: equivalente ao MessageStream do SDK da Anthropic."""
+
+    text_stream: Iterator[str]
+
+    def get_final_message(self) -> Any:
+        """Mensagem completa (content, stop_reason, usage) após o fim do stream."""
+
+
+class LLMBackend(Protocol):
+    """
+    Contrato de um backend de LLM.
+    Parâmetros e respostas seguem o formato da Messages API
+    (respostas expõem content[0].text, stop_reason, usage e model).
+
+    Attributes:
+        name: Identificador do backend (ex: "anthropic", "fake")
+        batches: Cliente da Message Batches API (None se não suportado)
+    """
+
+    name: str
+    batches: Optional[Any]
+
+    def create_message(self, **request: Any) -> Any:
+        """Envia uma requisição e retorna a mensagem completa."""
+
+    def stream_message(self, **request: Any) -> ContextManager[MessageStream]:
+        """Envia uma requisição em modo streaming."""
+
+    async def create_message_async(self, **request: Any) -> Any:
+        """Versão assíncrona de create_message."""
+
+
+class AnthropicBackend:
+    """
+    Backend da Messages API da Anthropic.
+    Usa os clientes compartilhados do ClientManager (pool persistente).
+    """
+
+    name = "anthropic"
+
+    def __init__(self, api_key: str):
+        """
+        Inicializa o backend.
+
+        Args:
+            api_key: Chave de API da Anthropic
+        """
+        self.api_key = api_key
+        self.client = get_client_manager().get_client(api_key)
+
+    @property
+    def batches(self) -> Any:
+        """Cliente da Message Batches API."""
+        return self.client.messages.batches
+
+    def create_message(self, **request: Any) -> Any:
+        """
+        Envia requisição à Messages API.
+
+        Args:
+            **request: Parâmetros de client.messages.create
+
+        Returns:
+            Message da API
+        """
+        return self.client.messages.create(**request)
+
+    def stream_message(self, **request: Any) -> ContextManager[MessageStream]:
+        """
+        Envia requisição em modo streaming.
+
+        Args:
+            **request: Parâmetros de client.messages.stream
+
+        Returns:
+            Context manager do MessageStream do SDK
+        """
+        return self.client.messages.stream(**request)
+
+    async def create_message_async(self, **request: Any) -> Any:
+        """
+        Versão assíncrona de create_message.
+        O cliente assíncrono fica vinculado ao event loop do processo.
+
+        Args:
+            **request: Parâmetros de client.messages.create
+
+        Returns:
+            Message da API
+        """
+        async_client = get_client_manager().get_async_client(self.api_key)
+        return await async_client.messages.create(**request)
+
+
+def create_backend(api_key: str = "", backend_name: Optional[str] = None) -> LLMBackend:
+    """
+    Cria o backend configurado.
+
+    Args:
+        api_key: Chave de API (ignorada pelo backend fake)
+        backend_name: "anthropic" ou "fake" (padrão: config.LLM_BACKEND)
+
+    Returns:
+        Backend de LLM
+
+    Raises:
+        ValueError: Se o backend for desconhecido
+    """
+    backend_name = backend_name or config.LLM_BACKEND
+
+    if backend_name == "anthropic":
+        return AnthropicBackend(api_key)
+
+    if backend_name == "fake":
+        from services.fake_backend import FakeBackend
+
+        return FakeBackend(
+            latency_seconds=config.FAKE_BACKEND_LATENCY_SECONDS,
+            tokens_per_second=config.FAKE_BACKEND_TOKENS_PER_SECOND,
+            seed=config.FAKE_BACKEND_SEED
+        )
+
+    raise ValueError(f"Backend de LLM desconhecido: {backend_name}")
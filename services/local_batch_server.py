@@ -0,0 +1,183 @@
+"""
+Servidor local que simula a Message Batches API da Anthropic.
+Implementa a mesma interface de client.messages.batches (create, retrieve,
+results, cancel) processando as requisições em thread de background.
+Usado em testes e em ambientes sem acesso à Batches API.
+Segue Liskov Substitution Principle: substitui o cliente real no BatchService.
+"""
+
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List
+from uuid import uuid4
+
+
+class LocalBatchServer:
+    """
+    Stand-in em processo da Message Batches API.
+    Cada requisição é resolvida pelo responder informado, que recebe
+    os params da Messages API e devolve o texto da resposta.
+    """
+
+    def __init__(self, responder: Callable[[Dict[str, Any]], str], delay_seconds: float = 0.0):
+        """
+        Inicializa o servidor local.
+
+        Args:
+            responder: Função params -> texto (ex: chamada síncrona à Messages API)
+            delay_seconds: Atraso artificial por requisição (simula fila do provedor)
+        """
+        self.responder = responder
+        self.delay_seconds = delay_seconds
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, requests: List[Dict[str, Any]]) -> SimpleNamespace:
+        """
+        Registra o lote e inicia o processamento em background.
+
+        Args:
+            requests: Lista de {"custom_id": str, "params": dict}
+
+        Returns:
+            Objeto equivalente a MessageBatch
+        """
+        batch_id = f"msgbatch_local_{uuid4().hex}"
+
+        with self._lock:
+            self._batches[batch_id] = {
+                "requests": list(requests),
+                "results": [],
+                "status": "in_progress",
+                "canceled": False,
+                "created_at": datetime.now().isoformat(),
+                "ended_at": None
+            }
+
+        thread = threading.Thread(
+            target=self._process,
+            args=(batch_id,),
+            name=f"local-batch-{batch_id[-8:]}",
+            daemon=True
+        )
+        thread.start()
+
+        return self.retrieve(batch_id)
+
+    def retrieve(self, batch_id: str) -> SimpleNamespace:
+        """
+        Retorna o estado atual do lote.
+
+        Args:
+            batch_id: ID do lote
+
+        Returns:
+            Objeto equivalente a MessageBatch
+
+        Raises:
+            KeyError: Se o lote não existir
+        """
+        with self._lock:
+            batch = self._batches[batch_id]
+            counts = {"processing": 0, "succeeded": 0, "errored": 0, "canceled": 0, "expired": 0}
+            for result in batch["results"]:
+                counts[result.result.type] += 1
+            counts["processing"] = len(batch["requests"]) - len(batch["results"])
+
+            return SimpleNamespace(
+                id=batch_id,
+                type="message_batch",
+                processing_status=batch["status"],
+                request_counts=SimpleNamespace(**counts),
+                created_at=batch["created_at"],
+                ended_at=batch["ended_at"]
+            )
+
+    def results(self, batch_id: str) -> Iterator[SimpleNamespace]:
+        """
+        Itera sobre os resultados de um lote encerrado.
+
+        Args:
+            batch_id: ID do lote
+
+        Returns:
+            Iterador de objetos equivalentes a MessageBatchIndividualResponse
+
+        Raises:
+            ValueError: Se o lote ainda estiver em processamento
+        """
+        with self._lock:
+            batch = self._batches[batch_id]
+            if batch["status"] != "ended":
+                raise ValueError(f"Lote {batch_id} ainda em processamento")
+            results = list(batch["results"])
+
+        return iter(results)
+
+    def cancel(self, batch_id: str) -> SimpleNamespace:
+        """
+        Solicita o cancelamento das requisições ainda não processadas.
+
+        Args:
+            batch_id: ID do lote
+
+        Returns:
+            Objeto equivalente a MessageBatch
+        """
+        with self._lock:
+            batch = self._batches[batch_id]
+            if batch["status"] == "in_progress":
+                batch["canceled"] = True
+                batch["status"] = "canceling"
+
+        return self.retrieve(batch_id)
+
+    def _process(self, batch_id: str) -> None:
+        """Resolve as requisições do lote em sequência."""
+        with self._lock:
+            requests = list(self._batches[batch_id]["requests"])
+
+        for request in requests:
+            with self._lock:
+                canceled = self._batches[batch_id]["canceled"]
+
+            if canceled:
+                result = SimpleNamespace(type="canceled")
+            else:
+                if self.delay_seconds:
+                    time.sleep(self.delay_seconds)
+                result = self._resolve(request["params"])
+
+            with self._lock:
+                self._batches[batch_id]["results"].append(
+                    SimpleNamespace(custom_id=request["custom_id"], result=result)
+                )
+
+        with self._lock:
+            self._batches[batch_id]["status"] = "ended"
+            self._batches[batch_id]["ended_at"] = datetime.now().isoformat()
+
+    def _resolve(self, params: Dict[str, Any]) -> SimpleNamespace:
+        """Executa o responder e monta o resultado individual."""
+        try:
+            text = self.responder(params)
+        except Exception as e:
+            return SimpleNamespace(
+                type="errored",
+                error=SimpleNamespace(
+                    type="error",
+                    error=SimpleNamespace(type="api_error", message=str(e))
+                )
+            )
+
+        return SimpleNamespace(
+            type="succeeded",
+            message=SimpleNamespace(
+                model=params.get("model"),
+                content=[SimpleNamespace(type="text", text=text)],
+                stop_reason="end_turn",
+                usage=SimpleNamespace(input_tokens=0, output_tokens=0)
+            )
+        )
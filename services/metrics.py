@@ -0,0 +1,429 @@
+"""
+Métricas de uso da IA: latência, tokens, stop reasons, erros e cache.
+Registro em memória do processo, exportado em formato texto do Prometheus
+por um endpoint HTTP local e resumido no painel de diagnóstico.
+Segue Single Responsibility Principle.
+"""
+
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import config
+
+
+# Limites dos histogramas (segundos)
+LATENCY_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 90.0)
+FIRST_TOKEN_BUCKETS = (0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0)
+
+# Campos de usage (Messages API) -> tipo no contador de tokens
+TOKEN_TYPES = {
+    "input_tokens": "input",
+    "output_tokens": "output",
+    "cache_read_input_tokens": "cache_read",
+    "cache_creation_input_tokens": "cache_creation"
+}
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Escapa valor de label (barra invertida, aspas e quebra de linha)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    """Formata labels no padrão {a="x",b="y"}."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Formata número no padrão do Prometheus."""
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """
+    Contador monotônico com labels.
+    """
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...]):
+        """
+        Inicializa o contador.
+
+        Args:
+            name: Nome da métrica
+            help_text: Descrição (linha # HELP)
+            labelnames: Nomes dos labels
+        """
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, amount: float = 1) -> None:
+        """Incrementa a série dos labels (chamado com o lock do registro)."""
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        """Linhas no formato texto do Prometheus."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Histograma com buckets cumulativos, soma e contagem por série.
+    """
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...], buckets: Tuple[float, ...]):
+        """
+        Inicializa o histograma.
+
+        Args:
+            name: Nome da métrica
+            help_text: Descrição (linha # HELP)
+            labelnames: Nomes dos labels
+            buckets: Limites superiores dos buckets (sem +Inf)
+        """
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets) + (math.inf,)
+        # labels -> [contagens por bucket (não cumulativas), soma, contagem]
+        self.series: Dict[Labels, List[Any]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        """Registra uma observação (chamado com o lock do registro)."""
+        series = self.series.setdefault(labels, [[0] * len(self.buckets), 0.0, 0])
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][index] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def merged(self, match: Callable[[Labels], bool]) -> Tuple[List[int], float, int]:
+        """Soma as séries cujos labels satisfazem match."""
+        counts = [0] * len(self.buckets)
+        total, count = 0.0, 0
+        for labels, (bucket_counts, series_sum, series_count) in self.series.items():
+            if match(labels):
+                counts = [a + b for a, b in zip(counts, bucket_counts)]
+                total += series_sum
+                count += series_count
+        return counts, total, count
+
+    def quantile(self, fraction: float, counts: List[int]) -> float:
+        """
+        Estima um quantil por interpolação linear dentro do bucket
+        (mesmo método de histogram_quantile do Prometheus).
+        """
+        count = sum(counts)
+        if not count:
+            return 0.0
+
+        rank = fraction * count
+        cumulative = 0
+        lower = 0.0
+        for bound, bucket_count in zip(self.buckets, counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if bound == math.inf:
+                    return lower
+                return lower + (bound - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+            lower = bound if bound != math.inf else lower
+        return lower
+
+    def render(self) -> List[str]:
+        """Linhas no formato texto do Prometheus."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (bucket_counts, series_sum, series_count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(round(series_sum, 6))}")
+            lines.append(f"{self.name}_count{label_text} {series_count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Registro das métricas de IA do processo.
+    Alimentado pelo AIService (síncrono e assíncrono); subsistemas com
+    estatísticas próprias (cache, agendador, circuit breaker) são
+    exportados como gauges por coletores registrados.
+    """
+
+    def __init__(self):
+        """Inicializa as métricas vazias."""
+        self._lock = threading.Lock()
+        self.requests = Counter(
+            "ai_requests_total", "Requisições à Messages API por resultado.",
+            ("operation", "model", "outcome")
+        )
+        self.duration = Histogram(
+            "ai_request_duration_seconds", "Duração das requisições (inclui espera no agendador).",
+            ("operation", "model"), LATENCY_BUCKETS
+        )
+        self.first_token = Histogram(
+            "ai_time_to_first_token_seconds", "Tempo até o primeiro trecho das requisições em streaming.",
+            ("operation", "model"), FIRST_TOKEN_BUCKETS
+        )
+        self.tokens = Counter(
+            "ai_tokens_total", "Tokens informados em response.usage.",
+            ("operation", "model", "type")
+        )
+        self.stop_reasons = Counter(
+            "ai_stop_reason_total", "Respostas por stop_reason.",
+            ("operation", "model", "stop_reason")
+        )
+        self.errors = Counter(
+            "ai_errors_total", "Erros das requisições por classe de exceção.",
+            ("operation", "error")
+        )
+        self.cache = Counter(
+            "ai_response_cache_requests_total", "Consultas ao cache de respostas.",
+            ("operation", "result")
+        )
+        self._metrics = [
+            self.requests, self.duration, self.first_token,
+            self.tokens, self.stop_reasons, self.errors, self.cache
+        ]
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def observe_response(
+        self,
+        operation: str,
+        model: str,
+        elapsed: float,
+        usage: Any,
+        stop_reason: Optional[str],
+        first_token: Optional[float] = None
+    ) -> None:
+        """
+        Registra uma resposta da API.
+
+        Args:
+            operation: Nome da operação
+            model: Modelo que respondeu
+            elapsed: Duração da requisição (segundos)
+            usage: Objeto usage da resposta
+            stop_reason: Motivo de parada informado pela API
+            first_token: Tempo até o primeiro trecho (streaming)
+        """
+        labels = (operation or "unknown", model)
+        with self._lock:
+            self.requests.inc(labels + ("ok",))
+            self.duration.observe(labels, elapsed)
+            if first_token is not None:
+                self.first_token.observe(labels, first_token)
+            for field, token_type in TOKEN_TYPES.items():
+                value = getattr(usage, field, 0) or 0
+                if value:
+                    self.tokens.inc(labels + (token_type,), value)
+            self.stop_reasons.inc(labels + (stop_reason or "unknown",))
+
+    def record_error(self, operation: str, model: str, error: BaseException) -> None:
+        """
+        Registra uma requisição que falhou.
+
+        Args:
+            operation: Nome da operação
+            model: Modelo da requisição
+            error: Exceção levantada
+        """
+        operation = operation or "unknown"
+        with self._lock:
+            self.requests.inc((operation, model, "error"))
+            self.errors.inc((operation, type(error).__name__))
+
+    def record_cache(self, operation: str, result: str) -> None:
+        """
+        Registra consulta ao cache de respostas.
+
+        Args:
+            operation: Nome da operação
+            result: "hit", "miss" ou "coalesced" (requisição idêntica em andamento)
+        """
+        with self._lock:
+            self.cache.inc((operation or "unknown", result))
+
+    def register_collector(self, name: str, collect: Callable[[], Dict[str, Any]]) -> None:
+        """
+        Registra estatísticas de um subsistema, exportadas como gauges
+        ai_<name>_<chave> (apenas valores numéricos).
+
+        Args:
+            name: Prefixo do subsistema (ex: "rate_limiter")
+            collect: Função que retorna o dict de estatísticas
+        """
+        with self._lock:
+            self._collectors[name] = collect
+
+    def render_prometheus(self) -> str:
+        """
+        Exporta todas as métricas no formato texto do Prometheus.
+
+        Returns:
+            Texto da exposição (versão 0.0.4)
+        """
+        with self._lock:
+            lines: List[str] = []
+            for metric in self._metrics:
+                lines.extend(metric.render())
+            collectors = dict(self._collectors)
+
+        for name, collect in sorted(collectors.items()):
+            try:
+                stats = collect() or {}
+            except Exception:
+                continue
+            for key, value in sorted(stats.items()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                metric = f"ai_{name}_{key}"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Resumo por operação para o painel de diagnóstico.
+
+        Returns:
+            Dict operação -> requisições, erros, latências p50/p95,
+            primeiro trecho p50, tokens, cache e stop reasons
+        """
+        with self._lock:
+            operations = sorted(
+                {labels[0] for labels in self.requests.values}
+                | {labels[0] for labels in self.cache.values}
+            )
+            result: Dict[str, Dict[str, Any]] = {}
+
+            for operation in operations:
+                def match(labels: Labels, op=operation) -> bool:
+                    return labels[0] == op
+
+                counts, total, count = self.duration.merged(match)
+                ttft_counts, _, ttft_count = self.first_token.merged(match)
+
+                result[operation] = {
+                    "requests": sum(v for k, v in self.requests.values.items() if k[0] == operation and k[2] == "ok"),
+                    "errors": sum(v for k, v in self.requests.values.items() if k[0] == operation and k[2] == "error"),
+                    "p50_seconds": round(self.duration.quantile(0.5, counts), 2),
+                    "p95_seconds": round(self.duration.quantile(0.95, counts), 2),
+                    "mean_seconds": round(total / count, 2) if count else 0.0,
+                    "first_token_p50_seconds": round(self.first_token.quantile(0.5, ttft_counts), 2) if ttft_count else None,
+                    "input_tokens": sum(v for k, v in self.tokens.values.items() if k[0] == operation and k[2] == "input"),
+                    "output_tokens": sum(v for k, v in self.tokens.values.items() if k[0] == operation and k[2] == "output"),
+                    "cache_hits": self.cache.values.get((operation, "hit"), 0),
+                    "cache_misses": self.cache.values.get((operation, "miss"), 0),
+                    "coalesced": self.cache.values.get((operation, "coalesced"), 0),
+                    "stop_reasons": {
+                        k[2]: v for k, v in self.stop_reasons.values.items() if k[0] == operation
+                    },
+                    "error_classes": {
+                        k[1]: v for k, v in self.errors.values.items() if k[0] == operation
+                    }
+                }
+
+        return result
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Handler HTTP que expõe /metrics."""
+
+    registry: MetricsRegistry
+
+    def do_GET(self):
+        """Responde GET /metrics com a exposição do Prometheus."""
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+
+        body = self.registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Silencia o log de acesso (scrapes periódicos)."""
+        return
+
+
+_registry_instance: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+_server_instance: Optional[ThreadingHTTPServer] = None
+
+
+def get_metrics_registry() -> Optional[MetricsRegistry]:
+    """
+    Retorna o registro compartilhado do processo (criado sob demanda).
+
+    Returns:
+        MetricsRegistry ou None se as métricas estiverem desabilitadas
+    """
+    global _registry_instance
+
+    if not config.METRICS_ENABLED:
+        return None
+
+    with _registry_lock:
+        if _registry_instance is None:
+            _registry_instance = MetricsRegistry()
+
+    return _registry_instance
+
+
+def start_metrics_server(host: str = "127.0.0.1", port: int = 9464) -> Optional[str]:
+    """
+    Inicia (uma vez por processo) o endpoint HTTP local das métricas.
+
+    Args:
+        host: Interface de escuta
+        port: Porta de escuta
+
+    Returns:
+        URL do endpoint ou None se as métricas estiverem desabilitadas
+        ou a porta estiver ocupada (ex: outro processo já exporta)
+    """
+    global _server_instance
+
+    registry = get_metrics_registry()
+    if registry is None:
+        return None
+
+    with _registry_lock:
+        if _server_instance is None:
+            handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+            try:
+                _server_instance = ThreadingHTTPServer((host, port), handler)
+            except OSError:
+                return None
+
+            threading.Thread(
+                target=_server_instance.serve_forever,
+                name="metrics-server",
+                daemon=True
+            ).start()
+
+        bound_host, bound_port = _server_instance.server_address[:2]
+
+    return f"http://{bound_host}:{bound_port}/metrics"
@@ -0,0 +1,276 @@
+"""
+Benchmark de tamanho dos prompts.
+Renderiza os templates de prompt sobre um corpus de formulários de exemplo
+e reporta tokens de entrada por template e por Value Area (sistema, dados e
+total), além do tempo de renderização. Permite comparar com um relatório
+anterior para medir quantos tokens uma alteração de prompt economiza.
+
+Uso:
+    python -m services.prompt_benchmark [--json relatorio.json] [--baseline anterior.json]
+
+Segue Single Responsibility Principle.
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional
+from services.fake_backend import FakeBackend
+from services.prompt_templates import VALUE_AREA_TEMPLATES
+from services.token_budget import TokenBudget
+
+
+# Corpus de exemplo (um ou mais formulários por Value Area, do mínimo ao completo)
+SAMPLE_CORPUS: List[Dict[str, Any]] = [
+    {
+        "value_area": "Business",
+        "titulo": "Cadastro de clientes",
+        "regras_negocio": ["CPF obrigatório e válido"],
+        "apis_servicos": ["API de clientes"],
+        "objetivos": {"como": "atendente", "quero": "cadastrar clientes", "para_que": "agilizar o atendimento"},
+        "complexidade": 3,
+        "criterios_aceitacao": ["Cliente salvo com sucesso"]
+    },
+    {
+        "value_area": "Business",
+        "titulo": "Busca de médicos por especialidade",
+        "regras_negocio": [
+            "Apenas médicos com cadastro ativo",
+            "Ordenar por distância do paciente",
+            "Paginação de 20 itens",
+            "Filtrar por convênio aceito"
+        ],
+        "apis_servicos": ["API de prestadores", "API de geolocalização", "API de convênios"],
+        "objetivos": {
+            "como": "paciente",
+            "quero": "encontrar médicos próximos da minha especialidade",
+            "para_que": "agendar consultas rapidamente"
+        },
+        "complexidade": 8,
+        "criterios_aceitacao": [
+            "Resultados filtrados por especialidade",
+            "Médicos inativos não aparecem",
+            "Resposta em até 2 segundos"
+        ],
+        "api_specs": {
+            "metodo": "GET",
+            "endpoint": "/api/v1/medicos",
+            "query_params": "especialidade, lat, lng, convenio, page, limit",
+            "formato_resposta": '{"items": [{"id": 1, "nome": "Dra. Ana", "distancia_km": 1.2}], "total": 42}'
+        },
+        "has_dependencies": True,
+        "dependencies": "Time de Geolocalização precisa publicar a v2 da API de distância"
+    },
+    {
+        "value_area": "Spike",
+        "titulo": "Avaliar mensageria para eventos de agenda",
+        "spike_pergunta": "Qual broker atende 5 mil eventos/s com entrega garantida?",
+        "spike_alternativas": ["Kafka", "RabbitMQ", "SQS + SNS"],
+        "spike_timebox": 16,
+        "spike_output": "Relatório comparativo com recomendação",
+        "spike_criterios_sucesso": ["Throughput medido", "Custo mensal estimado", "PoC executando"],
+        "objetivos": {"como": "arquiteto", "quero": "escolher o broker", "para_que": "desacoplar a agenda"},
+        "complexidade": 5
+    },
+    {
+        "value_area": "Kaizen",
+        "titulo": "Reduzir tempo do pipeline de CI",
+        "kaizen_processo": "Integração contínua",
+        "kaizen_situacao_atual": "Pipeline leva 35 minutos por PR",
+        "kaizen_meta": "Pipeline abaixo de 12 minutos",
+        "kaizen_metricas": ["Duração média do pipeline", "Taxa de falhas intermitentes"],
+        "kaizen_impacto": "Feedback mais rápido e menos troca de contexto",
+        "objetivos": {"como": "desenvolvedor", "quero": "pipelines rápidos", "para_que": "integrar com frequência"},
+        "complexidade": 5
+    },
+    {
+        "value_area": "Fix/Bug/Incidente",
+        "titulo": "Erro 500 ao emitir segunda via de boleto",
+        "fix_descricao": "A emissão de segunda via falha para boletos vencidos há mais de 30 dias",
+        "fix_passos_reproduzir": [
+            "Acessar Financeiro > Boletos",
+            "Selecionar boleto vencido há 45 dias",
+            "Clicar em Emitir segunda via"
+        ],
+        "fix_comportamento_esperado": "Boleto atualizado com juros e multa",
+        "fix_comportamento_atual": "Tela de erro genérico e HTTP 500",
+        "fix_ambiente": "Produção",
+        "fix_severidade": "Alta",
+        "fix_logs": (
+            "ERROR BoletoService - NullPointerException at JurosCalculator.calcular(JurosCalculator.java:87)\n"
+            "ERROR BoletoController - Falha ao emitir segunda via id=99812"
+        ),
+        "objetivos": {"como": "cliente", "quero": "emitir a segunda via", "para_que": "pagar sem atraso"},
+        "complexidade": 3
+    },
+    {
+        "value_area": "Fix/Bug/Incidente",
+        "titulo": "Botão de salvar sobreposto no mobile",
+        "fix_descricao": "Em telas menores que 360px o botão Salvar fica atrás do rodapé",
+        "fix_passos_reproduzir": ["Abrir o perfil no celular", "Editar o telefone"],
+        "fix_comportamento_esperado": "Botão visível e clicável",
+        "fix_comportamento_atual": "Botão encoberto pelo rodapé",
+        "fix_ambiente": "Produção (Android)",
+        "fix_severidade": "Média",
+        "fix_logs": "",
+        "fix_images": [{"name": "tela_perfil.png", "type": "image/png", "data": ""}],
+        "objetivos": {"como": "usuário", "quero": "salvar meu perfil", "para_que": "manter meus dados atualizados"},
+        "complexidade": 2
+    }
+]
+
+
+def run_benchmark(
+    ai_service: Any = None,
+    corpus: Optional[List[Dict[str, Any]]] = None,
+    render_rounds: int = 200
+) -> Dict[str, Any]:
+    """
+    Renderiza o corpus e mede tokens e tempo de renderização.
+    Tokens são a estimativa usada pelo agendador e pelo orçamento de tokens
+    (mesma contagem aplicada às requisições reais).
+
+    Args:
+        ai_service: AIService usado para montar os prompts (padrão: backend fake)
+        corpus: Formulários de exemplo (padrão: SAMPLE_CORPUS)
+        render_rounds: Renderizações por formulário na medição de tempo
+
+    Returns:
+        Dict com "templates" (por template) e "value_areas" (por Value Area)
+    """
+    if ai_service is None:
+        from services.ai_service import AIService
+
+        ai_service = AIService(backend=FakeBackend())
+
+    templates = ai_service.prompt_templates
+    corpus = corpus if corpus is not None else SAMPLE_CORPUS
+
+    report: Dict[str, Any] = {"templates": {}, "value_areas": {}}
+
+    for name, stats in templates.get_stats().items():
+        template = templates.get(name)
+        report["templates"][name] = {
+            "version": stats["version"],
+            "fingerprint": stats["fingerprint"],
+            "chars": stats["chars"],
+            # Tokens do texto fixo (sem os valores dos campos)
+            "static_tokens": TokenBudget.count_input_tokens([], template.text)
+        }
+
+    samples: Dict[str, List[Dict[str, float]]] = {}
+    for form_data in corpus:
+        value_area = form_data.get("value_area", "Business")
+        params = ai_service.build_request_params("generate_story", form_data=form_data)
+        system, messages = params.get("system"), params["messages"]
+
+        started = time.perf_counter()
+        for _ in range(render_rounds):
+            ai_service._build_story_prompt(
+                titulo=form_data.get("titulo", ""),
+                regras_negocio=form_data.get("regras_negocio", []),
+                apis_servicos=form_data.get("apis_servicos", []),
+                objetivos=form_data.get("objetivos", {}),
+                complexidade=form_data.get("complexidade", 5),
+                criterios_aceitacao=form_data.get("criterios_aceitacao", []),
+                api_specs=form_data.get("api_specs", None),
+                form_data=form_data
+            )
+        render_us = (time.perf_counter() - started) / render_rounds * 1_000_000
+
+        samples.setdefault(value_area, []).append({
+            "system_tokens": TokenBudget.count_input_tokens([], system),
+            "input_tokens": TokenBudget.count_input_tokens(messages),
+            "total_tokens": TokenBudget.count_input_tokens(messages, system),
+            "render_us": render_us
+        })
+
+    for value_area, rows in samples.items():
+        system_name, input_name = VALUE_AREA_TEMPLATES.get(value_area, VALUE_AREA_TEMPLATES["Business"])
+        report["value_areas"][value_area] = {
+            "samples": len(rows),
+            "system_template": templates.get(system_name).key,
+            "input_template": templates.get(input_name).key,
+            "system_tokens": max(row["system_tokens"] for row in rows),
+            "input_tokens_mean": round(sum(row["input_tokens"] for row in rows) / len(rows), 1),
+            "input_tokens_max": max(row["input_tokens"] for row in rows),
+            "total_tokens_mean": round(sum(row["total_tokens"] for row in rows) / len(rows), 1),
+            "render_us_mean": round(sum(row["render_us"] for row in rows) / len(rows), 1)
+        }
+
+    return report
+
+
+def format_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Formata o relatório em texto (com diferença para o baseline, se houver).
+
+    Args:
+        report: Resultado de run_benchmark
+        baseline: Relatório anterior para comparação (opcional)
+
+    Returns:
+        Relatório em texto
+    """
+    def delta(section: str, name: str, field: str, value: float) -> str:
+        previous = ((baseline or {}).get(section, {}).get(name) or {}).get(field)
+        if previous is None:
+            return ""
+        diff = value - previous
+        return f" ({diff:+.1f})" if diff else " (=)"
+
+    lines = ["TEMPLATES", f"{'template':<26}{'versao':>7}  {'fingerprint':<17}{'chars':>7}{'tokens':>8}"]
+    for name, stats in report["templates"].items():
+        lines.append(
+            f"{name:<26}{stats['version']:>7}  {stats['fingerprint']:<17}{stats['chars']:>7}"
+            f"{stats['static_tokens']:>8}{delta('templates', name, 'static_tokens', stats['static_tokens'])}"
+        )
+
+    lines += ["", "VALUE AREAS (tokens de entrada por requisição)"]
+    lines.append(
+        f"{'value area':<20}{'amostras':>9}{'sistema':>9}{'dados':>9}{'dados max':>10}{'total':>9}{'render us':>11}"
+    )
+    for value_area, stats in report["value_areas"].items():
+        lines.append(
+            f"{value_area:<20}{stats['samples']:>9}{stats['system_tokens']:>9}{stats['input_tokens_mean']:>9}"
+            f"{stats['input_tokens_max']:>10}{stats['total_tokens_mean']:>9}{stats['render_us_mean']:>11}"
+            f"{delta('value_areas', value_area, 'total_tokens_mean', stats['total_tokens_mean'])}"
+        )
+
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Executa o benchmark pela linha de comando.
+
+    Args:
+        argv: Argumentos (padrão: sys.argv)
+
+    Returns:
+        Código de saída
+    """
+    parser = argparse.ArgumentParser(description="Tokens de entrada dos templates de prompt")
+    parser.add_argument("--json", help="Grava o relatório em JSON (baseline de comparações futuras)")
+    parser.add_argument("--baseline", help="Relatório JSON anterior para comparar")
+    parser.add_argument("--rounds", type=int, default=200, help="Renderizações por formulário na medição de tempo")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    report = run_benchmark(render_rounds=args.rounds)
+    print(format_report(report, baseline))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""
+Templates de prompt compilados uma única vez por processo.
+Cada template tem nome, versão e fingerprint (hash do texto e da versão);
+o texto é pré-processado em trechos literais e campos {{nome}}, de modo que
+renderizar é apenas juntar os trechos com os valores, sem reinterpretar
+f-strings de vários KB a cada chamada. O fingerprint identifica o template
+nas chaves de cache no lugar do texto completo.
+Segue Single Responsibility Principle.
+"""
+
+import hashlib
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from services.story_prompts import (
+    BUSINESS_SYSTEM_PROMPT,
+    SPIKE_SYSTEM_PROMPT,
+    KAIZEN_SYSTEM_PROMPT,
+    FIX_SYSTEM_PROMPT,
+    BUSINESS_SECTION_SYSTEM_PROMPT,
+    BUSINESS_INPUT_TEMPLATE,
+    SPIKE_INPUT_TEMPLATE,
+    KAIZEN_INPUT_TEMPLATE,
+    FIX_INPUT_TEMPLATE,
+    FIX_IMAGES_TEMPLATE
+)
+
+
+# Campo de template: {{nome}}
+FIELD_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+# Templates embutidos (nome, versão, texto).
+# Incremente a versão ao alterar o texto de um template.
+BUILTIN_TEMPLATES = (
+    ("business_system", 2, BUSINESS_SYSTEM_PROMPT),
+    ("spike_system", 1, SPIKE_SYSTEM_PROMPT),
+    ("kaizen_system", 1, KAIZEN_SYSTEM_PROMPT),
+    ("fix_system", 1, FIX_SYSTEM_PROMPT),
+    ("business_section_system", 1, BUSINESS_SECTION_SYSTEM_PROMPT),
+    ("business_input", 1, BUSINESS_INPUT_TEMPLATE),
+    ("spike_input", 1, SPIKE_INPUT_TEMPLATE),
+    ("kaizen_input", 1, KAIZEN_INPUT_TEMPLATE),
+    ("fix_input", 1, FIX_INPUT_TEMPLATE),
+    ("fix_images", 1, FIX_IMAGES_TEMPLATE)
+)
+
+# Templates de sistema e de dados de cada Value Area
+VALUE_AREA_TEMPLATES = {
+    "Business": ("business_system", "business_input"),
+    "Spike": ("spike_system", "spike_input"),
+    "Kaizen": ("kaizen_system", "kaizen_input"),
+    "Fix/Bug/Incidente": ("fix_system", "fix_input")
+}
+
+
+class PromptTemplate:
+    """
+    Template compilado: trechos literais intercalados com campos.
+
+    Attributes:
+        name: Nome do template
+        version: Versão (incrementada a cada alteração do texto)
+        text: Texto original do template
+        fields: Campos esperados na renderização
+        fingerprint: Hash curto de nome, versão e texto
+    """
+
+    def __init__(self, name: str, version: int, text: str):
+        """
+        Compila o template.
+
+        Args:
+            name: Nome do template
+            version: Versão do template
+            text: Texto com campos no formato {{nome}}
+        """
+        self.name = name
+        self.version = version
+        self.text = text
+
+        # re.split alterna literal, campo, literal, ... (sempre começa e termina em literal)
+        pieces = FIELD_PATTERN.split(text)
+        self._literals: Tuple[str, ...] = tuple(pieces[0::2])
+        self._field_order: Tuple[str, ...] = tuple(pieces[1::2])
+        self.fields = frozenset(self._field_order)
+
+        digest = hashlib.sha256(f"{name}\n{version}\n{text}".encode("utf-8")).hexdigest()
+        self.fingerprint = digest[:16]
+
+    @property
+    def key(self) -> str:
+        """Identificador estável do template (nome, versão e fingerprint)."""
+        return f"{self.name}@v{self.version}:{self.fingerprint}"
+
+    def render(self, **values: Any) -> str:
+        """
+        Preenche os campos do template.
+
+        Args:
+            **values: Valor de cada campo (convertido com str)
+
+        Returns:
+            Texto renderizado
+
+        Raises:
+            ValueError: Se faltar valor para algum campo
+        """
+        if not self._field_order:
+            return self.text
+
+        missing = self.fields.difference(values)
+        if missing:
+            raise ValueError(
+                f"Campos ausentes no template '{self.name}': {', '.join(sorted(missing))}"
+            )
+
+        literals = self._literals
+        parts: List[str] = [literals[0]]
+        for index, field in enumerate(self._field_order, start=1):
+            parts.append(str(values[field]))
+            parts.append(literals[index])
+        return "".join(parts)
+
+
+class PromptTemplateRegistry:
+    """
+    Registro dos templates compilados do processo.
+    Também mapeia o texto de cada template estático para o seu identificador,
+    permitindo que chaves de cache referenciem o template em vez do texto.
+    """
+
+    def __init__(self):
+        """Inicializa o registro vazio."""
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._keys_by_text: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, version: int, text: str) -> PromptTemplate:
+        """
+        Compila e registra um template (substitui um de mesmo nome).
+
+        Args:
+            name: Nome do template
+            version: Versão do template
+            text: Texto com campos no formato {{nome}}
+
+        Returns:
+            Template compilado
+        """
+        template = PromptTemplate(name, version, text)
+
+        with self._lock:
+            previous = self._templates.get(name)
+            if previous is not None and not previous.fields:
+                self._keys_by_text.pop(previous.text, None)
+            self._templates[name] = template
+            if not template.fields:
+                self._keys_by_text[text] = template.key
+
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        """
+        Retorna um template compilado.
+
+        Args:
+            name: Nome do template
+
+        Returns:
+            Template compilado
+
+        Raises:
+            KeyError: Se o template não estiver registrado
+        """
+        try:
+            return self._templates[name]
+        except KeyError:
+            raise KeyError(f"Template de prompt não registrado: {name}")
+
+    def render(self, name: str, **values: Any) -> str:
+        """
+        Renderiza um template pelo nome.
+
+        Args:
+            name: Nome do template
+            **values: Valor de cada campo
+
+        Returns:
+            Texto renderizado
+        """
+        return self.get(name).render(**values)
+
+    def names(self) -> List[str]:
+        """Nomes dos templates registrados."""
+        return list(self._templates)
+
+    def key_for_text(self, text: str) -> Optional[str]:
+        """
+        Identificador do template estático com exatamente este texto.
+
+        Args:
+            text: Texto de um prompt de sistema
+
+        Returns:
+            Identificador (nome@versão:fingerprint) ou None se não for template
+        """
+        return self._keys_by_text.get(text)
+
+    def compact_system(self, system: Any) -> Any:
+        """
+        Substitui nos blocos de sistema o texto de templates conhecidos pelo
+        seu identificador. Usado nas chaves de cache: evita serializar e
+        hashear vários KB de instruções fixas por requisição, e uma nova
+        versão do template invalida as respostas antigas.
+
+        Args:
+            system: Prompt de sistema (texto ou lista de blocos)
+
+        Returns:
+            Prompt de sistema equivalente para fins de chave
+        """
+        if isinstance(system, str):
+            key = self.key_for_text(system)
+            return {"template": key} if key else system
+
+        if not isinstance(system, list):
+            return system
+
+        compacted = []
+        for block in system:
+            text = block.get("text") if isinstance(block, dict) else None
+            key = self.key_for_text(text) if isinstance(text, str) else None
+            if key:
+                block = {k: v for k, v in block.items() if k != "text"}
+                block["template"] = key
+            compacted.append(block)
+        return compacted
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna versão, fingerprint, campos e tamanho de cada template.
+
+        Returns:
+            Dict nome -> informações do template
+        """
+        return {
+            name: {
+                "version": template.version,
+                "fingerprint": template.fingerprint,
+                "fields": sorted(template.fields),
+                "chars": len(template.text)
+            }
+            for name, template in self._templates.items()
+        }
+
+
+_registry_instance: Optional[PromptTemplateRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_prompt_templates() -> PromptTemplateRegistry:
+    """
+    Retorna o registro de templates do processo (compilado sob demanda,
+    uma única vez, com os templates embutidos).
+
+    Returns:
+        PromptTemplateRegistry com os templates embutidos
+    """
+    global _registry_instance
+
+    with _registry_lock:
+        if _registry_instance is None:
+            registry = PromptTemplateRegistry()
+            for name, version, text in BUILTIN_TEMPLATES:
+                registry.register(name, version, text)
+            _registry_instance = registry
+
+    return _registry_instance
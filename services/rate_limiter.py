@@ -0,0 +1,314 @@
+"""
+Agendador de requisições ciente dos limites RPM/TPM da conta.
+Compartilhado por todas as sessões do processo: requisições acima do
+orçamento aguardam em fila (FIFO) em vez de falhar com 429.
+Segue Single Responsibility Principle.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import config
+
+
+# Aproximação de caracteres por token para textos em português
+CHARS_PER_TOKEN = 3.5
+
+# Estimativa de tokens por imagem enviada à API (imagem ~1000x1000 px)
+TOKENS_PER_IMAGE = 1600
+
+# Janela deslizante dos limites (segundos)
+WINDOW_SECONDS = 60.0
+
+
+class RateLimitQueueTimeout(Exception):
+    """Requisição esperou na fila além do tempo máximo permitido."""
+
+
+@dataclass(eq=False)
+class Reservation:
+    """
+    Orçamento reservado para uma requisição admitida.
+
+    Attributes:
+        admitted_at: Momento da admissão (time.monotonic)
+        tokens: Tokens reservados na janela
+    """
+
+    admitted_at: float
+    tokens: int
+
+
+class RateLimiter:
+    """
+    Controla admissão de requisições com janela deslizante de 60s.
+    Cada requisição reserva sua estimativa de tokens (entrada + max_tokens)
+    e a reserva é ajustada para o uso real quando a resposta chega.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_wait_seconds: float = 120.0
+    ):
+        """
+        Inicializa o agendador.
+
+        Args:
+            requests_per_minute: Orçamento de requisições por minuto
+            tokens_per_minute: Orçamento de tokens (entrada + saída) por minuto
+            max_wait_seconds: Tempo máximo de espera na fila
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_wait_seconds = max_wait_seconds
+
+        self._window: "deque[Reservation]" = deque()
+        self._tokens_in_window = 0
+        self._blocked_until = 0.0
+        self._next_ticket = 0
+        self._serving_ticket = 0
+        self._abandoned_tickets = set()
+        self._condition = threading.Condition()
+        self._stats = {
+            "admitted": 0,
+            "queued": 0,
+            "rate_limited": 0,
+            "queue_timeouts": 0,
+            "total_wait_seconds": 0.0
+        }
+
+    @staticmethod
+    def estimate_tokens(
+        messages: List[Dict[str, Any]],
+        max_tokens: int,
+        system: Any = None
+    ) -> int:
+        """
+        Estima tokens de uma requisição: entrada aproximada pelo tamanho
+        do texto, imagens por valor fixo e saída pelo max_tokens.
+
+        Args:
+            messages: Mensagens da requisição
+            max_tokens: Limite de tokens de saída
+            system: Prompt de sistema (opcional)
+
+        Returns:
+            Estimativa de tokens
+        """
+        images = 0
+        text_chars = 0
+
+        for block in RateLimiter._iter_blocks(messages):
+            if block.get("type") == "image":
+                images += 1
+            elif block.get("type") == "text":
+                text_chars += len(block.get("text", ""))
+
+        if system:
+            text_chars += len(system if isinstance(system, str) else json.dumps(system, ensure_ascii=False))
+
+        return int(text_chars / CHARS_PER_TOKEN) + images * TOKENS_PER_IMAGE + max_tokens
+
+    @staticmethod
+    def _iter_blocks(messages: List[Dict[str, Any]]):
+        """Normaliza conteúdo das mensagens em blocos tipados."""
+        for message in messages:
+            content = message.get("content", "")
+            if isinstance(content, str):
+                yield {"type": "text", "text": content}
+            else:
+                for block in content:
+                    yield block
+
+    def acquire(self, estimated_tokens: int) -> Reservation:
+        """
+        Aguarda (em ordem de chegada) até haver orçamento e reserva-o.
+
+        Args:
+            estimated_tokens: Tokens estimados da requisição
+
+        Returns:
+            Reserva a ser ajustada com release()
+
+        Raises:
+            RateLimitQueueTimeout: Se a espera exceder max_wait_seconds
+        """
+        # Requisições maiores que o orçamento inteiro são admitidas com a janela vazia
+        tokens = min(estimated_tokens, self.tokens_per_minute)
+        start = time.monotonic()
+        deadline = start + self.max_wait_seconds
+
+        with self._condition:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            queued = False
+
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._expire(now)
+
+                    if ticket == self._serving_ticket:
+                        wait = self._wait_time(now, tokens)
+                        if wait <= 0:
+                            break
+                    else:
+                        wait = WINDOW_SECONDS
+
+                    if now >= deadline:
+                        self._stats["queue_timeouts"] += 1
+                        raise RateLimitQueueTimeout(
+                            "Fila de requisições cheia. Tente novamente em instantes."
+                        )
+
+                    if not queued:
+                        queued = True
+                        self._stats["queued"] += 1
+
+                    self._condition.wait(timeout=min(wait, deadline - now))
+
+                reservation = Reservation(admitted_at=now, tokens=tokens)
+                self._window.append(reservation)
+                self._tokens_in_window += tokens
+                self._stats["admitted"] += 1
+                self._stats["total_wait_seconds"] += now - start
+                return reservation
+
+            finally:
+                # Libera a vez para o próximo da fila (admitido ou desistente)
+                if ticket == self._serving_ticket:
+                    self._serving_ticket += 1
+                else:
+                    self._abandoned_tickets.add(ticket)
+
+                # Pula tickets de quem desistiu enquanto aguardava
+                while self._serving_ticket in self._abandoned_tickets:
+                    self._abandoned_tickets.discard(self._serving_ticket)
+                    self._serving_ticket += 1
+
+                self._condition.notify_all()
+
+    def _wait_time(self, now: float, tokens: int) -> float:
+        """Calcula quanto falta para a requisição caber no orçamento."""
+        if now < self._blocked_until:
+            return self._blocked_until - now
+
+        waits = [0.0]
+
+        if len(self._window) >= self.requests_per_minute:
+            oldest = self._window[len(self._window) - self.requests_per_minute]
+            waits.append(oldest.admitted_at + WINDOW_SECONDS - now)
+
+        if self._tokens_in_window + tokens > self.tokens_per_minute:
+            # Tempo até reservas antigas liberarem tokens suficientes
+            freed = 0
+            needed = self._tokens_in_window + tokens - self.tokens_per_minute
+            for reservation in self._window:
+                freed += reservation.tokens
+                if freed >= needed:
+                    waits.append(reservation.admitted_at + WINDOW_SECONDS - now)
+                    break
+
+        return max(waits)
+
+    def _expire(self, now: float) -> None:
+        """Remove da janela reservas com mais de 60s."""
+        while self._window and self._window[0].admitted_at + WINDOW_SECONDS <= now:
+            self._tokens_in_window -= self._window.popleft().tokens
+
+    def release(self, reservation: Reservation, actual_tokens: Optional[int]) -> None:
+        """
+        Ajusta a reserva para o uso real informado pela API.
+
+        Args:
+            reservation: Reserva retornada por acquire()
+            actual_tokens: Tokens efetivamente consumidos (None mantém a estimativa)
+        """
+        if actual_tokens is None:
+            return
+
+        with self._condition:
+            if reservation in self._window:
+                self._tokens_in_window += actual_tokens - reservation.tokens
+                reservation.tokens = actual_tokens
+                self._condition.notify_all()
+
+    def penalize(self, retry_after_seconds: float) -> None:
+        """
+        Suspende novas admissões após um 429 (respeita retry-after).
+
+        Args:
+            retry_after_seconds: Tempo indicado pelo cabeçalho retry-after
+        """
+        with self._condition:
+            self._stats["rate_limited"] += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after_seconds)
+            self._condition.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores do agendador.
+
+        Returns:
+            Dict com admitidas, enfileiradas, 429 recebidos, uso atual da janela
+        """
+        with self._condition:
+            self._expire(time.monotonic())
+            stats = dict(self._stats)
+            stats["requests_in_window"] = len(self._window)
+            stats["tokens_in_window"] = self._tokens_in_window
+            stats["waiting"] = self._next_ticket - self._serving_ticket
+
+        return stats
+
+
+def retry_after_seconds(error: Exception, default: float) -> float:
+    """
+    Extrai o tempo de espera do cabeçalho retry-after de um erro 429.
+
+    Args:
+        error: Exceção da API (RateLimitError)
+        default: Valor usado quando o cabeçalho estiver ausente
+
+    Returns:
+        Segundos a aguardar
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+
+    try:
+        return max(float(headers.get("retry-after")), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+_limiter_instance: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Retorna o agendador compartilhado do processo (criado sob demanda).
+
+    Returns:
+        RateLimiter configurado ou None se o agendamento estiver desabilitado
+    """
+    global _limiter_instance
+
+    if not config.RATE_LIMIT_ENABLED:
+        return None
+
+    with _limiter_lock:
+        if _limiter_instance is None:
+            _limiter_instance = RateLimiter(
+                requests_per_minute=config.RATE_LIMIT_REQUESTS_PER_MINUTE,
+                tokens_per_minute=config.RATE_LIMIT_TOKENS_PER_MINUTE,
+                max_wait_seconds=config.RATE_LIMIT_MAX_WAIT_SECONDS
+            )
+
+    return _limiter_instance
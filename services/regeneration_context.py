@@ -0,0 +1,228 @@
+"""
+Seleção de contexto para regeneração de seções.
+Em vez de reenviar a história inteira, envia apenas as seções relevantes
+para as seções pedidas (ex: critérios de aceitação para cenários de teste)
+e um resumo de uma linha das demais. Referências de imagem viram texto.
+Também acumula a economia de tokens e a latência das regenerações.
+Segue Single Responsibility Principle.
+"""
+
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import config
+
+
+# Seções relevantes para cada seção regenerável (títulos normalizados, por prefixo).
+# Cobre os títulos de Business, Spike, Kaizen e Fix/Bug/Incidente.
+SECTION_RELEVANCE = {
+    "criterios": (
+        "contexto", "objetivo", "descricao do problema", "regras de negocio",
+        "apis e servicos", "especificacoes da api", "comportamento esperado",
+        "meta desejada", "criterios de sucesso", "criterios de aceitacao"
+    ),
+    "testes": (
+        "regras de negocio", "especificacoes da api", "criterios de aceitacao",
+        "passos para reproduzir", "comportamento esperado", "comportamento atual",
+        "cenarios de teste"
+    ),
+    "arquitetura": (
+        "contexto", "regras de negocio", "apis e servicos", "especificacoes da api",
+        "objetivos tecnicos", "analise tecnica", "plano de melhoria", "dependencias",
+        "estrutura tecnica"
+    ),
+    "beneficios": (
+        "contexto", "objetivo", "severidade e impacto", "meta desejada",
+        "impacto esperado", "beneficios"
+    )
+}
+
+# Seções sem conteúdo próprio (apenas separadores)
+SEPARATOR_SECTIONS = ("sessao tecnica",)
+
+# Referência de imagem no Markdown (image://<hash> ou data URI)
+IMAGE_PATTERN = re.compile(r'!\[([^\]]*)\]\((?:image://[0-9a-f]{64}|data:[^)]*)\)')
+
+# Título de seção ou subseção (### ou ####)
+HEADING_PATTERN = re.compile(r'^(#{3,4})\s+(.+?)\s*$', re.MULTILINE)
+
+
+def normalize_title(title: str) -> str:
+    """Título sem acentos, em minúsculas e sem espaços extras."""
+    text = unicodedata.normalize("NFKD", title)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(text.lower().split())
+
+
+class RegenerationContext:
+    """
+    Monta o contexto mínimo das regenerações e acumula a economia obtida.
+    """
+
+    def __init__(self, summary_chars: int = 160):
+        """
+        Inicializa o seletor.
+
+        Args:
+            summary_chars: Tamanho máximo do resumo de cada seção não relevante
+        """
+        self.summary_chars = summary_chars
+        self._lock = threading.Lock()
+        self._stats = {
+            "regenerations": 0,
+            "full_input_tokens": 0,
+            "input_tokens": 0,
+            "saved_tokens": 0,
+            "seconds": 0.0
+        }
+
+    @staticmethod
+    def split_sections(markdown_text: str) -> Tuple[str, List[Tuple[str, str, str]]]:
+        """
+        Divide a história em cabeçalho e seções (### e ####).
+
+        Args:
+            markdown_text: História em Markdown
+
+        Returns:
+            Tupla (texto antes da primeira seção, lista de (marcador, título, conteúdo))
+        """
+        matches = list(HEADING_PATTERN.finditer(markdown_text))
+        if not matches:
+            return markdown_text.strip(), []
+
+        head = markdown_text[:matches[0].start()].strip()
+        sections = []
+        for index, match in enumerate(matches):
+            end = matches[index + 1].start() if index + 1 < len(matches) else len(markdown_text)
+            content = markdown_text[match.end():end].strip()
+            # Separador horizontal que antecede a próxima seção não faz parte do conteúdo
+            if content.endswith("---"):
+                content = content[:-3].rstrip()
+            sections.append((match.group(1), match.group(2), content))
+
+        return head, sections
+
+    def select(self, markdown_text: str, section_names: Iterable[str]) -> Optional[Dict[str, str]]:
+        """
+        Separa a história em seções relevantes (texto integral) e resumo das demais.
+
+        Args:
+            markdown_text: História em Markdown
+            section_names: Seções a regenerar ("criterios", "testes", ...)
+
+        Returns:
+            Dict com "title", "relevant" e "summary", ou None se a história não
+            tiver seções reconhecíveis (o chamador envia a história inteira)
+        """
+        head, sections = self.split_sections(markdown_text or "")
+        if not sections:
+            return None
+
+        prefixes = tuple(
+            prefix
+            for name in section_names
+            for prefix in SECTION_RELEVANCE.get(name, (normalize_title(name),))
+        )
+
+        relevant: List[str] = []
+        summary: List[str] = []
+        for marker, title, content in sections:
+            normalized = normalize_title(title)
+            if normalized.startswith(SEPARATOR_SECTIONS):
+                continue
+            content = IMAGE_PATTERN.sub(lambda match: f"[imagem: {match.group(1) or 'anexo'}]", content)
+            if normalized.startswith(prefixes):
+                relevant.append(f"{marker} {title}\n\n{content}".strip())
+            else:
+                summary.append(f"- {title}: {self._summarize(content)}")
+
+        title_match = re.search(r'^##\s+(.+)$', head, re.MULTILINE)
+
+        return {
+            "title": title_match.group(1).strip() if title_match else "",
+            "relevant": "\n\n".join(relevant),
+            "summary": "\n".join(summary)
+        }
+
+    def _summarize(self, content: str) -> str:
+        """Primeira linha útil da seção (truncada) e quantidade de itens."""
+        lines = [line.strip() for line in content.splitlines() if line.strip() and line.strip() != "```"]
+        if not lines:
+            return "(vazia)"
+
+        first = re.sub(r'^(?:[-*]|\d+\.)\s+', '', lines[0]).replace("**", "")
+        if len(first) > self.summary_chars:
+            first = first[:self.summary_chars].rstrip() + "..."
+
+        items = sum(1 for line in lines if re.match(r'^(?:[-*]|\d+\.)\s+', line))
+        return f"{first} ({items} itens)" if items > 1 else first
+
+    def record(self, full_input_tokens: int, input_tokens: int, seconds: float) -> Dict[str, Any]:
+        """
+        Registra uma regeneração concluída.
+
+        Args:
+            full_input_tokens: Tokens do prompt com a história inteira
+            input_tokens: Tokens do prompt enviado
+            seconds: Latência da regeneração
+
+        Returns:
+            Dict com tokens, economia e latência desta regeneração
+        """
+        saved = max(full_input_tokens - input_tokens, 0)
+
+        with self._lock:
+            self._stats["regenerations"] += 1
+            self._stats["full_input_tokens"] += full_input_tokens
+            self._stats["input_tokens"] += input_tokens
+            self._stats["saved_tokens"] += saved
+            self._stats["seconds"] += seconds
+
+        return {
+            "full_input_tokens": full_input_tokens,
+            "input_tokens": input_tokens,
+            "saved_tokens": saved,
+            "saved_ratio": round(saved / full_input_tokens, 3) if full_input_tokens else 0.0,
+            "seconds": round(seconds, 2)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna a economia acumulada das regenerações.
+
+        Returns:
+            Dict com regenerações, tokens (integral, enviado, economizado),
+            fração economizada e latência média
+        """
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+
+        count = stats["regenerations"]
+        stats["saved_ratio"] = round(stats["saved_tokens"] / stats["full_input_tokens"], 3) if stats["full_input_tokens"] else 0.0
+        stats["mean_seconds"] = round(stats.pop("seconds") / count, 2) if count else 0.0
+        return stats
+
+
+_context_instance: Optional[RegenerationContext] = None
+_context_lock = threading.Lock()
+
+
+def get_regeneration_context() -> Optional[RegenerationContext]:
+    """
+    Retorna o seletor de contexto compartilhado do processo (criado sob demanda).
+
+    Returns:
+        RegenerationContext configurado ou None se desabilitado
+    """
+    global _context_instance
+
+    if not config.REGENERATION_MINIMAL_CONTEXT:
+        return None
+
+    with _context_lock:
+        if _context_instance is None:
+            _context_instance = RegenerationContext(summary_chars=config.REGENERATION_SUMMARY_CHARS)
+
+    return _context_instance
@@ -0,0 +1,314 @@
+"""
+Requisições hedged para reduzir a latência de cauda.
+Quando a primeira tentativa não entrega resposta (ou primeiro token) dentro
+de um percentil da latência observada, uma segunda requisição idêntica é
+disparada; a primeira a concluir vence e a outra é cancelada.
+Segue Single Responsibility Principle.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Generator, List, Optional
+import config
+
+
+# Tentativa: recebe o token de cancelamento e o callback de texto; retorna a mensagem final
+Attempt = Callable[["CancelToken", Callable[[str], None]], Any]
+
+# Critérios de vitória
+FIRST_TOKEN = "first_token"
+COMPLETE = "complete"
+
+
+class CancelToken:
+    """
+    Sinal de cancelamento de uma tentativa.
+    A tentativa registra callbacks (ex: fechar o stream HTTP) que são
+    executados no cancelamento, interrompendo inclusive leituras bloqueadas.
+    """
+
+    def __init__(self):
+        """Inicializa o token não cancelado."""
+        self._event = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def is_set(self) -> bool:
+        """Indica se a tentativa foi cancelada."""
+        return self._event.is_set()
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Registra ação de cancelamento (executada já, se cancelado).
+
+        Args:
+            callback: Função sem argumentos
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        self._run(callback)
+
+    def set(self) -> None:
+        """Cancela a tentativa e executa os callbacks registrados."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            self._run(callback)
+
+    @staticmethod
+    def _run(callback: Callable[[], None]) -> None:
+        """Executa callback ignorando erros (a tentativa já foi descartada)."""
+        try:
+            callback()
+        except Exception:
+            pass
+
+
+class RequestHedger:
+    """
+    Mantém histórico de latência por chave (operação/categoria/modo)
+    e coordena tentativas concorrentes de uma mesma requisição.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.9,
+        min_samples: int = 10,
+        default_delay_seconds: float = 8.0,
+        min_delay_seconds: float = 1.0,
+        history_size: int = 200
+    ):
+        """
+        Inicializa o hedger.
+
+        Args:
+            percentile: Percentil da latência observada que dispara o hedge
+            min_samples: Amostras mínimas para usar o histórico
+            default_delay_seconds: Atraso do hedge antes de haver histórico
+            min_delay_seconds: Menor atraso permitido
+            history_size: Latências mantidas por chave
+        """
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_delay_seconds = default_delay_seconds
+        self.min_delay_seconds = min_delay_seconds
+        self.history_size = history_size
+
+        self._latencies: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "hedged": 0,
+            "primary_wins": 0,
+            "hedge_wins": 0,
+            "failures": 0,
+            "extra_input_tokens": 0,
+            "wasted_output_chars": 0
+        }
+
+    def hedge_delay(self, key: str) -> float:
+        """
+        Tempo de espera antes de disparar a segunda tentativa.
+
+        Args:
+            key: Chave do histórico (ex: "generate_story:Spike:first_token")
+
+        Returns:
+            Percentil da latência observada ou o atraso padrão
+        """
+        with self._lock:
+            samples = sorted(self._latencies.get(key, []))
+
+        if len(samples) < self.min_samples:
+            return self.default_delay_seconds
+
+        index = min(int(len(samples) * self.percentile), len(samples) - 1)
+        return max(samples[index], self.min_delay_seconds)
+
+    def observe(self, key: str, latency: float) -> None:
+        """
+        Registra latência observada (até o primeiro token ou a conclusão).
+
+        Args:
+            key: Chave do histórico
+            latency: Latência em segundos
+        """
+        with self._lock:
+            history = self._latencies.setdefault(key, deque(maxlen=self.history_size))
+            history.append(latency)
+
+    def run(
+        self,
+        attempt: Attempt,
+        key: str,
+        wins_on: str = FIRST_TOKEN,
+        request_tokens: int = 0
+    ) -> Generator[str, None, Any]:
+        """
+        Executa a requisição com hedge.
+        Gerador: produz os trechos de texto da tentativa vencedora e
+        retorna (StopIteration.value) a mensagem final dela.
+
+        - FIRST_TOKEN: vence quem entregar o primeiro trecho (streaming)
+        - COMPLETE: vence quem concluir primeiro (resposta completa)
+
+        Args:
+            attempt: Função que executa uma tentativa (ver Attempt)
+            key: Chave do histórico de latência
+            wins_on: Critério de vitória (FIRST_TOKEN ou COMPLETE)
+            request_tokens: Tokens de entrada estimados (custo extra do hedge)
+
+        Returns:
+            Mensagem final da tentativa vencedora
+
+        Raises:
+            Exception: Erro da tentativa principal se todas falharem
+        """
+        events: "queue.Queue[tuple]" = queue.Queue()
+        cancels: List[CancelToken] = []
+        emitted_chars = [0, 0]
+
+        def start(index: int) -> None:
+            cancel = CancelToken()
+            cancels.append(cancel)
+
+            def emit(text: str) -> None:
+                emitted_chars[index] += len(text)
+                events.put(("text", index, text))
+
+            def target() -> None:
+                try:
+                    events.put(("done", index, attempt(cancel, emit)))
+                except Exception as e:
+                    events.put(("error", index, e))
+
+            threading.Thread(target=target, name=f"hedge-{index}", daemon=True).start()
+
+        with self._lock:
+            self._stats["requests"] += 1
+
+        started = time.monotonic()
+        delay = self.hedge_delay(key)
+        start(0)
+
+        winner: Optional[int] = None
+        pending: Dict[int, List[str]] = {0: [], 1: []}
+        errors: Dict[int, Exception] = {}
+
+        try:
+            while True:
+                wait = None
+                if winner is None and len(cancels) == 1:
+                    wait = started + delay - time.monotonic()
+                try:
+                    kind, index, payload = events.get(timeout=max(wait, 0) if wait is not None else None)
+                except queue.Empty:
+                    # Sem resposta dentro do percentil: dispara a segunda tentativa
+                    start(1)
+                    with self._lock:
+                        self._stats["hedged"] += 1
+                        self._stats["extra_input_tokens"] += request_tokens
+                    continue
+
+                if winner is not None and index != winner:
+                    continue
+
+                if kind == "error":
+                    errors[index] = payload
+                    if winner is not None or len(errors) == len(cancels):
+                        with self._lock:
+                            self._stats["failures"] += 1
+                        raise payload if winner is not None else errors[0]
+                    continue
+
+                if winner is None and (kind == "done" or wins_on == FIRST_TOKEN):
+                    winner = index
+                    self._declare_winner(index, cancels, key, time.monotonic() - started)
+                    for text in pending[index]:
+                        yield text
+
+                if kind == "text":
+                    if winner is None:
+                        pending[index].append(payload)
+                    else:
+                        yield payload
+                    continue
+
+                return payload
+
+        finally:
+            for cancel in cancels:
+                cancel.set()
+            if winner is not None and len(cancels) > 1:
+                with self._lock:
+                    self._stats["wasted_output_chars"] += emitted_chars[1 - winner]
+
+    def _declare_winner(self, index: int, cancels: List[CancelToken], key: str, latency: float) -> None:
+        """Cancela as demais tentativas e registra estatísticas da vitória."""
+        for other, cancel in enumerate(cancels):
+            if other != index:
+                cancel.set()
+
+        self.observe(key, latency)
+        with self._lock:
+            self._stats["hedge_wins" if index == 1 else "primary_wins"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores de hedge (taxa de disparo e vitórias).
+
+        Returns:
+            Dict com requisições, hedges disparados, vitórias e custo extra estimado
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["delays"] = {
+                key: round(self._percentile_of(values), 2)
+                for key, values in self._latencies.items()
+                if len(values) >= self.min_samples
+            }
+
+        stats["hedge_rate"] = round(stats["hedged"] / stats["requests"], 3) if stats["requests"] else 0.0
+        stats["hedge_win_rate"] = round(stats["hedge_wins"] / stats["hedged"], 3) if stats["hedged"] else 0.0
+        return stats
+
+    def _percentile_of(self, values: deque) -> float:
+        """Percentil configurado de uma série de latências."""
+        samples = sorted(values)
+        return samples[min(int(len(samples) * self.percentile), len(samples) - 1)]
+
+
+_hedger_instance: Optional[RequestHedger] = None
+_hedger_lock = threading.Lock()
+
+
+def get_request_hedger() -> Optional[RequestHedger]:
+    """
+    Retorna o hedger compartilhado do processo (criado sob demanda).
+
+    Returns:
+        RequestHedger configurado ou None se o hedge estiver desabilitado
+    """
+    global _hedger_instance
+
+    if not config.HEDGE_ENABLED:
+        return None
+
+    with _hedger_lock:
+        if _hedger_instance is None:
+            _hedger_instance = RequestHedger(
+                percentile=config.HEDGE_PERCENTILE,
+                min_samples=config.HEDGE_MIN_SAMPLES,
+                default_delay_seconds=config.HEDGE_DEFAULT_DELAY_SECONDS,
+                min_delay_seconds=config.HEDGE_MIN_DELAY_SECONDS
+            )
+
+    return _hedger_instance
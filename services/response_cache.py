@@ -0,0 +1,271 @@
+"""
+Cache de respostas da IA endereçado por conteúdo.
+Dois níveis: LRU em memória na frente de um armazenamento SQLite local.
+Segue Single Responsibility Principle.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import config
+
+
+class ResponseCache:
+    """
+    Cache de duas camadas para respostas da Claude API.
+    Chaves são hashes de modelo e prompt (incluindo hash das imagens).
+    Implementa expiração por TTL e remoção por tamanho (LRU).
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        ttl_seconds: int = 86400,
+        memory_max_entries: int = 256,
+        disk_max_entries: int = 5000
+    ):
+        """
+        Inicializa o cache e cria a tabela SQLite se necessário.
+
+        Args:
+            db_path: Caminho do arquivo SQLite
+            ttl_seconds: Tempo de vida das entradas em segundos
+            memory_max_entries: Máximo de entradas no LRU em memória
+            disk_max_entries: Máximo de entradas no SQLite
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.memory_max_entries = memory_max_entries
+        self.disk_max_entries = disk_max_entries
+
+        self._memory: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0
+        }
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        messages: List[Dict[str, Any]],
+        system: Any = None,
+        tools: Any = None,
+        backend: str = "anthropic"
+    ) -> str:
+        """
+        Calcula a chave de cache de uma requisição.
+        Dados base64 de imagens são substituídos pelo seu hash SHA-256.
+        O backend entra na chave: respostas do backend fake nunca são
+        servidas como respostas do modelo real.
+
+        Args:
+            model: Modelo utilizado
+            messages: Mensagens da requisição
+            system: Prompt de sistema (opcional)
+            tools: Ferramentas da requisição (opcional)
+            backend: Backend de LLM que produziu a resposta ("anthropic", "fake")
+
+        Returns:
+            Hash SHA-256 hexadecimal
+        """
+        payload = {
+            "backend": backend,
+            "model": model,
+            "system": system,
+            "messages": ResponseCache._hash_images(messages)
+        }
+        if tools:
+            payload["tools"] = tools
+        canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _hash_images(value: Any) -> Any:
+        """Substitui recursivamente blocos de imagem base64 pelo hash dos dados."""
+        if isinstance(value, list):
+            return [ResponseCache._hash_images(item) for item in value]
+
+        if isinstance(value, dict):
+            source = value.get("source")
+            if value.get("type") == "image" and isinstance(source, dict):
+                data = source.get("data", "")
+                return {
+                    "type": "image",
+                    "media_type": source.get("media_type"),
+                    "sha256": hashlib.sha256(data.encode("utf-8")).hexdigest()
+                }
+            return {k: ResponseCache._hash_images(v) for k, v in value.items()}
+
+        return value
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Busca resposta no cache (memória e depois SQLite).
+
+        Args:
+            key: Chave calculada por make_key
+
+        Returns:
+            Texto da resposta ou None se ausente/expirada
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self._stats["misses"] += 1
+                return None
+
+            value, expires_at = row
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                (now, key)
+            )
+            self._conn.commit()
+            self._remember(key, value, expires_at)
+            self._stats["disk_hits"] += 1
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Armazena resposta nas duas camadas.
+
+        Args:
+            key: Chave calculada por make_key
+            value: Texto da resposta
+        """
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now)
+            )
+            self._stats["writes"] += 1
+            self._evict_disk(now)
+            self._conn.commit()
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        """Insere no LRU em memória respeitando o limite de entradas."""
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _evict_disk(self, now: float) -> None:
+        """Remove entradas expiradas e as menos acessadas acima do limite."""
+        cursor = self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        self._stats["evictions"] += max(cursor.rowcount, 0)
+
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = count - self.disk_max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,)
+            )
+            self._stats["evictions"] += excess
+
+    def clear(self) -> None:
+        """Remove todas as entradas das duas camadas."""
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores de uso do cache.
+
+        Returns:
+            Dict com hits por camada, misses, escritas, remoções e taxa de acerto
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"] = self._conn.execute(
+                "SELECT COUNT(*) FROM responses"
+            ).fetchone()[0]
+
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        total = hits + stats["misses"]
+        stats["hit_rate"] = hits / total if total else 0.0
+        return stats
+
+
+_cache_instance: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Retorna o cache compartilhado do processo (criado sob demanda).
+
+    Returns:
+        ResponseCache configurado ou None se o cache estiver desabilitado
+    """
+    global _cache_instance
+
+    if not config.CACHE_ENABLED:
+        return None
+
+    with _cache_lock:
+        if _cache_instance is None:
+            _cache_instance = ResponseCache(
+                db_path=config.CACHE_DB_PATH,
+                ttl_seconds=config.CACHE_TTL_SECONDS,
+                memory_max_entries=config.CACHE_MEMORY_MAX_ENTRIES,
+                disk_max_entries=config.CACHE_DISK_MAX_ENTRIES
+            )
+
+    return _cache_instance
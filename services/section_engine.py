@@ -0,0 +1,234 @@
+"""
+Motor de geração por seções para histórias Business.
+Em vez de uma única chamada que escreve todas as seções em sequência,
+as seções independentes são pedidas em paralelo (prompts menores que
+compartilham o mesmo <input_data>); título, regras de negócio e complexidade
+são montados localmente. O tempo total fica limitado pela seção mais longa.
+Segue Single Responsibility Principle.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
+from services.story_prompts import BUSINESS_SECTION_INSTRUCTIONS
+
+if TYPE_CHECKING:
+    from services.ai_service import AIService
+
+
+# Operação registrada no orçamento de tokens e no uso (categoria = chave da seção)
+SECTION_OPERATION = "generate_section"
+
+
+@dataclass(frozen=True)
+class SectionSpec:
+    """
+    Trecho da história gerado pela IA.
+
+    Attributes:
+        key: Identificador (categoria no orçamento e instruções)
+        headings: Títulos ### que o trecho deve conter, em ordem
+        with_declaration: Se o trecho abre com a declaração Como/Quero/Para que
+    """
+
+    key: str
+    headings: tuple
+    with_declaration: bool = False
+
+
+# Trechos gerados pela IA (ordem de mandatory_structure)
+BUSINESS_SECTIONS = {
+    "abertura": SectionSpec("abertura", ("Contexto", "Objetivo"), with_declaration=True),
+    "apis": SectionSpec("apis", ("APIs e Servicos Necessarios",)),
+    "objetivos_tecnicos": SectionSpec("objetivos_tecnicos", ("Objetivos Tecnicos",)),
+    "criterios": SectionSpec("criterios", ("Criterios de Aceitacao",)),
+    "cenarios": SectionSpec("cenarios", ("Cenarios de Teste Sugeridos",)),
+    "dependencias": SectionSpec("dependencias", ("Dependencias",))
+}
+
+
+class SectionStoryEngine:
+    """
+    Gera histórias Business seção a seção, com as chamadas em paralelo.
+    Usa o AIService para cada seção (cache, orçamento, rate limiter e backend).
+    """
+
+    def __init__(self, ai_service: "AIService", max_workers: int = 6):
+        """
+        Inicializa o motor.
+
+        Args:
+            ai_service: Service usado nas requisições de cada seção
+            max_workers: Seções geradas simultaneamente
+        """
+        self.ai_service = ai_service
+        self.max_workers = max_workers
+
+    def generate(
+        self,
+        prompt: str,
+        titulo: str,
+        regras_negocio: List[str],
+        complexidade: int,
+        form_data: Optional[Dict] = None
+    ) -> Tuple[str, str]:
+        """
+        Gera a história completa.
+
+        Args:
+            prompt: Prompt da geração monolítica (fonte do <input_data>)
+            titulo: Título da história
+            regras_negocio: Regras de negócio (renderizadas literalmente)
+            complexidade: Pontos de complexidade
+            form_data: Dados do formulário (dependências)
+
+        Returns:
+            Tupla (história em Markdown, modelos que geraram as seções)
+
+        Raises:
+            Exception: Erro da primeira seção que falhar
+        """
+        parts: List[str] = []
+        stream = self.generate_stream(prompt, titulo, regras_negocio, complexidade, form_data)
+        while True:
+            try:
+                parts.append(next(stream))
+            except StopIteration as stop:
+                return "".join(parts), stop.value
+
+    def generate_stream(
+        self,
+        prompt: str,
+        titulo: str,
+        regras_negocio: List[str],
+        complexidade: int,
+        form_data: Optional[Dict] = None
+    ) -> Iterator[str]:
+        """
+        Gera a história entregando as partes na ordem final.
+        Cada parte é produzida assim que ela e todas as anteriores estiverem prontas.
+
+        Args:
+            Mesmos argumentos de generate
+
+        Yields:
+            Partes da história em Markdown (na ordem de mandatory_structure)
+
+        Returns:
+            Modelos que geraram as seções, separados por vírgula
+            (valor de retorno do gerador)
+
+        Raises:
+            Exception: Erro da primeira seção que falhar
+        """
+        form_data = form_data or {}
+        input_data = self._input_data(prompt)
+        system = self.ai_service._build_system_blocks(
+            self.ai_service.prompt_templates.get("business_section_system").text
+        )
+
+        keys = ["abertura", "apis", "objetivos_tecnicos", "criterios", "cenarios"]
+        if form_data.get("has_dependencies") and form_data.get("dependencies"):
+            keys.append("dependencias")
+
+        usage: Dict[str, Dict[str, int]] = {}
+        models: Dict[str, str] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="story-section") as executor:
+            futures = {
+                key: executor.submit(self._generate_section, BUSINESS_SECTIONS[key], input_data, system, usage, models)
+                for key in keys
+            }
+
+            try:
+                parts = self._layout(titulo, regras_negocio, complexidade, futures)
+                for index, part in enumerate(parts):
+                    text = part.result() if isinstance(part, Future) else part
+                    yield ("\n\n" if index else "") + text
+            finally:
+                # Falha ou abandono do stream: descarta as seções ainda não iniciadas
+                for future in futures.values():
+                    future.cancel()
+
+        model = ", ".join(dict.fromkeys(models[key] for key in keys if key in models))
+        self._record_usage(usage, model)
+        return model
+
+    def _layout(
+        self,
+        titulo: str,
+        regras_negocio: List[str],
+        complexidade: int,
+        futures: Dict[str, Future]
+    ) -> List[Union[str, Future]]:
+        """Partes da história em ordem: texto local ou Future da seção."""
+        regras = "\n".join(f"- {regra}" for regra in regras_negocio if regra.strip())
+
+        parts: List[Union[str, Future]] = [
+            f"## {titulo}",
+            futures["abertura"],
+            f"### Regras de Negocio\n\n{regras or '- Nenhuma regra de negócio informada'}",
+            "---\n\n### Sessão Técnica",
+            futures["apis"],
+            futures["objetivos_tecnicos"],
+            futures["criterios"],
+            futures["cenarios"]
+        ]
+        if "dependencias" in futures:
+            parts.append(futures["dependencias"])
+        parts.append(f"### Complexidade\n\nPontos: {complexidade}")
+
+        return parts
+
+    def _generate_section(
+        self,
+        spec: SectionSpec,
+        input_data: str,
+        system: List[Dict],
+        usage: Dict[str, Dict[str, int]],
+        models: Dict[str, str]
+    ) -> str:
+        """Requisição de um trecho (executada no pool)."""
+        usage_key = f"{SECTION_OPERATION}:{spec.key}"
+        text, models[spec.key] = self.ai_service._request_text_with_model(
+            messages=[{"role": "user", "content": self._section_prompt(spec, input_data)}],
+            system=system,
+            operation=SECTION_OPERATION,
+            category=spec.key,
+            usage_key=usage_key
+        )
+        usage[spec.key] = self.ai_service.get_last_usage(usage_key)
+        return text.strip()
+
+    @staticmethod
+    def _section_prompt(spec: SectionSpec, input_data: str) -> str:
+        """Prompt de um trecho: <input_data> compartilhado + tarefa da seção."""
+        headings = ", ".join(f'"### {heading}"' for heading in spec.headings)
+        noun = "a seção" if len(spec.headings) == 1 else "as seções"
+
+        lines = [f"Gere APENAS {noun} {headings} da história, nesta ordem."]
+        if spec.with_declaration:
+            lines.append(
+                "Comece pela declaração de objetivo em um único parágrafo, antes das seções:\n"
+                "**Como** [persona], **quero** [ação], **para que** [benefício]."
+            )
+        lines.append(BUSINESS_SECTION_INSTRUCTIONS[spec.key].strip())
+        lines.append("As demais seções são geradas separadamente: não as inclua.")
+
+        return f"{input_data}\n\n<section_task>\n" + "\n".join(lines) + "\n</section_task>"
+
+    @staticmethod
+    def _input_data(prompt: str) -> str:
+        """Bloco <input_data> do prompt monolítico (sem a instrução final)."""
+        head, marker, _ = prompt.rpartition("</input_data>")
+        return (head + marker).strip() if marker else prompt.strip()
+
+    def _record_usage(self, usage: Dict[str, Dict[str, int]], model: str) -> None:
+        """Soma o uso das seções em "generate_story" e registra os modelos usados."""
+        total: Dict[str, int] = {}
+        for section_usage in usage.values():
+            for name, value in section_usage.items():
+                total[name] = total.get(name, 0) + value
+
+        self.ai_service.last_usage["generate_story"] = total
+        self.ai_service._record_model("generate_story", model)
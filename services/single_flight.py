@@ -0,0 +1,234 @@
+"""
+Single-flight de requisições à IA.
+Requisições idênticas (mesma impressão digital) feitas enquanto a primeira
+ainda está em andamento — reruns do Streamlit, cliques duplos, duas abas na
+mesma história — se anexam a ela em vez de gerar novas chamadas à API.
+Segue Single Responsibility Principle.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+import config
+
+T = TypeVar("T")
+
+
+class FlightAbandoned(Exception):
+    """Voo interrompido porque todos os chamadores desistiram dele."""
+
+
+class Flight:
+    """
+    Requisição em andamento compartilhada por todos os chamadores.
+    Executa em thread própria (independente de quem a iniciou) e guarda
+    os trechos (e o valor de retorno da requisição) para que cada chamador
+    os receba desde o início.
+    Se todos os chamadores abandonarem a leitura, a requisição é interrompida.
+    """
+
+    def __init__(self, key: str):
+        """
+        Inicializa o voo.
+
+        Args:
+            key: Impressão digital da requisição
+        """
+        self.key = key
+        self.chunks: List[str] = []
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+        self.done = False
+        self.abandoned = False
+        self._readers = 0
+        self._condition = threading.Condition()
+
+    def attach(self) -> None:
+        """Registra um chamador (chamado pelo SingleFlight sob lock)."""
+        with self._condition:
+            self._readers += 1
+
+    def run(self, start: Callable[[], Iterator[str]], on_finish: Callable[["Flight"], None]) -> None:
+        """
+        Consome a requisição (executado na thread do voo).
+
+        Args:
+            start: Função que inicia a requisição e produz os trechos
+                (o valor de retorno do gerador é repassado aos chamadores)
+            on_finish: Callback de encerramento (remove o voo do registro)
+        """
+        stream = None
+        try:
+            stream = start()
+            while True:
+                try:
+                    chunk = next(stream)
+                except StopIteration as stop:
+                    self.result = stop.value
+                    break
+                with self._condition:
+                    if self.abandoned:
+                        break
+                    self.chunks.append(chunk)
+                    self._condition.notify_all()
+            if self.abandoned:
+                raise FlightAbandoned("Requisição abandonada por todos os chamadores")
+        except Exception as e:
+            self.error = e
+        finally:
+            if self.abandoned and stream is not None and hasattr(stream, "close"):
+                # Fecha o stream HTTP da requisição que ninguém mais aguarda
+                stream.close()
+            # Sai do registro antes de acordar os chamadores: novas requisições
+            # idênticas passam a consultar o cache de respostas
+            on_finish(self)
+            with self._condition:
+                self.done = True
+                self._condition.notify_all()
+
+    def follow(self) -> Iterator[str]:
+        """
+        Produz os trechos já recebidos e acompanha os próximos até o fim.
+
+        Yields:
+            Trechos da resposta
+
+        Returns:
+            Valor de retorno da requisição (ex: modelo que a atendeu)
+
+        Raises:
+            Exception: Erro da requisição compartilhada
+        """
+        index = 0
+        try:
+            while True:
+                with self._condition:
+                    while index >= len(self.chunks) and not self.done:
+                        self._condition.wait()
+                    pending = self.chunks[index:]
+                    finished = self.done
+
+                for chunk in pending:
+                    yield chunk
+                index += len(pending)
+
+                if finished and index >= len(self.chunks):
+                    break
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if self._readers == 0 and not self.done:
+                    self.abandoned = True
+
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """
+    Registro dos voos em andamento do processo, por impressão digital.
+    """
+
+    def __init__(self):
+        """Inicializa o registro vazio."""
+        self._flights: Dict[str, Flight] = {}
+        self._lock = threading.Lock()
+        self._stats = {"flights": 0, "coalesced": 0, "failed": 0, "abandoned": 0}
+
+    def stream(self, key: str, start: Callable[[], Iterator[str]]) -> Tuple[Iterator[str], bool]:
+        """
+        Executa (ou se anexa a) uma requisição em streaming.
+
+        Args:
+            key: Impressão digital da requisição
+            start: Função que inicia a requisição (chamada só pelo primeiro)
+
+        Returns:
+            Tupla (gerador de trechos, True se anexou a um voo existente);
+            o gerador retorna o valor de retorno de start
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            coalesced = flight is not None and not flight.abandoned
+
+            if coalesced:
+                self._stats["coalesced"] += 1
+            else:
+                flight = Flight(key)
+                self._flights[key] = flight
+                self._stats["flights"] += 1
+
+            flight.attach()
+
+        if not coalesced:
+            threading.Thread(
+                target=flight.run,
+                args=(start, self._finish),
+                name="single-flight",
+                daemon=True
+            ).start()
+
+        return flight.follow(), coalesced
+
+    def call(self, key: str, fetch: Callable[[], T]) -> Tuple[T, bool]:
+        """
+        Executa (ou se anexa a) uma requisição de resposta completa.
+
+        Args:
+            key: Impressão digital da requisição
+            fetch: Função que faz a requisição e retorna o resultado
+                (ex: texto e modelo), compartilhado com os chamadores anexados
+
+        Returns:
+            Tupla (resultado de fetch, True se anexou a um voo existente)
+        """
+        results, coalesced = self.stream(key, lambda: iter([fetch()]))
+        return list(results)[0], coalesced
+
+    def _finish(self, flight: Flight) -> None:
+        """Remove o voo concluído do registro."""
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+            if flight.abandoned:
+                self._stats["abandoned"] += 1
+            elif flight.error is not None:
+                self._stats["failed"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores de coalescência.
+
+        Returns:
+            Dict com voos iniciados, requisições coalescidas e voos em andamento
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._flights)
+
+        total = stats["flights"] + stats["coalesced"]
+        stats["coalesced_rate"] = round(stats["coalesced"] / total, 3) if total else 0.0
+        return stats
+
+
+_single_flight_instance: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """
+    Retorna o registro compartilhado do processo (criado sob demanda).
+
+    Returns:
+        SingleFlight ou None se a coalescência estiver desabilitada
+    """
+    global _single_flight_instance
+
+    if not config.SINGLE_FLIGHT_ENABLED:
+        return None
+
+    with _single_flight_lock:
+        if _single_flight_instance is None:
+            _single_flight_instance = SingleFlight()
+
+    return _single_flight_instance
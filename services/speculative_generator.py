@@ -0,0 +1,299 @@
+"""
+Pré-geração especulativa de histórias.
+Enquanto o formulário está completo e parado (debounce), a geração começa em
+background para aqueles dados; no envio, uma especulação com os mesmos dados
+(em andamento ou concluída) é reaproveitada e as desatualizadas são canceladas.
+Segue Single Responsibility Principle.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import config
+
+
+class Speculation:
+    """
+    Geração em background de uma versão do formulário.
+    Os trechos (e o modelo que os gerou) ficam guardados para serem
+    reproduzidos no envio, inclusive enquanto a geração ainda está em andamento.
+    """
+
+    def __init__(self, key: str):
+        """
+        Inicializa a especulação.
+
+        Args:
+            key: Chave da requisição de geração (hash do prompt)
+        """
+        self.key = key
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.chunks: List[str] = []
+        self.error: Optional[Exception] = None
+        self.usage: Dict[str, int] = {}
+        self.model = ""
+        self._cancelled = threading.Event()
+        self._condition = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        """Indica se a geração terminou (com sucesso, erro ou cancelamento)."""
+        return self.finished_at is not None
+
+    @property
+    def cancelled(self) -> bool:
+        """Indica se a especulação foi cancelada."""
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Interrompe a geração no próximo trecho."""
+        self._cancelled.set()
+
+    def run(self, generate: Callable[[], Iterator[str]], usage: Callable[[], Dict[str, int]]) -> None:
+        """
+        Consome a geração (executado em thread própria).
+
+        Args:
+            generate: Função que inicia a geração em streaming (o gerador
+                retorna o modelo usado)
+            usage: Função que retorna o uso de tokens ao final
+        """
+        stream = None
+        try:
+            stream = generate()
+            while True:
+                try:
+                    chunk = next(stream)
+                except StopIteration as stop:
+                    self.model = stop.value or ""
+                    break
+                if self.cancelled:
+                    break
+                with self._condition:
+                    self.chunks.append(chunk)
+                    self._condition.notify_all()
+            if not self.cancelled:
+                self.usage = usage()
+        except Exception as e:
+            self.error = e
+        finally:
+            if stream is not None and hasattr(stream, "close"):
+                # Fecha o stream HTTP (ou as seções pendentes) ao cancelar
+                stream.close()
+            with self._condition:
+                self.finished_at = time.monotonic()
+                self._condition.notify_all()
+
+    def follow(self) -> Iterator[str]:
+        """
+        Reproduz os trechos já gerados e acompanha os próximos até o fim.
+
+        Yields:
+            Trechos da história
+
+        Returns:
+            Modelo que gerou a história
+
+        Raises:
+            Exception: Erro da geração em background
+        """
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self.chunks) and not self.done:
+                    self._condition.wait()
+                pending = self.chunks[index:]
+                finished = self.done
+
+            for chunk in pending:
+                yield chunk
+            index += len(pending)
+
+            if finished and index >= len(self.chunks):
+                break
+
+        if self.error is not None:
+            raise self.error
+        return self.model
+
+
+class SpeculativeGenerator:
+    """
+    Coordena as especulações de cada sessão (uma por sessão).
+    Mudanças nos dados reiniciam o debounce e cancelam a especulação anterior.
+    """
+
+    def __init__(self, debounce_seconds: float = 2.0, max_sessions: int = 32):
+        """
+        Inicializa o coordenador.
+
+        Args:
+            debounce_seconds: Tempo que os dados devem ficar inalterados
+            max_sessions: Sessões com especulação mantida em memória
+        """
+        self.debounce_seconds = debounce_seconds
+        self.max_sessions = max_sessions
+
+        # sessão -> (chave, timer do debounce ou None, especulação ou None)
+        self._sessions: "OrderedDict[str, Tuple[str, Optional[threading.Timer], Optional[Speculation]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "started": 0,
+            "reused": 0,
+            "reused_completed": 0,
+            "cancelled": 0,
+            "missed": 0
+        }
+
+    def observe(
+        self,
+        owner: str,
+        key: str,
+        generate: Callable[[], Iterator[str]],
+        usage: Callable[[], Dict[str, int]]
+    ) -> None:
+        """
+        Registra os dados atuais (válidos) do formulário de uma sessão.
+        Se a chave mudou, cancela a especulação anterior e reinicia o debounce.
+
+        Args:
+            owner: Identificador da sessão
+            key: Chave da requisição de geração
+            generate: Função que inicia a geração em streaming
+            usage: Função que retorna o uso de tokens ao final
+        """
+        with self._lock:
+            current = self._sessions.get(owner)
+            if current is not None and current[0] == key:
+                self._sessions.move_to_end(owner)
+                return
+
+            self._cancel_entry(current)
+
+            timer = threading.Timer(self.debounce_seconds, self._start, (owner, key, generate, usage))
+            timer.daemon = True
+            self._sessions[owner] = (key, timer, None)
+            self._sessions.move_to_end(owner)
+            self._evict()
+
+        timer.start()
+
+    def discard(self, owner: str) -> None:
+        """
+        Cancela a especulação da sessão (ex: formulário inválido).
+
+        Args:
+            owner: Identificador da sessão
+        """
+        with self._lock:
+            self._cancel_entry(self._sessions.pop(owner, None))
+
+    def take(self, owner: str, key: str) -> Optional[Speculation]:
+        """
+        Retira a especulação da sessão para reaproveitamento no envio.
+
+        Args:
+            owner: Identificador da sessão
+            key: Chave da requisição enviada
+
+        Returns:
+            Especulação com a mesma chave (em andamento ou concluída sem erro)
+            ou None; especulações de outra chave são canceladas
+        """
+        with self._lock:
+            entry = self._sessions.pop(owner, None)
+            speculation = entry[2] if entry is not None else None
+
+            if entry is None or entry[0] != key or speculation is None or speculation.error is not None:
+                self._cancel_entry(entry)
+                self._stats["missed"] += 1
+                return None
+
+            self._stats["reused"] += 1
+            if speculation.done:
+                self._stats["reused_completed"] += 1
+
+        return speculation
+
+    def _start(
+        self,
+        owner: str,
+        key: str,
+        generate: Callable[[], Iterator[str]],
+        usage: Callable[[], Dict[str, int]]
+    ) -> None:
+        """Inicia a geração após o debounce (se os dados não mudaram)."""
+        with self._lock:
+            current = self._sessions.get(owner)
+            if current is None or current[0] != key or current[2] is not None:
+                return
+
+            speculation = Speculation(key)
+            self._sessions[owner] = (key, None, speculation)
+            self._stats["started"] += 1
+
+        threading.Thread(
+            target=speculation.run,
+            args=(generate, usage),
+            name="speculative-generation",
+            daemon=True
+        ).start()
+
+    def _cancel_entry(self, entry: Optional[Tuple[str, Optional[threading.Timer], Optional[Speculation]]]) -> None:
+        """Cancela timer e especulação de uma entrada (chamado com o lock)."""
+        if entry is None:
+            return
+
+        _, timer, speculation = entry
+        if timer is not None:
+            timer.cancel()
+        if speculation is not None and not speculation.done:
+            speculation.cancel()
+            self._stats["cancelled"] += 1
+
+    def _evict(self) -> None:
+        """Descarta as sessões mais antigas acima do limite (chamado com o lock)."""
+        while len(self._sessions) > self.max_sessions:
+            _, entry = self._sessions.popitem(last=False)
+            self._cancel_entry(entry)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores de especulação.
+
+        Returns:
+            Dict com especulações iniciadas, reaproveitadas, canceladas e perdidas
+        """
+        with self._lock:
+            stats = dict(self._stats)
+
+        attempts = stats["reused"] + stats["missed"]
+        stats["hit_rate"] = round(stats["reused"] / attempts, 3) if attempts else 0.0
+        return stats
+
+
+_speculator_instance: Optional[SpeculativeGenerator] = None
+_speculator_lock = threading.Lock()
+
+
+def get_speculative_generator() -> Optional[SpeculativeGenerator]:
+    """
+    Retorna o coordenador compartilhado do processo (criado sob demanda).
+
+    Returns:
+        SpeculativeGenerator configurado ou None se a especulação estiver desabilitada
+    """
+    global _speculator_instance
+
+    if not config.SPECULATIVE_GENERATION_ENABLED:
+        return None
+
+    with _speculator_lock:
+        if _speculator_instance is None:
+            _speculator_instance = SpeculativeGenerator(
+                debounce_seconds=config.SPECULATIVE_DEBOUNCE_SECONDS
+            )
+
+    return _speculator_instance
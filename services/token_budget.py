@@ -0,0 +1,294 @@
+"""
+Orçamento de tokens por tipo de requisição.
+Conta tokens do prompt antes do envio e estima o tamanho da resposta por
+operação e categoria (Value Area ou seção) a partir do histórico observado,
+definindo max_tokens e timeout de cada requisição.
+Segue Single Responsibility Principle.
+"""
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from services.rate_limiter import RateLimiter
+import config
+
+
+# Saída esperada (tokens) antes de haver histórico suficiente
+DEFAULT_OUTPUT_TOKENS = {
+    ("generate_story", "Business"): 2800,
+    ("generate_story", "Spike"): 1600,
+    ("generate_story", "Kaizen"): 1900,
+    ("generate_story", "Fix/Bug/Incidente"): 2200,
+    ("generate_story", ""): 2800,
+    ("generate_section", "abertura"): 700,
+    ("generate_section", "apis"): 1000,
+    ("generate_section", "objetivos_tecnicos"): 400,
+    ("generate_section", "criterios"): 1000,
+    ("generate_section", "cenarios"): 700,
+    ("generate_section", ""): 600,
+    ("regenerate_section", ""): 900,
+    ("regenerate_sections", ""): 2400,
+    ("validate_invest_with_ai", ""): 900,
+    ("analyze_and_suggest", ""): 1000,
+    ("review_story", ""): 1600
+}
+
+# Amostras mínimas para usar o histórico no lugar do valor padrão
+MIN_SAMPLES = 5
+
+# Arredondamento de max_tokens (mantém chaves de cache estáveis)
+MAX_TOKENS_STEP = 500
+
+
+@dataclass
+class TokenBudgetPlan:
+    """
+    Orçamento calculado para uma requisição.
+
+    Attributes:
+        input_tokens: Tokens estimados do prompt (sistema + mensagens)
+        expected_output_tokens: Saída esperada (percentil do histórico)
+        max_tokens: Limite de saída enviado à API
+        timeout: Timeout da requisição (segundos)
+        estimated_cost_usd: Custo estimado (entrada + saída esperada)
+    """
+
+    input_tokens: int
+    expected_output_tokens: int
+    max_tokens: int
+    timeout: float
+    estimated_cost_usd: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte para dicionário (exibição na interface)."""
+        return {
+            "input_tokens": self.input_tokens,
+            "expected_output_tokens": self.expected_output_tokens,
+            "max_tokens": self.max_tokens,
+            "timeout": self.timeout,
+            "estimated_cost_usd": self.estimated_cost_usd
+        }
+
+
+class TokenBudget:
+    """
+    Mantém histórico de tokens de saída e velocidade de geração por
+    (operação, categoria) e calcula o orçamento de novas requisições.
+    """
+
+    def __init__(
+        self,
+        history_size: int = 200,
+        percentile: float = 0.95,
+        safety_margin: float = 1.3,
+        min_max_tokens: int = 500,
+        max_max_tokens: int = config.CLAUDE_MAX_TOKENS
+    ):
+        """
+        Inicializa o orçamento.
+
+        Args:
+            history_size: Observações mantidas por (operação, categoria)
+            percentile: Percentil do histórico usado como saída esperada
+            safety_margin: Multiplicador aplicado à saída esperada
+            min_max_tokens: Menor max_tokens permitido
+            max_max_tokens: Maior max_tokens permitido
+        """
+        self.history_size = history_size
+        self.percentile = percentile
+        self.safety_margin = safety_margin
+        self.min_max_tokens = min_max_tokens
+        self.max_max_tokens = max_max_tokens
+
+        self._output_tokens: Dict[Tuple[str, str], deque] = {}
+        self._tokens_per_second: deque = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def count_input_tokens(messages: List[Dict[str, Any]], system: Any = None) -> int:
+        """
+        Conta (aproximadamente) os tokens do prompt sem chamar a API.
+
+        Args:
+            messages: Mensagens da requisição
+            system: Prompt de sistema (opcional)
+
+        Returns:
+            Tokens de entrada estimados
+        """
+        return RateLimiter.estimate_tokens(messages, 0, system)
+
+    def plan(
+        self,
+        operation: str,
+        category: str,
+        messages: List[Dict[str, Any]],
+        system: Any = None
+    ) -> TokenBudgetPlan:
+        """
+        Calcula max_tokens, timeout e custo estimado de uma requisição.
+
+        Args:
+            operation: Operação (ex: "generate_story")
+            category: Value Area ou seção (ex: "Spike", "criterios")
+            messages: Mensagens da requisição
+            system: Prompt de sistema (opcional)
+
+        Returns:
+            TokenBudgetPlan
+        """
+        input_tokens = self.count_input_tokens(messages, system)
+        expected = self.expected_output_tokens(operation, category)
+
+        max_tokens = math.ceil(expected * self.safety_margin / MAX_TOKENS_STEP) * MAX_TOKENS_STEP
+        max_tokens = max(self.min_max_tokens, min(max_tokens, self.max_max_tokens))
+
+        return TokenBudgetPlan(
+            input_tokens=input_tokens,
+            expected_output_tokens=expected,
+            max_tokens=max_tokens,
+            timeout=self._timeout_for(max_tokens),
+            estimated_cost_usd=self.estimate_cost(input_tokens, expected)
+        )
+
+    def expected_output_tokens(self, operation: str, category: str = "") -> int:
+        """
+        Saída esperada: percentil do histórico ou valor padrão.
+
+        Args:
+            operation: Operação
+            category: Value Area ou seção
+
+        Returns:
+            Tokens de saída esperados
+        """
+        with self._lock:
+            samples = list(self._output_tokens.get((operation, category), []))
+
+        if len(samples) >= MIN_SAMPLES:
+            samples.sort()
+            index = min(int(len(samples) * self.percentile), len(samples) - 1)
+            return samples[index]
+
+        return DEFAULT_OUTPUT_TOKENS.get(
+            (operation, category),
+            DEFAULT_OUTPUT_TOKENS.get((operation, ""), self.max_max_tokens)
+        )
+
+    def _timeout_for(self, max_tokens: int) -> float:
+        """Timeout proporcional ao tempo de gerar max_tokens na velocidade observada."""
+        with self._lock:
+            speeds = sorted(self._tokens_per_second)
+
+        # Velocidade conservadora: percentil 10 das observações
+        speed = speeds[len(speeds) // 10] if len(speeds) >= MIN_SAMPLES else config.TOKEN_BUDGET_DEFAULT_TOKENS_PER_SECOND
+        timeout = config.TOKEN_BUDGET_BASE_LATENCY_SECONDS + max_tokens / max(speed, 1.0)
+
+        return round(min(max(timeout, config.TOKEN_BUDGET_MIN_TIMEOUT), config.TOKEN_BUDGET_MAX_TIMEOUT), 1)
+
+    def observe(
+        self,
+        operation: str,
+        category: str,
+        output_tokens: int,
+        elapsed_seconds: Optional[float] = None,
+        stop_reason: Optional[str] = None,
+        first_token_seconds: Optional[float] = None
+    ) -> None:
+        """
+        Registra o resultado de uma requisição concluída.
+        Respostas cortadas por max_tokens entram com valor ampliado,
+        para que o próximo orçamento cresça.
+        A velocidade de geração só é amostrada em requisições com streaming:
+        vai do primeiro trecho ao fim da resposta, sem a espera na fila do
+        agendador nem o processamento do prompt (cobertos pela latência base).
+
+        Args:
+            operation: Operação
+            category: Value Area ou seção
+            output_tokens: Tokens de saída consumidos
+            elapsed_seconds: Duração da requisição
+            stop_reason: Motivo de parada informado pela API
+            first_token_seconds: Tempo até o primeiro trecho, medido a partir
+                do mesmo instante que elapsed_seconds (None sem streaming)
+        """
+        if not operation or not output_tokens:
+            return
+
+        observed = output_tokens
+        if stop_reason == "max_tokens":
+            observed = int(output_tokens * 1.5)
+
+        with self._lock:
+            history = self._output_tokens.setdefault(
+                (operation, category), deque(maxlen=self.history_size)
+            )
+            history.append(observed)
+
+            if elapsed_seconds is not None and first_token_seconds is not None:
+                generation_seconds = elapsed_seconds - first_token_seconds
+                if generation_seconds > 0:
+                    self._tokens_per_second.append(output_tokens / generation_seconds)
+
+    @staticmethod
+    def estimate_cost(input_tokens: int, output_tokens: int) -> float:
+        """
+        Custo estimado em dólares segundo os preços configurados.
+
+        Args:
+            input_tokens: Tokens de entrada
+            output_tokens: Tokens de saída
+
+        Returns:
+            Custo em USD
+        """
+        return round(
+            input_tokens / 1_000_000 * config.PRICE_INPUT_PER_MTOK
+            + output_tokens / 1_000_000 * config.PRICE_OUTPUT_PER_MTOK,
+            4
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna resumo do histórico por (operação, categoria).
+
+        Returns:
+            Dict com amostras e saída esperada por chave
+        """
+        with self._lock:
+            keys = list(self._output_tokens.keys())
+            counts = {key: len(values) for key, values in self._output_tokens.items()}
+
+        return {
+            f"{operation}:{category}" if category else operation: {
+                "samples": counts[(operation, category)],
+                "expected_output_tokens": self.expected_output_tokens(operation, category)
+            }
+            for operation, category in keys
+        }
+
+
+_budget_instance: Optional[TokenBudget] = None
+_budget_lock = threading.Lock()
+
+
+def get_token_budget() -> TokenBudget:
+    """
+    Retorna o orçamento de tokens do processo (histórico compartilhado).
+
+    Returns:
+        TokenBudget compartilhado
+    """
+    global _budget_instance
+
+    with _budget_lock:
+        if _budget_instance is None:
+            _budget_instance = TokenBudget(
+                history_size=config.TOKEN_BUDGET_HISTORY_SIZE,
+                percentile=config.TOKEN_BUDGET_PERCENTILE,
+                safety_margin=config.TOKEN_BUDGET_SAFETY_MARGIN
+            )
+
+    return _budget_instance
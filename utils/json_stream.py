@@ -0,0 +1,124 @@
+"""
+Parser incremental de JSON para respostas em streaming.
+Recebe o texto em trechos e entrega cada membro do objeto raiz
+assim que o seu valor termina, sem esperar o fechamento do objeto.
+Segue Single Responsibility Principle.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class IncrementalJsonObjectParser:
+    """
+    Lê um objeto JSON em partes e emite pares (chave, valor) do nível raiz.
+    Texto antes do primeiro "{" (prosa, cerca de código) é ignorado.
+    Valores que não forem JSON válido são descartados.
+    """
+
+    def __init__(self):
+        """Inicializa o estado da leitura."""
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expecting = "object"  # object, key, key_string, colon, value, after_value
+        self._key: Optional[str] = None
+        self._key_start = 0
+        self._value_start: Optional[int] = None
+        self.finished = False
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        Consome um trecho e retorna os membros concluídos nele.
+
+        Args:
+            text: Próximo trecho da resposta
+
+        Returns:
+            Lista de (chave, valor) na ordem em que fecharam
+        """
+        self._buffer += text
+        members: List[Tuple[str, Any]] = []
+
+        while self._pos < len(self._buffer) and not self.finished:
+            self._step(self._buffer[self._pos], self._pos, members)
+            self._pos += 1
+
+        return members
+
+    def _step(self, char: str, index: int, members: List[Tuple[str, Any]]) -> None:
+        """Processa um caractere atualizando profundidade, strings e membros."""
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._depth == 1 and self._expecting == "key_string":
+                    self._key = json.loads(self._buffer[self._key_start:index + 1])
+                    self._expecting = "colon"
+                elif self._depth == 1 and self._expecting == "value":
+                    self._emit(self._value_start, index + 1, members)
+            return
+
+        if self._expecting == "object":
+            if char == "{":
+                self._depth = 1
+                self._expecting = "key"
+            return
+
+        if char == '"':
+            self._in_string = True
+            if self._depth == 1 and self._expecting == "key":
+                self._key_start = index
+                self._expecting = "key_string"
+            elif self._depth == 1 and self._expecting == "value" and self._value_start is None:
+                self._value_start = index
+            return
+
+        if self._depth == 1 and char == ":" and self._expecting == "colon":
+            self._expecting = "value"
+            self._value_start = None
+            return
+
+        if char in "{[":
+            if self._depth == 1 and self._expecting == "value" and self._value_start is None:
+                self._value_start = index
+            self._depth += 1
+            return
+
+        if char in "}]":
+            self._depth -= 1
+            if self._depth == 1 and self._expecting == "value":
+                self._emit(self._value_start, index + 1, members)
+            elif self._depth == 0:
+                # Fim do objeto raiz (valor escalar pendente termina aqui)
+                if self._expecting == "value" and self._value_start is not None:
+                    self._emit(self._value_start, index, members)
+                self.finished = True
+            return
+
+        if self._depth == 1 and char == ",":
+            if self._expecting == "value" and self._value_start is not None:
+                self._emit(self._value_start, index, members)
+            self._expecting = "key"
+            return
+
+        if self._depth == 1 and self._expecting == "value" and self._value_start is None and not char.isspace():
+            # Início de valor escalar (número, true, false, null)
+            self._value_start = index
+
+    def _emit(self, start: Optional[int], end: int, members: List[Tuple[str, Any]]) -> None:
+        """Converte o valor concluído e registra o membro."""
+        self._expecting = "after_value"
+
+        if start is None or self._key is None:
+            return
+
+        try:
+            members.append((self._key, json.loads(self._buffer[start:end])))
+        except json.JSONDecodeError:
+            pass
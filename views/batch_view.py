@@ -0,0 +1,148 @@
+"""
+View responsável pelo processamento offline (Message Batches).
+Envia histórias da sessão em lote e acompanha os lotes submetidos.
+Segue Single Responsibility Principle.
+"""
+
+import streamlit as st
+from models.session_storage import SessionStorage
+from services.batch_service import BatchService, BatchJob
+
+
+OPERATION_LABELS = {
+    "generate_story": "Regenerar historia",
+    "validate_invest_with_ai": "Validacao INVEST",
+    "analyze_and_suggest": "Sugestoes de melhoria",
+    "review_story": "Revisao completa (INVEST + sugestoes)"
+}
+
+
+def render_batch_panel(batch_service: BatchService):
+    """
+    Renderiza envio de lote para as histórias salvas e a lista de lotes.
+
+    Args:
+        batch_service: Service de lotes
+    """
+    st.caption(
+        "Lotes sao processados de forma assincrona pelo provedor (ate 24h), "
+        "com custo reduzido e sem disputar o limite de requisicoes interativas."
+    )
+
+    stories = SessionStorage.get_all_stories()
+
+    if stories:
+        operations = st.multiselect(
+            "Operacoes para todas as historias da sessao:",
+            options=list(OPERATION_LABELS.keys()),
+            default=["review_story"],
+            format_func=lambda op: OPERATION_LABELS[op],
+            key="batch_operations"
+        )
+
+        skipped = []
+        if "generate_story" in operations:
+            skipped = batch_service.skipped_regenerations(stories)
+            if skipped:
+                st.warning(
+                    f"{len(skipped)} historia(s) ficarao fora da regeneracao "
+                    "(os prompts iriam sem os dados do formulario):\n\n"
+                    + "\n".join(f"- {story.get('titulo', story['id'])}: {reason}" for story, reason in skipped)
+                )
+
+        requests = len(stories) * len(operations) - len(skipped)
+
+        if st.button(
+            f"Enviar Lote ({requests} requisicoes)",
+            disabled=not requests,
+            use_container_width=True
+        ):
+            try:
+                items = batch_service.build_story_items(stories, operations)
+                submit_job(batch_service, items)
+            except Exception as e:
+                st.error(f"Erro ao enviar lote: {str(e)}")
+    else:
+        st.info("Nenhuma historia na sessao para processar em lote")
+
+    render_batch_jobs(batch_service)
+
+
+def submit_job(batch_service: BatchService, items: list) -> BatchJob:
+    """
+    Envia lote e registra o job na sessão.
+
+    Args:
+        batch_service: Service de lotes
+        items: Requisições do lote
+
+    Returns:
+        Job submetido
+    """
+    job = batch_service.submit(items)
+
+    if 'batch_jobs' not in st.session_state:
+        st.session_state.batch_jobs = []
+    st.session_state.batch_jobs.append(job)
+
+    st.success(f"Lote {job.batch_id} enviado com {len(items)} requisicao(oes)")
+    return job
+
+
+def render_batch_jobs(batch_service: BatchService):
+    """
+    Lista lotes submetidos com ações de atualização, cancelamento e coleta.
+
+    Args:
+        batch_service: Service de lotes
+    """
+    jobs = st.session_state.get('batch_jobs', [])
+    if not jobs:
+        return
+
+    st.markdown("**Lotes submetidos:**")
+
+    for job in reversed(jobs):
+        counts = job.request_counts
+        st.write(
+            f"`{job.batch_id}` - {job.status} | "
+            f"ok: {counts.get('succeeded', 0)} | erro: {counts.get('errored', 0)} | "
+            f"pendentes: {counts.get('processing', 0)}"
+        )
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            if st.button("Atualizar", key=f"batch_refresh_{job.batch_id}", use_container_width=True):
+                _run_action(lambda: batch_service.refresh(job))
+                st.rerun()
+
+        with col2:
+            if not job.ended:
+                if st.button("Cancelar", key=f"batch_cancel_{job.batch_id}", use_container_width=True):
+                    _run_action(lambda: batch_service.cancel(job))
+                    st.rerun()
+
+        with col3:
+            if job.ended and not job.applied:
+                if st.button("Aplicar Resultados", key=f"batch_apply_{job.batch_id}", type="primary",
+                             use_container_width=True):
+                    try:
+                        results = batch_service.collect(job)
+                        summary = batch_service.apply_results(job, results)
+                        st.success(
+                            f"Novas: {summary['created']} | Atualizadas: {summary['updated']} | "
+                            f"Falhas: {summary['failed']} | Ignoradas: {summary['skipped']}"
+                        )
+                    except Exception as e:
+                        st.error(f"Erro ao coletar resultados: {str(e)}")
+            elif job.applied:
+                st.caption("Resultados aplicados")
+
+
+def _run_action(action):
+    """Executa ação no provedor exibindo erro amigável."""
+    try:
+        action()
+    except Exception as e:
+        st.error(f"Erro ao consultar lote: {str(e)}")
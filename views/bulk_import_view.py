@@ -0,0 +1,131 @@
+"""
+View responsável pela importação de backlog em lote.
+Recebe arquivo CSV/JSONL, exibe prévia e progresso por linha.
+Segue Single Responsibility Principle.
+"""
+
+import streamlit as st
+from services.bulk_service import BulkGenerationService, BulkRowResult
+from utils.formatters import format_error_message
+from views import batch_view
+
+
+def render_bulk_import(story_controller, batch_service=None):
+    """
+    Renderiza interface de geração em lote.
+
+    Args:
+        story_controller: Controller de histórias
+        batch_service: Service de lotes offline (opcional, habilita Message Batches)
+    """
+    st.caption(
+        "Envie um arquivo CSV (cabecalho com os campos do formulario) ou JSONL "
+        "(um objeto form_data por linha). Campos obrigatorios: titulo e value_area "
+        "(Business, Spike, Kaizen ou Fix/Bug/Incidente). Em CSV, listas usam '|' "
+        "como separador e objetivos podem vir nas colunas como/quero/para_que."
+    )
+
+    uploaded_file = st.file_uploader(
+        "Arquivo de backlog",
+        type=["csv", "jsonl"],
+        key="bulk_import_file"
+    )
+
+    if uploaded_file is None:
+        return
+
+    bulk_service = BulkGenerationService(story_controller)
+    records, errors = bulk_service.parse_file(uploaded_file.name, uploaded_file.getvalue())
+
+    if errors:
+        with st.expander(f"{len(errors)} linha(s) ignorada(s)", expanded=False):
+            for error in errors:
+                st.warning(error)
+
+    if not records:
+        st.info("Nenhum registro valido encontrado no arquivo")
+        return
+
+    st.write(f"**{len(records)} historia(s) prontas para geracao**")
+
+    if st.button("Gerar Historias em Lote", type="primary", use_container_width=True):
+        _run_bulk_generation(bulk_service, records)
+
+    if batch_service is not None:
+        if st.button("Enviar como Lote Offline (Message Batches)", use_container_width=True):
+            try:
+                batch_view.submit_job(batch_service, batch_service.build_generation_items(records))
+                st.info("Acompanhe o lote na aba 'Minhas Historias'")
+            except Exception as e:
+                st.error(f"Erro ao enviar lote: {str(e)}")
+
+    _render_last_results()
+
+
+def _run_bulk_generation(bulk_service: BulkGenerationService, records: list):
+    """
+    Executa a geração em lote atualizando o progresso a cada linha concluída.
+
+    Args:
+        bulk_service: Service de geração em lote
+        records: Lista de form_data
+    """
+    progress_bar = st.progress(0.0, text="Iniciando geracao em lote...")
+    status_area = st.empty()
+    rows = []
+
+    def on_progress(result: BulkRowResult, done: int, total: int):
+        progress_bar.progress(done / total, text=f"{done}/{total} historia(s) processada(s)")
+        rows.append(_result_row(result))
+        status_area.dataframe(rows, use_container_width=True, hide_index=True)
+
+    results = bulk_service.run(records, on_progress=on_progress)
+
+    # Tabela final é exibida por _render_last_results (ordem original das linhas)
+    status_area.empty()
+    st.session_state.bulk_results = [_result_row(result) for result in results]
+
+
+def _result_row(result: BulkRowResult) -> dict:
+    """
+    Converte resultado de linha em registro de tabela.
+
+    Args:
+        result: Resultado da linha
+
+    Returns:
+        Dict com colunas exibidas
+    """
+    if result.success:
+        status = "Gerada"
+    else:
+        error_key = (result.error_type or "generic").split(":", 1)[0]
+        status = format_error_message(error_key)["title"]
+
+    return {
+        "Linha": result.row,
+        "Titulo": result.titulo,
+        "Status": status,
+        "Tentativas": result.attempts
+    }
+
+
+def _render_last_results():
+    """Exibe resumo da última execução em lote."""
+    results = st.session_state.get('bulk_results')
+    if not results:
+        return
+
+    generated = sum(1 for row in results if row["Status"] == "Gerada")
+    failed = len(results) - generated
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Geradas", generated)
+    with col2:
+        st.metric("Falhas", failed)
+
+    if generated:
+        st.success("Historias salvas! Confira na aba 'Minhas Historias'.")
+
+    st.dataframe(results, use_container_width=True, hide_index=True)
@@ -0,0 +1,120 @@
+"""
+View do painel de diagnóstico (sidebar).
+Exibe latência, tokens, stop reasons, erros e cache por operação, além do
+estado dos subsistemas compartilhados (cache, agendador, circuit breaker).
+Segue Single Responsibility Principle.
+"""
+
+import streamlit as st
+from typing import Any, Dict, Optional
+
+
+OPERATION_LABELS = {
+    "generate_story": "Geracao",
+    "generate_section": "Geracao por secoes",
+    "continue_story": "Continuacao (max_tokens)",
+    "regenerate_section": "Regeneracao de secao",
+    "regenerate_sections": "Regeneracao em lote",
+    "validate_invest_with_ai": "Validacao INVEST",
+    "analyze_and_suggest": "Sugestoes",
+    "review_story": "Revisao"
+}
+
+
+def render_diagnostics(ai_service: Any, metrics_url: Optional[str] = None):
+    """
+    Renderiza o painel de diagnóstico na sidebar.
+
+    Args:
+        ai_service: Service de IA (fonte das métricas e estatísticas)
+        metrics_url: URL do endpoint Prometheus (None se desabilitado)
+    """
+    with st.sidebar:
+        st.header("🩺 Diagnostico")
+
+        summary = ai_service.get_metrics_summary()
+        if not summary:
+            st.caption("Nenhuma requisicao registrada neste processo")
+        else:
+            _render_operations(summary)
+
+        _render_subsystems(ai_service)
+
+        if ai_service.metrics is not None:
+            if metrics_url:
+                st.caption(f"Prometheus: `{metrics_url}`")
+            st.download_button(
+                label="⬇️ Metricas (Prometheus)",
+                data=ai_service.metrics.render_prometheus(),
+                file_name="metrics.prom",
+                mime="text/plain",
+                use_container_width=True
+            )
+
+
+def _render_operations(summary: Dict[str, Dict[str, Any]]):
+    """Tabela resumida e detalhes por operação."""
+    rows = []
+    for operation, stats in summary.items():
+        lookups = stats["cache_hits"] + stats["cache_misses"]
+        rows.append({
+            "Operacao": OPERATION_LABELS.get(operation, operation),
+            "Req.": stats["requests"],
+            "Erros": stats["errors"],
+            "p50 (s)": stats["p50_seconds"],
+            "p95 (s)": stats["p95_seconds"],
+            "Cache": f"{stats['cache_hits'] / lookups:.0%}" if lookups else "-"
+        })
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+
+    for operation, stats in summary.items():
+        with st.expander(OPERATION_LABELS.get(operation, operation), expanded=False):
+            st.markdown(
+                f"- Tokens: entrada {stats['input_tokens']:,} | saida {stats['output_tokens']:,}\n"
+                f"- Latencia media: {stats['mean_seconds']}s"
+                + (
+                    f" | primeiro trecho p50: {stats['first_token_p50_seconds']}s"
+                    if stats["first_token_p50_seconds"] is not None else ""
+                )
+                + f"\n- Cache: {stats['cache_hits']} acertos, {stats['cache_misses']} erros, "
+                f"{stats['coalesced']} coalescidas"
+            )
+            if stats["stop_reasons"]:
+                st.caption("Stop reasons: " + ", ".join(
+                    f"{reason} ({count})" for reason, count in sorted(stats["stop_reasons"].items())
+                ))
+            if stats["error_classes"]:
+                st.caption("Erros: " + ", ".join(
+                    f"{error} ({count})" for error, count in sorted(stats["error_classes"].items())
+                ))
+
+
+def _render_subsystems(ai_service: Any):
+    """Estado dos subsistemas compartilhados pelo processo."""
+    breaker = ai_service.get_circuit_breaker_stats()
+    if breaker:
+        state = breaker["state"]
+        icon = {"closed": "🟢", "half_open": "🟡", "open": "🔴"}.get(state, "⚪")
+        st.caption(
+            f"{icon} Circuit breaker: {state} "
+            f"({breaker['opened']} aberturas, {breaker['fallback_requests']} desviadas)"
+        )
+
+    regeneration = ai_service.get_regeneration_stats()
+    if regeneration and regeneration["regenerations"]:
+        st.caption(
+            f"Regeneracao com contexto minimo: {regeneration['saved_tokens']:,} tokens economizados "
+            f"({regeneration['saved_ratio']:.0%}), {regeneration['mean_seconds']}s em media"
+        )
+
+    cache = ai_service.get_cache_stats()
+    if cache:
+        st.caption(f"Cache de respostas: {cache['hit_rate']:.0%} de acertos")
+
+    single_flight = ai_service.get_single_flight_stats()
+    if single_flight:
+        st.caption(f"Single-flight: {single_flight['coalesced']} requisicoes coalescidas")
+
+    hedge = ai_service.get_hedge_stats()
+    if hedge:
+        st.caption(f"Hedge: {hedge['hedge_rate']:.0%} das requisicoes")
@@ -5,11 +5,29 @@ Segue Single Responsibility Principle.
 """
 
 import streamlit as st
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from controllers.editor_controller import EditorController
+from services.image_store import resolve_images
 import re
 
 
+# Seções regeneráveis (chave -> rótulo exibido)
+REGENERATION_LABELS = {
+    'criterios': 'Criterios de Aceitacao',
+    'testes': 'Cenarios de Teste',
+    'arquitetura': 'Arquitetura',
+    'beneficios': 'Beneficios'
+}
+
+# Seções regeneráveis (chave -> título da seção no Markdown)
+SECTION_TITLES = {
+    'criterios': 'Criterios de Aceitacao',
+    'testes': 'Cenarios de Teste Sugeridos',
+    'arquitetura': 'Estrutura Tecnica',
+    'beneficios': 'Beneficios'
+}
+
+
 def render_editor(editor_controller: EditorController):
     """
     Renderiza interface de edição de histórias.
@@ -85,7 +103,7 @@ def render_editor(editor_controller: EditorController):
         preview_markdown = _generate_preview(st.session_state.editing_fields)
 
         # Renderizar preview
-        st.markdown(preview_markdown)
+        st.markdown(resolve_images(preview_markdown))
 
     # Botões de ação
     st.markdown("---")
@@ -264,6 +282,115 @@ def render_regeneration_panel(editor_controller: EditorController):
         if st.button("Regenerar Beneficios", use_container_width=True):
             _regenerate_section(editor_controller, 'beneficios', form_data)
 
+    # Regeneração em lote: uma única chamada à IA e uma única nova versão
+    st.markdown("---")
+    selected = st.multiselect(
+        "Regenerar varias secoes de uma vez:",
+        options=list(REGENERATION_LABELS.keys()),
+        format_func=lambda s: REGENERATION_LABELS[s],
+        key="batch_regeneration_sections"
+    )
+
+    if st.button("Regenerar Selecionadas", disabled=not selected, use_container_width=True):
+        _regenerate_sections(editor_controller, selected, form_data)
+
+    _render_batch_regenerations(editor_controller)
+
+
+def _regenerate_sections(
+    editor_controller: EditorController,
+    section_names: List[str],
+    form_data: Dict[str, Any]
+):
+    """
+    Regenera as seções selecionadas em uma única chamada e guarda o
+    resultado aguardando aprovação.
+
+    Args:
+        editor_controller: Controller
+        section_names: Seções selecionadas
+        form_data: Dados do formulário
+    """
+    with st.spinner(f"Regenerando {len(section_names)} secoes..."):
+        regenerated, error = editor_controller.handle_batch_regeneration(
+            section_names=section_names,
+            original_story=st.session_state.current_story,
+            form_data=form_data
+        )
+
+    if error:
+        st.error(f"Erro ao regenerar: {error}")
+        return
+
+    st.session_state.batch_regenerations = regenerated
+
+
+def _render_batch_regenerations(editor_controller: EditorController):
+    """
+    Exibe as seções regeneradas em lote (anterior x nova) com as ações
+    de aplicar todas como uma nova versão ou descartar.
+
+    Args:
+        editor_controller: Controller
+    """
+    pending = st.session_state.get('batch_regenerations')
+    if not pending:
+        return
+
+    sections = _extract_sections(st.session_state.current_story.get('historia_gerada', ''))
+    _render_regeneration_report(editor_controller)
+
+    for section_name, regenerated in pending.items():
+        st.markdown(f"#### {REGENERATION_LABELS.get(section_name, section_name)}")
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("**Versao Anterior:**")
+            old_section = sections.get(SECTION_TITLES.get(section_name, ''), 'Nao encontrada')
+            st.markdown(resolve_images(old_section))
+
+        with col2:
+            st.markdown("**Nova Versao:**")
+            st.markdown(resolve_images(regenerated))
+
+    col_a, col_b = st.columns(2)
+
+    with col_a:
+        if st.button("Aplicar Todas", key="accept_batch_regeneration", type="primary", use_container_width=True):
+            success, _ = editor_controller.apply_regenerated_sections(
+                regenerated_sections=pending,
+                user_note="Regeneracao em lote: " + ", ".join(pending)
+            )
+            del st.session_state.batch_regenerations
+            if success:
+                st.rerun()
+            else:
+                st.error("Erro ao aplicar")
+
+    with col_b:
+        if st.button("Descartar", key="discard_batch_regeneration", use_container_width=True):
+            del st.session_state.batch_regenerations
+            st.rerun()
+
+
+def _render_regeneration_report(editor_controller: EditorController):
+    """
+    Exibe tokens enviados, economia de contexto e latência da última regeneração.
+
+    Args:
+        editor_controller: Controller
+    """
+    report = editor_controller.get_last_regeneration()
+    if not report:
+        return
+
+    st.caption(
+        f"Contexto: {report['input_tokens']:,} tokens enviados "
+        f"(historia inteira: {report['full_input_tokens']:,}; "
+        f"economia de {report['saved_tokens']:,}, {report['saved_ratio']:.0%}) "
+        f"| {report['seconds']}s"
+    )
+
 
 def _regenerate_section(
     editor_controller: EditorController,
@@ -291,6 +418,7 @@ def _regenerate_section(
 
         # Mostrar comparação
         st.success("Secao regenerada!")
+        _render_regeneration_report(editor_controller)
 
         col1, col2 = st.columns(2)
 
@@ -300,18 +428,12 @@ def _regenerate_section(
             sections = _extract_sections(
                 st.session_state.current_story.get('historia_gerada', '')
             )
-            section_mapping = {
-                'criterios': 'Criterios de Aceitacao',
-                'testes': 'Cenarios de Teste Sugeridos',
-                'arquitetura': 'Estrutura Tecnica',
-                'beneficios': 'Beneficios'
-            }
-            old_section = sections.get(section_mapping.get(section_name, ''), 'Nao encontrada')
-            st.markdown(old_section)
+            old_section = sections.get(SECTION_TITLES.get(section_name, ''), 'Nao encontrada')
+            st.markdown(resolve_images(old_section))
 
         with col2:
             st.markdown("**Nova Versao:**")
-            st.markdown(regenerated)
+            st.markdown(resolve_images(regenerated))
 
         # Botões de ação
         col_a, col_b = st.columns(2)
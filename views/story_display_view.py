@@ -5,8 +5,12 @@ Segue Single Responsibility Principle.
 
 import streamlit as st
 import json
+import time
 from datetime import datetime
+from typing import Callable, Dict
+import config
 from models.story import Story
+from services.image_store import resolve_images, strip_images
 
 
 def render_story(story: Story):
@@ -24,8 +28,14 @@ def render_story(story: Story):
 
     # Container para a história
     with st.container():
-        # Renderiza o Markdown da história
-        st.markdown(story.historia_gerada, unsafe_allow_html=True)
+        # Renderiza o Markdown da história (referências de imagem resolvidas aqui)
+        st.markdown(resolve_images(story.historia_gerada), unsafe_allow_html=True)
+
+    if story.modelo_ia and story.modelo_ia != config.CLAUDE_MODEL:
+        st.caption(
+            f"⚠️ Gerada pelo modelo de contingência ({story.modelo_ia}): "
+            f"o modelo principal está fora do SLO de latência/erros"
+        )
 
     st.markdown("---")
 
@@ -42,7 +52,7 @@ def render_story(story: Story):
 
     with col1:
         # Exportar como TXT
-        txt_content = story.to_text_export()
+        txt_content = strip_images(story.to_text_export())
         st.download_button(
             label="📄 TXT",
             data=txt_content,
@@ -54,7 +64,7 @@ def render_story(story: Story):
 
     with col2:
         # Exportar como MD
-        md_content = story.to_markdown_export()
+        md_content = resolve_images(story.to_markdown_export())
         st.download_button(
             label="📝 Markdown",
             data=md_content,
@@ -66,8 +76,10 @@ def render_story(story: Story):
 
     with col3:
         # Exportar como JSON
+        json_data = story.to_json_export()
+        json_data["historia_gerada"] = resolve_images(json_data["historia_gerada"])
         json_content = json.dumps(
-            story.to_json_export(),
+            json_data,
             ensure_ascii=False,
             indent=2
         )
@@ -83,7 +95,7 @@ def render_story(story: Story):
     with col4:
         # Botão para copiar
         if st.button("📋 Copiar", use_container_width=True, help="Copiar Markdown"):
-            _show_copy_modal(story.historia_gerada)
+            _show_copy_modal(resolve_images(story.historia_gerada))
 
     st.markdown("---")
 
@@ -135,6 +147,58 @@ def _show_copy_modal(content: str):
     st.caption("💡 Dica: Clique no ícone de copiar no canto superior direito do código")
 
 
+def render_usage(usage: Dict[str, int]):
+    """
+    Exibe consumo de tokens da última geração, incluindo prompt caching.
+
+    Args:
+        usage: Dict retornado por AIService.get_last_usage
+    """
+    if not usage:
+        return
+
+    if usage.get("response_cache_hit"):
+        st.caption("Tokens: resposta servida pelo cache local (sem custo de API)")
+        return
+
+    if usage.get("coalesced_request"):
+        st.caption("Tokens: resposta compartilhada com requisição idêntica em andamento (sem custo de API)")
+        return
+
+    st.caption(
+        f"Tokens: entrada {usage.get('input_tokens', 0)} | "
+        f"cache lido {usage.get('cache_read_input_tokens', 0)} | "
+        f"cache gravado {usage.get('cache_creation_input_tokens', 0)} | "
+        f"saída {usage.get('output_tokens', 0)}"
+    )
+
+
+def create_stream_renderer(min_interval: float = 0.15) -> Callable[[str], None]:
+    """
+    Cria callback que renderiza a história progressivamente durante o streaming.
+    Acumula os trechos recebidos e redesenha o Markdown em um placeholder,
+    limitando a frequência de atualização para não sobrecarregar o frontend.
+
+    Args:
+        min_interval: Intervalo mínimo (segundos) entre redesenhos
+
+    Returns:
+        Função que recebe cada trecho de texto gerado
+    """
+    st.header("Gerando História ✨")
+    placeholder = st.empty()
+    state = {"text": "", "last_render": 0.0}
+
+    def on_chunk(chunk: str):
+        state["text"] += chunk
+        now = time.monotonic()
+        if now - state["last_render"] >= min_interval:
+            placeholder.markdown(state["text"] + " ▌", unsafe_allow_html=True)
+            state["last_render"] = now
+
+    return on_chunk
+
+
 def show_loading(message: str = "🤖 Gerando história com IA..."):
     """
     Exibe spinner de loading durante a geração.
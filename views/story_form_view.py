@@ -5,8 +5,30 @@ Segue Single Responsibility Principle.
 """
 
 import streamlit as st
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
 from models.validation import validate_form
+from services.image_preprocessor import get_image_preprocessor
+
+
+# Campos do session_state usados no rascunho de cada Value Area (estimativa de tokens)
+DRAFT_FIELDS = {
+    "Business": [
+        "regras_negocio", "apis_servicos", "complexidade", "criterios_aceitacao",
+        "is_api", "has_dependencies", "dependencies"
+    ],
+    "Spike": [
+        "spike_pergunta", "spike_alternativas", "spike_timebox", "spike_output",
+        "spike_criterios_sucesso"
+    ],
+    "Kaizen": [
+        "kaizen_processo", "kaizen_situacao_atual", "kaizen_meta", "kaizen_metricas",
+        "kaizen_impacto"
+    ],
+    "Fix/Bug/Incidente": [
+        "fix_descricao", "fix_passos_reproduzir", "fix_comportamento_esperado",
+        "fix_comportamento_atual", "fix_ambiente", "fix_severidade", "fix_logs"
+    ]
+}
 
 
 def initialize_session_state():
@@ -262,6 +284,62 @@ def render_form() -> Dict[str, Any]:
     return None
 
 
+def build_draft_form_data() -> Dict[str, Any]:
+    """
+    Monta form_data com os valores atuais do formulário (ainda não submetido).
+    Usado para estimativas e pré-geração especulativa; não aplica validação.
+
+    Returns:
+        Dict no formato de form_data
+    """
+    value_area = st.session_state.get('value_area', "Business")
+
+    form_data = {
+        "value_area": value_area,
+        "titulo": st.session_state.get('titulo', "").strip(),
+        "objetivos": {
+            "como": st.session_state.get('objetivo_como', "").strip(),
+            "quero": st.session_state.get('objetivo_quero', "").strip(),
+            "para_que": st.session_state.get('objetivo_para_que', "").strip()
+        }
+    }
+
+    for field in DRAFT_FIELDS.get(value_area, []):
+        value = st.session_state.get(field)
+        if isinstance(value, list):
+            value = [item.strip() for item in value if isinstance(item, str) and item.strip()]
+        elif isinstance(value, str):
+            value = value.strip()
+        form_data[field] = value
+
+    # Mesmo formato do envio: dependências só quando marcadas, specs só para APIs
+    if value_area == "Business":
+        if not form_data.get("has_dependencies"):
+            form_data["dependencies"] = ""
+        if form_data.get("is_api"):
+            form_data["api_specs"] = _build_api_specs()
+
+    return form_data
+
+
+def render_token_estimate(estimator: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]):
+    """
+    Exibe estimativa de tokens, tempo e custo da geração antes do envio.
+
+    Args:
+        estimator: Função form_data -> estimativa (StoryController.estimate_generation)
+    """
+    estimate = estimator(build_draft_form_data())
+    if not estimate:
+        return
+
+    st.caption(
+        f"Estimativa: ~{estimate['input_tokens']:,} tokens de entrada, "
+        f"~{estimate['expected_output_tokens']:,} de saida (limite {estimate['max_tokens']:,}) | "
+        f"timeout {estimate['timeout']:.0f}s | custo ~US$ {estimate['estimated_cost_usd']:.4f}"
+    )
+
+
 def _render_business_form() -> Dict[str, Any]:
     """Renderiza formulário para histórias Business (funcionais)."""
 
@@ -758,32 +836,42 @@ def _render_business_form() -> Dict[str, Any]:
 
             # Adicionar dados da API se aplicável
             if st.session_state.is_api:
-                api_specs = {
-                    "metodo": st.session_state.api_metodo,
-                    "endpoint": st.session_state.api_endpoint.strip(),
-                    "formato_resposta": st.session_state.api_formato_resposta.strip()
-                }
-
-                # Adicionar campos específicos baseados no método HTTP
-                metodo = st.session_state.api_metodo
-
-                if metodo == "GET":
-                    api_specs["query_params"] = st.session_state.api_query_params.strip()
-                elif metodo == "POST":
-                    api_specs["body"] = st.session_state.api_body.strip()
-                elif metodo in ["PUT", "PATCH"]:
-                    api_specs["path_param"] = st.session_state.api_path_param.strip()
-                    api_specs["body"] = st.session_state.api_body.strip()
-                elif metodo == "DELETE":
-                    api_specs["path_param"] = st.session_state.api_path_param.strip()
-
-                form_data["api_specs"] = api_specs
+                form_data["api_specs"] = _build_api_specs()
 
             return form_data
 
     return None
 
 
+def _build_api_specs() -> Dict[str, str]:
+    """
+    Monta as especificações da API com os campos relevantes ao método HTTP.
+
+    Returns:
+        Dict de api_specs (metodo, endpoint, formato_resposta e campos do método)
+    """
+    api_specs = {
+        "metodo": st.session_state.api_metodo,
+        "endpoint": st.session_state.api_endpoint.strip(),
+        "formato_resposta": st.session_state.api_formato_resposta.strip()
+    }
+
+    # Adicionar campos específicos baseados no método HTTP
+    metodo = st.session_state.api_metodo
+
+    if metodo == "GET":
+        api_specs["query_params"] = st.session_state.api_query_params.strip()
+    elif metodo == "POST":
+        api_specs["body"] = st.session_state.api_body.strip()
+    elif metodo in ["PUT", "PATCH"]:
+        api_specs["path_param"] = st.session_state.api_path_param.strip()
+        api_specs["body"] = st.session_state.api_body.strip()
+    elif metodo == "DELETE":
+        api_specs["path_param"] = st.session_state.api_path_param.strip()
+
+    return api_specs
+
+
 def reset_form():
     """
     Reseta o formulário para os valores iniciais.
@@ -1558,6 +1646,11 @@ def _render_fix_form() -> Dict[str, Any]:
 
     # Mostrar preview das imagens enviadas
     if uploaded_files:
+        # Pré-processamento em background enquanto o restante do formulário é preenchido
+        preprocessor = get_image_preprocessor()
+        for file in uploaded_files:
+            preprocessor.submit(file.name, file.type, file.getvalue())
+
         st.caption(f"{len(uploaded_files)} imagem(ns) anexada(s)")
         cols = st.columns(min(len(uploaded_files), 3))
         for i, file in enumerate(uploaded_files):
@@ -1611,25 +1704,20 @@ def _render_fix_form() -> Dict[str, Any]:
             st.error("Descrição do bug é obrigatória")
             return None
 
-        # Processar imagens para envio (converter para base64)
+        # Imagens pré-processadas (redimensionadas, sem metadados e sem duplicatas)
         fix_images_data = []
         if st.session_state.fix_images:
-            import base64
-            for img_file in st.session_state.fix_images:
-                try:
-                    # Ler bytes da imagem
-                    img_bytes = img_file.getvalue()
-                    # Converter para base64
-                    img_base64 = base64.standard_b64encode(img_bytes).decode("utf-8")
-                    # Determinar media type
-                    file_type = img_file.type if img_file.type else "image/png"
-                    fix_images_data.append({
-                        "name": img_file.name,
-                        "type": file_type,
-                        "data": img_base64
-                    })
-                except Exception as e:
-                    st.warning(f"Erro ao processar imagem {img_file.name}: {str(e)}")
+            try:
+                fix_images_data, report = get_image_preprocessor().prepare(st.session_state.fix_images)
+                if report.bytes_saved > 0 or report.duplicates:
+                    st.caption(
+                        f"Imagens otimizadas: {report.original_bytes / 1024:.0f} KB → "
+                        f"{report.processed_bytes / 1024:.0f} KB, "
+                        f"~{report.tokens_saved} tokens economizados"
+                        + (f", {report.duplicates} duplicada(s) ignorada(s)" if report.duplicates else "")
+                    )
+            except Exception as e:
+                st.warning(f"Erro ao processar imagens: {str(e)}")
 
         objetivos_dict = {
             "como": st.session_state.objetivo_como.strip(),
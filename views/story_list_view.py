@@ -17,6 +17,18 @@ def render_story_list():
         st.info("Nenhuma historia criada ainda. Crie sua primeira historia na aba 'Criar Historia'!")
         return
 
+    # Filtro por Value Area (índice da sessão, sem percorrer a lista)
+    value_areas = SessionStorage.count_by_value_area()
+    if len(value_areas) > 1:
+        selected_area = st.selectbox(
+            "Value Area:",
+            options=["Todas"] + list(value_areas),
+            format_func=lambda area: area if area == "Todas" else f"{area} ({value_areas[area]})",
+            key="story_list_value_area"
+        )
+        if selected_area != "Todas":
+            stories = SessionStorage.get_stories_by_value_area(selected_area)
+
     st.write(f"**{len(stories)} historia(s) encontrada(s)**")
     st.markdown("---")
 
@@ -53,7 +53,8 @@ def _run_analysis(editor_controller: EditorController):
         editor_controller: Controller
     """
     with st.spinner("Analisando historia com IA... (pode levar ate 20 segundos)"):
-        suggestions, error = editor_controller.analyze_and_suggest(
+        # Revisão única: sugestões e score INVEST na mesma chamada
+        invest_score, suggestions, error = editor_controller.review_story(
             st.session_state.current_story
         )
 
@@ -61,6 +62,8 @@ def _run_analysis(editor_controller: EditorController):
             st.error(f"Erro ao analisar: {error}")
             return
 
+        st.session_state.invest_score = invest_score
+
         if suggestions:
             st.session_state.suggestions = suggestions
             st.success(f"Analise concluida! {len(suggestions)} sugestoes geradas.")
@@ -294,3 +297,104 @@ def render_suggestion_summary(editor_controller: EditorController):
 
     if severity_counts.get("baixa", 0) > 0:
         st.success(f"🟢 {severity_counts['baixa']} Baixa(s)")
+
+
+def render_full_analysis(editor_controller: EditorController):
+    """
+    Renderiza painel de análise completa em paralelo.
+    Dispara validação INVEST, sugestões e regenerações selecionadas de uma vez.
+
+    Args:
+        editor_controller: Controller
+    """
+    st.subheader("Analise Completa")
+
+    if 'current_story' not in st.session_state or not st.session_state.current_story:
+        st.warning("Nenhuma historia para analisar. Crie uma historia primeiro.")
+        return
+
+    st.info("Validacao INVEST, sugestoes e regeneracoes sao executadas em paralelo")
+
+    section_labels = {
+        'criterios': 'Criterios de Aceitacao',
+        'testes': 'Cenarios de Teste',
+        'arquitetura': 'Arquitetura',
+        'beneficios': 'Beneficios'
+    }
+
+    sections = st.multiselect(
+        "Secoes para regenerar junto com a analise (opcional):",
+        options=list(section_labels.keys()),
+        format_func=lambda s: section_labels[s],
+        key="full_analysis_sections"
+    )
+
+    if st.button("Analisar Tudo com IA", type="primary", use_container_width=True):
+        with st.spinner("Executando analise completa em paralelo..."):
+            results = editor_controller.analyze_everything(
+                story=st.session_state.current_story,
+                form_data=st.session_state.get('form_data', {}),
+                sections=sections
+            )
+
+        invest_score, invest_error = results["invest"]
+        if invest_error:
+            st.warning(f"Usando validacao local devido a erro: {invest_error}")
+        st.session_state.invest_score = invest_score
+
+        suggestions, suggestions_error = results["suggestions"]
+        if suggestions_error:
+            st.error(f"Erro ao analisar: {suggestions_error}")
+        elif suggestions:
+            st.session_state.suggestions = suggestions
+
+        st.session_state.pending_regenerations = {
+            section: content
+            for section, (content, error) in results["regenerations"].items()
+            if content
+        }
+        for section, (content, error) in results["regenerations"].items():
+            if error:
+                st.error(f"Erro ao regenerar {section_labels.get(section, section)}: {error}")
+
+        st.success(f"Analise concluida! Score INVEST geral: {invest_score.overall}%")
+
+    # Regenerações aguardando aprovação
+    pending = st.session_state.get('pending_regenerations', {})
+    if len(pending) > 1:
+        if st.button("Aceitar Todas (uma versao)", key="accept_all_pending", use_container_width=True):
+            success, _ = editor_controller.apply_regenerated_sections(
+                regenerated_sections=dict(pending),
+                user_note="Regeneracao de " + ", ".join(pending)
+            )
+            st.session_state.pending_regenerations = {}
+            if success:
+                st.rerun()
+            else:
+                st.error("Erro ao aplicar")
+
+    for section, content in list(pending.items()):
+        st.markdown(f"**Nova versao - {section_labels.get(section, section)}:**")
+        st.markdown(content)
+
+        col_a, col_b = st.columns(2)
+
+        with col_a:
+            if st.button("Aceitar", key=f"accept_pending_{section}", use_container_width=True):
+                success, _ = editor_controller.apply_regenerated_section(
+                    section_name=section,
+                    regenerated_content=content,
+                    user_note=f"Regeneracao de {section}"
+                )
+                del st.session_state.pending_regenerations[section]
+                if success:
+                    st.rerun()
+                else:
+                    st.error("Erro ao aplicar")
+
+        with col_b:
+            if st.button("Descartar", key=f"discard_pending_{section}", use_container_width=True):
+                del st.session_state.pending_regenerations[section]
+                st.rerun()
+
+        st.markdown("---")
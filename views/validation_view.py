@@ -9,6 +9,16 @@ from models.invest_validator import InvestScore
 from controllers.editor_controller import EditorController
 
 
+CRITERIA = [
+    ('independent', 'Independent (Independente)', 'História pode ser desenvolvida sozinha'),
+    ('negotiable', 'Negotiable (Negociavel)', 'Tem flexibilidade de implementação'),
+    ('valuable', 'Valuable (Valiosa)', 'Entrega valor claro'),
+    ('estimable', 'Estimable (Estimavel)', 'Pode ser estimada com precisão'),
+    ('small', 'Small (Pequena)', 'Tamanho adequado para uma sprint'),
+    ('testable', 'Testable (Testavel)', 'Possui critérios testáveis')
+]
+
+
 def render_invest_validation(editor_controller: EditorController):
     """
     Renderiza interface de validação INVEST.
@@ -74,20 +84,45 @@ def _run_ai_validation(editor_controller: EditorController):
     Args:
         editor_controller: Controller
     """
-    with st.spinner("Analisando historia com IA... (pode levar ate 15 segundos)"):
-        invest_score, error = editor_controller.validate_invest_with_ai(
-            st.session_state.current_story
-        )
-
-        if error:
-            st.warning(f"Usando validacao local devido a erro: {error}")
-
-        if invest_score:
-            st.session_state.invest_score = invest_score
-            st.success("Validacao com IA concluida!")
-            st.rerun()
-        else:
-            st.error("Erro ao validar com IA")
+    status = st.empty()
+    status.info("Analisando historia com IA... os criterios aparecem assim que avaliados")
+    progress = st.progress(0.0)
+
+    # Um espaço por critério, preenchido conforme a resposta chega (streaming)
+    slots = {attr: st.empty() for attr, _, _ in CRITERIA}
+    labels = {attr: (label, description) for attr, label, description in CRITERIA}
+    lists_slot = st.empty()
+
+    invest_score, error = None, None
+    completed = 0
+
+    for field, invest_score, error in editor_controller.validate_invest_with_ai_stream(
+        st.session_state.current_story
+    ):
+        if field in slots:
+            completed += 1
+            progress.progress(completed / len(CRITERIA))
+            label, description = labels[field]
+            with slots[field].container():
+                _render_criterion(invest_score, field, label, description)
+        elif field in ('strengths', 'weaknesses', 'suggestions'):
+            lists_slot.caption(
+                f"Pontos fortes: {len(invest_score.strengths)} | "
+                f"Pontos fracos: {len(invest_score.weaknesses)} | "
+                f"Sugestoes: {len(invest_score.suggestions)}"
+            )
+
+    status.empty()
+
+    if error:
+        st.warning(f"Usando validacao local devido a erro: {error}")
+
+    if invest_score:
+        st.session_state.invest_score = invest_score
+        st.success("Validacao com IA concluida!")
+        st.rerun()
+    else:
+        st.error("Erro ao validar com IA")
 
 
 def _display_invest_results(invest_score: InvestScore):
@@ -127,42 +162,8 @@ def _display_invest_results(invest_score: InvestScore):
     # Scores individuais por critério
     st.subheader("Scores por Criterio")
 
-    criteria = [
-        ('independent', 'Independent (Independente)', 'História pode ser desenvolvida sozinha'),
-        ('negotiable', 'Negotiable (Negociavel)', 'Tem flexibilidade de implementação'),
-        ('valuable', 'Valuable (Valiosa)', 'Entrega valor claro'),
-        ('estimable', 'Estimable (Estimavel)', 'Pode ser estimada com precisão'),
-        ('small', 'Small (Pequena)', 'Tamanho adequado para uma sprint'),
-        ('testable', 'Testable (Testavel)', 'Possui critérios testáveis')
-    ]
-
-    for attr, label, description in criteria:
-        score = getattr(invest_score, attr)
-        justification = invest_score.justifications.get(attr, "Sem justificativa")
-
-        col_a, col_b = st.columns([1, 2])
-
-        with col_a:
-            st.markdown(f"**{label}**")
-            st.caption(description)
-
-        with col_b:
-            # Barra de progresso com cor
-            if score >= 80:
-                st.progress(score / 100)
-                st.markdown(f"✅ **{score}%** - Bom")
-            elif score >= 50:
-                st.progress(score / 100)
-                st.markdown(f"⚠️ **{score}%** - Regular")
-            else:
-                st.progress(score / 100)
-                st.markdown(f"❌ **{score}%** - Fraco")
-
-            # Justificativa em expander
-            with st.expander("Ver justificativa"):
-                st.write(justification)
-
-        st.markdown("---")
+    for attr, label, description in CRITERIA:
+        _render_criterion(invest_score, attr, label, description)
 
     # Pontos fortes e fracos
     col_left, col_right = st.columns(2)
@@ -221,6 +222,44 @@ def _display_invest_results(invest_score: InvestScore):
         )
 
 
+def _render_criterion(invest_score: InvestScore, attr: str, label: str, description: str):
+    """
+    Exibe score e justificativa de um critério INVEST.
+
+    Args:
+        invest_score: Scores INVEST
+        attr: Atributo do critério (ex: "independent")
+        label: Nome exibido
+        description: Descrição curta do critério
+    """
+    score = getattr(invest_score, attr)
+    justification = invest_score.justifications.get(attr, "Sem justificativa")
+
+    col_a, col_b = st.columns([1, 2])
+
+    with col_a:
+        st.markdown(f"**{label}**")
+        st.caption(description)
+
+    with col_b:
+        # Barra de progresso com cor
+        if score >= 80:
+            st.progress(score / 100)
+            st.markdown(f"✅ **{score}%** - Bom")
+        elif score >= 50:
+            st.progress(score / 100)
+            st.markdown(f"⚠️ **{score}%** - Regular")
+        else:
+            st.progress(score / 100)
+            st.markdown(f"❌ **{score}%** - Fraco")
+
+        # Justificativa em expander
+        with st.expander("Ver justificativa"):
+            st.write(justification)
+
+    st.markdown("---")
+
+
 def _generate_text_report(invest_score: InvestScore) -> str:
     """
     Gera relatório em texto da validação.
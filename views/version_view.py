@@ -8,6 +8,7 @@ import streamlit as st
 from typing import List, Optional, Tuple
 from models.version import StoryVersion
 from controllers.editor_controller import EditorController
+from services.image_store import resolve_images
 from datetime import datetime
 
 
@@ -151,7 +152,7 @@ def _render_version_details(version: StoryVersion, editor_controller: EditorCont
 
     with st.expander("Ver conteudo completo", expanded=False):
         historia_texto = version.content.get('historia_gerada', 'Conteudo nao disponivel')
-        st.markdown(historia_texto)
+        st.markdown(resolve_images(historia_texto))
 
     # Campos estruturados
     with st.expander("Ver dados estruturados", expanded=False):
@@ -194,7 +195,7 @@ def _render_version_details(version: StoryVersion, editor_controller: EditorCont
         historia_texto = version.content.get('historia_gerada', '')
         st.download_button(
             label="Exportar (MD)",
-            data=historia_texto,
+            data=resolve_images(historia_texto),
             file_name=f"historia_v{version.version_number}.md",
             mime="text/markdown",
             use_container_width=True